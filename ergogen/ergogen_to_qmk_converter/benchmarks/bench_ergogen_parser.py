@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Ergogen Parser Benchmark
+
+Times ErgogenParser and QMKHardwareModel.from_ergogen on every config in
+ergogen/working_samples, reporting the anchor cache hits and misses of each
+parse. Configs the parser rejects are listed with the error instead.
+
+A synthetic board then places one footprint per key, each selecting its key
+by name and adjusted by an anchor shared with the rest of its row, with the
+anchor cache on and off. With the cache, parse time grows linearly with the
+number of keys; without it every filter scans all points.
+
+Usage: python benchmarks/bench_ergogen_parser.py [--samples DIR] [--repeat 10]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# Add the ergogen directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from ergogen_to_qmk_converter.data_models import QMKHardwareModel
+from ergogen_to_qmk_converter.parsers import ErgogenParser, ErgogenParseError
+from kle_to_ergogen.parsers.ergogen_points_evaluator import YAMLLoader
+
+SAMPLES_DIR = Path(__file__).resolve().parents[2] / 'working_samples'
+
+
+def _median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def synthetic_config(rows, cols):
+    """A rows x cols board with a switch, diode and labelled footprint on every key."""
+    footprints = {}
+    for row in range(rows):
+        for col in range(cols):
+            key = f"matrix_c{col}_r{row}"
+            footprints[f"label_{key}"] = {
+                'what': 'text',
+                'where': key,
+                'adjust': {'ref': f"matrix_c0_r{row}", 'shift': [col * 2, -3]},
+                'params': {'text': '{{name}}'}
+            }
+    footprints['switch'] = {'what': 'mx', 'where': True, 'params': {'from': '{{column_net}}', 'to': '{{colrow}}'}}
+    footprints['diode'] = {'what': 'diode', 'where': True, 'params': {'from': '{{colrow}}', 'to': '{{row_net}}'}}
+
+    return {
+        'points': {
+            'zones': {
+                'matrix': {
+                    'key': {'colrow': '{{col.name}}_{{row}}'},
+                    'columns': {f"c{col}": {'key': {'column_net': f"C{col}"}} for col in range(cols)},
+                    'rows': {f"r{row}": {'row_net': f"R{row}"} for row in range(rows)}
+                }
+            }
+        },
+        'pcbs': {'board': {'footprints': footprints}}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Ergogen config parsing")
+    parser.add_argument('--samples', type=Path, default=SAMPLES_DIR, help='Directory of Ergogen configs')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per config')
+    args = parser.parse_args()
+
+    files = sorted(list(args.samples.glob('*.yaml')) + list(args.samples.glob('*.yml')))
+
+    print(f"{'config':<28} {'points':>6} {'places':>6} {'matrix':>7} {'load ms':>8} "
+          f"{'parse ms':>9} {'model ms':>9} {'hits':>5} {'misses':>6}")
+    parse_times = []
+    for path in files:
+        ergogen = ErgogenParser()
+        try:
+            start = time.perf_counter()
+            with open(path, 'r', encoding='utf-8') as f:
+                config = yaml.load(f, Loader=YAMLLoader)
+            load_time = (time.perf_counter() - start) * 1000
+
+            data = ergogen.parse_config(config, str(path))
+            parse_time = _median_ms(lambda: ergogen.parse_config(config, str(path)), args.repeat)
+            model = QMKHardwareModel.from_ergogen(data)
+            model_time = _median_ms(lambda: QMKHardwareModel.from_ergogen(data), args.repeat)
+        except (yaml.YAMLError, ErgogenParseError) as e:
+            reason = str(e).splitlines()[0]
+            print(f"{path.name:<28} skipped: {reason}")
+            continue
+
+        parse_times.append(parse_time)
+        placements = sum(len(footprints) for footprints in data.footprints.values())
+        matrix = f"{model.matrix.rows}x{model.matrix.cols}"
+        print(f"{path.name:<28} {len(data.points):>6} {placements:>6} {matrix:>7} {load_time:>8.1f} "
+              f"{parse_time:>9.1f} {model_time:>9.1f} {ergogen.cache_hits:>5} {ergogen.cache_misses:>6}")
+
+    if parse_times:
+        print(f"\n{len(parse_times)} of {len(files)} configs parsed, "
+              f"slowest {max(parse_times):.1f} ms, total {sum(parse_times):.1f} ms")
+
+    print(f"\n{'synthetic':<12} {'keys':>6} {'places':>6} {'cached ms':>10} {'uncached ms':>12}")
+    for rows, cols in ((4, 6), (8, 12), (16, 24), (32, 24)):
+        config = synthetic_config(rows, cols)
+        cached = ErgogenParser()
+        uncached = ErgogenParser(cache_anchors=False)
+        data = cached.parse_config(config)
+        repeat = max(1, args.repeat // 2)
+        cached_time = _median_ms(lambda: cached.parse_config(config), repeat)
+        uncached_time = _median_ms(lambda: uncached.parse_config(config), repeat)
+        placements = len(data.footprints['board'])
+        print(f"{f'{rows}x{cols}':<12} {len(data.points):>6} {placements:>6} "
+              f"{cached_time:>10.1f} {uncached_time:>12.1f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,7 @@ used to convert between Ergogen and QMK formats.
 
 Classes:
 - QMKHardwareModel: Main hardware configuration model
+- ErgogenData: Parsed Ergogen config (points and placed footprints)
 - MatrixConfig: Matrix configuration (rows, columns, pins)
 - HardwareFeatures: Hardware feature flags (encoders, OLED, etc.)
 - PhysicalLayout: Physical key positions and coordinates
@@ -13,21 +14,27 @@ Classes:
 - KeyboardMetadata: Basic keyboard information
 """
 
-# Data model classes - will be implemented
-# from .qmk_hardware_model import QMKHardwareModel
-# from .ergogen_model import ErgogenData
-# from .matrix_config import MatrixConfig
-# from .hardware_features import HardwareFeatures
-# from .physical_layout import PhysicalLayout
-# from .pin_mapping import PinMapping
-# from .keyboard_metadata import KeyboardMetadata
+from .qmk_hardware_model import QMKHardwareModel
+from .ergogen_model import ErgogenData, FootprintPlacement, PointData
+from .matrix_config import MatrixConfig
+from .hardware_features import HardwareFeatures, EncoderConfig, DisplayConfig, RGBConfig, AudioConfig
+from .physical_layout import PhysicalLayout, KeyPosition
+from .pin_mapping import PinMapping
+from .keyboard_metadata import KeyboardMetadata
 
-# __all__ = [
-#     "QMKHardwareModel",
-#     "ErgogenData",
-#     "MatrixConfig",
-#     "HardwareFeatures",
-#     "PhysicalLayout",
-#     "PinMapping",
-#     "KeyboardMetadata"
-# ]
+__all__ = [
+    "QMKHardwareModel",
+    "ErgogenData",
+    "FootprintPlacement",
+    "PointData",
+    "MatrixConfig",
+    "HardwareFeatures",
+    "EncoderConfig",
+    "DisplayConfig",
+    "RGBConfig",
+    "AudioConfig",
+    "PhysicalLayout",
+    "KeyPosition",
+    "PinMapping",
+    "KeyboardMetadata"
+]
@@ -0,0 +1,89 @@
+"""
+Ergogen Data Model
+
+This module defines the result of parsing an Ergogen config: the evaluated
+units and points, and every PCB footprint placed on them with its params
+filled in from the point it sits on.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .keyboard_metadata import KeyboardMetadata
+
+# Footprint kinds, in the order their patterns are tried (see ErgogenParser)
+FOOTPRINT_KINDS = ('controller', 'encoder', 'switch', 'diode', 'display', 'led', 'audio', 'split', 'other')
+
+
+@dataclass
+class PointData:
+    """An evaluated Ergogen point: center in mm (y up), rotation in degrees and key meta."""
+
+    name: str
+    x: float
+    y: float
+    r: float = 0.0
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def mirrored(self) -> bool:
+        return bool(self.meta.get('mirrored'))
+
+
+@dataclass
+class FootprintPlacement:
+    """
+    One footprint placed by a PCB.
+
+    A footprint whose where filter matches several points is placed once
+    per point; params have their {{...}} templates filled in from that
+    point's meta.
+    """
+
+    pcb: str
+    name: str  # Footprint name under pcbs.<pcb>.footprints
+    what: str
+    kind: str
+    x: float
+    y: float
+    r: float = 0.0
+    point: Optional[str] = None  # Point the footprint was placed at, if any
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    def nets(self, *names: str) -> List[str]:
+        """Values of the given params that are set to a net name."""
+        return [self.params[name] for name in names
+                if isinstance(self.params.get(name), str) and self.params[name]]
+
+
+@dataclass
+class ErgogenData:
+    """Parsed Ergogen config, ready to be turned into a QMKHardwareModel."""
+
+    config: Dict[str, Any]  # Preprocessed config (dotted keys unnested, $extends resolved)
+    units: Dict[str, float]
+    points: Dict[str, PointData]
+    footprints: Dict[str, List[FootprintPlacement]]  # PCB name -> placements, in config order
+    metadata: KeyboardMetadata
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def default_pcb(self) -> Optional[str]:
+        """
+        PCB used for the hardware model: the first one with a controller,
+        otherwise the first with switches. PCBs whose names start with an
+        underscore are treated as templates for the others.
+        """
+        candidates = [name for name in self.footprints if not name.startswith('_')]
+        for kind in ('controller', 'switch'):
+            for name in candidates:
+                if any(placement.kind == kind for placement in self.footprints[name]):
+                    return name
+        return candidates[0] if candidates else None
+
+    def placements(self, pcb: Optional[str], *kinds: str) -> List[FootprintPlacement]:
+        """Placements of a PCB, optionally limited to some footprint kinds."""
+        placements = self.footprints.get(pcb, []) if pcb is not None else []
+        if kinds:
+            placements = [placement for placement in placements if placement.kind in kinds]
+        return placements
@@ -0,0 +1,82 @@
+"""
+Hardware Features Model
+
+This module defines the optional hardware of a keyboard that needs firmware
+support: rotary encoders, displays, RGB LEDs, audio and split halves.
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class EncoderConfig:
+    """A rotary encoder; pins are None when a net does not reach the controller."""
+
+    name: str
+    a_net: Optional[str] = None
+    b_net: Optional[str] = None
+    pin_a: Optional[str] = None
+    pin_b: Optional[str] = None
+    resolution: int = 4
+    key: Optional[str] = None  # Point the encoder was placed at
+
+
+@dataclass
+class DisplayConfig:
+    """An OLED or memory LCD; pins map signals (SDA, SCL, CS) to controller pins."""
+
+    name: str
+    driver: str = 'ssd1306'
+    protocol: str = 'i2c'
+    pins: Dict[str, Optional[str]] = field(default_factory=dict)
+
+
+@dataclass
+class RGBConfig:
+    """Addressable LEDs chained from one data pin."""
+
+    count: int
+    driver: str = 'ws2812'
+    data_pin: Optional[str] = None
+
+
+@dataclass
+class AudioConfig:
+    """A speaker or buzzer."""
+
+    pin: Optional[str] = None
+
+
+@dataclass
+class HardwareFeatures:
+    """
+    Hardware features detected from a keyboard's PCB footprints.
+
+    Each feature maps to a QMK build option: encoders to ENCODER_ENABLE,
+    displays to OLED_ENABLE, rgb to RGBLIGHT_ENABLE, audio to
+    AUDIO_ENABLE and split to SPLIT_KEYBOARD.
+    """
+
+    encoders: List[EncoderConfig] = field(default_factory=list)
+    displays: List[DisplayConfig] = field(default_factory=list)
+    rgb: Optional[RGBConfig] = None
+    audio: Optional[AudioConfig] = None
+    split: bool = False
+    split_pin: Optional[str] = None  # Serial pin between the halves
+
+    @property
+    def enabled(self) -> List[str]:
+        """Names of the features present."""
+        flags = {
+            'encoder': bool(self.encoders),
+            'oled': bool(self.displays),
+            'rgblight': self.rgb is not None,
+            'audio': self.audio is not None,
+            'split': self.split
+        }
+        return [name for name, present in flags.items() if present]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export to a dictionary for debugging and serialization."""
+        return asdict(self)
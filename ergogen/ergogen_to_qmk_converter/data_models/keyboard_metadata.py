@@ -0,0 +1,30 @@
+"""
+Keyboard Metadata Model
+
+This module defines the basic descriptive information about a keyboard,
+taken from the meta section of an Ergogen config.
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class KeyboardMetadata:
+    """
+    Name, version and authorship of a keyboard.
+
+    Values come from Ergogen's meta section; the name falls back to the
+    config file name when the section is missing.
+    """
+
+    name: str
+    version: Optional[str] = None
+    author: Optional[str] = None
+    url: Optional[str] = None
+    engine: Optional[str] = None  # Ergogen version the config targets
+    source: Optional[str] = None  # Path of the config file
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export to a dictionary, leaving out unset fields."""
+        return {key: value for key, value in asdict(self).items() if value is not None}
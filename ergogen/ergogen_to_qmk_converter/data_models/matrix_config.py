@@ -0,0 +1,98 @@
+"""
+Matrix Configuration Model
+
+This module defines the switch matrix of a keyboard: its size, the nets and
+controller pins of each row and column, the diode direction and the matrix
+position of every key.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+DIODE_DIRECTIONS = ('COL2ROW', 'ROW2COL')
+
+
+@dataclass
+class MatrixConfig:
+    """
+    Switch matrix of a keyboard.
+
+    For split boards built from one reversible PCB both halves use the same
+    pins, and the keys of the mirrored half are placed in the rows after
+    the first half's, as QMK expects. Boards that wire every switch between
+    a pin and GND use direct_pins instead of row and column pins.
+    """
+
+    rows: int
+    cols: int
+    row_pins: List[str]
+    col_pins: List[str]
+
+    # Nets the rows and columns were derived from, in matrix order
+    row_nets: List[str] = field(default_factory=list)
+    col_nets: List[str] = field(default_factory=list)
+
+    diode_direction: str = 'COL2ROW'
+    split: bool = False
+
+    # Key name -> (row, col)
+    keys: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    # Key name -> pin, for keys wired straight to a pin
+    direct_pins: Dict[str, str] = field(default_factory=dict)
+
+    def validate(self) -> List[str]:
+        """
+        Check the matrix for inconsistencies.
+
+        Returns:
+            List of error messages (empty if valid)
+        """
+        errors = []
+        if self.diode_direction not in DIODE_DIRECTIONS:
+            errors.append(f"Unknown diode direction: {self.diode_direction}")
+        if not self.keys:
+            errors.append("Matrix has no keys")
+
+        if self.direct_pins:
+            missing = [key for key in self.keys if key not in self.direct_pins]
+            if missing:
+                errors.append(f"Keys without a direct pin: {', '.join(missing)}")
+        else:
+            halves = 2 if self.split else 1
+            if self.rows != len(self.row_pins) * halves:
+                errors.append(f"Matrix has {self.rows} rows but {len(self.row_pins)} row pins")
+            if self.cols != len(self.col_pins):
+                errors.append(f"Matrix has {self.cols} columns but {len(self.col_pins)} column pins")
+            shared = set(self.row_pins) & set(self.col_pins)
+            if shared:
+                errors.append(f"Pins used for both rows and columns: {', '.join(sorted(shared))}")
+
+        positions: Dict[Tuple[int, int], str] = {}
+        for key, position in self.keys.items():
+            row, col = position
+            if not (0 <= row < self.rows and 0 <= col < self.cols):
+                errors.append(f"Key {key} is outside the matrix at {position}")
+            elif position in positions:
+                errors.append(f"Keys {positions[position]} and {key} share matrix position {position}")
+            else:
+                positions[position] = key
+
+        return errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export to a dictionary for debugging and serialization."""
+        result: Dict[str, Any] = {
+            'rows': self.rows,
+            'cols': self.cols,
+            'row_pins': list(self.row_pins),
+            'col_pins': list(self.col_pins),
+            'row_nets': list(self.row_nets),
+            'col_nets': list(self.col_nets),
+            'diode_direction': self.diode_direction,
+            'split': self.split,
+            'keys': {key: list(position) for key, position in self.keys.items()}
+        }
+        if self.direct_pins:
+            result['direct_pins'] = dict(self.direct_pins)
+        return result
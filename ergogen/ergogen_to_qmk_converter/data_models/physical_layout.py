@@ -0,0 +1,68 @@
+"""
+Physical Layout Model
+
+This module defines the physical key positions of a keyboard in QMK's
+info.json conventions: key units of 19.05mm, y growing downwards and
+clockwise rotations.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+KEY_UNIT = 19.05  # mm per key unit
+
+
+@dataclass
+class KeyPosition:
+    """
+    A key in the physical layout.
+
+    x and y are the top-left corner of the unrotated key in key units,
+    normalized so the layout starts at (0, 0); the key is rotated by r
+    degrees clockwise about (rx, ry), its center.
+    """
+
+    name: str
+    x: float
+    y: float
+    w: float = 1.0
+    h: float = 1.0
+    r: float = 0.0
+    rx: float = 0.0
+    ry: float = 0.0
+
+    # Original Ergogen position of the key center in mm (y up)
+    x_mm: float = 0.0
+    y_mm: float = 0.0
+
+    matrix: Optional[Tuple[int, int]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export as an info.json layout entry."""
+        result: Dict[str, Any] = {'label': self.name, 'x': self.x, 'y': self.y}
+        if self.matrix is not None:
+            result['matrix'] = list(self.matrix)
+        if self.w != 1.0:
+            result['w'] = self.w
+        if self.h != 1.0:
+            result['h'] = self.h
+        if self.r:
+            result.update(r=self.r, rx=self.rx, ry=self.ry)
+        return result
+
+
+@dataclass
+class PhysicalLayout:
+    """Key positions of a keyboard and the size of their bounding box."""
+
+    keys: List[KeyPosition] = field(default_factory=list)
+    width_mm: float = 0.0
+    height_mm: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export to a dictionary for debugging and serialization."""
+        return {
+            'width_mm': self.width_mm,
+            'height_mm': self.height_mm,
+            'keys': [key.to_dict() for key in self.keys]
+        }
@@ -0,0 +1,63 @@
+"""
+Pin Mapping Model
+
+This module defines the assignment of nets to the pins of a keyboard's
+controller, as given by the params of its Ergogen controller footprint.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+# Controller pin names: Pro Micro style (P10), RP2040 (GP10) and AVR ports (B4)
+PIN_NAME = re.compile(r'^(?:G?P\d{1,2}|[A-F]\d{1,2})$')
+
+# Power and reset pins are never used for signals
+POWER_PINS = re.compile(r'^(?:RAW|VCC|VIN|VUSB|3V3|5V|GND\d*|RST|BAT[+-]?|B\+|B-)$', re.IGNORECASE)
+
+
+@dataclass
+class PinMapping:
+    """
+    Controller pins and the nets connected to them.
+
+    Pins that a footprint leaves unassigned keep Ergogen's default net,
+    which is the pin's own name, so a net such as 'P7' resolves to pin P7
+    unless that pin was given another net.
+    """
+
+    controller: Optional[str] = None  # Footprint name, e.g. promicro
+    pins: Dict[str, str] = field(default_factory=dict)  # Pin -> net
+
+    def __post_init__(self):
+        self._nets: Dict[str, str] = {}
+        for pin, net in self.pins.items():
+            if not POWER_PINS.match(pin):
+                self._nets.setdefault(net, pin)
+
+    @property
+    def nets(self) -> Dict[str, str]:
+        """Net -> first signal pin connected to it."""
+        return dict(self._nets)
+
+    def pin_for(self, net: Optional[str]) -> Optional[str]:
+        """
+        Find the controller pin a net is connected to.
+
+        Args:
+            net: Net name
+
+        Returns:
+            Pin name, or None if the net does not reach the controller
+        """
+        if not net:
+            return None
+        if net in self._nets:
+            return self._nets[net]
+        if PIN_NAME.match(net) and net not in self.pins:
+            return net
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export to a dictionary for debugging and serialization."""
+        return {'controller': self.controller, 'pins': dict(self.pins)}
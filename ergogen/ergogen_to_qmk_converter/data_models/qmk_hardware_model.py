@@ -0,0 +1,106 @@
+"""
+QMK Hardware Model
+
+This module defines the intermediate representation between a parsed
+Ergogen config and the generated QMK files.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .ergogen_model import ErgogenData
+from .hardware_features import HardwareFeatures
+from .keyboard_metadata import KeyboardMetadata
+from .matrix_config import MatrixConfig
+from .physical_layout import PhysicalLayout
+from .pin_mapping import PinMapping
+
+
+@dataclass
+class QMKHardwareModel:
+    """Complete QMK hardware configuration."""
+
+    metadata: KeyboardMetadata
+    matrix: MatrixConfig
+    pins: PinMapping
+    features: HardwareFeatures
+    layout: PhysicalLayout
+    pcb: Optional[str] = None  # Ergogen PCB the hardware was read from
+    warnings: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_ergogen(cls, data: ErgogenData, pcb: Optional[str] = None) -> 'QMKHardwareModel':
+        """
+        Build the hardware model of one PCB of a parsed Ergogen config.
+
+        Args:
+            data: Result of ErgogenParser.parse
+            pcb: PCB to read (default: ErgogenData.default_pcb)
+
+        Returns:
+            Hardware model; problems that did not stop extraction are
+            listed in its warnings
+        """
+        # Imported here as the parsers build on these models
+        from ..parsers.feature_parser import FeatureParser
+        from ..parsers.layout_parser import LayoutParser
+        from ..parsers.matrix_parser import MatrixParser
+        from ..parsers.pin_parser import PinParser
+
+        pcb = pcb if pcb is not None else data.default_pcb
+        if pcb is not None and pcb not in data.footprints:
+            raise ValueError(f"Unknown PCB: {pcb}")
+
+        warnings = list(data.warnings)
+        pins = PinParser(warnings).parse(data, pcb)
+        matrix = MatrixParser(warnings).parse(data, pcb, pins)
+        features = FeatureParser(warnings).parse(data, pcb, pins, matrix)
+        layout = LayoutParser(warnings).parse(data, matrix)
+
+        return cls(
+            metadata=data.metadata,
+            matrix=matrix,
+            pins=pins,
+            features=features,
+            layout=layout,
+            pcb=pcb,
+            warnings=warnings
+        )
+
+    def validate(self) -> List[str]:
+        """
+        Validate the complete hardware model.
+
+        Returns:
+            List of error messages (empty if valid)
+        """
+        errors = self.matrix.validate()
+        if self.pins.controller is None:
+            errors.append("No controller footprint found")
+
+        pins = list(self.matrix.row_pins) + list(self.matrix.col_pins) + list(self.matrix.direct_pins.values())
+        unresolved = sorted(set(pin for pin in pins if self.pins.pin_for(pin) is None and pin not in self.pins.pins))
+        if unresolved and self.pins.controller is not None:
+            errors.append(f"Nets not connected to the controller: {', '.join(unresolved)}")
+
+        for encoder in self.features.encoders:
+            if encoder.pin_a is None or encoder.pin_b is None:
+                errors.append(f"Encoder {encoder.name} is not connected to the controller")
+
+        layout_keys = set(key.name for key in self.layout.keys)
+        missing = [key for key in self.matrix.keys if key not in layout_keys]
+        if missing:
+            errors.append(f"Matrix keys missing from the layout: {', '.join(missing)}")
+        return errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export to a dictionary for debugging and serialization."""
+        return {
+            'metadata': self.metadata.to_dict(),
+            'pcb': self.pcb,
+            'matrix': self.matrix.to_dict(),
+            'pins': self.pins.to_dict(),
+            'features': self.features.to_dict(),
+            'layout': self.layout.to_dict(),
+            'warnings': list(self.warnings)
+        }
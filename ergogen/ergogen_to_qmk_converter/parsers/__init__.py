@@ -6,23 +6,23 @@ hardware definition files.
 
 Classes:
 - ErgogenParser: Main parser for Ergogen YAML files
-- MatrixParser: Extract matrix configuration from zones
+- MatrixParser: Extract matrix configuration from switch and diode nets
 - PinParser: Extract pin assignments from controller
 - FeatureParser: Detect hardware features from footprints
 - LayoutParser: Extract physical layout from points
 """
 
-# Parser classes - will be implemented
-# from .ergogen_parser import ErgogenParser
-# from .matrix_parser import MatrixParser
-# from .pin_parser import PinParser
-# from .feature_parser import FeatureParser
-# from .layout_parser import LayoutParser
+from .ergogen_parser import ErgogenParser, ErgogenParseError
+from .matrix_parser import MatrixParser
+from .pin_parser import PinParser
+from .feature_parser import FeatureParser
+from .layout_parser import LayoutParser
 
-# __all__ = [
-#     "ErgogenParser",
-#     "MatrixParser",
-#     "PinParser", 
-#     "FeatureParser",
-#     "LayoutParser"
-# ]
+__all__ = [
+    "ErgogenParser",
+    "ErgogenParseError",
+    "MatrixParser",
+    "PinParser",
+    "FeatureParser",
+    "LayoutParser"
+]
@@ -0,0 +1,538 @@
+"""
+Ergogen Parser
+
+This module parses an Ergogen v4 config into ErgogenData in one pass: the
+config is preprocessed once ($extends and dotted keys), units and points are
+evaluated once with the kle_to_ergogen points evaluator, and each PCB's
+footprints are placed on the points their where filters select.
+
+Filters and anchors are resolved through a memo shared by all footprints.
+Repeated filters (most footprints of a board select the same keys) are
+evaluated once, plain name and tag filters are answered from an index
+instead of a scan over every point, and each distinct anchor is resolved
+once per start point, so boards with many cross-referenced anchors parse
+in time linear in the number of placements.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+import yaml
+
+from ..data_models.ergogen_model import ErgogenData, FootprintPlacement, PointData
+from ..data_models.keyboard_metadata import KeyboardMetadata
+
+# The points evaluator lives in the sibling kle_to_ergogen package
+from kle_to_ergogen.parsers.ergogen_points_evaluator import (
+    ErgogenEvaluationError,
+    ErgogenPointsEvaluator,
+    Point,
+    YAMLLoader,
+    inherit,
+    render_template,
+    unnest
+)
+
+_FOOTPRINT_FIELDS = ('what', 'where', 'asym', 'adjust', 'params')
+_SOURCE_ALIASES = ('source', 'origin', 'base', 'primary', 'left')
+_CLONE_ALIASES = ('clone', 'image', 'derived', 'secondary', 'right')
+
+# Footprint kind -> pattern matched against the footprint name (without its
+# "author/" prefix); the first match wins, so reset and power switches are
+# claimed by 'other' before the switch pattern sees them
+_FOOTPRINT_PATTERNS = (
+    ('other', re.compile(r'reset|power|slide|bonus|tact|button|jumper|battery|bat$|hole|logo|text|via|pad$')),
+    ('controller', re.compile(r'promicro|pro_micro|nice_?nano|xiao|elite_?c|rp2040|pico|kb2040|blackpill|'
+                              r'holyiot|bluemicro|puchi|mcu')),
+    ('encoder', re.compile(r'rotary|encoder|ec11|evqwgd|scrollwheel')),
+    ('display', re.compile(r'oled|ssd1306|sh1106|nice_?view|display|lcd')),
+    ('switch', re.compile(r'mx|choc|alps|pg135|switch|hotswap|kailh|gateron')),
+    ('diode', re.compile(r'diode|sod\d|1n4148')),
+    ('led', re.compile(r'led|rgb|ws2812|sk6812')),
+    ('audio', re.compile(r'speaker|buzzer|piezo|audio')),
+    ('split', re.compile(r'trrs|trs|pj320|jack')),
+)
+
+_JS_REGEX_FLAGS = {'i': re.IGNORECASE, 'm': re.MULTILINE, 's': re.DOTALL}
+
+
+class ErgogenParseError(Exception):
+    """Raised when an Ergogen config cannot be parsed."""
+
+    def __init__(self, message: str, yaml_path: Optional[str] = None, line_number: Optional[int] = None):
+        self.message = message
+        self.yaml_path = yaml_path  # e.g. "points.zones.numpad.columns.col0"
+        self.line_number = line_number
+        location = ':'.join(str(part) for part in (yaml_path, line_number) if part is not None)
+        super().__init__(f"{message} at {location}" if location else message)
+
+
+def classify_footprint(what: str) -> str:
+    """Footprint kind (see FOOTPRINT_KINDS) of an Ergogen footprint name."""
+    name = what.rsplit('/', 1)[-1].lower()
+    for kind, pattern in _FOOTPRINT_PATTERNS:
+        if pattern.search(name):
+            return kind
+    return 'other'
+
+
+def _canonical(raw: Any) -> str:
+    """Memo key of a filter or anchor config."""
+    return json.dumps(raw, sort_keys=True, default=str)
+
+
+def _contains_object(value: Any) -> bool:
+    if isinstance(value, dict):
+        return True
+    if isinstance(value, list):
+        return any(_contains_object(item) for item in value)
+    return False
+
+
+def _mirror_ref(name: str) -> str:
+    return name[len('mirror_'):] if name.startswith('mirror_') else f"mirror_{name}"
+
+
+def _lookup(point: Point, key: str) -> Any:
+    """Value of a filter key such as 'meta.tags' on a point."""
+    levels = key.split('.')
+    value: Any = point
+    if levels[0] == 'meta':
+        value, levels = point.meta, levels[1:]
+    elif hasattr(point, levels[0]) and levels[0] in Point.__slots__:
+        value, levels = getattr(point, levels[0]), levels[1:]
+    for level in levels:
+        if not isinstance(value, dict) or level not in value:
+            return None
+        value = value[level]
+    return value
+
+
+class _AnchorResolver:
+    """
+    Memoized footprint filter and anchor resolution over a board's points.
+
+    Results are keyed on the canonical form of the filter or anchor config
+    (plus the asym setting or the start point), so identical configs under
+    different footprints, including YAML aliases, are resolved once.
+    """
+
+    def __init__(self, evaluator: ErgogenPointsEvaluator, points: Dict[str, Point],
+                 units: Dict[str, float], cache: bool = True):
+        self.evaluator = evaluator
+        self.points = points
+        self.units = units
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+        self._order = {name: index for index, name in enumerate(points)}
+        self._filters: Dict[Tuple[str, str], List[Point]] = {}
+        self._anchors: Dict[Tuple[Any, ...], Point] = {}
+        self._testers: Dict[str, Callable[[Any], bool]] = {}
+
+        # Name and tag -> points, for the default "meta.name,meta.tags ~ value" filters
+        self._index: Dict[str, set] = {}
+        for name, point in points.items():
+            for value in self._values(point, 'meta.name') + self._values(point, 'meta.tags'):
+                self._index.setdefault(value, set()).add(name)
+
+    @staticmethod
+    def _values(point: Point, key: str) -> List[str]:
+        """String values a filter key tests: array items, object keys or the value itself."""
+        value = _lookup(point, key)
+        if isinstance(value, list):
+            return [str(item) for item in value]
+        if isinstance(value, dict):
+            return [str(item) for item in value]
+        return [_js_string(value)]
+
+    def filter(self, raw: Any, name: str, asym: str) -> List[Point]:
+        """
+        Points selected by a footprint's where filter, like Ergogen's filter.parse.
+
+        Args:
+            raw: Filter config; None selects the origin, an anchor (any
+                mapping) selects one point, anything else filters by name and tags
+            name: Field name for error messages
+            asym: 'source', 'clone' or 'both'
+
+        Returns:
+            Selected points, cloned
+        """
+        key = (_canonical(raw), asym)
+        if self.cache and key in self._filters:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._filters[key] = self._resolve_filter(raw, name, asym)
+        return [point.clone() for point in self._filters[key]]
+
+    def anchor(self, raw: Any, name: str, start: Optional[Point] = None, mirror: bool = False) -> Point:
+        """Resolve an anchor, optionally relative to a start point; the result is cloned."""
+        key: Tuple[Any, ...] = (_canonical(raw), mirror)
+        if start is not None:
+            key += (start.meta.get('name'), start.x, start.y, start.r, bool(start.meta.get('mirrored')))
+        if self.cache and key in self._anchors:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._anchors[key] = self.evaluator.parse_anchor(raw, name, self.points, self.units, start, mirror)
+        return self._anchors[key].clone()
+
+    def _resolve_filter(self, raw: Any, name: str, asym: str) -> List[Point]:
+        if raw is None:
+            return [Point()]
+
+        if _contains_object(raw):
+            result = []
+            if asym in ('source', 'both'):
+                result.append(self.anchor(raw, name))
+            if asym in ('clone', 'both'):
+                clone = self.anchor(raw, name, mirror=True)
+                if all((point.x, point.y, point.r) != (clone.x, clone.y, clone.r) for point in result):
+                    result.append(clone)
+            return result
+
+        selected = sorted(self._select(raw, name, self._union), key=self._order.__getitem__)
+        result = [self.points[point_name] for point_name in selected] if asym in ('source', 'both') else []
+        if asym in ('clone', 'both'):
+            pool = set(point.meta.get('name') for point in result)
+            for point_name in selected:
+                mirrored = self.points.get(_mirror_ref(point_name))
+                if mirrored is not None and mirrored.meta.get('name') not in pool:
+                    result.append(mirrored)
+        return result
+
+    @staticmethod
+    def _union(sets: List[FrozenSet[str]]) -> FrozenSet[str]:
+        return frozenset().union(*sets)
+
+    @staticmethod
+    def _intersection(sets: List[FrozenSet[str]]) -> FrozenSet[str]:
+        return frozenset.intersection(*sets) if sets else frozenset()
+
+    def _select(self, raw: Any, name: str, aggregator: Callable) -> FrozenSet[str]:
+        """Names of the points a filter selects; nested arrays alternate between or and and."""
+        if isinstance(raw, bool):
+            return frozenset(self.points) if raw else frozenset()
+        if isinstance(raw, (str, int, float)):
+            return self._simple(str(raw), name)
+        if isinstance(raw, list):
+            alternate = self._intersection if aggregator == self._union else self._union
+            return aggregator([self._select(item, name, alternate) for item in raw])
+        raise ErgogenParseError(f'Unexpected type "{type(raw).__name__}" found at filter "{name}"!', name)
+
+    def _simple(self, expression: str, name: str) -> FrozenSet[str]:
+        keys = ['meta.name', 'meta.tags']
+        value = expression
+        parts = expression.split()
+        if len(parts) > 1 and parts[1] == '~':
+            keys = parts[0].split(',')
+            value = ' '.join(parts[2:])
+        elif parts and parts[0] == '~':
+            value = ' '.join(parts[1:])
+
+        negate = value.startswith('-')
+        if negate:
+            value = value[1:]
+
+        if self.cache and not value.startswith('/') and keys == ['meta.name', 'meta.tags']:
+            matches = frozenset(self._index.get(value, ()))
+        else:
+            tester = self._tester(value, name)
+            matches = frozenset(point_name for point_name, point in self.points.items()
+                                if any(tester(item) for key in keys for item in self._values(point, key)))
+        return frozenset(self.points) - matches if negate else matches
+
+    def _tester(self, reference: str, name: str) -> Callable[[Any], bool]:
+        if reference not in self._testers:
+            if reference.startswith('/'):
+                parts = reference.split('/')
+                flags = 0
+                for flag in parts[-1]:
+                    flags |= _JS_REGEX_FLAGS.get(flag, 0)
+                try:
+                    regex = re.compile('/'.join(parts[1:-1]), flags)
+                except re.error:
+                    raise ErgogenParseError(f'Invalid regex "{reference}" found at filter "{name}"!', name)
+                self._testers[reference] = lambda value: regex.search(value) is not None
+            else:
+                self._testers[reference] = lambda value: value == reference
+        return self._testers[reference]
+
+
+def _js_string(value: Any) -> str:
+    """String form of a meta value as JavaScript would print it."""
+    if value is None:
+        return 'undefined'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _fill_templates(value: Any, meta: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        return render_template(value, meta) if '{{' in value else value
+    if isinstance(value, dict):
+        return {key: _fill_templates(item, meta) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill_templates(item, meta) for item in value]
+    return value
+
+
+class ErgogenParser:
+    """
+    Parser for Ergogen v4 configs.
+
+    Produces ErgogenData: evaluated units and points plus the footprints of
+    every PCB placed on them, which QMKHardwareModel.from_ergogen turns into
+    matrix, pin, feature and layout information. Outlines and cases are
+    not evaluated.
+    """
+
+    def __init__(self, cache_anchors: bool = True):
+        """
+        Initialize the parser.
+
+        Args:
+            cache_anchors: Memoize filter and anchor resolution (only worth
+                turning off to measure what the memo saves)
+        """
+        self.evaluator = ErgogenPointsEvaluator()
+        self.cache_anchors = cache_anchors
+        self.warnings: List[str] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def parse(self, source: Union[str, Path, Dict[str, Any]]) -> ErgogenData:
+        """
+        Parse an Ergogen config from a file path or an already loaded mapping.
+
+        Raises:
+            ErgogenParseError: If the config cannot be loaded or evaluated
+        """
+        if isinstance(source, dict):
+            return self.parse_config(source)
+        return self.parse_file(source)
+
+    def parse_file(self, filepath: Union[str, Path]) -> ErgogenData:
+        """
+        Parse an Ergogen YAML file.
+
+        Args:
+            filepath: Path to the config
+
+        Returns:
+            Parsed config
+
+        Raises:
+            ErgogenParseError: If the file cannot be read or evaluated; YAML
+                syntax errors and evaluation errors carry a line number
+        """
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except OSError as e:
+            raise ErgogenParseError(f"Failed to read {filepath}: {e}")
+
+        try:
+            config = yaml.load(text, Loader=YAMLLoader)
+        except yaml.YAMLError as e:
+            mark = getattr(e, 'problem_mark', None)
+            problem = getattr(e, 'problem', None) or str(e)
+            raise ErgogenParseError(f"Invalid YAML: {problem}", str(filepath),
+                                    mark.line + 1 if mark is not None else None)
+
+        try:
+            return self.parse_config(config, str(filepath))
+        except ErgogenParseError as e:
+            if e.line_number is None and e.yaml_path:
+                e = ErgogenParseError(e.message, e.yaml_path, _line_of(text, e.yaml_path))
+            raise e
+
+    def parse_config(self, config: Any, source: Optional[str] = None) -> ErgogenData:
+        """
+        Parse a loaded Ergogen config.
+
+        Args:
+            config: Config as loaded from YAML
+            source: Where the config came from, for metadata
+
+        Returns:
+            Parsed config
+        """
+        errors = self.validate_structure(config)
+        if errors:
+            raise ErgogenParseError(errors[0], _quoted_path(errors[0]))
+        self.warnings = []
+
+        try:
+            config = inherit(unnest(config))
+            units = self.evaluator.parse_units(config)
+            points = self.evaluator.evaluate_points(config, units)
+            self.warnings.extend(self.evaluator.notes)
+
+            resolver = _AnchorResolver(self.evaluator, points, units, self.cache_anchors)
+            footprints = {}
+            for pcb_name, pcb in (config.get('pcbs') or {}).items():
+                footprints[str(pcb_name)] = self._place_footprints(str(pcb_name), pcb or {}, resolver)
+        except ErgogenEvaluationError as e:
+            raise ErgogenParseError(str(e), _quoted_path(str(e)))
+        self.cache_hits, self.cache_misses = resolver.hits, resolver.misses
+
+        return ErgogenData(
+            config=config,
+            units=units,
+            points={name: PointData(name, point.x, point.y, point.r, point.meta) for name, point in points.items()},
+            footprints=footprints,
+            metadata=self.extract_metadata(config, source),
+            warnings=list(self.warnings)
+        )
+
+    def validate_structure(self, data: Any) -> List[str]:
+        """
+        Check that the sections the parser relies on are present and well formed.
+
+        Args:
+            data: Config as loaded from YAML
+
+        Returns:
+            List of error messages (empty if valid)
+        """
+        if not isinstance(data, dict):
+            return ["Ergogen config should be a mapping"]
+
+        errors = []
+        points = data.get('points')
+        zones = points.get('zones') if isinstance(points, dict) else None
+        if not isinstance(points, dict):
+            errors.append('Missing section "points"')
+        elif not isinstance(zones, dict) and not any(str(key).startswith('zones.') for key in points):
+            errors.append('Field "points.zones" should be of type object!')
+
+        pcbs = data.get('pcbs') or {}
+        if not isinstance(pcbs, dict):
+            errors.append('Field "pcbs" should be of type object!')
+            return errors
+        for pcb_name, pcb in pcbs.items():
+            footprints = pcb.get('footprints') if isinstance(pcb, dict) else None
+            if footprints is not None and not isinstance(footprints, (dict, list)):
+                errors.append(f'Field "pcbs.{pcb_name}.footprints" should be of type object!')
+        return errors
+
+    def extract_metadata(self, data: Dict[str, Any], source: Optional[str] = None) -> KeyboardMetadata:
+        """
+        Read the keyboard's name, version and authorship from the meta section.
+
+        Args:
+            data: Config as loaded from YAML
+            source: Config file path, used when meta has no name
+
+        Returns:
+            Keyboard metadata
+        """
+        meta = data.get('meta') if isinstance(data.get('meta'), dict) else {}
+
+        def text(field: str) -> Optional[str]:
+            value = meta.get(field)
+            return str(value) if value is not None else None
+
+        name = text('name') or (Path(source).stem if source else 'keyboard')
+        return KeyboardMetadata(
+            name=name,
+            version=text('version'),
+            author=text('author'),
+            url=text('url') or text('repository'),
+            engine=text('engine'),
+            source=source
+        )
+
+    def _place_footprints(self, pcb_name: str, pcb: Dict[str, Any],
+                          resolver: _AnchorResolver) -> List[FootprintPlacement]:
+        """Place every footprint of a PCB on the points its where filter selects."""
+        footprints = pcb.get('footprints') or {}
+        if isinstance(footprints, list):
+            footprints = {str(index): footprint for index, footprint in enumerate(footprints)}
+
+        placements = []
+        for footprint_name, footprint in footprints.items():
+            name = f"pcbs.{pcb_name}.footprints.{footprint_name}"
+            if not isinstance(footprint, dict):
+                raise ErgogenParseError(f'Field "{name}" should be of type object!', name)
+            # Footprint lists are not reached by the config-wide unnest
+            footprint = unnest(footprint)
+
+            what = footprint.get('what')
+            if what is None and footprint.get('type') is not None:
+                # Ergogen 3 footprints: placed at the origin, as v4 would
+                what = footprint['type']
+                self.warnings.append(f'Footprint "{name}" uses "type" instead of "what"')
+            elif any(field not in _FOOTPRINT_FIELDS for field in footprint):
+                unexpected = [field for field in footprint if field not in _FOOTPRINT_FIELDS]
+                self.warnings.append(f'Unexpected key "{unexpected[0]}" within field "{name}"')
+            if not what:
+                raise ErgogenParseError(f'Field "{name}.what" should be a footprint name!', name)
+
+            asym = footprint.get('asym') or 'source'
+            if asym not in ('both',) + _SOURCE_ALIASES + _CLONE_ALIASES:
+                raise ErgogenParseError(f'Field "{name}.asym" should be one of both, source, clone!', name)
+            asym = 'source' if asym in _SOURCE_ALIASES else 'clone' if asym in _CLONE_ALIASES else 'both'
+
+            what = str(what)
+            kind = classify_footprint(what)
+            adjust = footprint.get('adjust')
+            params = footprint.get('params') or {}
+            for point in resolver.filter(footprint.get('where'), f"{name}.where", asym):
+                if adjust is not None:
+                    point = resolver.anchor(adjust, f"{name}.adjust", point)
+                placements.append(FootprintPlacement(
+                    pcb=pcb_name,
+                    name=str(footprint_name),
+                    what=what,
+                    kind=kind,
+                    x=point.x,
+                    y=point.y,
+                    r=point.r,
+                    point=point.meta.get('name'),
+                    params=_fill_templates(params, point.meta)
+                ))
+        return placements
+
+
+def _quoted_path(message: str) -> Optional[str]:
+    """First quoted config path in an error message, e.g. "points.zones.matrix"."""
+    match = re.search(r'"((?:points|units|variables|pcbs|outlines|cases)\b[^"]*)"', message)
+    return match.group(1) if match else None
+
+
+def _line_of(text: str, yaml_path: str) -> Optional[int]:
+    """Line of the deepest node along a dotted config path, or None."""
+    try:
+        node = yaml.compose(text, Loader=yaml.SafeLoader)
+    except yaml.YAMLError:
+        return None
+    line = None
+    levels = re.sub(r'\[(\d+)\]', r'.\1', yaml_path).split('.')
+    while levels and node is not None:
+        if isinstance(node, yaml.MappingNode):
+            found = None
+            for width in range(len(levels), 0, -1):
+                key = '.'.join(levels[:width])
+                found = next((value for item, value in node.value if item.value == key), None)
+                if found is not None:
+                    line = found.start_mark.line + 1
+                    levels = levels[width:]
+                    break
+            node = found
+        elif isinstance(node, yaml.SequenceNode) and levels[0].isdigit() and int(levels[0]) < len(node.value):
+            node = node.value[int(levels[0])]
+            line = node.start_mark.line + 1
+            levels = levels[1:]
+        else:
+            break
+    return line
@@ -0,0 +1,115 @@
+"""
+Feature Parser
+
+This module detects the hardware features of an Ergogen PCB (encoders,
+displays, RGB LEDs, audio and split halves) from its footprints.
+"""
+
+import re
+from typing import List, Optional
+
+from ..data_models.ergogen_model import ErgogenData, FootprintPlacement
+from ..data_models.hardware_features import (
+    AudioConfig, DisplayConfig, EncoderConfig, HardwareFeatures, RGBConfig
+)
+from ..data_models.matrix_config import MatrixConfig
+from ..data_models.pin_mapping import POWER_PINS, PinMapping
+
+# Display signal -> footprint params that may carry it; a signal's own name is its default net
+_DISPLAY_SIGNALS = {
+    'SDA': ('SDA', 'MOSI', 'DI'),
+    'SCL': ('SCL', 'SCK', 'CLK'),
+    'CS': ('CS',)
+}
+
+# Controller nets that usually feed an LED chain
+_LED_DATA_NET = re.compile(r'^(?:led|rgb|din|data_?in|ws2812)', re.IGNORECASE)
+
+
+class FeatureParser:
+    """Detect hardware features from the footprints of a PCB."""
+
+    def __init__(self, warnings: Optional[List[str]] = None):
+        self.warnings = warnings if warnings is not None else []
+
+    def parse(self, data: ErgogenData, pcb: Optional[str], pins: PinMapping,
+              matrix: Optional[MatrixConfig] = None) -> HardwareFeatures:
+        """
+        Detect the features of a PCB.
+
+        Args:
+            data: Parsed Ergogen config
+            pcb: PCB to read
+            pins: Controller pins, to resolve feature nets
+            matrix: Matrix of the PCB; a split matrix makes the board split
+
+        Returns:
+            Hardware features
+        """
+        placements = data.placements(pcb)
+        features = HardwareFeatures()
+
+        for placement in placements:
+            if placement.kind == 'encoder':
+                features.encoders.append(self._encoder(placement, pins))
+            elif placement.kind == 'display':
+                features.displays.append(self._display(placement, pins))
+
+        leds = [placement for placement in placements if placement.kind == 'led']
+        if leds:
+            data_pin = next((pin for pin, net in pins.pins.items() if _LED_DATA_NET.match(net)), None)
+            features.rgb = RGBConfig(count=len(leds), data_pin=data_pin)
+
+        speakers = [placement for placement in placements if placement.kind == 'audio']
+        if speakers:
+            features.audio = AudioConfig(pin=self._signal_pin(speakers[0], pins))
+
+        jacks = [placement for placement in placements if placement.kind == 'split']
+        controllers = set((placement.x, placement.y) for placement in placements if placement.kind == 'controller')
+        features.split = bool(jacks) or len(controllers) > 1 or bool(matrix is not None and matrix.split)
+        if jacks:
+            features.split_pin = self._signal_pin(jacks[0], pins)
+            if features.split_pin is None:
+                self.warnings.append(f"Split connector {jacks[0].name} has no data net on the controller")
+        return features
+
+    @staticmethod
+    def _encoder(placement: FootprintPlacement, pins: PinMapping) -> EncoderConfig:
+        a_net = placement.params.get('A') if isinstance(placement.params.get('A'), str) else None
+        b_net = placement.params.get('B') if isinstance(placement.params.get('B'), str) else None
+        return EncoderConfig(
+            name=placement.name,
+            a_net=a_net,
+            b_net=b_net,
+            pin_a=pins.pin_for(a_net),
+            pin_b=pins.pin_for(b_net),
+            key=placement.point
+        )
+
+    @staticmethod
+    def _display(placement: FootprintPlacement, pins: PinMapping) -> DisplayConfig:
+        name = placement.what.rsplit('/', 1)[-1].lower()
+        spi = re.search(r'nice_?view|sharp|lcd', name) is not None
+        signals = ('SDA', 'SCL', 'CS') if spi else ('SDA', 'SCL')
+
+        display_pins = {}
+        for signal in signals:
+            nets = placement.nets(*_DISPLAY_SIGNALS[signal]) + [signal]
+            display_pins[signal] = next((pins.pin_for(net) for net in nets if pins.pin_for(net)), None)
+
+        return DisplayConfig(
+            name=placement.name,
+            driver='nice_view' if spi else 'ssd1306',
+            protocol='spi' if spi else 'i2c',
+            pins=display_pins
+        )
+
+    @staticmethod
+    def _signal_pin(placement: FootprintPlacement, pins: PinMapping) -> Optional[str]:
+        """First controller pin reached by one of a footprint's signal (non-power) nets."""
+        for value in placement.params.values():
+            if isinstance(value, str) and value and not POWER_PINS.match(value):
+                pin = pins.pin_for(value)
+                if pin is not None:
+                    return pin
+        return None
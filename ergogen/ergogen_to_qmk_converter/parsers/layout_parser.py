@@ -0,0 +1,86 @@
+"""
+Layout Parser
+
+This module converts the evaluated points of an Ergogen config into a
+physical layout in QMK's info.json conventions.
+"""
+
+from typing import List, Optional
+
+from ..data_models.ergogen_model import ErgogenData
+from ..data_models.matrix_config import MatrixConfig
+from ..data_models.physical_layout import KEY_UNIT, KeyPosition, PhysicalLayout
+
+
+def _round(value: float) -> float:
+    return round(value, 2) or 0.0  # No negative zeros in the JSON
+
+
+class LayoutParser:
+    """Extract the physical layout from Ergogen points."""
+
+    def __init__(self, warnings: Optional[List[str]] = None):
+        self.warnings = warnings if warnings is not None else []
+
+    def parse(self, data: ErgogenData, matrix: Optional[MatrixConfig] = None) -> PhysicalLayout:
+        """
+        Convert key centers in mm (y up, counter-clockwise rotation) to key
+        units (y down, clockwise rotation) normalized to start at (0, 0).
+
+        Args:
+            data: Parsed Ergogen config
+            matrix: Matrix of the board; only its keys are laid out, in
+                point order (default: every point)
+
+        Returns:
+            Physical layout
+        """
+        names = [name for name in data.points if matrix is None or name in matrix.keys]
+        if not names:
+            return PhysicalLayout()
+
+        # Ergogen keys default to u-1 mm keycaps, so a 1u key is (width + 1) / u units wide
+        unit = data.units.get('u', 19)
+        gap = unit - data.units.get('$default_width', unit - 1)
+        sizes = {}
+        for name in names:
+            meta = data.points[name].meta
+            width = float(meta.get('width', unit - gap))
+            height = float(meta.get('height', unit - gap))
+            sizes[name] = (width, height,
+                           max(0.25, round((width + gap) / unit * 4) / 4),
+                           max(0.25, round((height + gap) / unit * 4) / 4))
+
+        # Key centers in key units with y down; the layout starts at the top-left keycap edge
+        centers = {name: (data.points[name].x / KEY_UNIT, -data.points[name].y / KEY_UNIT) for name in names}
+        left = min(centers[name][0] - sizes[name][2] / 2 for name in names)
+        top = min(centers[name][1] - sizes[name][3] / 2 for name in names)
+
+        keys = []
+        for name in names:
+            point = data.points[name]
+            _, _, w, h = sizes[name]
+            center_x = centers[name][0] - left
+            center_y = centers[name][1] - top
+            rotation = -(point.r % 360)
+            if rotation <= -180:
+                rotation += 360
+            keys.append(KeyPosition(
+                name=name,
+                x=_round(center_x - w / 2),
+                y=_round(center_y - h / 2),
+                w=w,
+                h=h,
+                r=_round(rotation),
+                rx=_round(center_x),
+                ry=_round(center_y),
+                x_mm=point.x,
+                y_mm=point.y,
+                matrix=matrix.keys.get(name) if matrix is not None else None
+            ))
+
+        width_mm = (max(data.points[name].x + sizes[name][0] / 2 for name in names)
+                    - min(data.points[name].x - sizes[name][0] / 2 for name in names))
+        height_mm = (max(data.points[name].y + sizes[name][1] / 2 for name in names)
+                     - min(data.points[name].y - sizes[name][1] / 2 for name in names))
+        return PhysicalLayout(keys=keys, width_mm=width_mm, height_mm=height_mm)
@@ -0,0 +1,221 @@
+"""
+Matrix Parser
+
+This module derives the switch matrix of an Ergogen PCB from the nets of
+its switch and diode footprints.
+
+A switch and a diode on the same key share a net that nothing else uses:
+the switch's other net is the key's column and the diode's other net its
+row, and the diode's orientation gives the diode direction. Switches
+without a diode are wired from column to row, and switches wired to GND
+are direct pins. Nets are oriented with the keys' row_net and column_net
+settings where the footprints have them the other way round. Without
+switch footprints the matrix falls back to those settings, then to the
+keys' row and column names.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..data_models.ergogen_model import ErgogenData
+from ..data_models.matrix_config import MatrixConfig
+from ..data_models.pin_mapping import PinMapping
+
+# (row net, column net, whether the diode's cathode is on the row side)
+_Wiring = Tuple[str, str, Optional[bool]]
+
+
+def _unmirror(net: str) -> str:
+    return net[len('mirror_'):] if net.startswith('mirror_') else net
+
+
+class MatrixParser:
+    """Extract the matrix configuration of a PCB."""
+
+    def __init__(self, warnings: Optional[List[str]] = None):
+        self.warnings = warnings if warnings is not None else []
+
+    def parse(self, data: ErgogenData, pcb: Optional[str], pins: PinMapping) -> MatrixConfig:
+        """
+        Build the matrix of a PCB.
+
+        Args:
+            data: Parsed Ergogen config
+            pcb: PCB to read (None to use the keys' net settings only)
+            pins: Controller pins, to turn row and column nets into pins
+
+        Returns:
+            Matrix configuration
+        """
+        wiring, direct = self._wire_keys(data, pcb, pins)
+        if direct and wiring:
+            self.warnings.append(f"Keys wired straight to a pin are left out of the matrix: {', '.join(direct)}")
+            direct = {}
+
+        if direct:
+            return self._direct_matrix(data, direct, pins)
+        return self._row_col_matrix(data, wiring, pins)
+
+    def _wire_keys(self, data: ErgogenData, pcb: Optional[str],
+                   pins: PinMapping) -> Tuple[Dict[str, _Wiring], Dict[str, str]]:
+        """Matrix wiring and direct pin net of every key, in point order."""
+        switches: Dict[str, List[Tuple[str, str]]] = {}
+        diodes: Dict[str, List[Tuple[str, str]]] = {}
+        net_points: Dict[str, set] = {}
+        for placement in data.placements(pcb, 'switch', 'encoder', 'diode'):
+            nets = placement.nets('from', 'to')
+            if placement.point not in data.points or len(nets) != 2:
+                continue
+            target = diodes if placement.kind == 'diode' else switches
+            target.setdefault(placement.point, []).append((nets[0], nets[1]))
+            for net in nets:
+                net_points.setdefault(net, set()).add(placement.point)
+
+        wiring: Dict[str, _Wiring] = {}
+        direct: Dict[str, str] = {}
+        if not switches:
+            if pcb is not None:
+                self.warnings.append(f"PCB {pcb} has no switch footprints, matrix taken from the key settings")
+            keys = [name for name, point in data.points.items()
+                    if point.meta.get('row_net') and point.meta.get('column_net')] or list(data.points)
+            for name in keys:
+                meta = data.points[name].meta
+                row = str(meta.get('row_net') or meta.get('row'))
+                col = str(meta.get('column_net') or f"{meta['zone']['name']}_{meta['col']['name']}")
+                wiring[name] = (row, col, None)
+            return wiring, direct
+
+        for name in data.points:
+            if name not in switches:
+                continue
+            meta = data.points[name].meta
+            result = self._wire_key(switches[name], diodes.get(name, []), net_points, name, pins)
+            if isinstance(result, str):
+                direct[name] = result
+                continue
+            row, col, cathode_on_row = result
+            if row == meta.get('column_net') or col == meta.get('row_net'):
+                row, col = col, row
+                cathode_on_row = None if cathode_on_row is None else not cathode_on_row
+            wiring[name] = (row, col, cathode_on_row)
+        return wiring, direct
+
+    @staticmethod
+    def _wire_key(switches: List[Tuple[str, str]], diodes: List[Tuple[str, str]],
+                  net_points: Dict[str, set], name: str, pins: PinMapping) -> Union[_Wiring, str]:
+        """Wiring of one key, or the net of a key wired straight to a pin."""
+        def reaches(net: str) -> bool:
+            return pins.controller is None or pins.pin_for(net) is not None
+
+        for switch_from, switch_to in switches:
+            if 'GND' in (switch_from.upper(), switch_to.upper()):
+                return switch_to if switch_from.upper() == 'GND' else switch_from
+            for diode_from, diode_to in diodes:
+                shared = set((switch_from, switch_to)) & set((diode_from, diode_to))
+                if len(shared) != 1:
+                    continue
+                key_net = shared.pop()
+                # Diodes that only share a row or column net are not in series with the switch
+                if net_points[key_net] != {name}:
+                    continue
+                col = switch_to if switch_from == key_net else switch_from
+                row = diode_to if diode_from == key_net else diode_from
+                # A switch already wired between two controller nets is not behind the diode
+                if reaches(key_net) and not reaches(row):
+                    continue
+                return row, col, diode_from == key_net
+        switch_from, switch_to = switches[0]
+        return switch_to, switch_from, None
+
+    @staticmethod
+    def _halves(data: ErgogenData, wiring: Dict[str, Any]) -> Dict[str, str]:
+        """Mirrored keys wired like their source key (the other half of a split), mirrored -> source."""
+        def unmirrored(wires: Any) -> Any:
+            if isinstance(wires, tuple):
+                return tuple(_unmirror(item) if isinstance(item, str) else item for item in wires)
+            return _unmirror(wires)
+
+        halves = {}
+        for name, wires in wiring.items():
+            source = name[len('mirror_'):]
+            if data.points[name].mirrored and source in wiring and unmirrored(wires) == unmirrored(wiring[source]):
+                halves[name] = source
+        return halves
+
+    def _row_col_matrix(self, data: ErgogenData, wiring: Dict[str, _Wiring], pins: PinMapping) -> MatrixConfig:
+        halves = self._halves(data, wiring)
+        sources = [name for name in wiring if name not in halves]
+
+        # Rows top to bottom and columns left to right, by the average position of their keys
+        row_y: Dict[str, List[float]] = {}
+        col_x: Dict[str, List[float]] = {}
+        for name in sources:
+            row, col, _ = wiring[name]
+            row_y.setdefault(row, []).append(data.points[name].y)
+            col_x.setdefault(col, []).append(data.points[name].x)
+        row_nets = sorted(row_y, key=lambda net: -sum(row_y[net]) / len(row_y[net]))
+        col_nets = sorted(col_x, key=lambda net: sum(col_x[net]) / len(col_x[net]))
+        row_index = {net: index for index, net in enumerate(row_nets)}
+        col_index = {net: index for index, net in enumerate(col_nets)}
+
+        keys: Dict[str, Tuple[int, int]] = {}
+        taken: Dict[Tuple[int, int], str] = {}
+        for name in sources:
+            row, col, _ = wiring[name]
+            position = (row_index[row], col_index[col])
+            if position in taken:
+                self.warnings.append(f"Keys {taken[position]} and {name} share matrix position {position}")
+            taken.setdefault(position, name)
+            keys[name] = position
+        for name, source in halves.items():
+            row, col = keys[source]
+            keys[name] = (row + len(row_nets), col)
+
+        votes = [cathode_on_row for _, _, cathode_on_row in wiring.values() if cathode_on_row is not None]
+        if votes and 0 < sum(votes) < len(votes):
+            self.warnings.append("Diodes face both ways; using the direction most keys use")
+        diode_direction = 'ROW2COL' if votes and sum(votes) * 2 < len(votes) else 'COL2ROW'
+
+        return MatrixConfig(
+            rows=len(row_nets) * (2 if halves else 1),
+            cols=len(col_nets),
+            row_pins=self._pins(row_nets, pins),
+            col_pins=self._pins(col_nets, pins),
+            row_nets=row_nets,
+            col_nets=col_nets,
+            diode_direction=diode_direction,
+            split=bool(halves),
+            keys=keys
+        )
+
+    def _direct_matrix(self, data: ErgogenData, direct: Dict[str, str], pins: PinMapping) -> MatrixConfig:
+        halves = self._halves(data, direct)
+        sources = [name for name in direct if name not in halves]
+        nets = [direct[name] for name in sources]
+        keys = {name: (0, index) for index, name in enumerate(sources)}
+        for name, source in halves.items():
+            keys[name] = (1, keys[source][1])
+
+        key_pins = dict(zip(sources, self._pins(nets, pins)))
+        for name, source in halves.items():
+            key_pins[name] = key_pins[source]
+
+        return MatrixConfig(
+            rows=2 if halves else 1,
+            cols=len(sources),
+            row_pins=[],
+            col_pins=[],
+            col_nets=nets,
+            split=bool(halves),
+            keys={name: keys[name] for name in direct},
+            direct_pins={name: key_pins[name] for name in direct}
+        )
+
+    def _pins(self, nets: List[str], pins: PinMapping) -> List[str]:
+        """Controller pins of some nets; nets that do not reach the controller are kept as they are."""
+        result = []
+        for net in nets:
+            pin = pins.pin_for(net)
+            if pin is None and pins.controller is not None:
+                self.warnings.append(f"Net {net} is not connected to a controller pin")
+            result.append(pin or net)
+        return result
@@ -0,0 +1,46 @@
+"""
+Pin Parser
+
+This module reads the controller pin assignments of an Ergogen PCB from
+the params of its controller footprint.
+"""
+
+from typing import List, Optional
+
+from ..data_models.ergogen_model import ErgogenData
+from ..data_models.pin_mapping import PIN_NAME, POWER_PINS, PinMapping
+
+
+class PinParser:
+    """Extract pin assignments from the controller footprint of a PCB."""
+
+    def __init__(self, warnings: Optional[List[str]] = None):
+        self.warnings = warnings if warnings is not None else []
+
+    def parse(self, data: ErgogenData, pcb: Optional[str]) -> PinMapping:
+        """
+        Map the controller's pins to nets.
+
+        Reversible PCBs often place the controller twice with only one copy
+        carrying the pin params; the copy with the most assigned pins is used.
+
+        Args:
+            data: Parsed Ergogen config
+            pcb: PCB to read
+
+        Returns:
+            Pin mapping; empty when the PCB has no controller footprint
+        """
+        controllers = data.placements(pcb, 'controller')
+        if not controllers:
+            self.warnings.append(f"No controller footprint on PCB {pcb}" if pcb else "Config has no PCBs")
+            return PinMapping()
+
+        def assigned(placement):
+            return {str(param): value for param, value in placement.params.items()
+                    if isinstance(value, str) and (PIN_NAME.match(str(param)) or POWER_PINS.match(str(param)))}
+
+        best = max(controllers, key=lambda placement: len(assigned(placement)))
+        if len(set(placement.what for placement in controllers)) > 1:
+            self.warnings.append(f"PCB {pcb} has several controller footprints, using {best.name}")
+        return PinMapping(controller=best.what, pins=assigned(best))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Points Collection Benchmark
+
+Builds PointsCollections for large panelized grids (19.05mm pitch, with a
+few deliberately overlapping points), then times name lookups, validation
+and removing half of the points. Times are reported per point, so linear
+scaling shows up as flat columns as the grid grows.
+
+Usage: python benchmarks/bench_points_collection.py [--points 1000 4000 16000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the ergogen directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from kle_to_ergogen.data_models.ergogen_point import ErgogenPoint, PointsCollection
+
+PITCH = 19.05
+
+
+def build_points(count: int):
+    columns = max(1, int(count ** 0.5))
+    points = []
+    for index in range(count):
+        row, col = divmod(index, columns)
+        points.append(ErgogenPoint(name=f"r{row}c{col}", x=col * PITCH, y=row * PITCH))
+    # One overlapping point per hundred
+    for index in range(0, count, 100):
+        points.append(ErgogenPoint(name=f"dup_{index}", x=points[index].x + 0.05, y=points[index].y))
+    return points
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PointsCollection operations")
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 4000, 16000], help='Grid sizes')
+    args = parser.parse_args()
+
+    print(f"{'points':>7} {'add us/pt':>10} {'get us/pt':>10} {'validate us/pt':>15} "
+          f"{'remove us/pt':>13} {'overlaps':>9}")
+    for count in args.points:
+        points = build_points(count)
+        collection = PointsCollection()
+
+        def build():
+            for point in points:
+                collection.add_point(point)
+
+        add_time, _ = timed(build)
+        get_time, _ = timed(lambda: [collection.get_point(point.name) for point in points])
+        validate_time, errors = timed(collection.validate)
+        remove_time, _ = timed(lambda: [collection.remove_point(point.name) for point in points[::2]])
+        total = len(points)
+        print(f"{total:>7} {add_time / total * 1e6:>10.2f} {get_time / total * 1e6:>10.2f} "
+              f"{validate_time / total * 1e6:>15.2f} {remove_time / (total // 2 or 1) * 1e6:>13.2f} "
+              f"{len(errors):>9}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Ergogen Points Evaluator Benchmark
+
+Times ErgogenPointsEvaluator on every config in ergogen/working_samples.
+Each config is loaded once, then evaluated with an empty expression cache
+(cold) and again with the cache warm. Configs that cannot be evaluated,
+e.g. YAML that PyYAML rejects or pre-v4 column settings, are listed with
+the error instead.
+
+Usage: python benchmarks/bench_points_evaluator.py [--samples DIR] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# Add the ergogen directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from kle_to_ergogen.parsers import ergogen_points_evaluator
+from kle_to_ergogen.parsers.ergogen_points_evaluator import ErgogenPointsEvaluator, ErgogenEvaluationError
+
+SAMPLES_DIR = Path(__file__).resolve().parents[2] / 'working_samples'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Ergogen points evaluation")
+    parser.add_argument('--samples', type=Path, default=SAMPLES_DIR, help='Directory of Ergogen configs')
+    parser.add_argument('--repeat', type=int, default=20, help='Warm runs per config')
+    args = parser.parse_args()
+
+    evaluator = ErgogenPointsEvaluator()
+    files = sorted(list(args.samples.glob('*.yaml')) + list(args.samples.glob('*.yml')))
+
+    print(f"{'config':<28} {'points':>6} {'load ms':>8} {'cold ms':>8} {'warm ms':>8}")
+    warm_times = []
+    for path in files:
+        try:
+            start = time.perf_counter()
+            with open(path, 'r', encoding='utf-8') as f:
+                config = yaml.load(f, Loader=ergogen_points_evaluator.YAMLLoader)
+            load_time = time.perf_counter() - start
+
+            ergogen_points_evaluator.compile_expression.cache_clear()
+            start = time.perf_counter()
+            collection = evaluator.evaluate(config)
+            cold_time = time.perf_counter() - start
+
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                evaluator.evaluate(config)
+                timings.append(time.perf_counter() - start)
+        except (yaml.YAMLError, ErgogenEvaluationError) as e:
+            reason = str(e).splitlines()[0]
+            print(f"{path.name:<28} skipped: {reason}")
+            continue
+
+        warm_time = statistics.median(timings)
+        warm_times.append(warm_time)
+        print(f"{path.name:<28} {len(collection.points):>6} {load_time * 1000:>8.1f} "
+              f"{cold_time * 1000:>8.1f} {warm_time * 1000:>8.1f}")
+
+    if warm_times:
+        print(f"\n{len(warm_times)} of {len(files)} configs evaluated, "
+              f"slowest warm {max(warm_times) * 1000:.1f} ms, total {sum(warm_times) * 1000:.1f} ms")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
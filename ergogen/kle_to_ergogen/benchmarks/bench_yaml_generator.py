@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Ergogen YAML Generator Benchmark
+
+Times ErgogenYAMLGenerator on irregular (absolute positioned) layouts with
+comments enabled, building the document as a string and streaming it into
+a file. Times are reported per point, so the single pass writer should show
+flat columns as the layout grows.
+
+Usage: python benchmarks/bench_yaml_generator.py [--points 500 2000 8000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the ergogen directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from kle_to_ergogen.data_models.ergogen_point import ErgogenPoint, PointsCollection
+from kle_to_ergogen.generators import ergogen_yaml_generator
+from kle_to_ergogen.generators.ergogen_yaml_generator import ErgogenYAMLGenerator
+
+
+def build_collection(count: int) -> PointsCollection:
+    """Scattered, partly rotated keys with labels and matrix positions."""
+    rng = random.Random(count)
+    collection = PointsCollection()
+    for index in range(count):
+        row, col = divmod(index, 16)
+        collection.add_point(ErgogenPoint(
+            name=f"r{row}c{col}",
+            x=col * 19.05 + rng.uniform(-2, 2),
+            y=row * 19.05 + rng.uniform(-2, 2),
+            rotation=rng.choice([0.0, 0.0, 15.0]),
+            kle_label=rng.choice(["Q", "Esc", "Shift", "A\nB"]),
+            kle_row=row,
+            kle_col=col,
+            kle_width=rng.choice([1.0, 1.0, 1.5])
+        ))
+    return collection
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Ergogen YAML generation")
+    parser.add_argument('--points', type=int, nargs='+', default=[500, 2000, 8000], help='Layout sizes')
+    args = parser.parse_args()
+
+    generator = ErgogenYAMLGenerator()
+    print(f"YAML dumper: {ergogen_yaml_generator.YAMLDumper.__name__}")
+    print(f"{'points':>7} {'string us/pt':>13} {'file us/pt':>11} {'KiB':>7}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'points.yaml')
+        for count in args.points:
+            collection = build_collection(count)
+            string_time = timed(lambda: generator.generate_yaml(collection))
+            file_time = timed(lambda: generator.save_to_file(collection, output_path))
+            size = os.path.getsize(output_path) / 1024
+            print(f"{count:>7} {string_time / count * 1e6:>13.1f} {file_time / count * 1e6:>11.1f} {size:>7.0f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Zone Inference Benchmark
+
+Compares absolute point output with inferred zones on panels of column
+staggered half boards (6 columns by 4 rows, with a rotated thumb cluster).
+For each panel size it reports the YAML size and entry count of both forms,
+the time taken to infer and verify the zones, and the time to load the YAML
+back and evaluate it. Ergogen itself is not needed: loading uses PyYAML and
+zones are evaluated with ErgogenPointsEvaluator, the same evaluator used for
+the round-trip check.
+
+Usage: python benchmarks/bench_zone_inference.py [--boards 1 8 64]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# Add the ergogen directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from kle_to_ergogen.data_models.ergogen_point import ErgogenPoint, PointsCollection
+from kle_to_ergogen.generators.ergogen_yaml_generator import ErgogenYAMLGenerator
+from kle_to_ergogen.generators.ergogen_zone_inference import ZoneInferenceEngine, zone_config_size
+from kle_to_ergogen.parsers.ergogen_points_evaluator import ErgogenPointsEvaluator
+
+UNIT = 19.05
+STAGGER = [0.0, 2.0, 6.0, 8.0, 5.0, 3.0]  # Column stagger in mm
+THUMB_ANGLE = 15.0
+
+
+def build_collection(boards: int) -> PointsCollection:
+    """Half boards laid out on a panel, 8 per panel row."""
+    collection = PointsCollection()
+    for board in range(boards):
+        panel_row, panel_col = divmod(board, 8)
+        origin_x = panel_col * 8 * UNIT
+        origin_y = -panel_row * 7 * UNIT
+        for col, stagger in enumerate(STAGGER):
+            for row in range(4):
+                collection.add_point(ErgogenPoint(
+                    name=f"b{board}_r{row}c{col}",
+                    x=origin_x + col * UNIT,
+                    y=origin_y + stagger - row * UNIT,
+                    kle_row=row,
+                    kle_col=col
+                ))
+        for thumb in range(3):
+            collection.add_point(ErgogenPoint(
+                name=f"b{board}_t{thumb}",
+                x=origin_x + (3 + thumb) * UNIT,
+                y=origin_y - 4.5 * UNIT,
+                rotation=THUMB_ANGLE,
+                kle_row=4,
+                kle_col=3 + thumb
+            ))
+    return collection
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Ergogen zone inference")
+    parser.add_argument('--boards', type=int, nargs='+', default=[1, 8, 64], help='Half boards per panel')
+    args = parser.parse_args()
+
+    absolute = ErgogenYAMLGenerator(include_comments=False, infer_zones=False)
+    zoned = ErgogenYAMLGenerator(include_comments=False, infer_zones=True)
+    engine = ZoneInferenceEngine()
+
+    print(f"{'points':>7} {'abs KiB':>8} {'zone KiB':>9} {'abs entries':>12} {'zone entries':>13} "
+          f"{'infer ms':>9} {'abs load ms':>12} {'zone load+eval ms':>18}")
+    for boards in args.boards:
+        collection = build_collection(boards)
+        absolute_yaml = absolute.generate_yaml(collection)
+        zone_yaml = zoned.generate_yaml(collection)
+        infer_time, layout = timed(lambda: engine.infer(collection))
+        if layout is None:
+            print(f"{len(collection):>7} zone inference fell back to absolute positions")
+            continue
+
+        absolute_load, absolute_config = timed(lambda: yaml.safe_load(absolute_yaml))
+        zone_load, zone_config = timed(lambda: yaml.safe_load(zone_yaml))
+        zone_eval, _ = timed(lambda: ErgogenPointsEvaluator().evaluate(zone_config))
+
+        print(f"{len(collection):>7} {len(absolute_yaml) / 1024:>8.1f} {len(zone_yaml) / 1024:>9.1f} "
+              f"{zone_config_size(absolute_config['points']):>12} {zone_config_size(zone_config['points']):>13} "
+              f"{infer_time * 1000:>9.1f} {absolute_load * 1000:>12.1f} "
+              f"{(zone_load + zone_eval) * 1000:>18.1f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
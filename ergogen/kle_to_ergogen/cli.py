@@ -91,6 +91,7 @@ Examples:
   %(prog)s layout.json --section-only          # Generate only points section
   %(prog)s layout.json --no-comments           # Generate without comments
   %(prog)s layout.json --precision 2           # Use 2 decimal places for coordinates
+  %(prog)s layout.json --zones                 # Write irregular layouts as compact zones
 
 Naming Strategies:
   matrix     : r0c1, r1c2, etc. (default)
@@ -177,6 +178,14 @@ Dependencies:
         help='Do not sort point names alphabetically'
     )
     
+    parser.add_argument(
+        '--zones',
+        action='store_true',
+        help='Write irregular layouts as inferred Ergogen zones when shorter than absolute '
+             'positions (points are renamed zone_col_row, or zone_col in single-row zones, '
+             'and keep only the key tag)'
+    )
+    
     # Validation and info options
     parser.add_argument(
         '--validate-only',
@@ -290,7 +299,8 @@ Dependencies:
             indent=args.indent,
             sort_keys=not args.no_sort,
             include_comments=not args.no_comments,
-            precision=args.precision
+            precision=args.precision,
+            infer_zones=args.zones
         )
         
         try:
@@ -5,7 +5,7 @@ This module defines the data structures for representing Ergogen points
 converted from KLE keyboard layouts.
 """
 
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterable, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 import math
 
@@ -208,18 +208,64 @@ class LabelNamingStrategy(PointNamingStrategy):
         return cleaned if cleaned else ""
 
 
-@dataclass
 class PointsCollection:
     """
     Collection of Ergogen points with metadata and validation.
     
     Represents the complete set of points for a keyboard layout
     with utilities for manipulation and export.
+    
+    Points are stored in insertion order under a serial number, with an
+    index from each name to the serials of the points carrying it, so adding,
+    looking up and removing points by name take constant time. Names are
+    indexed when a point is added; if a point is renamed in place, call
+    reindex(). Overlap checks bucket points into a grid of tolerance-sized
+    cells and only compare neighbours.
     """
     
-    points: List[ErgogenPoint] = field(default_factory=list)
-    metadata: Dict[str, Any] = field(default_factory=dict)
-    naming_strategy: PointNamingStrategy = field(default_factory=MatrixNamingStrategy)
+    # Points closer than this many millimetres overlap
+    OVERLAP_TOLERANCE = 0.1
+    
+    def __init__(self, points: Optional[Iterable[ErgogenPoint]] = None,
+                 metadata: Optional[Dict[str, Any]] = None,
+                 naming_strategy: Optional[PointNamingStrategy] = None):
+        """
+        Initialize the collection.
+        
+        Args:
+            points: Initial points, kept as given (duplicate names are reported by validate())
+            metadata: Collection metadata
+            naming_strategy: Strategy used to name points (default: matrix naming)
+        """
+        self.metadata: Dict[str, Any] = metadata if metadata is not None else {}
+        self.naming_strategy: PointNamingStrategy = (naming_strategy if naming_strategy is not None
+                                                     else MatrixNamingStrategy())
+        self._entries: Dict[int, ErgogenPoint] = {}  # Serial -> point, in insertion order
+        self._names: Dict[str, List[int]] = {}       # Name -> serials of points with that name
+        self._next_serial = 0
+        self._points_list: Optional[List[ErgogenPoint]] = None
+        for point in points or ():
+            self._append(point)
+    
+    @property
+    def points(self) -> List[ErgogenPoint]:
+        """Points in insertion order (rebuilt after changes; do not modify)."""
+        if self._points_list is None:
+            self._points_list = list(self._entries.values())
+        return self._points_list
+    
+    def _append(self, point: ErgogenPoint) -> None:
+        serial = self._next_serial
+        self._next_serial += 1
+        self._entries[serial] = point
+        self._names.setdefault(point.name, []).append(serial)
+        self._points_list = None
+    
+    def reindex(self) -> None:
+        """Rebuild the name index, e.g. after renaming points in place."""
+        self._names = {}
+        for serial, point in self._entries.items():
+            self._names.setdefault(point.name, []).append(serial)
     
     def add_point(self, point: ErgogenPoint) -> None:
         """Add a point to the collection."""
@@ -230,22 +276,26 @@ class PointsCollection:
         if self.get_point(point.name):
             raise ValueError(f"Point with name '{point.name}' already exists")
         
-        self.points.append(point)
+        self._append(point)
     
     def get_point(self, name: str) -> Optional[ErgogenPoint]:
         """Get a point by name."""
-        for point in self.points:
-            if point.name == name:
-                return point
+        serials = self._names.get(name)
+        if serials:
+            return self._entries[serials[0]]
         return None
     
     def remove_point(self, name: str) -> bool:
         """Remove a point by name. Returns True if removed."""
-        for i, point in enumerate(self.points):
-            if point.name == name:
-                del self.points[i]
-                return True
-        return False
+        serials = self._names.get(name)
+        if not serials:
+            return False
+        
+        del self._entries[serials.pop(0)]
+        if not serials:
+            del self._names[name]
+        self._points_list = None
+        return True
     
     def get_bounds(self) -> Optional[Dict[str, float]]:
         """Get the bounding box of all points."""
@@ -288,6 +338,34 @@ class PointsCollection:
         
         return self.translate_all(-center_x, -center_y)
     
+    def overlapping_pairs(self, tolerance: float = OVERLAP_TOLERANCE) -> List[Tuple[int, int]]:
+        """
+        Find points closer than tolerance to each other.
+        
+        Returns:
+            Sorted (i, j) index pairs into points, with i < j
+        """
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        pairs = []
+        points = self.points
+        
+        for j, point in enumerate(points):
+            if not (math.isfinite(point.x) and math.isfinite(point.y)):
+                # Never within tolerance of anything
+                continue
+            
+            cell_x = math.floor(point.x / tolerance)
+            cell_y = math.floor(point.y / tolerance)
+            for neighbour_x in (cell_x - 1, cell_x, cell_x + 1):
+                for neighbour_y in (cell_y - 1, cell_y, cell_y + 1):
+                    for i in cells.get((neighbour_x, neighbour_y), ()):
+                        if points[i].distance_to(point) < tolerance:
+                            pairs.append((i, j))
+            cells.setdefault((cell_x, cell_y), []).append(j)
+        
+        pairs.sort()
+        return pairs
+    
     def validate(self) -> List[str]:
         """Validate the points collection and return any errors."""
         errors = []
@@ -298,16 +376,17 @@ class PointsCollection:
             return errors
         
         # Check for duplicate names
-        names = [p.name for p in self.points]
-        duplicates = set([name for name in names if names.count(name) > 1])
-        for name in duplicates:
-            errors.append(f"Duplicate point name: {name}")
+        name_counts: Dict[str, int] = {}
+        for point in self.points:
+            name_counts[point.name] = name_counts.get(point.name, 0) + 1
+        for name, count in name_counts.items():
+            if count > 1:
+                errors.append(f"Duplicate point name: {name}")
         
         # Check for overlapping points (within 0.1mm tolerance)
-        for i, point1 in enumerate(self.points):
-            for j, point2 in enumerate(self.points[i+1:], i+1):
-                if point1.distance_to(point2) < 0.1:
-                    errors.append(f"Points {point1.name} and {point2.name} overlap")
+        points = self.points
+        for i, j in self.overlapping_pairs():
+            errors.append(f"Points {points[i].name} and {points[j].name} overlap")
         
         # Validate individual points
         for point in self.points:
@@ -329,12 +408,24 @@ class PointsCollection:
     
     def __len__(self) -> int:
         """Return number of points."""
-        return len(self.points)
+        return len(self._entries)
     
     def __iter__(self):
         """Iterate over points."""
         return iter(self.points)
     
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PointsCollection):
+            return NotImplemented
+        return ((self.points, self.metadata, self.naming_strategy)
+                == (other.points, other.metadata, other.naming_strategy))
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return (f"PointsCollection(points={self.points!r}, metadata={self.metadata!r}, "
+                f"naming_strategy={self.naming_strategy!r})")
+    
     def __str__(self) -> str:
         """String representation for debugging."""
         return f"PointsCollection({len(self.points)} points)"
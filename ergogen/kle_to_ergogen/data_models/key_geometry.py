@@ -0,0 +1,47 @@
+"""
+Key Geometry
+
+Rotated key centers for KLE keys. KLE draws a key rotated clockwise by
+rotation_angle degrees about (rotation_x, rotation_y), in key units with y
+pointing down; the center computed here is where that key ends up, which is
+the position of its Ergogen point.
+
+This mirrors key_center() in the QMK format converter's
+data_models/geometry.py, kept here so the tool does not depend on that
+package.
+"""
+
+import math
+from typing import Tuple
+
+
+Point = Tuple[float, float]
+
+
+def rotate_point(x: float, y: float, angle: float, origin_x: float, origin_y: float) -> Point:
+    """Rotate a point clockwise (KLE y-down coordinates) about an origin."""
+    radians = math.radians(angle)
+    cos_a = math.cos(radians)
+    sin_a = math.sin(radians)
+    dx = x - origin_x
+    dy = y - origin_y
+    return (origin_x + dx * cos_a - dy * sin_a,
+            origin_y + dx * sin_a + dy * cos_a)
+
+
+def key_center(key) -> Point:
+    """
+    Return the center of a KLE key after rotation.
+
+    Args:
+        key: Object with KeyDefinition's x, y, width, height, rotation_angle,
+            rotation_x and rotation_y attributes
+
+    Returns:
+        (x, y) in key units
+    """
+    x = (key.x or 0.0) + (key.width or 1.0) / 2
+    y = (key.y or 0.0) + (key.height or 1.0) / 2
+    if not key.rotation_angle:
+        return (x, y)
+    return rotate_point(x, y, key.rotation_angle, key.rotation_x or 0.0, key.rotation_y or 0.0)
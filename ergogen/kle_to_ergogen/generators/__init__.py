@@ -5,5 +5,6 @@ This package contains generators for outputting converted points to various form
 """
 
 from .ergogen_yaml_generator import ErgogenYAMLGenerator
+from .ergogen_zone_inference import ZoneInferenceEngine, ZoneLayout
 
-__all__ = ['ErgogenYAMLGenerator']
+__all__ = ['ErgogenYAMLGenerator', 'ZoneInferenceEngine', 'ZoneLayout']
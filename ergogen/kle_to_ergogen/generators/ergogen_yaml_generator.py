@@ -3,6 +3,11 @@ Ergogen YAML Generator
 
 This module provides functionality to generate Ergogen-compatible YAML 
 from converted point collections.
+
+Documents are written to a text stream in small batches of mapping entries,
+with per-point comments added as each line is written, so large layouts can
+be saved without building the whole document in memory. The C-accelerated
+YAML dumper is used when PyYAML was built with libyaml.
 """
 
 import yaml
@@ -16,6 +21,15 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from kle_to_ergogen.data_models.ergogen_point import PointsCollection, ErgogenPoint
+from kle_to_ergogen.generators.ergogen_zone_inference import ZoneInferenceEngine
+
+try:
+    from yaml import CDumper as YAMLDumper
+except ImportError:
+    from yaml import Dumper as YAMLDumper
+
+# Mapping entries dumped together; larger nested mappings are written entry by entry
+STREAM_BATCH_SIZE = 64
 
 
 class ErgogenYAMLGeneratorError(Exception):
@@ -37,7 +51,8 @@ class ErgogenYAMLGenerator:
         sort_keys: bool = True,
         include_metadata: bool = True,
         include_comments: bool = True,
-        precision: int = 3
+        precision: int = 3,
+        infer_zones: bool = False
     ):
         """
         Initialize the YAML generator.
@@ -48,12 +63,18 @@ class ErgogenYAMLGenerator:
             include_metadata: Whether to include metadata as comments (default: True) 
             include_comments: Whether to include descriptive comments (default: True)
             precision: Decimal precision for coordinates (default: 3)
+            infer_zones: Whether to describe irregular layouts as Ergogen zones
+                when that is shorter than absolute positions. Zone points are
+                named zone_col_row (zone_col in single-row zones) and lose
+                their row/column tags and per-key comments, so this is opt-in
+                (default: False)
         """
         self.indent = indent
         self.sort_keys = sort_keys
         self.include_metadata = include_metadata
         self.include_comments = include_comments
         self.precision = precision
+        self.infer_zones = infer_zones
     
     def generate_yaml(self, points_collection: PointsCollection) -> str:
         """
@@ -65,6 +86,24 @@ class ErgogenYAMLGenerator:
         Returns:
             YAML string ready for Ergogen
             
+        Raises:
+            ErgogenYAMLGeneratorError: If generation fails
+        """
+        stream = StringIO()
+        self.write_yaml(points_collection, stream)
+        return stream.getvalue()
+    
+    def write_yaml(self, points_collection: PointsCollection, stream: TextIO) -> None:
+        """
+        Write Ergogen YAML for a points collection to a text stream.
+        
+        The document is written in a single pass, a batch of mapping entries
+        at a time, so it is never held in memory as a whole string.
+        
+        Args:
+            points_collection: Collection of converted points
+            stream: Text stream to write to, e.g. an open file
+            
         Raises:
             ErgogenYAMLGeneratorError: If generation fails
         """
@@ -72,18 +111,15 @@ class ErgogenYAMLGenerator:
             raise ErgogenYAMLGeneratorError("Points collection is empty")
         
         try:
-            # Convert points to dictionary format
-            points_dict = self._convert_points_to_dict(points_collection)
+            config = self._generate_config(points_collection)
             
-            # Generate base YAML
-            yaml_content = self._generate_base_yaml(points_dict, points_collection)
-            
-            # Add comments if requested
             if self.include_comments:
-                yaml_content = self._add_comments(yaml_content, points_collection)
-            
-            return yaml_content
-            
+                for line in self._generate_header_comment(points_collection):
+                    stream.write(line + '\n')
+                self._write_mapping(stream, config, 0, points_collection)
+            else:
+                self._write_mapping(stream, config, 0)
+                
         except Exception as e:
             raise ErgogenYAMLGeneratorError(f"Failed to generate YAML: {e}")
     
@@ -104,15 +140,10 @@ class ErgogenYAMLGenerator:
             points_dict = self._convert_points_to_dict(points_collection)
             
             # Generate just the points section
-            yaml_str = yaml.dump(
-                points_dict,
-                default_flow_style=False,
-                sort_keys=self.sort_keys,
-                indent=self.indent,
-                allow_unicode=True
-            )
+            stream = StringIO()
+            self._write_mapping(stream, points_dict, 0)
             
-            return yaml_str.strip()
+            return stream.getvalue().strip()
             
         except Exception as e:
             raise ErgogenYAMLGeneratorError(f"Failed to generate YAML section: {e}")
@@ -134,14 +165,18 @@ class ErgogenYAMLGenerator:
         Raises:
             ErgogenYAMLGeneratorError: If saving fails
         """
+        if not points_collection or not points_collection.points:
+            raise ErgogenYAMLGeneratorError("Points collection is empty")
+        
         try:
             if section_only:
                 yaml_content = self.generate_yaml_section(points_collection)
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(yaml_content)
             else:
-                yaml_content = self.generate_yaml(points_collection)
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(yaml_content)
+                # Stream the full document straight into the file
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    self.write_yaml(points_collection, f)
                 
         except IOError as e:
             raise ErgogenYAMLGeneratorError(f"Failed to save YAML file: {e}")
@@ -165,15 +200,13 @@ class ErgogenYAMLGenerator:
         
         return points_dict
     
-    def _generate_base_yaml(
-        self, 
-        points_dict: Dict[str, Any], 
-        points_collection: PointsCollection
-    ) -> str:
+    def _generate_config(self, points_collection: PointsCollection) -> Dict[str, Any]:
         """Generate the base YAML structure."""
         
         # Check if this is a regular grid or irregular layout
         if self._is_regular_grid(points_collection):
+            points_dict = self._convert_points_to_dict(points_collection)
+            
             # Use matrix structure for regular grids
             config = {
                 'points': {
@@ -194,22 +227,134 @@ class ErgogenYAMLGenerator:
                 }
             }
         else:
-            # Use absolute positioning for irregular layouts
-            config = {
-                'points': self._generate_absolute_points(points_collection)
-            }
+            # Use absolute positioning for irregular layouts, unless inferred
+            # zones reproduce the same positions in shorter YAML
+            absolute_points = self._generate_absolute_points(points_collection)
+            config = {'points': absolute_points}
+            
+            if self.infer_zones:
+                layout = ZoneInferenceEngine(precision=self.precision).infer(points_collection)
+                if layout is not None:
+                    zone_config = {'points': {'zones': layout.zones}}
+                    if self._yaml_length(zone_config) < self._yaml_length(config):
+                        config = zone_config
+        
+        return config
+    
+    def _yaml_length(self, config: Dict[str, Any]) -> int:
+        """Length of a config as written without comments."""
+        stream = StringIO()
+        self._write_mapping(stream, config, 0)
+        return len(stream.getvalue())
+    
+    def _write_mapping(
+        self,
+        stream: TextIO,
+        mapping: Dict[Any, Any],
+        depth: int,
+        comment_points: Optional[PointsCollection] = None
+    ) -> None:
+        """
+        Write a mapping as block YAML, one entry at a time.
+        
+        Consecutive entries are dumped in batches of STREAM_BATCH_SIZE and
+        indented to their depth, which gives the same text as dumping the
+        whole mapping. Nested mappings larger than a batch are opened with
+        their key line and written recursively.
         
-        # Generate YAML
-        yaml_str = yaml.dump(
-            config,
+        Args:
+            stream: Text stream to write to
+            mapping: Mapping to write
+            depth: Nesting depth of the mapping
+            comment_points: Points to add comments for, or None for no comments
+        """
+        # PyYAML and libyaml fall back to 2 for indents outside 2-9
+        indent = self.indent if 1 < self.indent < 10 else 2
+        prefix = ' ' * (indent * depth)
+        
+        items = list(mapping.items())
+        if self.sort_keys:
+            try:
+                items = sorted(items)
+            except TypeError:
+                pass
+        
+        batch = {}
+        for key, value in items:
+            key_line = None
+            if isinstance(value, dict) and len(value) > STREAM_BATCH_SIZE:
+                key_line = self._dump_key(key, prefix)
+            
+            if key_line is None:
+                batch[key] = value
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    self._write_batch(stream, batch, prefix, comment_points)
+                    batch = {}
+                continue
+            
+            self._write_batch(stream, batch, prefix, comment_points)
+            batch = {}
+            self._write_line(stream, prefix + key_line, comment_points)
+            self._write_mapping(stream, value, depth + 1, comment_points)
+        
+        self._write_batch(stream, batch, prefix, comment_points)
+    
+    def _write_batch(
+        self,
+        stream: TextIO,
+        batch: Dict[Any, Any],
+        prefix: str,
+        comment_points: Optional[PointsCollection]
+    ) -> None:
+        """Dump a batch of mapping entries and write it indented by prefix."""
+        if not batch:
+            return
+        
+        fragment = self._dump(batch, prefix)
+        for line in fragment.split('\n')[:-1]:
+            # Blank lines inside multi-line scalars are not indented
+            self._write_line(stream, prefix + line if line else line, comment_points)
+    
+    def _dump_key(self, key: Any, prefix: str) -> Optional[str]:
+        """Return the 'key:' line opening a nested mapping, or None for complex keys."""
+        text = self._dump({key: None}, prefix)
+        if text.endswith(': null\n') and text.count('\n') == 1:
+            return text[:-len(' null\n')]
+        return None
+    
+    def _dump(self, data: Dict[Any, Any], prefix: str) -> str:
+        """Dump a mapping that will be written indented by prefix."""
+        return yaml.dump(
+            data,
+            Dumper=YAMLDumper,
             default_flow_style=False,
             sort_keys=self.sort_keys,
             indent=self.indent,
             allow_unicode=True,
-            width=80
+            width=80 - len(prefix)  # Wrap at the same column as an unindented dump
         )
+    
+    def _write_line(
+        self,
+        stream: TextIO,
+        line: str,
+        comment_points: Optional[PointsCollection]
+    ) -> None:
+        """Write one YAML line, preceded by its descriptive comment if any."""
+        if comment_points is not None:
+            stripped = line.strip()
+            if stripped.startswith('points:'):
+                # Add comment before points section
+                stream.write('# Key switch positions for PCB generation\n')
+            elif ':' in line and not stripped.startswith('#'):
+                # Check if this is a point definition
+                point = comment_points.get_point(line.split(':')[0].strip())
+                if point:
+                    comment = self._generate_point_comment(point)
+                    if comment:
+                        stream.write(f"  # {comment}\n")
         
-        return yaml_str
+        stream.write(line + '\n')
     
     def _generate_rows_from_points(self, points_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Generate row definitions from points."""
@@ -368,41 +513,6 @@ class ErgogenYAMLGenerator:
         
         return points_dict
     
-    def _add_comments(
-        self, 
-        yaml_content: str, 
-        points_collection: PointsCollection
-    ) -> str:
-        """Add descriptive comments to the YAML."""
-        lines = yaml_content.split('\n')
-        commented_lines = []
-        
-        # Add header comment
-        header_comment = self._generate_header_comment(points_collection)
-        commented_lines.extend(header_comment)
-        
-        # Process each line
-        for line in lines:
-            if line.strip().startswith('points:'):
-                # Add comment before points section
-                commented_lines.append('# Key switch positions for PCB generation')
-                commented_lines.append(line)
-            elif ':' in line and not line.strip().startswith('#'):
-                # Check if this is a point definition
-                point_name = line.split(':')[0].strip()
-                if point_name in [p.name for p in points_collection.points]:
-                    # Find the corresponding point
-                    point = next((p for p in points_collection.points if p.name == point_name), None)
-                    if point:
-                        comment = self._generate_point_comment(point)
-                        if comment:
-                            commented_lines.append(f"  # {comment}")
-                commented_lines.append(line)
-            else:
-                commented_lines.append(line)
-        
-        return '\n'.join(commented_lines)
-    
     def _generate_header_comment(self, points_collection: PointsCollection) -> List[str]:
         """Generate header comment with conversion info."""
         comments = [
@@ -0,0 +1,571 @@
+"""
+Ergogen Zone Inference
+
+This module clusters the points of a PointsCollection into Ergogen zones,
+columns and rows, so irregular layouts can be written as compact zone
+definitions instead of one absolute entry per key.
+
+Zones follow Ergogen v4 semantics. A zone starts at its anchor; every column
+after the first moves the zone anchor by `spread` along x, every column moves
+it by `stagger` along y, and a non-zero `splay` rotates that column and all
+following columns about the column's `origin`. Keys of a column are laid out
+`padding` apart along the column's direction. Keys that do not sit exactly on
+that grid get per-key `shift` and `rotate` overrides, and empty slots are
+`skip`ped.
+
+Two clusterings are tried: vertical columns chained into zones (column
+staggered and splayed boards), and one zone per horizontal row (row staggered
+boards). The one with the shorter YAML wins. Every result is evaluated again
+with ErgogenPointsEvaluator and compared with the source points, and layouts
+that do not round-trip within tolerance are rejected so callers can fall
+back to absolute points.
+
+As in Ergogen, keys are named <zone>_<column>_<row>, and single-row zones,
+whose only row is "default", drop the "_default" suffix.
+"""
+
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from kle_to_ergogen.data_models.ergogen_point import ErgogenPoint, PointsCollection
+from kle_to_ergogen.parsers.ergogen_points_evaluator import ErgogenEvaluationError, ErgogenPointsEvaluator
+
+try:
+    from yaml import CDumper as YAMLDumper
+except ImportError:
+    from yaml import Dumper as YAMLDumper
+
+
+POSITION_TOLERANCE = 0.01     # mm, round-trip tolerance at the default precision
+ANGLE_TOLERANCE = 0.05        # degrees, half the 0.1° rotation step of absolute points
+ANGLE_GROUP_TOLERANCE = 0.01  # degrees, keys within this share a column direction
+COLUMN_TOLERANCE = 1.0        # mm, keys within this across a column share the column
+MAX_SPLAY = 30.0              # degrees, largest splay between chained columns
+MAX_COLUMN_GAP = 1.75         # key units, largest spread between chained columns
+MAX_STAGGER = 2.0             # key units, largest stagger between chained columns
+MAX_SKIPPED_ROWS = 1          # Empty slots allowed between keys of one column
+
+def _rotate(x: float, y: float, angle: float,
+            origin: Tuple[float, float] = (0.0, 0.0)) -> Tuple[float, float]:
+    """Rotate (x, y) counter-clockwise by angle degrees about origin."""
+    if not angle:
+        return x, y
+    radians = math.radians(angle)
+    cos_a = math.cos(radians)
+    sin_a = math.sin(radians)
+    dx = x - origin[0]
+    dy = y - origin[1]
+    return origin[0] + dx * cos_a - dy * sin_a, origin[1] + dx * sin_a + dy * cos_a
+
+
+def _normalize_angle(angle: float) -> float:
+    """Normalize an angle to the (-180, 180] degree range."""
+    angle = math.fmod(angle, 360.0)
+    if angle <= -180.0:
+        angle += 360.0
+    elif angle > 180.0:
+        angle -= 360.0
+    return angle
+
+
+# A zone's rotations compose into one rigid transform (angle, x offset, y offset)
+# that maps p to R(angle) p + offset
+Transform = Tuple[float, float, float]
+IDENTITY: Transform = (0.0, 0.0, 0.0)
+
+
+def _compose(transform: Transform, angle: float, origin: Tuple[float, float]) -> Transform:
+    """
+    Add a rotation by angle degrees about origin, given in the zone's unrotated frame.
+
+    Ergogen moves each new rotation origin through the earlier rotations, so
+    the result is the transform applied after the new rotation.
+    """
+    placed_x, placed_y = _apply(transform, *origin)
+    turned_x, turned_y = _rotate(origin[0], origin[1], transform[0] + angle)
+    return transform[0] + angle, placed_x - turned_x, placed_y - turned_y
+
+
+def _apply(transform: Transform, x: float, y: float) -> Tuple[float, float]:
+    x, y = _rotate(x, y, transform[0])
+    return x + transform[1], y + transform[2]
+
+
+def zone_config_size(config: Any) -> int:
+    """Count the YAML entries (mapping keys and list items) in a config."""
+    if isinstance(config, dict):
+        return sum(1 + zone_config_size(value) for value in config.values())
+    if isinstance(config, list):
+        return sum(1 + zone_config_size(value) for value in config)
+    return 0
+
+
+def yaml_length(config: Any) -> int:
+    """Length of a config dumped as block YAML."""
+    return len(yaml.dump(config, Dumper=YAMLDumper, default_flow_style=False, sort_keys=True))
+
+
+def ergogen_key_name(zone_name: str, column_name: str, row_name: str) -> str:
+    """Name Ergogen gives a zone key: "_default" suffixes are dropped."""
+    name = f"{zone_name}_{column_name}_{row_name}"
+    while name.endswith('_default'):
+        name = name[:-len('_default')]
+    return name
+
+
+@dataclass
+class ZoneLayout:
+    """Inferred Ergogen zones for a points collection."""
+    zones: Dict[str, Any]    # points.zones mapping
+    names: Dict[str, str]    # Source point name -> Ergogen key name
+    size: int                # Length of zones dumped as YAML
+
+
+@dataclass
+class _Column:
+    """Keys laid out along one direction, padding apart."""
+    angle: float                             # Column direction, degrees counter-clockwise
+    base: Tuple[float, float]                # Position of row 0
+    keys: List[Tuple[int, ErgogenPoint]]     # (row index, point), bottom row first
+
+
+class ZoneInferenceEngine:
+    """
+    Infers compact Ergogen zones from absolute point positions.
+
+    Point positions and rotations are used as they are written for absolute
+    points, so a zone layout places every key exactly where the absolute
+    output would. Ergogen names zone keys <zone>_<column>_<row>, or
+    <zone>_<column> in single-row zones; the mapping from source point names
+    is returned with the zones.
+    """
+
+    def __init__(
+        self,
+        key_unit_size: float = 19.05,
+        precision: int = 3,
+        tolerance: Optional[float] = None
+    ):
+        """
+        Initialize the inference engine.
+
+        Args:
+            key_unit_size: Size of one key unit in mm (default: 19.05mm)
+            precision: Decimal precision of emitted values (default: 3)
+            tolerance: Round-trip position tolerance in mm
+                (default: POSITION_TOLERANCE, or one step of precision if larger)
+        """
+        self.key_unit_size = key_unit_size
+        self.precision = precision
+        if tolerance is None:
+            tolerance = max(POSITION_TOLERANCE, 10.0 ** -precision)
+        self.tolerance = tolerance
+
+    def infer(self, points_collection: PointsCollection) -> Optional[ZoneLayout]:
+        """
+        Infer zones for a points collection.
+
+        Args:
+            points_collection: Collection of points to cluster
+
+        Returns:
+            The smallest zone layout that round-trips, or None if none does
+        """
+        points = points_collection.points
+        if not points or len({point.name for point in points}) != len(points):
+            return None
+        for point in points:
+            if not (math.isfinite(point.x) and math.isfinite(point.y) and math.isfinite(point.rotation)):
+                return None
+
+        padding = self._estimate_padding(points)
+        candidates = []
+        for chains in (self._chain_columns(self._vertical_columns(points, padding)),
+                       self._row_chains(points)):
+            layout = self._build_layout(chains, padding)
+            if not self.verify(layout, points):
+                candidates.append(layout)
+
+        if not candidates:
+            return None
+        return min(candidates, key=lambda layout: layout.size)
+
+    def verify(self, layout: ZoneLayout, points: List[ErgogenPoint]) -> List[str]:
+        """
+        Evaluate inferred zones as Ergogen would and compare them with the source points.
+
+        Args:
+            layout: Inferred zone layout
+            points: Source points
+
+        Returns:
+            List of round-trip errors (empty if every key matches)
+        """
+        try:
+            evaluated = ErgogenPointsEvaluator().evaluate({'points': {'zones': layout.zones}})
+        except ErgogenEvaluationError as e:
+            return [f"Zones cannot be evaluated: {e}"]
+        laid_out = {point.name: (point.x, point.y, point.rotation) for point in evaluated.points}
+
+        errors = []
+        if len(laid_out) != len(points):
+            errors.append(f"Zones define {len(laid_out)} keys for {len(points)} points")
+
+        for point in points:
+            name = layout.names.get(point.name)
+            if name not in laid_out:
+                errors.append(f"Point '{point.name}' is missing from the zones")
+                continue
+            x, y, rotation = laid_out[name]
+            distance = math.hypot(x - point.x, y - point.y)
+            if distance > self.tolerance:
+                errors.append(f"Point '{point.name}' is {distance:.4f}mm from zone key '{name}'")
+            if abs(_normalize_angle(rotation - point.rotation)) > ANGLE_TOLERANCE:
+                errors.append(f"Point '{point.name}' is rotated {rotation:.3f}° in zone key '{name}'")
+
+        return errors
+
+    def _round(self, value: float) -> float:
+        value = round(value, self.precision)
+        return value if value else 0.0  # No -0.0 in the output
+
+    @staticmethod
+    def _labels(prefix: str, count: int) -> List[str]:
+        """Zero-padded names, so sorted YAML keys keep layout order."""
+        width = len(str(count - 1))
+        return [f"{prefix}{index:0{width}d}" for index in range(count)]
+
+    def _angle_groups(self, points: List[ErgogenPoint]) -> List[Tuple[float, List[ErgogenPoint]]]:
+        """Group points whose rotations differ by at most ANGLE_GROUP_TOLERANCE."""
+        ordered = sorted(points, key=lambda point: _normalize_angle(point.rotation))
+        groups = []
+        for point in ordered:
+            angle = _normalize_angle(point.rotation)
+            if groups and angle - groups[-1][0] <= ANGLE_GROUP_TOLERANCE:
+                groups[-1][1].append(point)
+            else:
+                groups.append((angle, [point]))
+        return groups
+
+    def _estimate_padding(self, points: List[ErgogenPoint]) -> float:
+        """Most common distance between vertically adjacent keys."""
+        gaps = []
+        for angle, group in self._angle_groups(points):
+            local = sorted(((_rotate(point.x, point.y, -angle), point) for point in group),
+                           key=lambda item: item[0])
+            for index in range(1, len(local)):
+                (u0, v0), _ = local[index - 1]
+                (u1, v1), _ = local[index]
+                gap = v1 - v0
+                if abs(u1 - u0) <= COLUMN_TOLERANCE and 0.5 * self.key_unit_size <= gap <= 1.5 * self.key_unit_size:
+                    gaps.append(self._round(gap))
+        if not gaps:
+            return self._round(self.key_unit_size)
+        return Counter(gaps).most_common(1)[0][0]
+
+    def _vertical_columns(self, points: List[ErgogenPoint], padding: float) -> List[_Column]:
+        """Cluster keys that share a direction and a position across it."""
+        columns = []
+        for angle, group in self._angle_groups(points):
+            local = sorted(((_rotate(point.x, point.y, -angle), point) for point in group),
+                           key=lambda item: item[0])
+            cluster = []
+            for (u, v), point in local:
+                if cluster and u - cluster[0][0] > COLUMN_TOLERANCE:
+                    columns.extend(self._split_column(angle, cluster, padding))
+                    cluster = []
+                cluster.append((u, v, point))
+            if cluster:
+                columns.extend(self._split_column(angle, cluster, padding))
+        return columns
+
+    def _split_column(self, angle: float, cluster: List[Tuple[float, float, ErgogenPoint]],
+                      padding: float) -> List[_Column]:
+        """
+        Assign rows along a column.
+
+        Keys landing on a row that is already taken start another column, and
+        so do keys more than MAX_SKIPPED_ROWS empty slots above the previous key.
+        """
+        columns = []
+        remaining = sorted(cluster, key=lambda item: item[1])
+        while remaining:
+            base_v = remaining[0][1]
+            keys = []
+            leftover = []
+            for index, (u, v, point) in enumerate(remaining):
+                row = int(round((v - base_v) / padding))
+                if keys and row > keys[-1][0] + MAX_SKIPPED_ROWS + 1:
+                    leftover.extend(remaining[index:])
+                    break
+                if keys and row == keys[-1][0]:
+                    leftover.append((u, v, point))
+                else:
+                    keys.append((row, point))
+            base_point = keys[0][1]
+            columns.append(_Column(angle, (base_point.x, base_point.y), keys))
+            remaining = sorted(leftover, key=lambda item: item[1])
+        return columns
+
+    def _chain_columns(self, columns: List[_Column]) -> List[List[_Column]]:
+        """
+        Chain columns into zones, left to right.
+
+        Each zone starts at the leftmost unused column and repeatedly takes
+        the column to the right that is within MAX_COLUMN_GAP, MAX_STAGGER
+        and MAX_SPLAY of the current one and closest to one key unit of
+        spread with no stagger.
+        """
+        unit = self.key_unit_size
+        reach = math.hypot(MAX_COLUMN_GAP, MAX_STAGGER) * unit
+        ordered = sorted(range(len(columns)), key=lambda index: columns[index].base)
+
+        # Spatial index of column bases, one cell per reach
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        for index, column in enumerate(columns):
+            cell = (math.floor(column.base[0] / reach), math.floor(column.base[1] / reach))
+            grid.setdefault(cell, []).append(index)
+
+        used = [False] * len(columns)
+        chains = []
+        for start in ordered:
+            if used[start]:
+                continue
+            used[start] = True
+            chain = [columns[start]]
+            current = columns[start]
+            while True:
+                cell_x = math.floor(current.base[0] / reach)
+                cell_y = math.floor(current.base[1] / reach)
+                best = None
+                for grid_x in (cell_x - 1, cell_x, cell_x + 1):
+                    for grid_y in (cell_y - 1, cell_y, cell_y + 1):
+                        for index in grid.get((grid_x, grid_y), ()):
+                            if used[index]:
+                                continue
+                            candidate = columns[index]
+                            if abs(_normalize_angle(candidate.angle - current.angle)) > MAX_SPLAY:
+                                continue
+                            dx, dy = _rotate(candidate.base[0] - current.base[0],
+                                             candidate.base[1] - current.base[1], -current.angle)
+                            if not 0.25 * unit < dx <= MAX_COLUMN_GAP * unit or abs(dy) > MAX_STAGGER * unit:
+                                continue
+                            score = (abs(dx - unit) + abs(dy), index)
+                            if best is None or score < best:
+                                best = score
+                if best is None:
+                    break
+                used[best[1]] = True
+                current = columns[best[1]]
+                chain.append(current)
+            chains.append(chain)
+        return chains
+
+    def _row_chains(self, points: List[ErgogenPoint]) -> List[List[_Column]]:
+        """One chain per row of keys that share a direction, one key per column."""
+        chains = []
+        for angle, group in self._angle_groups(points):
+            local = sorted(((_rotate(point.x, point.y, -angle), point) for point in group),
+                           key=lambda item: (item[0][1], item[0][0]))
+            rows = []
+            for (u, v), point in local:
+                if rows and v - rows[-1][0] <= COLUMN_TOLERANCE:
+                    rows[-1][1].append((u, point))
+                else:
+                    rows.append((v, [(u, point)]))
+            for _, row in rows:
+                row.sort(key=lambda item: item[0])
+                chains.append([_Column(angle, (point.x, point.y), [(0, point)]) for _, point in row])
+        return chains
+
+    def _build_layout(self, chains: List[List[_Column]], padding: float) -> ZoneLayout:
+        zone_names = self._labels('zone', len(chains))
+        zones = {}
+        names = {}
+        for zone_name, chain in zip(zone_names, chains):
+            # Fit once to find the most common spread, then use it as the zone default
+            zone, _ = self._fit_zone(zone_name, chain, padding, self._round(self.key_unit_size))
+            spreads = [column.get('key', {}).get('spread', zone['key'].get('spread'))
+                       for column in list(zone['columns'].values())[1:]]
+            if spreads:
+                spread = Counter(spreads).most_common(1)[0][0]
+                zone, zone_names_map = self._fit_zone(zone_name, chain, padding, spread)
+            else:
+                zone, zone_names_map = self._fit_zone(zone_name, chain, padding, None)
+            zones[zone_name] = zone
+            names.update(zone_names_map)
+        return ZoneLayout(zones=zones, names=names, size=yaml_length(zones))
+
+    def _fit_zone(self, zone_name: str, chain: List[_Column], padding: float,
+                  spread: Optional[float]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Fit anchor, column and key settings for a chain of columns.
+
+        Columns are fitted in order with the rounded values that will be
+        emitted, so rounding errors do not build up along the zone.
+        """
+        unit = self._round(self.key_unit_size)
+        row_count = max(row for column in chain for row, _ in column.keys) + 1
+        row_names = self._labels('r', row_count) if row_count > 1 else ['default']
+        column_names = self._labels('c', len(chain))
+
+        first = chain[0]
+        anchor_x = self._round(first.base[0])
+        anchor_y = self._round(first.base[1])
+        anchor: Dict[str, Any] = {'shift': [anchor_x, anchor_y]}
+        transform = IDENTITY
+        angle = self._round(first.angle)
+        if angle:
+            anchor['rotate'] = angle
+            transform = _compose(transform, angle, (anchor_x, anchor_y))
+
+        zone_key: Dict[str, Any] = {}
+        if spread is not None:
+            zone_key['spread'] = spread
+        if row_count > 1:
+            zone_key['padding'] = padding
+        zone_key.update({'width': unit, 'height': unit, 'tags': ['key']})
+
+        zone: Dict[str, Any] = {'anchor': anchor, 'key': zone_key}
+        if row_count > 1:
+            zone['rows'] = {row: {} for row in row_names}
+
+        columns = {}
+        names = {}
+        for index, (column_name, column) in enumerate(zip(column_names, chain)):
+            column_key: Dict[str, Any] = {}
+            if index:
+                splay = self._round(_normalize_angle(column.angle - angle))
+                if abs(splay) <= ANGLE_GROUP_TOLERANCE:
+                    splay = 0.0
+
+                if splay:
+                    target_x, target_y, origin = self._solve_splay(
+                        column.base, transform, splay, anchor_x, anchor_y,
+                        spread if spread is not None else unit)
+                else:
+                    target_x, target_y = self._unrotate(column.base, transform)
+                    origin = None
+
+                column_spread = self._round(target_x - anchor_x)
+                stagger = self._round(target_y - anchor_y)
+                anchor_x += column_spread
+                anchor_y += stagger
+                if column_spread != spread:
+                    column_key['spread'] = column_spread
+                if stagger:
+                    column_key['stagger'] = stagger
+
+                if splay:
+                    origin_x, origin_y = (0.0, 0.0)
+                    if origin is not None:
+                        origin_x = self._round(origin[0] - anchor_x)
+                        origin_y = self._round(origin[1] - anchor_y)
+                    transform = _compose(transform, splay, (anchor_x + origin_x, anchor_y + origin_y))
+                    angle = transform[0]
+                    column_key['splay'] = splay
+                    if origin_x or origin_y:
+                        column_key['origin'] = [origin_x, origin_y]
+
+            base_x, base_y = _apply(transform, anchor_x, anchor_y)
+
+            column_rows: Dict[str, Any] = {}
+            occupied = set()
+            for row, point in column.keys:
+                occupied.add(row)
+                step_x, step_y = _rotate(0.0, row * padding, angle)
+                overrides = self._key_overrides(point, base_x + step_x, base_y + step_y, angle)
+                if overrides:
+                    column_rows[row_names[row]] = overrides
+                names[point.name] = ergogen_key_name(zone_name, column_name, row_names[row])
+            for row in range(row_count):
+                if row not in occupied:
+                    column_rows[row_names[row]] = {'skip': True}
+
+            column_config = {}
+            if column_key:
+                column_config['key'] = column_key
+            if column_rows:
+                column_config['rows'] = column_rows
+            columns[column_name] = column_config
+
+        zone['columns'] = columns
+        return zone, names
+
+    def _key_overrides(self, point: ErgogenPoint, x: float, y: float, angle: float) -> Dict[str, Any]:
+        """
+        Per-key settings that move a key from its grid position (x, y) to the point.
+
+        Offsets go under adjust, which unlike shift and rotate does not carry
+        over to the rest of the column.
+        """
+        overrides: Dict[str, Any] = {}
+        adjust: Dict[str, Any] = {}
+
+        shift_x, shift_y = _rotate(point.x - x, point.y - y, -angle)
+        if math.hypot(shift_x, shift_y) > self.tolerance / 2:
+            adjust['shift'] = [self._round(shift_x), self._round(shift_y)]
+
+        rotate = _normalize_angle(point.rotation - angle)
+        if abs(rotate) > ANGLE_TOLERANCE / 2:
+            adjust['rotate'] = self._round(rotate)
+
+        if adjust:
+            overrides['adjust'] = adjust
+
+        if point.kle_width != 1.0:
+            overrides['width'] = self._round(point.kle_width * self.key_unit_size)
+        if point.kle_height != 1.0:
+            overrides['height'] = self._round(point.kle_height * self.key_unit_size)
+
+        return overrides
+
+    @staticmethod
+    def _unrotate(position: Tuple[float, float], transform: Transform) -> Tuple[float, float]:
+        """Undo the zone's rotations, giving the unrotated column anchor."""
+        return _rotate(position[0] - transform[1], position[1] - transform[2], -transform[0])
+
+    def _solve_splay(
+        self,
+        target: Tuple[float, float],
+        transform: Transform,
+        splay: float,
+        anchor_x: float,
+        anchor_y: float,
+        spread: float
+    ) -> Tuple[float, float, Optional[Tuple[float, float]]]:
+        """
+        Find the unrotated column anchor and splay origin that put the column at target.
+
+        The default origin (the column anchor itself) is preferred. Splaying
+        about the anchor leaves it where the zone's earlier rotations T put
+        it, so the anchor c is the target with T undone. If that gives an
+        implausible spread or stagger, the column keeps the zone spread and
+        the origin o is solved from T(R(splay, o) c) = target.
+
+        Returns:
+            Unrotated anchor x and y, and the origin (None for the default)
+        """
+        # With the default origin the column anchor stays at T(c)
+        x, y = self._unrotate(target, transform)
+        unit = self.key_unit_size
+        if 0.0 <= x - anchor_x <= MAX_COLUMN_GAP * unit and abs(y - anchor_y) <= MAX_STAGGER * unit:
+            return x, y, None
+
+        # Keep the zone spread and solve (I - R(splay)) o = T^-1(target) - R(splay) c
+        x = anchor_x + spread
+        y = anchor_y
+        local_x, local_y = self._unrotate(target, transform)
+        turned_x, turned_y = _rotate(x, y, splay)
+        rhs_x = local_x - turned_x
+        rhs_y = local_y - turned_y
+        a = 1.0 - math.cos(math.radians(splay))
+        b = -math.sin(math.radians(splay))
+        determinant = a * a + b * b
+        origin_x = (a * rhs_x + b * rhs_y) / determinant
+        origin_y = (-b * rhs_x + a * rhs_y) / determinant
+        return x, y, (origin_x, origin_y)
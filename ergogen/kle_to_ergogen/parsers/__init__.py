@@ -5,5 +5,6 @@ This package contains parsers for converting KLE layouts to Ergogen points.
 """
 
 from .kle_to_ergogen_converter import KLEToErgogenConverter
+from .ergogen_points_evaluator import ErgogenPointsEvaluator, ErgogenEvaluationError
 
-__all__ = ['KLEToErgogenConverter']
+__all__ = ['KLEToErgogenConverter', 'ErgogenPointsEvaluator', 'ErgogenEvaluationError']
@@ -0,0 +1,842 @@
+"""
+Ergogen Points Evaluator
+
+This module evaluates the units and points sections of an Ergogen v4 config
+in Python, so a board can be previewed without starting Node Ergogen.
+
+Configs are preprocessed as Ergogen does (dotted keys are unnested and
+$extends presets are inherited), units are evaluated in order, and each
+zone is laid out column by column with its anchor, stagger, spread, splay,
+key adjustments and mirroring. Unit expressions such as '-kp + 7.8' or
+'2 kx' are translated from math.js syntax to Python, checked against a
+whitelist of syntax nodes and compiled once per distinct expression.
+
+Point and render_template are public: the Ergogen to QMK parser places
+footprints on evaluated points and fills their parameter templates.
+"""
+
+import ast
+import functools
+import math
+import re
+import sys
+from pathlib import Path
+from types import CodeType
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import yaml
+
+from kle_to_ergogen.data_models.ergogen_point import ErgogenPoint, PointsCollection
+
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
+
+
+class ErgogenEvaluationError(Exception):
+    """Raised when an Ergogen config cannot be evaluated."""
+    pass
+
+
+# Ergogen's built-in units; config units and variables extend these in order
+DEFAULT_UNITS = {
+    'U': 19.05,
+    'u': 19,
+    'cx': 18,
+    'cy': 17,
+    '$default_stagger': 0,
+    '$default_spread': 'u',
+    '$default_splay': 0,
+    '$default_height': 'u-1',
+    '$default_width': 'u-1',
+    '$default_padding': 'u',
+    '$default_autobind': 10
+}
+
+_ANCHOR_FIELDS = ('ref', 'aggregate', 'orient', 'shift', 'rotate', 'affect', 'resist')
+_AGGREGATE_FIELDS = ('parts', 'method')
+_POINTS_FIELDS = ('zones', 'key', 'rotate', 'mirror')
+_ZONE_FIELDS = ('columns', 'rows', 'key')
+_COLUMN_FIELDS = ('rows', 'key')
+_NUMBER_FIELDS = ('stagger', 'spread', 'splay', 'orient', 'rotate', 'width', 'height', 'padding')
+_XY_FIELDS = ('origin', 'shift')
+_SOURCE_ALIASES = ('source', 'origin', 'base', 'primary', 'left')
+_CLONE_ALIASES = ('clone', 'image', 'derived', 'secondary', 'right')
+
+def _round(value: float, digits: float = 0) -> float:
+    """math.js round: halves round away from zero."""
+    scale = 10.0 ** int(digits)
+    return math.copysign(math.floor(abs(value) * scale + 0.5) / scale, value)
+
+
+# Functions and constants available to unit expressions (math.js trigonometry uses radians).
+# Every function returns a float, so results stay doubles as in math.js
+_MATH_NAMES = {
+    'abs': abs, 'min': min, 'max': max, 'round': _round,
+    'sqrt': math.sqrt, 'cbrt': lambda value: math.copysign(abs(value) ** (1 / 3), value),
+    'exp': math.exp, 'log': math.log, 'log10': math.log10, 'pow': math.pow,
+    'floor': lambda value: float(math.floor(value)), 'ceil': lambda value: float(math.ceil(value)),
+    'sign': lambda value: float((value > 0) - (value < 0)),
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan, 'atan2': math.atan2,
+    'pi': math.pi, 'e': math.e
+}
+
+# Python 3.7 parses numbers as ast.Num
+_NUMBER_NODE = ast.Constant if sys.version_info >= (3, 8) else ast.Num
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, _NUMBER_NODE,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow, ast.UAdd, ast.USub
+)
+
+_TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<name>[A-Za-z_$][\w$]*)"
+    r"|(?P<op>[-+*/%^(),]))"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_expression(expression: str) -> Tuple[CodeType, Tuple[Tuple[str, str], ...]]:
+    """
+    Compile a math.js unit expression into Python bytecode.
+
+    '^' becomes '**', implicit multiplication ('2 kx', '0.5cy', '2(u + 1)')
+    is made explicit and unit names are replaced by placeholders, so
+    $default_* units and names that are Python keywords can be referenced.
+    Number literals are compiled as floats, so arithmetic uses doubles like
+    math.js and a huge power overflows instead of building an exact
+    integer. Compilations are cached per expression string.
+
+    Args:
+        expression: Expression as written in the config
+
+    Returns:
+        Compiled code and (Python name, unit name) pairs for the names it uses
+
+    Raises:
+        ErgogenEvaluationError: If the expression has unsupported syntax
+    """
+    tokens = []
+    position = 0
+    stripped = expression.rstrip()
+    while position < len(stripped):
+        match = _TOKEN_PATTERN.match(stripped, position)
+        if not match:
+            raise ErgogenEvaluationError(f'Could not parse "{expression}" as a number!')
+        position = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+
+    parts = []
+    names: Dict[str, str] = {}  # Unit name -> placeholder
+    previous = None
+    for kind, text in tokens:
+        opens_operand = kind in ('number', 'name') or text == '('
+        closes_operand = previous is not None and (previous[0] in ('number', 'name') or previous[1] == ')')
+        calls_function = previous is not None and previous[0] == 'name' and text == '('
+        if opens_operand and closes_operand and not calls_function:
+            parts.append('*')
+        if kind == 'name':
+            parts.append(names.setdefault(text, f"_{len(names)}"))
+        elif kind == 'number' and not any(marker in text for marker in '.eE'):
+            parts.append(text + '.0')
+        else:
+            parts.append('**' if text == '^' else text)
+        previous = (kind, text)
+
+    try:
+        tree = ast.parse(' '.join(parts), mode='eval')
+    except SyntaxError:
+        raise ErgogenEvaluationError(f'Could not parse "{expression}" as a number!')
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ErgogenEvaluationError(f'Unsupported syntax in expression "{expression}"')
+        if isinstance(node, ast.Call) and (node.keywords or not isinstance(node.func, ast.Name)):
+            raise ErgogenEvaluationError(f'Unsupported function call in expression "{expression}"')
+        if isinstance(node, _NUMBER_NODE) and type(getattr(node, 'value', getattr(node, 'n', None))) not in (int, float):
+            raise ErgogenEvaluationError(f'Unsupported constant in expression "{expression}"')
+
+    return compile(tree, '<unit expression>', 'eval'), tuple((placeholder, name) for name, placeholder in names.items())
+
+
+def evaluate_number(value: Any, units: Dict[str, float], name: str) -> float:
+    """
+    Evaluate a number or unit expression against the units defined so far.
+
+    Args:
+        value: Number or expression string
+        units: Unit name -> value
+        name: Field name for error messages
+
+    Returns:
+        The value as a float
+
+    Raises:
+        ErgogenEvaluationError: If the value is not a valid number or expression
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ErgogenEvaluationError(f'Field "{name}" should be of type number!')
+    if not isinstance(value, str):
+        return float(value)
+
+    code, names = compile_expression(value)
+    namespace = {}
+    for python_name, unit_name in names:
+        if unit_name in units:
+            namespace[python_name] = units[unit_name]
+        elif unit_name in _MATH_NAMES:
+            namespace[python_name] = _MATH_NAMES[unit_name]
+        else:
+            raise ErgogenEvaluationError(f'Unknown unit "{unit_name}" in field "{name}"')
+    try:
+        result = eval(code, {'__builtins__': {}}, namespace)
+        if isinstance(result, bool) or not isinstance(result, (int, float)):
+            raise ErgogenEvaluationError(f'Field "{name}" should be of type number!')
+        result = float(result)
+    except (ArithmeticError, TypeError, ValueError) as e:
+        raise ErgogenEvaluationError(f'Could not evaluate "{value}" in field "{name}": {e}')
+    if not math.isfinite(result):
+        raise ErgogenEvaluationError(f'Could not evaluate "{value}" in field "{name}": result is not finite')
+    return result
+
+
+def _is_number(value: Any, units: Dict[str, float]) -> bool:
+    """Whether Ergogen would treat the value as a number (a number or a valid expression)."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    if not isinstance(value, str):
+        return False
+    try:
+        evaluate_number(value, units, '')
+    except ErgogenEvaluationError:
+        return False
+    return True
+
+
+def _copy(value: Any) -> Any:
+    """Deep copy of plain YAML data (much faster than copy.deepcopy)."""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+_UNSET = object()
+
+
+def _extend_pair(to: Any, source: Any) -> Any:
+    if source is None:
+        return to
+    if source == '$unset':
+        return _UNSET
+    if isinstance(source, dict) and isinstance(to, dict):
+        result = _copy(to)
+        for key, value in source.items():
+            merged = _extend_pair(to.get(key), value)
+            if merged is _UNSET:
+                result.pop(key, None)
+            else:
+                result[key] = merged
+        return result
+    if isinstance(source, list) and isinstance(to, list):
+        result = _copy(to)
+        for index, value in enumerate(source):
+            merged = _extend_pair(result[index] if index < len(result) else None, value)
+            merged = None if merged is _UNSET else merged
+            if index < len(result):
+                result[index] = merged
+            else:
+                result.append(merged)
+        return result
+    return source
+
+
+def extend(*layers: Any) -> Any:
+    """
+    Merge config layers the way Ergogen does.
+
+    Mappings merge recursively, lists merge by index, None leaves a value
+    alone and '$unset' removes it; anything else replaces the earlier value.
+    """
+    result = layers[0]
+    for layer in layers[1:]:
+        if layer is result:
+            continue
+        result = _extend_pair(result, layer)
+    return None if result is _UNSET else result
+
+
+def unnest(config: Any) -> Any:
+    """Expand dotted keys ('anchor.shift: ...') into nested mappings."""
+    if not isinstance(config, dict):
+        return config
+    result: Dict[str, Any] = {}
+    for key, value in config.items():
+        levels = str(key).split('.')
+        step = result
+        for level in levels[:-1]:
+            if not isinstance(step.get(level), dict):
+                step[level] = {}
+            step = step[level]
+        step[levels[-1]] = unnest(value)
+    return result
+
+
+def _deep_get(config: Any, path: str) -> Any:
+    for level in path.split('.'):
+        if not isinstance(config, dict) or level not in config:
+            return None
+        config = config[level]
+    return config
+
+
+def inherit(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve $extends references (dotted paths into the config) bottom up."""
+
+    def traverse(value: Any, breadcrumbs: List[str]) -> Any:
+        if isinstance(value, list):
+            return [traverse(item, breadcrumbs + [f"[{index}]"]) for index, item in enumerate(value)]
+        if not isinstance(value, dict):
+            return value
+
+        result = {}
+        for key, item in value.items():
+            item = traverse(item, breadcrumbs + [key])
+            if isinstance(item, dict) and item.get('$extends') is not None:
+                candidates = item['$extends']
+                candidates = list(candidates) if isinstance(candidates, list) else [candidates]
+                chain = [item]
+                while candidates:
+                    path = candidates.pop(0)
+                    other = _deep_get(config, str(path))
+                    if not other:
+                        raise ErgogenEvaluationError(
+                            f'"{path}" (reached from "{".".join(breadcrumbs + [key])}.$extends") '
+                            f'does not name a valid inheritance target!')
+                    parents = other.get('$extends', []) if isinstance(other, dict) else []
+                    candidates.extend(parents if isinstance(parents, list) else [parents])
+                    chain.insert(0, _copy(other))
+                item = extend(*chain)
+                item.pop('$extends', None)
+            result[key] = item
+        return result
+
+    return traverse(config, [])
+
+
+def _check_fields(config: Dict[str, Any], name: str, allowed: Tuple[str, ...]) -> None:
+    for key in config:
+        if key not in allowed:
+            raise ErgogenEvaluationError(f'Unexpected key "{key}" within field "{name}"!')
+
+
+def _mapping(value: Any, name: str) -> Dict[str, Any]:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ErgogenEvaluationError(f'Field "{name}" should be of type object!')
+    return value
+
+
+def _rotate(x: float, y: float, angle: float, origin_x: float = 0.0, origin_y: float = 0.0) -> Tuple[float, float]:
+    """Rotate (x, y) counter-clockwise by angle degrees about the origin."""
+    radians = math.radians(angle)
+    cos_a = math.cos(radians)
+    sin_a = math.sin(radians)
+    x -= origin_x
+    y -= origin_y
+    return x * cos_a - y * sin_a + origin_x, x * sin_a + y * cos_a + origin_y
+
+
+def render_template(text: str, values: Dict[str, Any]) -> str:
+    """Fill {{path}} placeholders from values, like Ergogen's key name templates."""
+    return re.sub(r'\{\{([^}]*)\}\}', lambda match: str(_deep_get(values, match.group(1)) or ''), text)
+
+
+class Point:
+    """An Ergogen point: position, rotation and the key settings it came from."""
+
+    __slots__ = ('x', 'y', 'r', 'meta')
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, r: float = 0.0, meta: Optional[Dict[str, Any]] = None):
+        self.x = x
+        self.y = y
+        self.r = r
+        self.meta = meta if meta is not None else {}
+
+    def clone(self) -> 'Point':
+        return Point(self.x, self.y, self.r, dict(self.meta))
+
+    def shift(self, x: float, y: float, relative: bool = True, resist: bool = False) -> 'Point':
+        if not resist and self.meta.get('mirrored'):
+            x = -x
+        if relative:
+            x, y = _rotate(x, y, self.r)
+        self.x += x
+        self.y += y
+        return self
+
+    def rotate(self, angle: float, origin: Optional[Tuple[float, float]] = (0.0, 0.0),
+               resist: bool = False) -> 'Point':
+        if not resist and self.meta.get('mirrored'):
+            angle = -angle
+        if origin is not None:
+            self.x, self.y = _rotate(self.x, self.y, angle, *origin)
+        self.r += angle
+        return self
+
+    def mirror(self, axis: float) -> 'Point':
+        self.x = 2 * axis - self.x
+        self.r = -self.r
+        return self
+
+    def angle(self, other: 'Point') -> float:
+        return -math.degrees(math.atan2(other.x - self.x, other.y - self.y))
+
+
+class ErgogenPointsEvaluator:
+    """
+    Evaluator for the units and points sections of Ergogen v4 configs.
+
+    Follows Ergogen's point semantics: anchors (ref, aggregate, orient,
+    shift, rotate, affect, resist), zone and column layout with stagger,
+    spread, splay and origin, cumulative orient/shift/rotate and independent
+    adjust per key, padding, skip, zone and global rotation, and zone and
+    global mirroring with asym. Outlines, cases and PCBs are not evaluated.
+    """
+
+    def __init__(self):
+        """Initialize the evaluator."""
+        self.notes: List[str] = []
+
+    def evaluate_file(self, file_path: Union[str, Path]) -> PointsCollection:
+        """
+        Evaluate the points of an Ergogen YAML config file.
+
+        Args:
+            file_path: Path to the config
+
+        Returns:
+            Points collection with one point per (non-skipped) key
+
+        Raises:
+            ErgogenEvaluationError: If the file cannot be read or evaluated
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                config = yaml.load(f, Loader=YAMLLoader)
+        except (OSError, yaml.YAMLError) as e:
+            raise ErgogenEvaluationError(f"Failed to load {file_path}: {e}")
+        return self.evaluate(config)
+
+    def evaluate(self, config: Dict[str, Any]) -> PointsCollection:
+        """
+        Evaluate the points of a loaded Ergogen config.
+
+        Args:
+            config: Parsed YAML config
+
+        Returns:
+            Points collection in Ergogen order; rotations are normalized to
+            0-360 degrees and the evaluated units are kept in its metadata
+
+        Raises:
+            ErgogenEvaluationError: If the config is invalid
+        """
+        if not isinstance(config, dict):
+            raise ErgogenEvaluationError("Ergogen config should be a mapping")
+        self.notes = []
+
+        config = inherit(unnest(config))
+        units = self.parse_units(config)
+        points = self.evaluate_points(config, units)
+
+        collection = PointsCollection(metadata={'units': units, 'notes': list(self.notes)})
+        for name, point in points.items():
+            collection._append(self._to_ergogen_point(name, point))
+        return collection
+
+    def parse_units(self, config: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Evaluate the built-in units, then the config's units and variables, in order.
+
+        Args:
+            config: Preprocessed config
+
+        Returns:
+            Unit name -> value
+        """
+        raw_units = extend(
+            dict(DEFAULT_UNITS),
+            _mapping(config.get('units'), 'units'),
+            _mapping(config.get('variables'), 'variables')
+        )
+        units: Dict[str, float] = {}
+        for name, value in raw_units.items():
+            units[name] = evaluate_number(value, units, f"units.{name}")
+        return units
+
+    def evaluate_points(self, config: Dict[str, Any], units: Dict[str, float]) -> Dict[str, Point]:
+        """
+        Lay out every zone of a preprocessed config.
+
+        Args:
+            config: Preprocessed config (see unnest and inherit)
+            units: Evaluated units
+
+        Returns:
+            Point name -> point, without skipped keys
+        """
+        points_config = _mapping(config.get('points'), 'points')
+        _check_fields(points_config, 'points', _POINTS_FIELDS)
+        zones = points_config.get('zones')
+        if not isinstance(zones, dict):
+            raise ErgogenEvaluationError('Field "points.zones" should be of type object!')
+        global_key = _mapping(points_config.get('key'), 'points.key')
+        global_rotate = evaluate_number(points_config.get('rotate') or 0, units, 'points.rotate')
+
+        points: Dict[str, Point] = {}
+        for zone_name, zone in zones.items():
+            name = f"points.zones.{zone_name}"
+            zone = dict(_mapping(zone, name))
+
+            anchor = self.parse_anchor(zone.pop('anchor', None) or {}, f"{name}.anchor", points, units)
+            rotate = evaluate_number(zone.pop('rotate', None) or 0, units, f"{name}.rotate")
+            mirror = zone.pop('mirror', None)
+
+            new_points = self._render_zone(zone_name, zone, anchor, global_key, units)
+
+            # Single-key columns and rows drop their "_default" suffixes
+            while any(key.endswith('_default') for key in new_points):
+                for key in [key for key in new_points if key.endswith('_default')]:
+                    new_key = key[:-len('_default')]
+                    new_points[new_key] = new_points.pop(key)
+                    new_points[new_key].meta['name'] = new_key
+
+            for new_name, new_point in new_points.items():
+                if new_name in points:
+                    self.notes.append(f'Key "{new_name}" defined more than once!')
+                if rotate:
+                    new_point.rotate(rotate)
+
+            points.update(new_points)
+
+            axis = self._parse_axis(mirror, f"{name}.mirror", points, units)
+            if axis is not None:
+                mirrored = {}
+                for new_point in new_points.values():
+                    mirrored_name, mirrored_point = self._mirror(new_point, axis)
+                    if mirrored_point is not None:
+                        mirrored[mirrored_name] = mirrored_point
+                points.update(mirrored)
+
+        if global_rotate:
+            for point in points.values():
+                point.rotate(global_rotate)
+
+        axis = self._parse_axis(points_config.get('mirror'), 'points.mirror', points, units)
+        if axis is not None:
+            mirrored = {}
+            for point in points.values():
+                if 'mirrored' not in point.meta:
+                    mirrored_name, mirrored_point = self._mirror(point, axis)
+                    if mirrored_point is not None:
+                        mirrored[mirrored_name] = mirrored_point
+            points.update(mirrored)
+
+        return {name: point for name, point in points.items() if not point.meta.get('skip')}
+
+    def parse_anchor(
+        self,
+        raw: Any,
+        name: str,
+        points: Dict[str, Point],
+        units: Dict[str, float],
+        start: Optional[Point] = None,
+        mirror: bool = False
+    ) -> Point:
+        """
+        Resolve an Ergogen anchor to a point.
+
+        Args:
+            raw: Anchor config: a mapping, a point name or a list of steps
+            name: Field name for error messages
+            points: Points defined so far, for references
+            units: Evaluated units
+            start: Point the anchor starts from (default: the origin)
+            mirror: Whether references resolve to their mirrored counterparts
+
+        Returns:
+            The resolved point
+        """
+        start = start if start is not None else Point()
+        if isinstance(raw, list):
+            current = start.clone()
+            for index, step in enumerate(raw, 1):
+                current = self.parse_anchor(step, f"{name}[{index}]", points, units, current, mirror)
+            return current
+        if isinstance(raw, str):
+            raw = {'ref': raw}
+        raw = _mapping(raw, name)
+        _check_fields(raw, name, _ANCHOR_FIELDS)
+
+        point = start.clone()
+        if raw.get('ref') is not None and raw.get('aggregate') is not None:
+            raise ErgogenEvaluationError(f'Fields "ref" and "aggregate" cannot appear together in anchor "{name}"!')
+        if raw.get('ref') is not None:
+            ref = raw['ref']
+            if isinstance(ref, str):
+                if mirror:
+                    ref = ref[len('mirror_'):] if ref.startswith('mirror_') else f"mirror_{ref}"
+                if ref not in points:
+                    raise ErgogenEvaluationError(f'Unknown point reference "{ref}" in anchor "{name}"!')
+                point = points[ref].clone()
+            else:
+                point = self.parse_anchor(ref, f"{name}.ref", points, units, start, mirror)
+        if raw.get('aggregate') is not None:
+            point = self._aggregate(raw['aggregate'], f"{name}.aggregate", points, units, start, mirror)
+
+        resist = raw.get('resist') or False
+        if not isinstance(resist, bool):
+            raise ErgogenEvaluationError(f'Field "{name}.resist" should be of type boolean!')
+
+        def rotator(config: Any, field: str) -> None:
+            if _is_number(config, units):
+                point.rotate(evaluate_number(config, units, field), None, resist)
+            else:
+                target = self.parse_anchor(config, field, points, units, start, mirror)
+                point.r = point.angle(target)
+
+        if raw.get('orient') is not None:
+            rotator(raw['orient'], f"{name}.orient")
+        if raw.get('shift') is not None:
+            point.shift(*self._wh(raw['shift'], f"{name}.shift", units), True, resist)
+        if raw.get('rotate') is not None:
+            rotator(raw['rotate'], f"{name}.rotate")
+        if raw.get('affect') is not None:
+            candidate = point
+            point = start.clone()
+            point.meta = candidate.meta
+            affect = raw['affect']
+            for index, axis in enumerate(list(affect) if isinstance(affect, str) else affect, 1):
+                if axis not in ('x', 'y', 'r'):
+                    raise ErgogenEvaluationError(f'Field "{name}.affect[{index}]" should be one of x, y, r!')
+                setattr(point, axis, getattr(candidate, axis))
+
+        return point
+
+    def _aggregate(self, raw: Any, name: str, points: Dict[str, Point], units: Dict[str, float],
+                   start: Point, mirror: bool) -> Point:
+        raw = _mapping(raw, name)
+        _check_fields(raw, name, _AGGREGATE_FIELDS)
+        method = raw.get('method') or 'average'
+        parts = raw.get('parts') or []
+        if not isinstance(parts, list):
+            raise ErgogenEvaluationError(f'Field "{name}.parts" should be of type array!')
+        parts = [self.parse_anchor(part, f"{name}.parts[{index}]", points, units, start, mirror)
+                 for index, part in enumerate(parts, 1)]
+
+        if method == 'average':
+            if not parts:
+                return Point()
+            count = len(parts)
+            return Point(sum(part.x for part in parts) / count,
+                          sum(part.y for part in parts) / count,
+                          sum(part.r for part in parts) / count)
+
+        if method == 'intersect':
+            # Each part contributes the line along its (rotated) Y axis
+            if len(parts) != 2:
+                raise ErgogenEvaluationError(f'Intersect expects exactly two parts, but it got {len(parts)}!')
+            first, second = parts
+            first_dx, first_dy = _rotate(0.0, 1.0, first.r)
+            second_dx, second_dy = _rotate(0.0, 1.0, second.r)
+            determinant = first_dx * second_dy - first_dy * second_dx
+            if abs(determinant) < 1e-9:
+                raise ErgogenEvaluationError(f'The points under "{name}.parts" do not intersect!')
+            distance = ((second.x - first.x) * second_dy - (second.y - first.y) * second_dx) / determinant
+            return Point(first.x + distance * first_dx, first.y + distance * first_dy, 0.0)
+
+        raise ErgogenEvaluationError(f'Field "{name}.method" should be one of average, intersect!')
+
+    def _render_zone(self, zone_name: str, zone: Dict[str, Any], anchor: Point,
+                     global_key: Dict[str, Any], units: Dict[str, float]) -> Dict[str, Point]:
+        """Lay out the keys of one zone, starting from its resolved anchor."""
+        name = f"points.zones.{zone_name}"
+        _check_fields(zone, name, _ZONE_FIELDS)
+        columns = _mapping(zone.get('columns'), f"{name}.columns") or {'default': {}}
+        zone_rows = {row: settings or {} for row, settings in _mapping(zone.get('rows'), f"{name}.rows").items()}
+        zone_key = _mapping(zone.get('key'), f"{name}.key")
+        zone_meta = dict(zone, name=zone_name)
+
+        default_key = {
+            'stagger': units['$default_stagger'],
+            'spread': units['$default_spread'],
+            'splay': units['$default_splay'],
+            'origin': [0, 0],
+            'orient': 0,
+            'shift': [0, 0],
+            'rotate': 0,
+            'adjust': {},
+            'width': units['$default_width'],
+            'height': units['$default_height'],
+            'padding': units['$default_padding'],
+            'autobind': units['$default_autobind'],
+            'skip': False,
+            'asym': 'both',
+            'colrow': '{{col.name}}_{{row}}',
+            'name': '{{zone.name}}_{{colrow}}'
+        }
+        base_key = extend(default_key, global_key, zone_key)
+
+        points: Dict[str, Point] = {}
+        # Ergogen turns the anchor rotation into the zone's first rotation
+        rotations: List[Tuple[float, Tuple[float, float]]] = [(anchor.r, (anchor.x, anchor.y))]
+        zone_anchor = anchor.clone()
+        zone_anchor.r = 0.0
+
+        for column_index, (column_name, column) in enumerate(columns.items()):
+            column_field = f"{name}.columns.{column_name}"
+            column = _mapping(column, column_field)
+            _check_fields(column, column_field, _COLUMN_FIELDS)
+            column_rows = {row: settings or {}
+                           for row, settings in _mapping(column.get('rows'), f"{column_field}.rows").items()}
+            column_key = _mapping(column.get('key'), f"{column_field}.key")
+            column_meta = dict(column, name=column_name)
+
+            row_names = list(extend(zone_rows, column_rows)) or ['default']
+            column_base = extend(base_key, column_key)
+            keys = [self._key(extend(column_base, zone_rows.get(row) or {}, column_rows.get(row) or {}),
+                              zone_meta, column_meta, row, units)
+                    for row in row_names]
+
+            # Column-level settings come from the column's first key
+            first = keys[0]
+            if column_index:
+                zone_anchor.x += first['spread']
+            zone_anchor.y += first['stagger']
+            column_anchor = zone_anchor.clone()
+
+            if first['splay']:
+                # Each new rotation origin is carried along by the earlier rotations
+                origin = column_anchor.clone().shift(*first['origin'], relative=False)
+                origin_x, origin_y = origin.x, origin.y
+                for angle, (x, y) in rotations:
+                    origin_x, origin_y = _rotate(origin_x, origin_y, angle, x, y)
+                rotations.append((first['splay'], (origin_x, origin_y)))
+
+            running = column_anchor.clone()
+            for angle, origin in rotations:
+                running.rotate(angle, origin)
+
+            for key in keys:
+                point = running.clone()
+                point.r += key['orient']
+                point.shift(*key['shift'])
+                point.r += key['rotate']
+                running = point.clone()
+
+                point = self.parse_anchor(key['adjust'], f"{key['name']}.adjust", {}, units, point)
+                point.meta = key
+                points[key['name']] = point
+
+                running.shift(0.0, key['padding'])
+
+        return points
+
+    def _key(self, key: Dict[str, Any], zone: Dict[str, Any], column: Dict[str, Any],
+             row: str, units: Dict[str, float]) -> Dict[str, Any]:
+        """Evaluate and template the merged settings of one key."""
+        key['zone'] = zone
+        key['col'] = column
+        key['row'] = row
+        name = key.get('name')
+
+        for field in _NUMBER_FIELDS:
+            key[field] = evaluate_number(key[field], units, f"{name}.{field}")
+        for field in _XY_FIELDS:
+            value = key[field]
+            if not isinstance(value, list) or len(value) != 2:
+                raise ErgogenEvaluationError(f'Field "{name}.{field}" should be an array of length 2!')
+            key[field] = [evaluate_number(item, units, f"{name}.{field}") for item in value]
+        if not isinstance(key['skip'], bool):
+            raise ErgogenEvaluationError(f'Field "{name}.skip" should be of type boolean!')
+        asym = key['asym']
+        if asym not in ('both',) + _SOURCE_ALIASES + _CLONE_ALIASES:
+            raise ErgogenEvaluationError(f'Field "{name}.asym" should be one of both, source, clone!')
+        key['asym'] = 'source' if asym in _SOURCE_ALIASES else 'clone' if asym in _CLONE_ALIASES else 'both'
+
+        for field, value in key.items():
+            if isinstance(value, str) and '{{' in value:
+                key[field] = render_template(value, key)
+        return key
+
+    def _parse_axis(self, config: Any, name: str, points: Dict[str, Point],
+                    units: Dict[str, float]) -> Optional[float]:
+        """Mirror axis x coordinate: a number, or an anchor plus half a distance."""
+        if config is None:
+            return None
+        if _is_number(config, units):
+            return evaluate_number(config, units, name)
+        config = dict(_mapping(config, name))
+        distance = evaluate_number(config.pop('distance', None) or 0, units, f"{name}.distance")
+        return self.parse_anchor(config, name, points, units).x + distance / 2
+
+    @staticmethod
+    def _mirror(point: Point, axis: float) -> Tuple[str, Optional[Point]]:
+        point.meta['mirrored'] = False
+        if point.meta.get('asym') == 'source':
+            return '', None
+        mirrored = point.clone().mirror(axis)
+        # Key settings under "mirror" (e.g. mirror.row_net) only apply to the mirrored copy
+        overrides = point.meta.get('mirror')
+        if isinstance(overrides, dict):
+            mirrored.meta = extend(mirrored.meta, overrides)
+        mirrored.meta['name'] = f"mirror_{point.meta.get('name')}"
+        mirrored.meta['colrow'] = f"mirror_{point.meta.get('colrow')}"
+        mirrored.meta['mirrored'] = True
+        if point.meta.get('asym') == 'clone':
+            point.meta['skip'] = True
+        return mirrored.meta['name'], mirrored
+
+    @staticmethod
+    def _wh(value: Any, name: str, units: Dict[str, float]) -> Tuple[float, float]:
+        if not isinstance(value, list):
+            value = [value, value]
+        if len(value) != 2:
+            raise ErgogenEvaluationError(f'Field "{name}" should be an array of length 2!')
+        return evaluate_number(value[0], units, name), evaluate_number(value[1], units, name)
+
+    @staticmethod
+    def _to_ergogen_point(name: str, point: Point) -> ErgogenPoint:
+        key = point.meta
+        tags = key.get('tags') or []
+        if isinstance(tags, str):
+            tags = [tags]
+        elif isinstance(tags, dict):
+            tags = [tag for tag, enabled in tags.items() if enabled]
+
+        meta = {
+            'zone': key['zone']['name'],
+            'column': key['col']['name'],
+            'row': key['row'],
+            'width': key['width'],
+            'height': key['height']
+        }
+        if key.get('mirrored'):
+            meta['mirrored'] = True
+
+        return ErgogenPoint(
+            name=name,
+            x=point.x,
+            y=point.y,
+            rotation=point.r,
+            tags=[str(tag) for tag in tags],
+            meta=meta
+        )
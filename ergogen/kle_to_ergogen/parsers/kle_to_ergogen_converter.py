@@ -22,6 +22,7 @@ from kle_to_ergogen.data_models.ergogen_point import (
     LabelNamingStrategy,
     kle_units_to_mm
 )
+from kle_to_ergogen.data_models.key_geometry import key_center
 
 
 class KLEToErgogenError(Exception):
@@ -168,9 +169,8 @@ class KLEToErgogenConverter:
         Returns:
             ErgogenPoint instance
         """
-        # Extract coordinates
-        x_kle = key.x or 0.0
-        y_kle = key.y or 0.0
+        # Ergogen points are key centers; KLE rotates keys about (rotation_x, rotation_y)
+        x_kle, y_kle = key_center(key)
         
         # Convert units from KLE key units to millimeters
         x_mm = kle_units_to_mm(x_kle, self.key_unit_size)
@@ -180,13 +180,9 @@ class KLEToErgogenConverter:
         if self.invert_y_axis:
             y_mm = -y_mm
         
-        # Handle rotation
+        # Handle rotation (the rotation center is already applied to the position)
         rotation = key.rotation_angle or 0.0
         
-        # If key has rotation center, we need to handle it
-        # For now, we'll use the rotation as-is
-        # TODO: Implement proper rotation center handling
-        
         # Generate point name using naming strategy
         point_name = self.naming_strategy.generate_name(
             row=key.matrix_row or 0,
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+ASCII Render Benchmark
+
+Renders many synthetic layers for every bundled layout in layouts/*.json,
+comparing str.format on the whole template with labels resolved per key
+(as generate_ascii used to work) against generate_ascii with precompiled
+templates and memoized labels. Layouts whose template cannot be formatted
+are listed and skipped.
+
+Usage: python benchmarks/bench_ascii_render.py [--layers 200] [--repeat 5]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the generator directory to the Python path
+GENERATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(GENERATOR_DIR))
+
+from modular_keymap_ascii_generator import ModularKeymapParser
+
+PARAMETERIZED = ["MO(_LOWER)", "MO(_RAISE)", "LT(1, KC_SPC)", "LCTL(KC_C)", "OSM(MOD_LSFT)", "MY_MACRO"]
+
+
+def format_key_uncached(parser: ModularKeymapParser, keycode: str, width: int = 6) -> str:
+    """format_key_for_ascii without the label cache."""
+    label = parser.keycode_to_label(keycode)
+    if not label or label in ['_______', 'XXXXXXX']:
+        return ' ' * width
+    if len(label) > width:
+        return label[:width]
+    return label.center(width)
+
+
+def render_with_format(parser, layout_config, layer_name, keys) -> str:
+    key_dict = {f'k{i}': format_key_uncached(parser, keycode) for i, keycode in enumerate(keys)}
+    return layout_config.template.format(layer_name=layer_name, **key_dict)
+
+
+def time_call(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ASCII keymap rendering")
+    parser.add_argument('--layers', type=int, default=200, help='Layers rendered per layout')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        keymap_parser = ModularKeymapParser(str(GENERATOR_DIR / 'layouts'), str(GENERATOR_DIR / 'templates'))
+    keycodes = list(keymap_parser.keycode_map) + PARAMETERIZED
+    rng = random.Random(42)
+
+    print(f"{'layout':<12} {'keys':>5} {'format ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    totals = [0.0, 0.0]
+    skipped = []
+    for name, layout_config in sorted(keymap_parser.layouts.items()):
+        layers = [[rng.choice(keycodes) for _ in range(layout_config.key_count)]
+                  for _ in range(args.layers)]
+        try:
+            expected = [render_with_format(keymap_parser, layout_config, f"L{i}", keys)
+                        for i, keys in enumerate(layers)]
+        except (KeyError, IndexError, ValueError) as e:
+            skipped.append(f"{name} ({e})")
+            continue
+        actual = [keymap_parser.generate_ascii(layout_config, f"L{i}", keys) for i, keys in enumerate(layers)]
+        if actual != expected:
+            raise SystemExit(f"Output mismatch for {name}")
+
+        format_time = time_call(lambda: [render_with_format(keymap_parser, layout_config, f"L{i}", keys)
+                                         for i, keys in enumerate(layers)], args.repeat)
+        compiled_time = time_call(lambda: [keymap_parser.generate_ascii(layout_config, f"L{i}", keys)
+                                           for i, keys in enumerate(layers)], args.repeat)
+        totals[0] += format_time
+        totals[1] += compiled_time
+        print(f"{name:<12} {layout_config.key_count:>5} {format_time * 1000:>10.2f} "
+              f"{compiled_time * 1000:>12.2f} {format_time / compiled_time:>7.1f}x")
+
+    if totals[1]:
+        print(f"{'total':<12} {'':>5} {totals[0] * 1000:>10.2f} {totals[1] * 1000:>12.2f} "
+              f"{totals[0] / totals[1]:>7.1f}x")
+    if skipped:
+        print(f"\nSkipped {len(skipped)} layouts whose templates cannot be formatted:")
+        for entry in skipped:
+            print(f"  {entry}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
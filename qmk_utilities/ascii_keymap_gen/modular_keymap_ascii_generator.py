@@ -11,9 +11,75 @@ import re
 import sys
 import json
 import glob
+import string
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+# Keycode parsing is shared with the QMK format converter, imported through its
+# package so the converter and this generator use the same module
+try:
+    from qmk_format_converter.data_models.keycode_expressions import CALL, split_keycodes, try_parse_keycode
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from qmk_format_converter.data_models.keycode_expressions import CALL, split_keycodes, try_parse_keycode
+
+class CompiledTemplate:
+    """
+    An ASCII art template split once into literal text and key slots.
+    
+    Rendering fills the slots of a copy of the segment list and joins it,
+    which gives the same result as str.format on the whole template with
+    layer_name and k0..kN. Only templates whose fields are layer_name or kN,
+    without nested format specs, can be compiled.
+    """
+    
+    CONVERSIONS = {'s': str, 'r': repr, 'a': ascii}
+    
+    def __init__(self, segments: List[str], slots: List[Tuple[int, int, str, Optional[str]]]):
+        self.segments = segments  # Literal text, with placeholders where slots go
+        self.slots = slots        # (segment index, key index or -1 for layer name, format spec, conversion)
+        self.key_count = max((key for _, key, _, _ in slots), default=-1) + 1
+    
+    @classmethod
+    def compile(cls, template: str) -> Optional['CompiledTemplate']:
+        """Compile a template, or return None if it has to be rendered with str.format."""
+        segments = []
+        slots = []
+        try:
+            fields = list(string.Formatter().parse(template))
+        except ValueError:
+            # Malformed template; str.format reports the error when rendering
+            return None
+        
+        for literal, field_name, format_spec, conversion in fields:
+            if literal:
+                segments.append(literal)
+            if field_name is None:
+                continue
+            if field_name == 'layer_name':
+                key = -1
+            elif field_name[:1] == 'k' and field_name[1:].isdigit():
+                key = int(field_name[1:])
+            else:
+                return None
+            if '{' in format_spec or (conversion and conversion not in cls.CONVERSIONS):
+                return None
+            slots.append((len(segments), key, format_spec, conversion))
+            segments.append('')
+        
+        return cls(segments, slots)
+    
+    def render(self, layer_name: str, cells: List[str]) -> str:
+        """Render the template with a layer name and one cell per key."""
+        parts = self.segments.copy()
+        for position, key, format_spec, conversion in self.slots:
+            value = layer_name if key < 0 else cells[key]
+            if conversion:
+                value = self.CONVERSIONS[conversion](value)
+            parts[position] = format(value, format_spec)
+        return ''.join(parts)
+
+
 class LayoutConfig:
     """Configuration for a specific keyboard layout."""
     def __init__(self, config_data: dict, template_content: str):
@@ -22,8 +88,18 @@ class LayoutConfig:
         self.key_count = config_data['key_count']  
         self.layout_functions = config_data['layout_functions']
         self.template = template_content
+        self.compiled_template = CompiledTemplate.compile(template_content)
         self.author = config_data.get('author', '')
         self.tags = config_data.get('tags', [])
+    
+    def render(self, layer_name: str, cells: List[str]) -> str:
+        """Fill the template with a layer name and one formatted cell per key."""
+        compiled = self.compiled_template
+        if compiled is None or compiled.key_count > len(cells):
+            # Let str.format produce the result, or the same error as always
+            return self.template.format(layer_name=layer_name,
+                                        **{f'k{i}': cell for i, cell in enumerate(cells)})
+        return compiled.render(layer_name, cells)
 
 class ModularKeymapParser:
     def __init__(self, layouts_dir: str = "layouts", templates_dir: str = "templates"):
@@ -82,6 +158,9 @@ class ModularKeymapParser:
             'RGB_MOD': 'MODE', 'RM_NEXT': 'MODE',
         }
         
+        # Formatted cell per (keycode, width), filled as keys are rendered
+        self._cell_cache: Dict[Tuple[str, int], str] = {}
+        
         # Load layout configurations
         self.layouts = self._load_layouts()
     
@@ -191,9 +270,9 @@ class ModularKeymapParser:
         # Extract the content between parentheses
         layout_content = content[paren_start + 1:pos - 1]
         
-        # Split by commas and clean up
+        # Split by top-level commas, so LT(1, KC_SPC) stays one key, and clean up
         keys = []
-        for key in layout_content.split(','):
+        for key in split_keycodes(layout_content):
             key = key.strip()
             if key and self._is_valid_keycode(key):
                 keys.append(key)
@@ -224,39 +303,24 @@ class ModularKeymapParser:
                 if line.startswith('//') or line.count('-') > 3 or line.count('|') > 2:
                     return False
         
-        # Valid keycodes typically:
-        # - Start with KC_, MO(, LT(, or other QMK prefixes
-        # - Are simple identifiers like XXXXXXX, _______
-        # - Are custom function names
-        valid_prefixes = ['KC_', 'MO(', 'LT(', 'MT(', 'LCTL(', 'LSFT(', 'LALT(', 'LGUI(',
-                         'RCTL(', 'RSFT(', 'RALT(', 'RGUI(', 'QK_', 'RGB_', 'RM_', 'UG_',
-                         'AU_', 'MU_', 'MI_', 'DB_', 'AG_', 'S(', 'LSFT_T(', 'RSFT_T(',
-                         'LCTL_T(', 'RCTL_T(', 'LALT_T(', 'RALT_T(', 'LGUI_T(', 'RGUI_T(']
-        
-        # Check for valid prefixes
-        for prefix in valid_prefixes:
-            if key.startswith(prefix):
-                return True
-        
-        # Check for common placeholder keycodes
-        if key in ['XXXXXXX', '_______', 'TRNS', 'NO']:
-            return True
-        
-        # Check for custom defines (alphanumeric identifiers)
-        if key.replace('_', '').replace('()', '').isalnum():
-            return True
-        
-        return False
+        # Valid keycodes are QMK keycode expressions:
+        # - Plain keycodes like KC_A, XXXXXXX, _______ or custom defines
+        # - Function-style keycodes like MO(_LOWER), LT(1, KC_SPC) or LCTL(KC_C)
+        return try_parse_keycode(key) is not None
     
     def keycode_to_label(self, keycode: str) -> str:
         """Convert a QMK keycode to a readable label."""
-        # Handle layer keys like MO(_LOWER)
-        if keycode.startswith('MO(_'):
-            layer_name = keycode[4:-1]  # Extract layer name
-            return layer_name
+        expression = try_parse_keycode(keycode)
+        if expression is not None and expression.kind == CALL:
+            # Handle layer keys like MO(_LOWER)
+            layer = expression.layer
+            if expression.name == 'MO' and layer is not None and layer.name.startswith('_'):
+                return layer.name[1:]  # Extract layer name
+            
+            # Handle other function-like keycodes
+            return expression.name
         
-        # Handle other function-like keycodes
-        if '(' in keycode:
+        if expression is None and '(' in keycode:
             return keycode.split('(')[0]
         
         # Use the mapping or return the keycode as-is
@@ -264,30 +328,36 @@ class ModularKeymapParser:
     
     def format_key_for_ascii(self, keycode: str, width: int = 6) -> str:
         """Format a key label to fit in the ASCII representation."""
+        cell = self._cell_cache.get((keycode, width))
+        if cell is not None:
+            return cell
+        
         label = self.keycode_to_label(keycode)
         
         # Handle empty keys
         if not label or label in ['_______', 'XXXXXXX']:
-            return ' ' * width
-        
+            cell = ' ' * width
         # Truncate or pad to fit width
-        if len(label) > width:
-            return label[:width]
+        elif len(label) > width:
+            cell = label[:width]
         else:
-            return label.center(width)
+            cell = label.center(width)
+        
+        self._cell_cache[(keycode, width)] = cell
+        return cell
+    
+    def clear_label_cache(self) -> None:
+        """Forget formatted labels, e.g. after changing keycode_map."""
+        self._cell_cache.clear()
     
     def generate_ascii(self, layout_config: LayoutConfig, layer_name: str, keys: List[str]) -> str:
         """Generate ASCII representation for the specified layout."""
         if len(keys) != layout_config.key_count:
             raise ValueError(f"Expected {layout_config.key_count} keys for {layout_config.name}, got {len(keys)}")
         
-        # Create a dictionary mapping key positions to formatted labels
-        key_dict = {}
-        for i, keycode in enumerate(keys):
-            key_dict[f'k{i}'] = self.format_key_for_ascii(keycode)
-        
-        # Format the template with the keys
-        return layout_config.template.format(layer_name=layer_name, **key_dict)
+        # Format each key's label, then fill the precompiled template
+        format_key = self.format_key_for_ascii
+        return layout_config.render(layer_name, [format_key(keycode) for keycode in keys])
     
     def parse_keymap_file(self, filename: str, forced_layout: Optional[str] = None) -> Dict[str, Tuple[List[str], LayoutConfig]]:
         """Parse a keymap.c file and extract all layouts with their configurations."""
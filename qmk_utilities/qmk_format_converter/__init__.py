@@ -17,7 +17,26 @@ License: Same as QMK
 __version__ = "1.0.0"
 __author__ = "QMK Community"
 
-from .qmk_converter import QMKFormatConverter
-from .data_models.universal_layout import UniversalLayout, KeyDefinition
-
 __all__ = ['QMKFormatConverter', 'UniversalLayout', 'KeyDefinition']
+
+# Public names are imported on first access so that importing the package
+# (for example to run the CLI) does not load the converter up front
+_LAZY_EXPORTS = {
+    'QMKFormatConverter': '.qmk_converter',
+    'UniversalLayout': '.data_models.universal_layout',
+    'KeyDefinition': '.data_models.universal_layout',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
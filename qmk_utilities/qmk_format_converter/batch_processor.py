@@ -3,9 +3,19 @@ Batch Processing System for QMK Format Converter
 
 Handles batch conversion of multiple files with progress reporting
 and detailed success/failure tracking.
+
+Watch mode polls the inputs and re-converts only files whose content
+changed, after a short debounce so a burst of writes triggers one run.
 """
 
+import contextlib
+import hashlib
+import io
 import logging
+import os
+import pickle
+import sys
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Callable, Optional, Tuple, Union
 from dataclasses import dataclass, field
@@ -15,11 +25,17 @@ import time
 # Handle both standalone and module execution
 try:
     from .qmk_converter import QMKFormatConverter, SupportedFormat
+    from .conversion_cache import ConversionCache, LayoutCache
 except ImportError:
     # Running as standalone script
     import sys
     sys.path.insert(0, str(Path(__file__).parent))
     from qmk_converter import QMKFormatConverter, SupportedFormat
+    from conversion_cache import ConversionCache, LayoutCache
+
+
+# File extensions searched when the input format is auto-detected
+AUTO_DETECT_PATTERNS = ["*.json", "*.c", "*.kle"]
 
 
 @dataclass
@@ -31,6 +47,8 @@ class BatchResult:
     start_time: datetime = field(default_factory=datetime.now)
     end_time: Optional[datetime] = None
     total_files: int = 0
+    cache_hits: int = 0         # Conversions served from the conversion cache
+    cache_misses: int = 0       # Conversions that ran and populated the cache
     
     @property
     def success_count(self) -> int:
@@ -70,11 +88,120 @@ class BatchResult:
             "skipped": self.skipped_count,
             "success_rate": f"{self.success_rate:.1f}%",
             "duration": f"{self.duration:.2f}s",
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
             "start_time": self.start_time.isoformat(),
             "end_time": self.end_time.isoformat() if self.end_time else None
         }
 
 
+class FileChangeTracker:
+    """
+    Polling change detector for input files.
+    
+    Files are compared by modification time and size on every poll; content
+    is hashed only when those differ, so touching a file without editing it
+    does not count as a change.
+    """
+    
+    def __init__(self):
+        self._signatures: Dict[Path, Tuple[int, int]] = {}
+        self._digests: Dict[Path, str] = {}
+    
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def poll(self, paths: List[Path]) -> Tuple[List[Path], List[Path]]:
+        """
+        Compare paths against the previous poll.
+        
+        Returns:
+            (modified, removed): paths that are new or whose mtime or size
+            changed, and previously seen paths that are gone
+        """
+        modified = []
+        current = set()
+        for path in paths:
+            signature = self._signature(path)
+            if signature is None:
+                continue
+            current.add(path)
+            if self._signatures.get(path) != signature:
+                self._signatures[path] = signature
+                modified.append(path)
+        
+        removed = [path for path in self._signatures if path not in current]
+        for path in removed:
+            del self._signatures[path]
+            self._digests.pop(path, None)
+        return modified, removed
+    
+    def content_changed(self, path: Path) -> bool:
+        """Hash path and record its digest; True if the content differs from last time."""
+        try:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return False
+        if self._digests.get(path) == digest:
+            return False
+        self._digests[path] = digest
+        return True
+
+
+# Converter used by pool worker processes, created on first use in each worker
+_worker_converter: Optional[QMKFormatConverter] = None
+_worker_cache_config: Optional[Tuple[str, int]] = None
+
+
+def _convert_in_worker(input_path: str, input_format: Optional[str],
+                       output_path: str, output_format: str,
+                       cache_config: Optional[Tuple[str, int]] = None
+                       ) -> Tuple[Optional[Exception], str, Optional[bool]]:
+    """
+    Convert a single file inside a pool worker process.
+    
+    Args:
+        cache_config: (cache_dir, max_bytes) of the parent's conversion cache, if any
+    
+    Returns:
+        Tuple of (None on success or the exception raised, captured stdout,
+        cache hit flag)
+    """
+    global _worker_converter, _worker_cache_config
+    if _worker_converter is None or cache_config != _worker_cache_config:
+        cache = ConversionCache(*cache_config) if cache_config else None
+        _worker_converter = QMKFormatConverter(cache=cache)
+        _worker_cache_config = cache_config
+    
+    _worker_converter.last_stats = None
+    
+    # Capture converter messages so the parent can print them whole
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            _worker_converter.convert_file(
+                Path(input_path),
+                SupportedFormat(input_format) if input_format else None,
+                Path(output_path),
+                SupportedFormat(output_format)
+            )
+        stats = _worker_converter.last_stats
+        return None, output.getvalue(), stats.cache_hit if stats else None
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            # Exceptions must travel back to the parent process
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        return e, output.getvalue(), None
+
+
 class BatchProcessor:
     """
     Batch processor for converting multiple keyboard layout files.
@@ -83,14 +210,18 @@ class BatchProcessor:
     with progress reporting and detailed error tracking.
     """
     
-    def __init__(self, converter: Optional[QMKFormatConverter] = None):
+    def __init__(self, converter: Optional[QMKFormatConverter] = None,
+                 workers: int = 1):
         """
         Initialize batch processor.
         
         Args:
             converter: QMKFormatConverter instance (creates new if None)
+            workers: Number of worker processes for conversions (1 = serial,
+                     0 = one per CPU)
         """
         self.converter = converter or QMKFormatConverter()
+        self.workers = workers
         self.progress_callback: Optional[Callable[[int, int, str], None]] = None
         self.logger = logging.getLogger(__name__)
         
@@ -151,6 +282,14 @@ class BatchProcessor:
         Returns:
             List of input file paths
         """
+        files = self._list_candidate_files(input_dir, input_format, recursive)
+        return sorted(self._filter_by_format(files, input_format))
+    
+    @staticmethod
+    def _list_candidate_files(input_dir: Path,
+                              input_format: Optional[SupportedFormat] = None,
+                              recursive: bool = False) -> List[Path]:
+        """List files whose extension fits input_format, without reading them."""
         if not input_dir.is_dir():
             return []
         
@@ -163,28 +302,31 @@ class BatchProcessor:
             patterns = ["*.json"]
         else:
             # Auto-detect: look for common extensions
-            patterns = ["*.json", "*.c", "*.kle"]
+            patterns = AUTO_DETECT_PATTERNS
         
         files = []
         search_method = input_dir.rglob if recursive else input_dir.glob
         
         for pattern in patterns:
             files.extend(search_method(pattern))
-        
-        # Filter out files that don't match the format if specified
-        if input_format:
-            filtered_files = []
-            for file_path in files:
-                try:
-                    detected = self.converter.detect_format(file_path)
-                    if detected == input_format:
-                        filtered_files.append(file_path)
-                except Exception:
-                    # Skip files that can't be processed
-                    continue
-            files = filtered_files
-        
-        return sorted(files)
+        return files
+    
+    def _filter_by_format(self, files: List[Path],
+                          input_format: Optional[SupportedFormat]) -> List[Path]:
+        """Keep only files detected as input_format (all files if None)."""
+        if not input_format:
+            return list(files)
+        
+        filtered_files = []
+        for file_path in files:
+            try:
+                detected = self.converter.detect_format(file_path)
+                if detected == input_format:
+                    filtered_files.append(file_path)
+            except Exception:
+                # Skip files that can't be processed
+                continue
+        return filtered_files
     
     def process_directory(self, input_dir: Union[str, Path],
                          output_dir: Union[str, Path],
@@ -192,7 +334,8 @@ class BatchProcessor:
                          output_format: Optional[SupportedFormat] = None,
                          recursive: bool = False,
                          naming_pattern: str = "{name}",
-                         overwrite: bool = False) -> BatchResult:
+                         overwrite: bool = False,
+                         workers: Optional[int] = None) -> BatchResult:
         """
         Process all compatible files in a directory.
         
@@ -204,6 +347,7 @@ class BatchProcessor:
             recursive: Search subdirectories recursively
             naming_pattern: Output filename pattern
             overwrite: Overwrite existing output files
+            workers: Worker processes (uses the processor default if None)
             
         Returns:
             BatchResult with processing results
@@ -224,17 +368,23 @@ class BatchProcessor:
         input_files = self._find_input_files(input_dir, input_format, recursive)
         
         return self.process_file_list(input_files, output_dir, input_format,
-                                    output_format, naming_pattern, overwrite)
+                                    output_format, naming_pattern, overwrite,
+                                    workers)
     
     def process_file_list(self, file_list: List[Union[str, Path]],
                          output_dir: Union[str, Path],
                          input_format: Optional[SupportedFormat] = None,
                          output_format: Optional[SupportedFormat] = None,
                          naming_pattern: str = "{name}",
-                         overwrite: bool = False) -> BatchResult:
+                         overwrite: bool = False,
+                         workers: Optional[int] = None) -> BatchResult:
         """
         Process a list of files.
         
+        With more than one worker, conversions run in a process pool. Result
+        lists keep the order of file_list regardless of completion order, and
+        progress is reported as files finish.
+        
         Args:
             file_list: List of input file paths
             output_dir: Directory for output files
@@ -242,6 +392,7 @@ class BatchProcessor:
             output_format: Output format (required)
             naming_pattern: Output filename pattern
             overwrite: Overwrite existing output files
+            workers: Worker processes (uses the processor default if None)
             
         Returns:
             BatchResult with processing results
@@ -261,40 +412,48 @@ class BatchProcessor:
         
         self.logger.info(f"Starting batch processing of {len(file_list)} files")
         
-        for i, file_path in enumerate(file_list, 1):
-            file_path = Path(file_path)
-            
-            try:
-                self._report_progress(i, len(file_list), file_path.name)
-                
-                # Check if input file exists
-                if not file_path.exists():
-                    result.skipped_files.append((file_path, "File not found"))
-                    continue
-                
-                # Generate output path
-                output_path = self._get_output_filename(
-                    file_path, output_dir, output_format, naming_pattern
-                )
+        workers = self._resolve_workers(workers)
+        if workers > 1 and len(file_list) > 1:
+            self._process_parallel(result, file_list, output_dir, input_format,
+                                   output_format, naming_pattern, overwrite, workers)
+        else:
+            for i, file_path in enumerate(file_list, 1):
+                file_path = Path(file_path)
                 
-                # Check if output already exists
-                if output_path.exists() and not overwrite:
-                    result.skipped_files.append(
-                        (file_path, f"Output exists: {output_path}")
+                try:
+                    self._report_progress(i, len(file_list), file_path.name)
+                    
+                    # Check if input file exists
+                    if not file_path.exists():
+                        result.skipped_files.append((file_path, "File not found"))
+                        continue
+                    
+                    # Generate output path
+                    output_path = self._get_output_filename(
+                        file_path, output_dir, output_format, naming_pattern
                     )
-                    continue
-                
-                # Perform conversion
-                self.converter.convert_file(
-                    file_path, input_format, output_path, output_format
-                )
-                
-                result.successful_conversions.append(file_path)
-                self.logger.info(f"Converted: {file_path} -> {output_path}")
-                
-            except Exception as e:
-                result.failed_conversions.append((file_path, e))
-                self.logger.error(f"Failed to convert {file_path}: {e}")
+                    
+                    # Check if output already exists
+                    if output_path.exists() and not overwrite:
+                        result.skipped_files.append(
+                            (file_path, f"Output exists: {output_path}")
+                        )
+                        continue
+                    
+                    # Perform conversion
+                    self.converter.last_stats = None
+                    self.converter.convert_file(
+                        file_path, input_format, output_path, output_format
+                    )
+                    stats = self.converter.last_stats
+                    self._record_cache_outcome(result, stats.cache_hit if stats else None)
+                    
+                    result.successful_conversions.append(file_path)
+                    self.logger.info(f"Converted: {file_path} -> {output_path}")
+                    
+                except Exception as e:
+                    result.failed_conversions.append((file_path, e))
+                    self.logger.error(f"Failed to convert {file_path}: {e}")
         
         result.end_time = datetime.now()
         
@@ -305,6 +464,213 @@ class BatchProcessor:
         
         return result
     
+    @staticmethod
+    def _record_cache_outcome(result: BatchResult, cache_hit: Optional[bool]) -> None:
+        """Count a conversion cache hit or miss (None means no cache was used)."""
+        if cache_hit is True:
+            result.cache_hits += 1
+        elif cache_hit is False:
+            result.cache_misses += 1
+    
+    def _resolve_workers(self, workers: Optional[int]) -> int:
+        """Resolve a worker count, where 0 means one per CPU."""
+        if workers is None:
+            workers = self.workers
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        return max(1, workers)
+    
+    def _process_parallel(self, result: BatchResult,
+                          file_list: List[Union[str, Path]],
+                          output_dir: Path,
+                          input_format: Optional[SupportedFormat],
+                          output_format: SupportedFormat,
+                          naming_pattern: str,
+                          overwrite: bool,
+                          workers: int) -> None:
+        """
+        Convert files in a process pool, recording results in input order.
+        
+        Files that map to the same output path are converted in successive
+        waves, in input order, so skipping and overwriting behave exactly as
+        in the serial loop.
+        """
+        total = len(file_list)
+        completed = 0
+        # Outcome per input position: ('skipped', reason), ('ok', output) or ('failed', error)
+        outcomes: List[Optional[Tuple[str, Any]]] = [None] * total
+        waves: List[List[Tuple[int, Path, Path]]] = []
+        output_uses: Dict[Path, int] = {}
+        
+        for index, file_path in enumerate(file_list):
+            file_path = Path(file_path)
+            try:
+                if not file_path.exists():
+                    outcomes[index] = ('skipped', "File not found")
+                else:
+                    output_path = self._get_output_filename(
+                        file_path, output_dir, output_format, naming_pattern
+                    )
+                    wave = output_uses.get(output_path, 0)
+                    output_uses[output_path] = wave + 1
+                    if wave == len(waves):
+                        waves.append([])
+                    waves[wave].append((index, file_path, output_path))
+                    continue
+            except Exception as e:
+                outcomes[index] = ('failed', e)
+            
+            completed += 1
+            self._report_progress(completed, total, file_path.name)
+        
+        if not waves:
+            return
+        
+        # Imported here: multiprocessing is slow to load and only needed for pools
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        
+        input_value = input_format.value if input_format else None
+        cache = self.converter.cache
+        cache_config = (str(cache.cache_dir), cache.max_bytes) if cache is not None else None
+        with ProcessPoolExecutor(max_workers=min(workers, len(waves[0]))) as executor:
+            for wave in waves:
+                futures = {}
+                for index, file_path, output_path in wave:
+                    # Check if output already exists
+                    if output_path.exists() and not overwrite:
+                        outcomes[index] = ('skipped', f"Output exists: {output_path}")
+                        completed += 1
+                        self._report_progress(completed, total, file_path.name)
+                        continue
+                    
+                    future = executor.submit(_convert_in_worker, str(file_path), input_value,
+                                             str(output_path), output_format.value,
+                                             cache_config)
+                    futures[future] = (index, file_path, output_path)
+                
+                for future in as_completed(futures):
+                    index, file_path, output_path = futures[future]
+                    try:
+                        error, messages, cache_hit = future.result()
+                    except Exception as e:
+                        # Worker crashed or the task could not be transferred
+                        error, messages, cache_hit = e, "", None
+                    
+                    if messages:
+                        sys.stdout.write(messages)
+                    
+                    if error is None:
+                        self._record_cache_outcome(result, cache_hit)
+                        outcomes[index] = ('ok', output_path)
+                        self.logger.info(f"Converted: {file_path} -> {output_path}")
+                    else:
+                        outcomes[index] = ('failed', error)
+                        self.logger.error(f"Failed to convert {file_path}: {error}")
+                    
+                    completed += 1
+                    self._report_progress(completed, total, file_path.name)
+        
+        for file_path, (status, detail) in zip(file_list, outcomes):
+            file_path = Path(file_path)
+            if status == 'ok':
+                result.successful_conversions.append(file_path)
+            elif status == 'skipped':
+                result.skipped_files.append((file_path, detail))
+            else:
+                result.failed_conversions.append((file_path, detail))
+    
+    def watch(self, inputs: Union[str, Path, List[Union[str, Path]]],
+              output_dir: Union[str, Path],
+              input_format: Optional[SupportedFormat] = None,
+              output_format: Optional[SupportedFormat] = None,
+              recursive: bool = False,
+              naming_pattern: str = "{name}",
+              overwrite: bool = False,
+              interval: float = 1.0,
+              debounce: float = 0.3,
+              on_result: Optional[Callable[[BatchResult], None]] = None,
+              stop_event: Optional[threading.Event] = None) -> None:
+        """
+        Convert inputs, then keep re-converting files as they change.
+        
+        The first pass converts every input. After that the inputs are polled
+        every interval seconds; a file is re-converted once it has not been
+        modified for debounce seconds and its content hash differs from the
+        last conversion. A directory is re-listed on every poll, so new files
+        are picked up. Parsed layouts are kept in memory between runs (and
+        the converter's conversion cache still applies).
+        
+        Args:
+            inputs: Directory to watch, or a list of files
+            output_dir: Directory for output files
+            input_format: Input format (auto-detect if None)
+            output_format: Output format (required)
+            recursive: Watch subdirectories of a directory input
+            naming_pattern: Output filename pattern
+            overwrite: Overwrite existing outputs in the first pass (changed
+                       files are always re-converted)
+            interval: Seconds between polls
+            debounce: Seconds a file must stay unchanged before converting it
+            on_result: Called with the BatchResult of every run
+            stop_event: Set to stop watching (runs until interrupted if None)
+        """
+        if not output_format:
+            raise ValueError("Output format must be specified")
+        
+        output_dir = Path(output_dir).resolve()
+        stop_event = stop_event or threading.Event()
+        if self.converter.layout_cache is None:
+            self.converter.layout_cache = LayoutCache()
+        
+        watch_directory = isinstance(inputs, (str, Path))
+        if watch_directory:
+            input_dir = Path(inputs)
+            if not input_dir.exists():
+                raise FileNotFoundError(f"Input directory not found: {input_dir}")
+            
+            def list_inputs() -> List[Path]:
+                files = self._list_candidate_files(input_dir, input_format, recursive)
+                # Never treat our own outputs as inputs
+                return sorted(path for path in files
+                              if output_dir not in path.resolve().parents)
+        else:
+            file_list = [Path(path) for path in inputs]
+            
+            def list_inputs() -> List[Path]:
+                return file_list
+        
+        def run(files: List[Path], overwrite_outputs: bool) -> None:
+            if watch_directory:
+                files = self._filter_by_format(files, input_format)
+            if not files:
+                return
+            result = self.process_file_list(files, output_dir, input_format, output_format,
+                                            naming_pattern, overwrite_outputs)
+            if on_result:
+                on_result(result)
+        
+        tracker = FileChangeTracker()
+        initial, _ = tracker.poll(list_inputs())
+        for path in initial:
+            tracker.content_changed(path)
+        run(initial, overwrite)
+        
+        pending: Dict[Path, float] = {}  # Path -> time its last modification was seen
+        while not stop_event.wait(min(interval, debounce) if pending else interval):
+            modified, removed = tracker.poll(list_inputs())
+            now = time.monotonic()
+            for path in modified:
+                pending[path] = now
+            for path in removed:
+                pending.pop(path, None)
+                self.logger.info(f"Input removed: {path}")
+            
+            ready = [path for path, changed_at in pending.items() if now - changed_at >= debounce]
+            for path in ready:
+                del pending[path]
+            changed = [path for path in ready if tracker.content_changed(path)]
+            run(changed, True)
+    
     def validate_directory(self, input_dir: Union[str, Path],
                           input_format: Optional[SupportedFormat] = None,
                           recursive: bool = False) -> Dict[str, Any]:
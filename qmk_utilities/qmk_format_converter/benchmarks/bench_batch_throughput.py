@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Batch Throughput Benchmark
+
+Compares BatchProcessor throughput of the serial path against the process
+pool path. The fixture files in valid/ are copied repeatedly into a temporary
+directory to build a corpus of the requested size.
+
+Usage: python benchmarks/bench_batch_throughput.py [--files 400] [--workers 2 4 8]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the converter directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from qmk_converter import SupportedFormat
+from batch_processor import BatchProcessor
+
+
+FIXTURES_DIR = Path(__file__).parent.parent / "valid"
+
+
+def build_corpus(target_dir: Path, file_count: int):
+    """Copy fixture files into target_dir until it holds file_count inputs."""
+    fixtures = sorted(path for path in FIXTURES_DIR.iterdir() if path.is_file())
+    files = []
+    for index in range(file_count):
+        fixture = fixtures[index % len(fixtures)]
+        destination = target_dir / f"{fixture.stem}_{index:05d}{fixture.suffix}"
+        shutil.copyfile(fixture, destination)
+        files.append(destination)
+    return files
+
+
+def run_batch(files, output_dir: Path, output_format: SupportedFormat, workers: int):
+    """Run one batch and return (seconds, result)."""
+    processor = BatchProcessor(workers=workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = processor.process_file_list(files, output_dir, None, output_format,
+                                             overwrite=True)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch conversion throughput")
+    parser.add_argument('--files', type=int, default=400, help='Number of input files')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[2, 4, os.cpu_count() or 1],
+                        help='Worker counts to compare against the serial path')
+    parser.add_argument('--to', dest='output_format', default='via',
+                        choices=[fmt.value for fmt in SupportedFormat],
+                        help='Output format')
+    args = parser.parse_args()
+
+    output_format = SupportedFormat(args.output_format)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_dir = Path(temp_dir) / "input"
+        input_dir.mkdir()
+        files = build_corpus(input_dir, args.files)
+
+        serial_time, serial_result = run_batch(files, Path(temp_dir) / "serial", output_format, 1)
+        print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'speedup':>8} {'ok':>5} {'failed':>7}")
+        print(f"{1:>8} {serial_time:>9.2f} {len(files) / serial_time:>9.1f} {1.0:>8.2f} "
+              f"{serial_result.success_count:>5} {serial_result.failure_count:>7}")
+
+        for workers in sorted(set(args.workers)):
+            if workers <= 1:
+                continue
+            output_dir = Path(temp_dir) / f"workers_{workers}"
+            elapsed, result = run_batch(files, output_dir, output_format, workers)
+            if (result.successful_conversions != serial_result.successful_conversions or
+                    [path for path, _ in result.failed_conversions] !=
+                    [path for path, _ in serial_result.failed_conversions]):
+                print(f"Result mismatch with {workers} workers")
+                return 1
+            print(f"{workers:>8} {elapsed:>9.2f} {len(files) / elapsed:>9.1f} "
+                  f"{serial_time / elapsed:>8.2f} {result.success_count:>5} {result.failure_count:>7}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+
+Measures cold start time of the converter CLI by running it in fresh
+subprocesses. `--version` and `--list-formats` are compared against a bare
+interpreter start, against importing argparse (the floor for any argparse
+CLI) and against a run that imports every parser and generator up front,
+which is what the CLI used to do on every invocation.
+
+Usage: python benchmarks/bench_cli_startup.py [--runs 20]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+# Directory containing the qmk_format_converter package
+PACKAGE_PARENT = Path(__file__).resolve().parent.parent.parent
+
+EAGER_IMPORTS = "; ".join([
+    "import qmk_format_converter.cli",
+    "import qmk_format_converter.parsers",
+    "import qmk_format_converter.generators",
+    "from qmk_format_converter.data_models.keycode_mappings import KEYCODE_MAPPER",
+    "KEYCODE_MAPPER.kle_to_qmk('A')",
+])
+
+COMMANDS = [
+    ("python -c pass", [sys.executable, "-c", "pass"]),
+    ("import argparse", [sys.executable, "-c", "import argparse"]),
+    ("cli --version", [sys.executable, "-m", "qmk_format_converter.cli", "--version"]),
+    ("cli --list-formats", [sys.executable, "-m", "qmk_format_converter.cli", "--list-formats"]),
+    ("eager imports", [sys.executable, "-c", EAGER_IMPORTS]),
+]
+
+
+def time_command(command, runs: int):
+    """Run command runs times and return the wall clock durations."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=str(PACKAGE_PARENT), stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI cold start time")
+    parser.add_argument('--runs', type=int, default=20, help='Subprocess runs per command')
+    args = parser.parse_args()
+
+    # Warm the OS file cache and bytecode caches first
+    for _, command in COMMANDS:
+        time_command(command, 1)
+
+    print(f"{'command':<20} {'min ms':>8} {'median ms':>10} {'over python':>12}")
+    baseline = None
+    for name, command in COMMANDS:
+        timings = time_command(command, args.runs)
+        median = statistics.median(timings)
+        if baseline is None:
+            baseline = median
+        print(f"{name:<20} {min(timings) * 1000:>8.1f} {median * 1000:>10.1f} "
+              f"{(median - baseline) * 1000:>+11.1f}ms")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Format Conversion Benchmark Suite
+
+Times parse, generate and round-trip for every SupportedFormat pair of
+QMKFormatConverter. Each case runs on the real keyboard files under
+keyboards/ (dz60, lily58, corne, hillside52, air75v2) and on synthetic
+layouts scaled up to larger key and layer counts.
+
+Every fixture is loaded once from its native file, then rendered in each
+format to get the parser inputs:
+
+  parse       input text -> UniversalLayout
+  generate    UniversalLayout -> output text
+  round_trip  parse input, generate output, parse that, generate input again
+
+Timings are the best and median of several repeats. Peak memory is measured
+with tracemalloc in a separate, untimed run of each case. Results can be
+written as JSON and compared against a previous run to spot regressions
+between commits.
+
+Usage: python benchmarks/bench_formats.py [--output results.json]
+                                          [--compare baseline.json]
+                                          [--synthetic-sizes 500 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Import through the package, as the CLI does, so the converter and the ASCII
+# keymap generator share their modules
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from qmk_format_converter.qmk_converter import QMKFormatConverter, SupportedFormat
+from qmk_format_converter.data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+from qmk_format_converter.parsers.kle_parser import parse_kle_json
+from qmk_format_converter.parsers.via_parser import parse_via_json
+from qmk_format_converter.parsers.keymap_parser import parse_keymap_content
+from qmk_format_converter.parsers.qmk_configurator_parser import parse_qmk_configurator_json
+from qmk_format_converter.generators.kle_generator import generate_kle_json
+from qmk_format_converter.generators.via_generator import generate_via_json
+from qmk_format_converter.generators.keymap_generator import generate_keymap_content
+from qmk_format_converter.generators.qmk_configurator_generator import generate_qmk_configurator_json
+
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+# Real keyboards, loaded in their native format
+FIXTURES = {
+    'dz60': REPO_ROOT / 'keyboards' / 'dz60.json',
+    'lily58': REPO_ROOT / 'keyboards' / 'lily58.json',
+    'corne': REPO_ROOT / 'keyboards' / 'crkbd' / 'corne_v4.layout.json',
+    'hillside52': REPO_ROOT / 'keyboards' / 'hillside52.json',
+    'air75v2': REPO_ROOT / 'keyboards' / 'air75v2' / 'nuphy_air75_v2.layout.json',
+}
+
+# In-memory counterparts of the converter's file parsers and generators
+PARSERS = {
+    SupportedFormat.KLE: parse_kle_json,
+    SupportedFormat.VIA: parse_via_json,
+    SupportedFormat.KEYMAP: parse_keymap_content,
+    SupportedFormat.QMK_CONFIGURATOR: parse_qmk_configurator_json,
+}
+GENERATORS = {
+    SupportedFormat.KLE: generate_kle_json,
+    SupportedFormat.VIA: generate_via_json,
+    SupportedFormat.KEYMAP: generate_keymap_content,
+    SupportedFormat.QMK_CONFIGURATOR: generate_qmk_configurator_json,
+}
+
+SYNTHETIC_KEYCODES = ["KC_A", "KC_B", "KC_C", "KC_D", "KC_E", "KC_1", "KC_2", "KC_SPC",
+                      "KC_ENT", "KC_LSFT", "KC_TRNS", "MO(1)", "LT(2, KC_TAB)", "KC_NO"]
+
+RESULTS_VERSION = 1
+
+
+def check_coverage():
+    """Fail loudly if a format is added to the converter without benchmark hooks."""
+    converter = QMKFormatConverter()
+    for format_type in SupportedFormat:
+        if format_type not in PARSERS or format_type not in GENERATORS:
+            raise SystemExit(f"No benchmark parser/generator for format '{format_type.value}'")
+        if format_type not in converter.parsers or format_type not in converter.generators:
+            raise SystemExit(f"QMKFormatConverter does not handle format '{format_type.value}'")
+
+
+def build_synthetic_layout(key_count: int, layer_count: int) -> UniversalLayout:
+    """Build a grid keyboard with key_count keys and layer_count layers."""
+    columns = 16
+    layout = UniversalLayout(name=f"Synthetic {key_count}", keyboard="synthetic")
+    for index in range(key_count):
+        row, col = divmod(index, columns)
+        layout.add_key(KeyDefinition(x=float(col), y=float(row), matrix_row=row, matrix_col=col,
+                                     keycode=SYNTHETIC_KEYCODES[index % len(SYNTHETIC_KEYCODES)],
+                                     primary_label=f"K{index}"))
+
+    layout.layers = [
+        LayerDefinition(name="Default" if layer == 0 else f"Layer {layer}", index=layer,
+                        keycodes=[SYNTHETIC_KEYCODES[(index + layer) % len(SYNTHETIC_KEYCODES)]
+                                  for index in range(key_count)],
+                        is_default=(layer == 0))
+        for layer in range(layer_count)
+    ]
+    layout.matrix_rows = (key_count + columns - 1) // columns
+    layout.matrix_cols = columns
+    return layout
+
+
+def load_fixtures(names, synthetic_sizes, synthetic_layers):
+    """Return {fixture name: UniversalLayout}."""
+    converter = QMKFormatConverter()
+    layouts = {}
+    for name in names:
+        with contextlib.redirect_stdout(io.StringIO()):
+            layouts[name] = converter.load_file(FIXTURES[name])
+    for size in synthetic_sizes:
+        layouts[f"synthetic_{size}"] = build_synthetic_layout(size, synthetic_layers)
+    return layouts
+
+
+def measure(func, repeat: int, measure_memory: bool):
+    """Time func() repeat times and return a result dict (plus the last return value)."""
+    timings = []
+    value = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            value = func()
+            timings.append(time.perf_counter() - start)
+
+        peak = None
+        if measure_memory:
+            tracemalloc.start()
+            try:
+                func()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    return {
+        'best_s': min(timings),
+        'median_s': statistics.median(timings),
+        'repeat': repeat,
+        'peak_bytes': peak,
+    }, value
+
+
+def run_case(results, case, func, repeat, measure_memory):
+    """Run one case, recording either its measurements or the error it raised."""
+    try:
+        stats, value = measure(func, repeat, measure_memory)
+    except Exception as e:
+        case['error'] = f"{type(e).__name__}: {e}"
+        value = None
+    else:
+        case.update(stats)
+    results.append(case)
+    return value
+
+
+def round_trip(input_text, input_format, output_format):
+    parse_in, generate_in = PARSERS[input_format], GENERATORS[input_format]
+    parse_out, generate_out = PARSERS[output_format], GENERATORS[output_format]
+    return generate_in(parse_out(generate_out(parse_in(input_text))))
+
+
+def run_suite(layouts, repeat, measure_memory, progress):
+    """Run every case for every fixture and return the list of case results."""
+    results = []
+    formats = list(SupportedFormat)
+
+    for fixture, layout in layouts.items():
+        key_count = len(layout.keys)
+        base = {'fixture': fixture, 'keys': key_count, 'layers': len(layout.layers)}
+
+        # Generate every format from the native layout; these are the parser inputs
+        inputs = {}
+        for output_format in formats:
+            case = dict(base, operation='generate', output_format=output_format.value)
+            text = run_case(results, case, lambda: GENERATORS[output_format](layout),
+                            repeat, measure_memory)
+            if text is not None:
+                inputs[output_format] = text
+                case['output_bytes'] = len(text.encode('utf-8'))
+
+        for input_format in formats:
+            if input_format not in inputs:
+                continue
+            text = inputs[input_format]
+            case = dict(base, operation='parse', input_format=input_format.value)
+            run_case(results, case, lambda: PARSERS[input_format](text), repeat, measure_memory)
+
+            for output_format in formats:
+                case = dict(base, operation='round_trip', input_format=input_format.value,
+                            output_format=output_format.value)
+                run_case(results, case, lambda: round_trip(text, input_format, output_format),
+                         repeat, measure_memory)
+
+        if progress:
+            print(f"  {fixture}: done", file=sys.stderr)
+
+    return results
+
+
+def case_id(case):
+    return '/'.join(str(case.get(name, '-')) for name in
+                    ('fixture', 'operation', 'input_format', 'output_format'))
+
+
+def git_commit():
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(REPO_ROOT),
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def print_results(results):
+    print(f"{'case':<58} {'best ms':>9} {'median ms':>10} {'peak KiB':>9}")
+    for case in results:
+        if 'error' in case:
+            print(f"{case_id(case):<58} {'error':>9}  {case['error']}")
+            continue
+        peak = '-' if case['peak_bytes'] is None else f"{case['peak_bytes'] / 1024:.0f}"
+        print(f"{case_id(case):<58} {case['best_s'] * 1000:>9.2f} "
+              f"{case['median_s'] * 1000:>10.2f} {peak:>9}")
+
+
+def compare_results(results, baseline_path: Path, threshold: float) -> int:
+    """Print per-case ratios against a baseline run; return the number of regressions."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {case_id(case): case for case in json.load(f)['results']}
+
+    regressions = 0
+    print(f"\nComparison with {baseline_path} (regression threshold {threshold:.2f}x)")
+    print(f"{'case':<58} {'time':>8} {'memory':>8}")
+    for case in results:
+        previous = baseline.get(case_id(case))
+        if previous is None or 'error' in case or 'error' in previous:
+            continue
+
+        time_ratio = case['best_s'] / previous['best_s'] if previous['best_s'] else 1.0
+        memory_ratio = None
+        if case.get('peak_bytes') and previous.get('peak_bytes'):
+            memory_ratio = case['peak_bytes'] / previous['peak_bytes']
+
+        flag = ''
+        if time_ratio > threshold or (memory_ratio is not None and memory_ratio > threshold):
+            flag = '  REGRESSION'
+            regressions += 1
+        memory_column = '-' if memory_ratio is None else f"{memory_ratio:.2f}x"
+        print(f"{case_id(case):<58} {time_ratio:>7.2f}x {memory_column:>8}{flag}")
+
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse/generate/round-trip for all formats")
+    parser.add_argument('--fixtures', nargs='+', choices=sorted(FIXTURES), default=sorted(FIXTURES),
+                        help='Real keyboard fixtures to include')
+    parser.add_argument('--synthetic-sizes', type=int, nargs='*', default=[500, 2000],
+                        help='Key counts of synthetic layouts (none to skip)')
+    parser.add_argument('--synthetic-layers', type=int, default=4,
+                        help='Layer count of synthetic layouts')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc peak memory run')
+    parser.add_argument('--output', '-o', type=Path, help='Write results as JSON to this file')
+    parser.add_argument('--compare', type=Path, help='Compare against a previous JSON results file')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown ratio reported as a regression by --compare')
+    args = parser.parse_args()
+
+    check_coverage()
+    layouts = load_fixtures(args.fixtures, args.synthetic_sizes, args.synthetic_layers)
+    results = run_suite(layouts, max(1, args.repeat), not args.no_memory, progress=True)
+    print_results(results)
+
+    if args.output:
+        report = {
+            'version': RESULTS_VERSION,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        return 1 if compare_results(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
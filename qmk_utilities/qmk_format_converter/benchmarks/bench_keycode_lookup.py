@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Keycode Lookup Benchmark
+
+Measures per-label lookup throughput of KEYCODE_MAPPER.kle_to_qmk,
+parse_kle_key_label and suggest_keycode against the original linear scans
+over the mapping table.
+
+Usage: python benchmarks/bench_keycode_lookup.py [--lookups 200000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the converter directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_models.keycode_mappings import KEYCODE_MAPPER
+
+
+def legacy_kle_to_qmk(kle_label):
+    """Linear scan equivalent to the original kle_to_qmk."""
+    for mapping in KEYCODE_MAPPER.mappings.values():
+        if mapping.kle_label == kle_label:
+            return mapping.qmk_code
+    return None
+
+
+def legacy_suggest_keycode(partial):
+    """Substring scan equivalent to the original suggest_keycode."""
+    partial_upper = partial.upper()
+    return sorted(qmk_code for qmk_code in KEYCODE_MAPPER.mappings if partial_upper in qmk_code)
+
+
+def build_labels(count):
+    """Cycle through every known label plus a few unmapped ones."""
+    labels = [mapping.kle_label for mapping in KEYCODE_MAPPER.mappings.values()]
+    labels += ["Space", "Enter", "Fn", "↑", "Layer 1"]
+    return [labels[index % len(labels)] for index in range(count)]
+
+
+def time_lookups(func, inputs):
+    start = time.perf_counter()
+    results = [func(value) for value in inputs]
+    return time.perf_counter() - start, results
+
+
+def report(name, count, indexed_time, legacy_time):
+    print(f"{name:<22} {count / indexed_time:>14,.0f} {count / legacy_time:>14,.0f} "
+          f"{legacy_time / indexed_time:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keycode label lookups")
+    parser.add_argument('--lookups', type=int, default=200000,
+                        help='Number of label lookups to time')
+    parser.add_argument('--suggestions', type=int, default=20000,
+                        help='Number of suggest_keycode queries to time')
+    args = parser.parse_args()
+
+    labels = build_labels(args.lookups)
+    partials = ["KC_", "A", "F1", "SFT", "KC_LS", "VOL", "BSPC", "X"]
+    queries = [partials[index % len(partials)] for index in range(args.suggestions)]
+
+    print(f"{'operation':<22} {'indexed ops/s':>14} {'legacy ops/s':>14} {'speedup':>9}")
+
+    indexed_time, indexed = time_lookups(KEYCODE_MAPPER.kle_to_qmk, labels)
+    legacy_time, legacy = time_lookups(legacy_kle_to_qmk, labels)
+    if indexed != legacy:
+        print("kle_to_qmk results differ from the linear scan")
+        return 1
+    report("kle_to_qmk", len(labels), indexed_time, legacy_time)
+
+    indexed_time, indexed = time_lookups(KEYCODE_MAPPER.parse_kle_key_label, labels)
+    # Route the label parser through the linear scan for comparison
+    KEYCODE_MAPPER.kle_to_qmk = legacy_kle_to_qmk
+    try:
+        legacy_time, legacy = time_lookups(KEYCODE_MAPPER.parse_kle_key_label, labels)
+    finally:
+        del KEYCODE_MAPPER.kle_to_qmk
+    if indexed != legacy:
+        print("parse_kle_key_label results differ from the linear scan")
+        return 1
+    report("parse_kle_key_label", len(labels), indexed_time, legacy_time)
+
+    indexed_time, indexed = time_lookups(KEYCODE_MAPPER.suggest_keycode, queries)
+    legacy_time, legacy = time_lookups(legacy_suggest_keycode, queries)
+    if indexed != legacy:
+        print("suggest_keycode results differ from the substring scan")
+        return 1
+    report("suggest_keycode", len(queries), indexed_time, legacy_time)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Keymap Generator Benchmark
+
+Times KeymapGenerator.generate_content on synthetic keymaps with many
+layers. Row placement is computed once per layout, so the time per layer
+should stay flat as layers are added. Run it from ascii_keymap_gen/ to
+include the Lily58 ASCII template comments (--keys 58).
+
+Usage: python benchmarks/bench_keymap_generator.py [--keys 58 400] [--layers 8 32 128]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Import through the package, as the CLI does, so the converter and the ASCII
+# keymap generator share their modules
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from qmk_format_converter.data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+from qmk_format_converter.generators.keymap_generator import KeymapGenerator
+
+KEYCODES = ["KC_Q", "KC_W", "KC_E", "KC_TRNS", "KC_TRNS", "KC_LSFT", "KC_SPC",
+            "MO(1)", "LT(2, KC_TAB)", "LCTL(KC_C)", "MY_MACRO"]
+
+
+def build_layout(key_count: int, layer_count: int) -> UniversalLayout:
+    """Split grid layout with random keycodes on every layer."""
+    rng = random.Random(key_count * 1000 + layer_count)
+    layout = UniversalLayout(name=f"Synthetic {key_count}", keyboard="synthetic")
+    for index in range(key_count):
+        row, col = divmod(index, 12)
+        layout.keys.append(KeyDefinition(x=col + (2.0 if col >= 6 else 0.0), y=float(row),
+                                         matrix_row=row, matrix_col=col))
+    layout.layers = [LayerDefinition(name=f"Layer_{index}", index=index,
+                                     keycodes=[rng.choice(KEYCODES) for _ in range(key_count)])
+                     for index in range(layer_count)]
+    return layout
+
+
+def time_call(func, repeat: int) -> float:
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keymap.c generation")
+    parser.add_argument('--keys', type=int, nargs='+', default=[58, 400], help='Keys per layout')
+    parser.add_argument('--layers', type=int, nargs='+', default=[8, 32, 128], help='Layer counts')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+    args = parser.parse_args()
+
+    generator = KeymapGenerator()
+
+    print(f"{'keys':>6} {'layers':>7} {'ms':>8} {'us/layer':>9}")
+    for key_count in args.keys:
+        for layer_count in args.layers:
+            layout = build_layout(key_count, layer_count)
+            elapsed = time_call(lambda: generator.generate_content(layout), args.repeat)
+            print(f"{key_count:>6} {layer_count:>7} {elapsed * 1000:>8.2f} "
+                  f"{elapsed / layer_count * 1e6:>9.1f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
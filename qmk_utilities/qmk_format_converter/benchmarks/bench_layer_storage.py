@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Layer Storage Benchmark
+
+Measures memory and parse time of layer keycodes on synthetic VIA keymaps
+with many layers, most of them transparent apart from a few keys. Memory of
+the KeycodeList layers (interned keycode IDs, sparse or dense) is compared
+with the same keycodes held in plain lists; parse time per key is reported
+for growing key counts, so the scaling of parsing and of
+UniversalLayout.add_key padding is visible. Keycode validation time is
+reported as well, since it checks each distinct keycode ID only once.
+
+Usage: python benchmarks/bench_layer_storage.py [--layers 32] [--keys 100 400 1600]
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add the converter directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+from data_models.keycode_list import KeycodeList
+from data_models.layout_utils import LayoutValidator
+from parsers.via_parser import parse_via_json
+from generators.via_generator import generate_via_json
+
+BASE_KEYCODES = ["KC_Q", "KC_W", "KC_E", "KC_R", "KC_T", "KC_A", "KC_S", "KC_D",
+                 "KC_LSFT", "KC_SPC", "MO(1)", "LT(2, KC_TAB)"]
+
+
+def build_via_json(key_count: int, layer_count: int, overrides_per_layer: int) -> str:
+    """VIA keymap with a full base layer and mostly transparent upper layers."""
+    columns = 16
+    layout = UniversalLayout(name=f"Synthetic {key_count}", keyboard="synthetic")
+    for index in range(key_count):
+        row, col = divmod(index, columns)
+        layout.keys.append(KeyDefinition(x=float(col), y=float(row), matrix_row=row, matrix_col=col))
+    layout.matrix_rows = (key_count + columns - 1) // columns
+    layout.matrix_cols = columns
+
+    layers = [[BASE_KEYCODES[index % len(BASE_KEYCODES)] for index in range(key_count)]]
+    for layer in range(1, layer_count):
+        keycodes = ["KC_TRNS"] * key_count
+        for offset in range(overrides_per_layer):
+            keycodes[(layer * 7 + offset * 13) % key_count] = f"KC_F{offset % 12 + 1}"
+        layers.append(keycodes)
+    layout.layers = [LayerDefinition(name=f"Layer_{index}", index=index, keycodes=keycodes)
+                     for index, keycodes in enumerate(layers)]
+
+    return generate_via_json(layout)
+
+
+def measure_memory(build) -> int:
+    """Return bytes still allocated by build()'s result."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def time_call(func, repeat: int) -> float:
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def time_add_key(key_count: int, layer_count: int) -> float:
+    layout = UniversalLayout(name="Synthetic")
+    for _ in range(layer_count - 1):
+        layout.layers.append(LayerDefinition(name="", index=len(layout.layers)))
+    start = time.perf_counter()
+    for index in range(key_count):
+        layout.add_key(KeyDefinition(x=float(index % 16), y=float(index // 16)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark layer keycode storage")
+    parser.add_argument('--layers', type=int, default=32, help='Layers per keymap')
+    parser.add_argument('--keys', type=int, nargs='+', default=[100, 400, 1600], help='Key counts')
+    parser.add_argument('--overrides', type=int, default=8,
+                        help='Non-transparent keys per upper layer')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+    args = parser.parse_args()
+
+    print(f"{'keys':>6} {'layers':>6} {'stored KiB':>11} {'lists KiB':>10} {'saved':>6} "
+          f"{'parse ms':>9} {'us/key':>7} {'add_key us/key':>15} {'validate ms':>12}")
+    for key_count in args.keys:
+        text = build_via_json(key_count, args.layers, args.overrides)
+        with contextlib.redirect_stdout(io.StringIO()):
+            layout = parse_via_json(text)
+        if len(layout.layers) < args.layers:
+            raise SystemExit(f"Expected {args.layers} layers, parsed {len(layout.layers)}")
+
+        keycode_lists = [layer.keycodes.copy() for layer in layout.layers]
+        sparse = measure_memory(lambda: [KeycodeList(keycodes) for keycodes in keycode_lists])
+        plain = measure_memory(lambda: [list(keycodes) for keycodes in keycode_lists])
+        parse_time = time_call(lambda: parse_via_json(text), args.repeat)
+        add_key_time = time_add_key(key_count, args.layers)
+        validate_time = time_call(lambda: LayoutValidator._validate_keycodes(layout.layers), args.repeat)
+        print(f"{key_count:>6} {len(layout.layers):>6} {sparse / 1024:>11.1f} {plain / 1024:>10.1f} "
+              f"{1 - sparse / plain:>6.0%} {parse_time * 1000:>9.2f} "
+              f"{parse_time / key_count * 1e6:>7.1f} {add_key_time / key_count * 1e6:>15.2f} "
+              f"{validate_time * 1000:>12.2f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Layout Transform Benchmark
+
+Times bounds, normalize, scale and rotate on synthetic layouts, comparing
+the per-key Python loops with data_models/layout_arrays.py as it dispatches
+by default, for key lists and for columnar key storage. The per-layout case
+calls the operation once per layout; the batch case transforms all layouts
+in a single call.
+
+Usage: python benchmarks/bench_layout_transforms.py [--keys 100 1000] [--layouts 50]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the converter directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_models import layout_arrays
+from data_models.universal_layout import UniversalLayout, KeyDefinition
+
+
+def build_layout(key_count: int, columnar: bool) -> UniversalLayout:
+    """Grid layout with every fifth key rotated."""
+    layout = UniversalLayout(name=f"Synthetic {key_count}")
+    if columnar:
+        layout.use_columnar_keys()
+    for index in range(key_count):
+        row, col = divmod(index, 16)
+        key = KeyDefinition(x=float(col), y=float(row), width=1.25 if col == 0 else 1.0)
+        if index % 5 == 0:
+            key.rotation_angle = 15.0
+            key.rotation_x = float(col)
+            key.rotation_y = float(row)
+        layout.add_key(key)
+    return layout
+
+
+OPERATIONS = {
+    'bounds': lambda layouts: layout_arrays.batch_layout_bounds(layouts, rotated=True),
+    'normalize': lambda layouts: layout_arrays.batch_normalize_positions(layouts),
+    'scale': lambda layouts: layout_arrays.batch_scale_layouts(layouts, 1.0),
+    'rotate': lambda layouts: layout_arrays.batch_rotate_layouts(layouts, 360.5),
+}
+
+
+def time_call(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(layouts, operation, use_numpy: bool, batch: bool, repeat: int) -> float:
+    saved = layout_arrays.HAS_NUMPY
+    layout_arrays.HAS_NUMPY = use_numpy and saved
+    try:
+        if batch:
+            return time_call(lambda: operation(layouts), repeat)
+        return time_call(lambda: [operation([layout]) for layout in layouts], repeat)
+    finally:
+        layout_arrays.HAS_NUMPY = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized layout transforms")
+    parser.add_argument('--keys', type=int, nargs='+', default=[100, 1000], help='Keys per layout')
+    parser.add_argument('--layouts', type=int, default=50, help='Layouts per call')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+    args = parser.parse_args()
+
+    if not layout_arrays.HAS_NUMPY:
+        print("NumPy is not installed; only the Python implementation is timed")
+
+    print(f"{'case':<34} {'python ms':>10} {'layout ms':>10} {'batch ms':>10} {'speedup':>8}")
+    for key_count in args.keys:
+        for columnar in (False, True):
+            layouts = [build_layout(key_count, columnar) for _ in range(args.layouts)]
+            storage = 'columnar' if columnar else 'list'
+            for name, operation in OPERATIONS.items():
+                python_time = run(layouts, operation, False, False, args.repeat)
+                numpy_time = run(layouts, operation, True, False, args.repeat)
+                batch_time = run(layouts, operation, True, True, args.repeat)
+                print(f"{f'{name} {key_count} keys ({storage})':<34} {python_time * 1000:>10.2f} "
+                      f"{numpy_time * 1000:>10.2f} {batch_time * 1000:>10.2f} "
+                      f"{python_time / batch_time:>7.1f}x")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
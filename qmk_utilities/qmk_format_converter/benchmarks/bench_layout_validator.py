@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Layout Validator Benchmark
+
+Times LayoutValidator._validate_key_positions on synthetic boards of 1k to 50k
+keys. The legacy all-pairs check is timed as well for the smaller boards so the
+two can be compared.
+
+Usage: python benchmarks/bench_layout_validator.py [--sizes 1000 5000 ...]
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+# Add the converter directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_models.universal_layout import KeyDefinition
+from data_models.layout_utils import LayoutValidator
+
+
+def build_keys(count: int, rotated_every: int = 0):
+    """Build a square-ish grid of 1u keys, optionally rotating every Nth key in place."""
+    columns = max(1, int(math.sqrt(count)))
+    keys = []
+    for index in range(count):
+        x = float(index % columns)
+        y = float(index // columns)
+        key = KeyDefinition(x=x, y=y)
+        if rotated_every and index % rotated_every == 0:
+            key.rotation_angle = 15.0
+            key.rotation_x = x + 0.5
+            key.rotation_y = y + 0.5
+        keys.append(key)
+    return keys
+
+
+def legacy_validate(keys):
+    """All-pairs overlap check equivalent to the original implementation."""
+    errors = []
+    for i, key1 in enumerate(keys):
+        for j, key2 in enumerate(keys[i + 1:], i + 1):
+            if LayoutValidator._keys_overlap(key1, key2):
+                errors.append(f"Keys {i} and {j} overlap in physical position")
+    return errors
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark key overlap validation")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 10000, 25000, 50000],
+                        help='Key counts to benchmark')
+    parser.add_argument('--legacy-limit', type=int, default=5000,
+                        help='Largest board to run the all-pairs check on')
+    parser.add_argument('--rotated-every', type=int, default=10,
+                        help='Rotate every Nth key in place (0 disables rotation)')
+    args = parser.parse_args()
+
+    print(f"{'keys':>8} {'indexed (s)':>12} {'all-pairs (s)':>14} {'overlaps':>9}")
+    for size in args.sizes:
+        keys = build_keys(size, args.rotated_every)
+        indexed_time, errors = time_call(LayoutValidator._validate_key_positions, keys)
+
+        legacy_column = '-'
+        if size <= args.legacy_limit:
+            legacy_time, legacy_errors = time_call(legacy_validate, keys)
+            if legacy_errors != errors:
+                print(f"Mismatch at {size} keys: {len(legacy_errors)} vs {len(errors)} overlaps")
+                return 1
+            legacy_column = f"{legacy_time:.3f}"
+
+        print(f"{size:>8} {indexed_time:>12.3f} {legacy_column:>14} {len(errors):>9}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
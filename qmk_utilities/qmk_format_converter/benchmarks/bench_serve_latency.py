@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Conversion Server Latency Benchmark
+
+Compares per-request latency of the JSON-RPC server (`--serve`, over stdio
+and over a Unix socket) with spawning the CLI once per conversion. Requests
+cycle through the fixture files in valid/ and convert each to every output
+format, so after the first pass the server answers from its parsed layout
+cache. The on-disk conversion cache is disabled in every mode.
+
+Usage: python benchmarks/bench_serve_latency.py [--requests 100]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+CONVERTER_DIR = Path(__file__).resolve().parent.parent
+PACKAGE_PARENT = CONVERTER_DIR.parent
+FIXTURES_DIR = CONVERTER_DIR / "valid"
+OUTPUT_FORMATS = ["kle", "via", "keymap", "qmk_configurator"]
+CLI = [sys.executable, "-m", "qmk_format_converter.cli"]
+
+
+def build_jobs(count: int, output_dir: Path):
+    """Return count (input, output, format) conversions cycling over the fixtures."""
+    fixtures = sorted(path for path in FIXTURES_DIR.iterdir() if path.is_file())
+    pairs = [(fixture, fmt) for fixture in fixtures for fmt in OUTPUT_FORMATS]
+    jobs = []
+    for index in range(count):
+        fixture, fmt = pairs[index % len(pairs)]
+        jobs.append((str(fixture), str(output_dir / f"out_{index % len(pairs)}.{fmt}"), fmt))
+    return jobs
+
+
+def convert_request(request_id: int, job) -> bytes:
+    input_path, output_path, fmt = job
+    request = {"jsonrpc": "2.0", "id": request_id, "method": "convert",
+               "params": {"input": input_path, "output": output_path, "to": fmt}}
+    return (json.dumps(request) + "\n").encode("utf-8")
+
+
+def check_response(line: bytes) -> None:
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(f"Server error: {response['error']}")
+
+
+def time_process_per_call(jobs):
+    timings = []
+    for input_path, output_path, fmt in jobs:
+        start = time.perf_counter()
+        subprocess.run(CLI + [input_path, "-o", output_path, "--to", fmt, "--no-cache", "--quiet"],
+                       cwd=str(PACKAGE_PARENT), stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_stdio_server(jobs):
+    process = subprocess.Popen(CLI + ["--serve", "--no-cache"], cwd=str(PACKAGE_PARENT),
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL)
+    timings = []
+    try:
+        for request_id, job in enumerate(jobs):
+            start = time.perf_counter()
+            process.stdin.write(convert_request(request_id, job))
+            process.stdin.flush()
+            line = process.stdout.readline()
+            timings.append(time.perf_counter() - start)
+            check_response(line)
+    finally:
+        process.stdin.close()
+        process.wait(timeout=30)
+    return timings
+
+
+def time_socket_server(jobs, socket_path: str):
+    process = subprocess.Popen(CLI + ["--socket", socket_path, "--no-cache"], cwd=str(PACKAGE_PARENT),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    timings = []
+    try:
+        deadline = time.time() + 30
+        while not os.path.exists(socket_path):
+            if time.time() > deadline or process.poll() is not None:
+                raise RuntimeError("Server did not start")
+            time.sleep(0.01)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            stream = client.makefile("rwb")
+            for request_id, job in enumerate(jobs):
+                start = time.perf_counter()
+                stream.write(convert_request(request_id, job))
+                stream.flush()
+                line = stream.readline()
+                timings.append(time.perf_counter() - start)
+                check_response(line)
+            stream.write(b'{"jsonrpc": "2.0", "id": "stop", "method": "shutdown"}\n')
+            stream.flush()
+            stream.readline()
+    finally:
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return timings
+
+
+def report(name, timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<18} {statistics.median(timings) * 1000:>10.2f} {p95 * 1000:>9.2f} "
+          f"{ordered[0] * 1000:>9.2f} {ordered[-1] * 1000:>9.2f}")
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark conversion server latency")
+    parser.add_argument('--requests', type=int, default=100, help='Conversions per mode')
+    parser.add_argument('--process-requests', type=int, default=20,
+                        help='Conversions for the process-per-call mode (slow)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir)
+        jobs = build_jobs(args.requests, output_dir)
+
+        print(f"{'mode':<18} {'median ms':>10} {'p95 ms':>9} {'min ms':>9} {'max ms':>9}")
+        process_median = report("process per call",
+                                time_process_per_call(jobs[:args.process_requests]))
+        stdio_median = report("serve (stdio)", time_stdio_server(jobs))
+        if hasattr(socket, "AF_UNIX"):
+            socket_median = report("serve (socket)",
+                                   time_socket_server(jobs, str(output_dir / "server.sock")))
+            print(f"\nSpeedup over process per call: stdio {process_median / stdio_median:.1f}x, "
+                  f"socket {process_median / socket_median:.1f}x")
+        else:
+            print(f"\nSpeedup over process per call: stdio {process_median / stdio_median:.1f}x")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,49 +6,45 @@ Command-line interface for converting between KLE, VIA, and keymap.c formats.
 """
 
 import argparse
-import logging
 import sys
-from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-# Handle both standalone and module execution
+# Only the format tables are imported up front; the converter, batch processor
+# and cache are imported by the commands that use them, so --version,
+# --list-formats and --info start about as fast as the interpreter
 try:
-    from .qmk_converter import QMKFormatConverter, SupportedFormat
-    from .batch_processor import BatchProcessor
+    from .formats import FORMAT_DESCRIPTIONS, FORMAT_INFO, SupportedFormat, format_from_string
 except ImportError:
-    # Running as standalone script
+    # Running as standalone script: import through the package anyway, so modules
+    # shared with other tools (such as the ASCII keymap generator) load only once
     import os
-    sys.path.insert(0, os.path.dirname(__file__))
-    from qmk_converter import QMKFormatConverter, SupportedFormat
-    from batch_processor import BatchProcessor
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from qmk_format_converter.formats import (
+        FORMAT_DESCRIPTIONS, FORMAT_INFO, SupportedFormat, format_from_string
+    )
 
+if TYPE_CHECKING:
+    from .batch_processor import BatchProcessor
+    from .qmk_converter import QMKFormatConverter
 
-def format_from_string(format_str: str) -> SupportedFormat:
-    """Convert string to SupportedFormat enum."""
-    format_map = {
-        'kle': SupportedFormat.KLE,
-        'via': SupportedFormat.VIA,
-        'keymap': SupportedFormat.KEYMAP,
-        'keymap.c': SupportedFormat.KEYMAP,
-        'c': SupportedFormat.KEYMAP,
-        'qmk_configurator': SupportedFormat.QMK_CONFIGURATOR,
-        'qmk-configurator': SupportedFormat.QMK_CONFIGURATOR,
-        'configurator': SupportedFormat.QMK_CONFIGURATOR
-    }
-    
-    format_str = format_str.lower()
-    if format_str not in format_map:
-        raise ValueError(f"Unsupported format: {format_str}")
-    
-    return format_map[format_str]
 
+def load_converter_modules():
+    """Import the converter, batch processor and conversion cache modules."""
+    try:
+        from . import batch_processor, conversion_cache, qmk_converter
+    except ImportError:
+        from qmk_format_converter import batch_processor, conversion_cache, qmk_converter
+    return qmk_converter, batch_processor, conversion_cache
 
-def setup_logging(verbose: bool = False, log_file: Optional[str] = None):
+
+def setup_logging(verbose: bool = False, log_file: Optional[str] = None, stream=None):
     """Setup logging configuration."""
+    import logging
+    
     level = logging.DEBUG if verbose else logging.INFO
     format_str = '%(asctime)s - %(levelname)s - %(message)s'
     
-    handlers = [logging.StreamHandler(sys.stdout)]
+    handlers = [logging.StreamHandler(stream or sys.stdout)]
     if log_file:
         handlers.append(logging.FileHandler(log_file))
     
@@ -68,6 +64,69 @@ def progress_callback(current: int, total: int, filename: str):
         print()  # New line when complete
 
 
+def watch(batch_processor: 'BatchProcessor', args, input_format: Optional[SupportedFormat],
+          output_format: SupportedFormat, show_cache: bool) -> int:
+    """Run batch conversion in watch mode until interrupted."""
+    def report(result):
+        summary = result.summary()
+        line = (f"[{result.end_time:%H:%M:%S}] Converted {summary['successful']}/"
+                f"{summary['total_files']} file(s) in {summary['duration']}")
+        if summary['failed']:
+            line += f", {summary['failed']} failed"
+        if summary['skipped']:
+            line += f", {summary['skipped']} skipped"
+        if show_cache:
+            line += f" (cache hits: {summary['cache_hits']})"
+        print(line, flush=True)
+        for file_path, error in result.failed_conversions:
+            print(f"  {file_path}: {error}", file=sys.stderr)
+    
+    inputs = args.batch_dir if args.batch_dir else args.batch_files
+    if not args.quiet:
+        print("Watching for changes (Ctrl+C to stop)...", flush=True)
+    try:
+        batch_processor.watch(
+            inputs,
+            args.output_dir,
+            input_format,
+            output_format,
+            args.recursive,
+            args.naming_pattern,
+            args.overwrite,
+            interval=args.watch_interval,
+            debounce=args.debounce,
+            on_result=report
+        )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def serve(converter: 'QMKFormatConverter', socket_path: Optional[str],
+          layout_cache_size: int) -> int:
+    """Run the JSON-RPC conversion server until shutdown."""
+    # Imported here so ordinary CLI runs do not pay for the server module
+    try:
+        from .conversion_server import ConversionServer
+        from .conversion_cache import LayoutCache
+    except ImportError:
+        from qmk_format_converter.conversion_server import ConversionServer
+        from qmk_format_converter.conversion_cache import LayoutCache
+    
+    server = ConversionServer(converter, LayoutCache(layout_cache_size))
+    try:
+        if socket_path:
+            server.serve_unix_socket(socket_path)
+        else:
+            server.serve_stdio()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -81,6 +140,15 @@ Examples:
   # Batch convert directory
   %(prog)s --batch-dir input_dir --output-dir output_dir --to via
   
+  # Batch convert directory using 8 worker processes
+  %(prog)s --batch-dir input_dir --output-dir output_dir --to via --workers 8
+  
+  # Batch convert without reusing cached outputs
+  %(prog)s --batch-dir input_dir --output-dir output_dir --to via --no-cache
+  
+  # Re-convert files in a directory whenever they change
+  %(prog)s --batch-dir input_dir --output-dir output_dir --to via --watch
+  
   # Batch convert with file list
   %(prog)s --batch-files file1.json file2.c --output-dir output_dir --to kle
   
@@ -90,6 +158,10 @@ Examples:
   
   # List supported formats
   %(prog)s --list-formats
+  
+  # Serve JSON-RPC conversion requests on stdio or a Unix socket
+  %(prog)s --serve
+  %(prog)s --serve --socket /tmp/qmk-convert.sock
         """
     )
     
@@ -112,6 +184,29 @@ Examples:
                        help='Output filename pattern (default: {name})')
     parser.add_argument('--overwrite', action='store_true',
                        help='Overwrite existing output files')
+    parser.add_argument('--watch', action='store_true',
+                       help='Keep running and re-convert batch inputs when they change')
+    parser.add_argument('--watch-interval', type=float, default=1.0,
+                       help='Seconds between checks for changed files in watch mode (default: 1.0)')
+    parser.add_argument('--debounce', type=float, default=0.3,
+                       help='Seconds a file must stay unchanged before re-converting it (default: 0.3)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes for batch conversion (default: 1, 0 = one per CPU)')
+    
+    # Conversion cache options
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Disable the on-disk conversion cache')
+    parser.add_argument('--cache-dir',
+                       help='Conversion cache directory (default: ~/.cache/qmk_format_converter)')
+    parser.add_argument('--cache-size', type=int, default=256,
+                       help='Maximum conversion cache size in MB (default: 256)')
+    
+    # Server options
+    parser.add_argument('--serve', action='store_true',
+                       help='Serve JSON-RPC conversion requests (stdio unless --socket is given)')
+    parser.add_argument('--socket', help='Unix socket path to serve on (implies --serve)')
+    parser.add_argument('--layout-cache-size', type=int, default=64,
+                       help='Parsed layouts kept in memory while serving (default: 64)')
     
     # Validation options
     parser.add_argument('--validate', action='store_true', help='Validate input file')
@@ -132,22 +227,13 @@ Examples:
     
     args = parser.parse_args()
     
-    # Setup logging
-    setup_logging(args.verbose, args.log_file)
-    
-    # Initialize converter and batch processor
-    converter = QMKFormatConverter()
-    batch_processor = BatchProcessor(converter)
-    
-    # Set up progress callback if not quiet
-    if not args.quiet:
-        batch_processor.set_progress_callback(progress_callback)
+    if args.socket:
+        args.serve = True
     
     # Handle list formats command
     if args.list_formats:
         print("Supported formats:")
-        formats = converter.list_supported_formats()
-        for fmt, desc in formats.items():
+        for fmt, desc in FORMAT_DESCRIPTIONS.items():
             print(f"  {fmt:<15} - {desc}")
         return 0
     
@@ -155,7 +241,7 @@ Examples:
     if args.info:
         try:
             format_type = format_from_string(args.info)
-            info = converter.get_format_info(format_type)
+            info = FORMAT_INFO[format_type]
             print(f"Format: {info['name']}")
             print(f"Extension: {info['extension']}")
             print(f"Description: {info['description']}")
@@ -166,6 +252,26 @@ Examples:
             return 1
         return 0
     
+    # Setup logging (stdout carries the protocol when serving over stdio)
+    setup_logging(args.verbose, args.log_file, sys.stderr if args.serve else None)
+    
+    # Initialize converter and batch processor
+    qmk_converter, batch_processor_module, conversion_cache = load_converter_modules()
+    cache = None
+    if not args.no_cache:
+        cache = conversion_cache.ConversionCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    converter = qmk_converter.QMKFormatConverter(cache=cache)
+    
+    # Handle server mode
+    if args.serve:
+        return serve(converter, args.socket, args.layout_cache_size)
+    
+    batch_processor = batch_processor_module.BatchProcessor(converter, workers=args.workers)
+    
+    # Set up progress callback if not quiet
+    if not args.quiet:
+        batch_processor.set_progress_callback(progress_callback)
+    
     # Handle batch validation
     if args.batch_validate:
         try:
@@ -214,6 +320,10 @@ Examples:
             
             output_format = format_from_string(args.output_format)
             
+            if args.watch:
+                return watch(batch_processor, args, input_format, output_format,
+                             cache is not None)
+            
             # Perform batch processing
             if args.batch_dir:
                 result = batch_processor.process_directory(
@@ -244,6 +354,8 @@ Examples:
             print(f"  Skipped: {summary['skipped']}")
             print(f"  Success rate: {summary['success_rate']}")
             print(f"  Duration: {summary['duration']}")
+            if cache is not None:
+                print(f"  Cache hits: {summary['cache_hits']}, misses: {summary['cache_misses']}")
             
             if result.failed_conversions and args.verbose:
                 print("\nFailed conversions:")
@@ -266,6 +378,8 @@ Examples:
         parser.error("Input file is required for single file operations")
         return 1
     
+    from pathlib import Path
+    
     input_path = Path(args.input)
     if not input_path.exists():
         print(f"Error: Input file '{input_path}' not found", file=sys.stderr)
@@ -329,6 +443,9 @@ Examples:
         
         converter.convert_file(input_path, input_format, output_path, output_format)
         
+        if args.verbose and converter.last_stats:
+            print(f"Input I/O: {converter.last_stats.summary()}")
+        
         if not args.quiet:
             print("Conversion completed successfully")
         
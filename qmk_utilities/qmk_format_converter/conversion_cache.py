@@ -0,0 +1,297 @@
+"""
+Conversion Cache for QMK Format Converter
+
+On-disk cache of converted outputs keyed by the SHA-256 of the input content,
+the input and output formats, a fingerprint of the converter's sources and
+any other inputs of the output format (such as the ASCII layouts a keymap.c
+comment is drawn with). A
+cache hit skips parsing and generation entirely; the cached output bytes are
+written straight to the destination file. Since the fingerprint covers the
+parsers and generators themselves, upgrading the converter invalidates every
+entry even when the package version stays the same.
+
+Entries are plain files sharded by the first two hex digits of their key.
+Reading an entry refreshes its modification time, and the least recently used
+entries are evicted once the cache grows beyond its size limit.
+
+LayoutCache is the in-memory counterpart used by long-running processes: it
+keeps recently parsed layouts keyed by input content, so converting an
+unchanged file again skips parsing.
+"""
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Union
+
+try:
+    from . import __version__ as CONVERTER_VERSION
+except ImportError:
+    # Running as standalone script
+    CONVERTER_VERSION = "1.0.0"
+
+
+# Bump when the layout of cache entries changes
+CACHE_FORMAT_VERSION = 1
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+# Sources whose changes alter conversion output: the converter, its parsers,
+# generators and data models, and the ASCII generator that draws keymap comments
+FINGERPRINT_SOURCES = (
+    'qmk_converter.py',
+    'parsers/*.py',
+    'generators/*.py',
+    'data_models/*.py',
+    '../ascii_keymap_gen/*.py',
+)
+
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024  # 256 MB
+
+DEFAULT_LAYOUT_CACHE_ENTRIES = 64
+
+
+@lru_cache(maxsize=None)
+def converter_fingerprint() -> str:
+    """
+    Hash the converter's sources, so cache keys change whenever its output can.
+
+    Computed once per process, on the first cache lookup.
+    """
+    digest = hashlib.sha256(CONVERTER_VERSION.encode('utf-8'))
+    for pattern in FINGERPRINT_SOURCES:
+        for path in sorted(PACKAGE_DIR.glob(pattern)):
+            try:
+                content = path.read_bytes()
+            except OSError:
+                continue
+            digest.update(f"\0{pattern}\0{path.name}\0".encode('utf-8'))
+            digest.update(content)
+    return digest.hexdigest()
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory (honours XDG_CACHE_HOME)."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'qmk_format_converter'
+
+
+class ConversionCache:
+    """
+    Size-bounded, content-addressed cache of conversion outputs.
+
+    Usage:
+        cache = ConversionCache()
+        converter = QMKFormatConverter(cache=cache)
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None,
+                 max_bytes: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries (default_cache_dir() if None)
+            max_bytes: Maximum total size of cached entries before eviction
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        # Running total of entry sizes, computed by the first put()
+        self._total_bytes: Optional[int] = None
+
+    def make_key(self, content: bytes, input_format: Optional[str],
+                 output_format: str, input_suffix: str = "", context: str = "") -> str:
+        """
+        Build the cache key for a conversion.
+
+        Args:
+            content: Raw input file bytes
+            input_format: Input format value, or None when auto-detected
+            output_format: Output format value
+            input_suffix: Input file extension, used when the format is auto-detected
+            context: Digest of the output format's other inputs, if it has any
+
+        Returns:
+            Hex digest identifying the conversion
+        """
+        # Auto-detection depends on the file extension as well as the content
+        input_part = input_format or f"auto:{input_suffix.lower()}"
+        digest = hashlib.sha256()
+        digest.update(f"{CACHE_FORMAT_VERSION}\0{converter_fingerprint()}\0"
+                      f"{input_part}\0{output_format}\0{context}\0".encode('utf-8'))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached output for key, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            # Mark as recently used for LRU eviction
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store output bytes under key, evicting old entries if needed."""
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            previous_size = path.stat().st_size if path.exists() else 0
+
+            # Write atomically so concurrent workers never see partial entries
+            import tempfile
+            fd, temp_path = tempfile.mkstemp(dir=str(path.parent), prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+        except OSError as e:
+            self.logger.warning(f"Could not write cache entry {key}: {e}")
+            return
+
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += len(data) - previous_size
+
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        """Yield (path, stat) for every cache entry."""
+        if not self.cache_dir.is_dir():
+            return
+        for shard in self.cache_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            for path in shard.iterdir():
+                if path.name.startswith('.tmp-'):
+                    continue
+                try:
+                    yield path, path.stat()
+                except OSError:
+                    continue
+
+    def _scan_size(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def evict(self, target_bytes: Optional[int] = None) -> int:
+        """
+        Remove least recently used entries until the cache fits target_bytes.
+
+        Args:
+            target_bytes: Size to shrink to (defaults to 90% of max_bytes)
+
+        Returns:
+            Number of entries removed
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+
+        entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        removed = 0
+
+        for path, stat in entries:
+            if total <= target_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= stat.st_size
+            removed += 1
+
+        self._total_bytes = total
+        if removed:
+            self.logger.debug(f"Evicted {removed} cache entries")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        self.evict(target_bytes=0)
+
+
+class LayoutCache:
+    """
+    In-memory LRU cache of parsed layouts keyed by input content and format.
+
+    Cached layouts are shared between conversions, so callers must treat them
+    as read-only.
+
+    Usage:
+        converter = QMKFormatConverter(layout_cache=LayoutCache())
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_LAYOUT_CACHE_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Number of layouts to keep before evicting the least recently used
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def make_key(self, content: bytes, input_format: Optional[str], input_suffix: str = "") -> str:
+        """
+        Build the cache key for a parsed input.
+
+        Args:
+            content: Raw input file bytes
+            input_format: Input format value, or None when auto-detected
+            input_suffix: Input file extension, used when the format is auto-detected
+        """
+        input_part = input_format or f"auto:{input_suffix.lower()}"
+        digest = hashlib.sha256(f"{input_part}\0".encode('utf-8'))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached layout for key, or None on a miss."""
+        layout = self._entries.get(key)
+        if layout is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return layout
+
+    def put(self, key: str, layout: Any) -> None:
+        """Store a parsed layout, evicting the least recently used ones if needed."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = layout
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every cached layout."""
+        self._entries.clear()
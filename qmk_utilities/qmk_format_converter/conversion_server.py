@@ -0,0 +1,306 @@
+"""
+Conversion Server for QMK Format Converter
+
+Long-running JSON-RPC 2.0 server that keeps a QMKFormatConverter, its parsers,
+generators and keycode tables loaded between requests, so editor integrations
+can convert on every save without paying interpreter startup each time.
+
+Requests and responses are single-line JSON objects separated by newlines,
+read from stdin and written to stdout, or exchanged over a Unix domain socket.
+While serving, anything the converter prints goes to stderr so it cannot
+corrupt the protocol stream.
+
+Methods:
+    convert(input, output, to, from=None)  Convert a file; returns the output
+                                           path and cache outcomes
+    validate(input, from=None)             Validate a file
+    list_formats()                         Supported formats with descriptions
+    stats()                                Request and cache counters
+    shutdown()                             Stop serving after this response
+
+Example request and response:
+    {"jsonrpc": "2.0", "id": 1, "method": "convert",
+     "params": {"input": "keymap.c", "output": "layout.json", "to": "via"}}
+    {"jsonrpc": "2.0", "id": 1, "result": {"output": "layout.json", ...}}
+"""
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import stat
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional, TextIO
+
+# Handle both standalone and module execution
+try:
+    from .qmk_converter import QMKFormatConverter, SupportedFormat
+    from .conversion_cache import LayoutCache
+    from .formats import format_from_string
+except ImportError:
+    # Running as standalone script
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent))
+    from qmk_converter import QMKFormatConverter, SupportedFormat
+    from conversion_cache import LayoutCache
+    from formats import format_from_string
+
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class RPCError(Exception):
+    """Error reported to the client as a JSON-RPC error object."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        error = {"code": self.code, "message": self.message}
+        if self.data is not None:
+            error["data"] = self.data
+        return error
+
+
+def _format_param(params: Dict[str, Any], name: str, required: bool) -> Optional[SupportedFormat]:
+    """Read a format name parameter (same aliases as the CLI)."""
+    value = params.get(name)
+    if value is None:
+        if required:
+            raise RPCError(INVALID_PARAMS, f"Missing parameter '{name}'")
+        return None
+    try:
+        return format_from_string(str(value))
+    except ValueError as e:
+        raise RPCError(INVALID_PARAMS, str(e))
+
+
+def _path_param(params: Dict[str, Any], name: str) -> str:
+    value = params.get(name)
+    if not isinstance(value, str) or not value:
+        raise RPCError(INVALID_PARAMS, f"Parameter '{name}' must be a non-empty path string")
+    return value
+
+
+class ConversionServer:
+    """
+    JSON-RPC request handler around a warm QMKFormatConverter.
+
+    Usage:
+        server = ConversionServer(converter)
+        server.serve_stdio()
+    """
+
+    def __init__(self, converter: Optional[QMKFormatConverter] = None,
+                 layout_cache: Optional[LayoutCache] = None):
+        """
+        Initialize the server.
+
+        Args:
+            converter: Converter to use (a new one without disk cache if None)
+            layout_cache: Parsed layout cache; replaces the converter's if given
+        """
+        self.converter = converter or QMKFormatConverter()
+        if layout_cache is not None:
+            self.converter.layout_cache = layout_cache
+        elif self.converter.layout_cache is None:
+            self.converter.layout_cache = LayoutCache()
+
+        self.logger = logging.getLogger(__name__)
+        self.requests = 0
+        self.errors = 0
+        self.shutdown_requested = False
+        self._lock = threading.Lock()
+        self._methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "convert": self._convert,
+            "validate": self._validate,
+            "list_formats": self._list_formats,
+            "stats": self._stats,
+            "shutdown": self._shutdown,
+        }
+
+    # Protocol handling
+
+    def handle_line(self, line: str) -> Optional[str]:
+        """
+        Handle one line of input.
+
+        Returns:
+            The response line (without newline), or None for notifications
+        """
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError as e:
+            return self._encode(self._error_response(None, RPCError(PARSE_ERROR, f"Parse error: {e}")))
+
+        if isinstance(message, list):
+            if not message:
+                return self._encode(self._error_response(
+                    None, RPCError(INVALID_REQUEST, "Empty batch")))
+            responses = [response for response in map(self.handle_request, message)
+                         if response is not None]
+            return self._encode(responses) if responses else None
+
+        response = self.handle_request(message)
+        return self._encode(response) if response is not None else None
+
+    def handle_request(self, request: Any) -> Optional[Dict[str, Any]]:
+        """Handle a single decoded request object and return its response."""
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or \
+                not isinstance(request.get("method"), str):
+            return self._error_response(None, RPCError(INVALID_REQUEST, "Invalid request"))
+
+        request_id = request.get("id")
+        is_notification = "id" not in request
+        params = request.get("params", {})
+
+        try:
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "Parameters must be an object")
+            method = self._methods.get(request["method"])
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+
+            with self._lock:
+                self.requests += 1
+                try:
+                    result = method(params)
+                except RPCError:
+                    raise
+                except Exception as e:
+                    raise RPCError(SERVER_ERROR, str(e), {"type": type(e).__name__})
+        except RPCError as e:
+            self.errors += 1
+            if is_notification:
+                return None
+            return self._error_response(request_id, e)
+
+        if is_notification:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    @staticmethod
+    def _error_response(request_id: Any, error: RPCError) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": request_id, "error": error.to_dict()}
+
+    @staticmethod
+    def _encode(response: Any) -> str:
+        return json.dumps(response, ensure_ascii=False, separators=(',', ':'))
+
+    # Methods
+
+    def _convert(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        input_path = _path_param(params, "input")
+        output_path = _path_param(params, "output")
+        output_format = _format_param(params, "to", required=True)
+        input_format = _format_param(params, "from", required=False)
+
+        if not os.path.exists(input_path):
+            raise RPCError(SERVER_ERROR, f"Input file not found: {input_path}",
+                           {"type": "FileNotFoundError"})
+
+        self.converter.convert_file(input_path, input_format, output_path, output_format)
+        stats = self.converter.last_stats
+        return {
+            "output": output_path,
+            "format": output_format.value,
+            "cache_hit": stats.cache_hit if stats else None,
+            "layout_cache_hit": stats.layout_cache_hit if stats else None,
+        }
+
+    def _validate(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        input_path = _path_param(params, "input")
+        input_format = _format_param(params, "from", required=False)
+        return self.converter.validate_file(input_path, input_format)
+
+    def _list_formats(self, params: Dict[str, Any]) -> Dict[str, str]:
+        return self.converter.list_supported_formats()
+
+    def _stats(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        layout_cache = self.converter.layout_cache
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cached_layouts": len(layout_cache),
+            "layout_cache_hits": layout_cache.hits,
+            "layout_cache_misses": layout_cache.misses,
+        }
+
+    def _shutdown(self, params: Dict[str, Any]) -> bool:
+        self.shutdown_requested = True
+        return True
+
+    # Transports
+
+    def serve_stdio(self, stdin: Optional[TextIO] = None, stdout: Optional[TextIO] = None) -> None:
+        """Serve requests from stdin until end of input or a shutdown request."""
+        stdin = stdin or sys.stdin
+        protocol_out = stdout or sys.stdout
+
+        # Converter output must not end up in the protocol stream
+        with contextlib.redirect_stdout(sys.stderr):
+            for line in stdin:
+                if not line.strip():
+                    continue
+                response = self.handle_line(line)
+                if response is not None:
+                    protocol_out.write(response + "\n")
+                    protocol_out.flush()
+                if self.shutdown_requested:
+                    break
+
+    def serve_unix_socket(self, socket_path: str) -> None:
+        """Serve requests on a Unix domain socket until a shutdown request."""
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix domain sockets are not supported on this platform")
+        import socketserver
+
+        server_self = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw_line in self.rfile:
+                    line = raw_line.decode("utf-8", errors="replace")
+                    if not line.strip():
+                        continue
+                    response = server_self.handle_line(line)
+                    if response is not None:
+                        self.wfile.write((response + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                    if server_self.shutdown_requested:
+                        # shutdown() blocks until serve_forever returns, so run it elsewhere
+                        threading.Thread(target=self.server.shutdown, daemon=True).start()
+                        break
+
+        class Server(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+
+        _remove_stale_socket(socket_path)
+        with contextlib.redirect_stdout(sys.stderr):
+            with Server(socket_path, Handler) as server:
+                self.logger.info(f"Serving on {socket_path}")
+                try:
+                    server.serve_forever()
+                finally:
+                    _remove_stale_socket(socket_path)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Remove a leftover socket file; refuse to delete anything else."""
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise OSError(f"{socket_path} exists and is not a socket")
+    os.unlink(socket_path)
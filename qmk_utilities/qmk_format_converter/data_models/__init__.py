@@ -6,5 +6,8 @@ keyboard layouts in a format-agnostic way.
 """
 
 from .universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+from .columnar_layout import ColumnarKeys, KeyView
+from .keycode_list import KeycodeList
 
-__all__ = ['UniversalLayout', 'KeyDefinition', 'LayerDefinition']
+__all__ = ['UniversalLayout', 'KeyDefinition', 'LayerDefinition', 'ColumnarKeys', 'KeyView',
+           'KeycodeList']
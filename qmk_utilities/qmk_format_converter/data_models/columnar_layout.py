@@ -0,0 +1,342 @@
+"""
+Columnar Key Storage
+
+This module provides a compact, array-backed alternative to a list of
+KeyDefinition objects. Numeric key properties (position, size, rotation, font
+size and matrix coordinates) are stored in typed arrays, string properties in
+plain lists, and secondary labels only for keys that actually have them.
+
+Keys are accessed through lightweight KeyView objects that expose the same
+attributes as KeyDefinition and read and write straight through to the arrays,
+so parsers and generators can use a columnar layout without code changes.
+"""
+
+from array import array
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterator, List, Optional
+
+from .universal_layout import KeyDefinition
+
+
+# Numeric columns stored as doubles. Values that were assigned as ints are
+# flagged per key so they read back as ints, keeping generator output identical.
+FLOAT_FIELDS = ('x', 'y', 'width', 'height', 'rotation_angle',
+                'rotation_x', 'rotation_y', 'font_size')
+INT_FIELDS = ('matrix_row', 'matrix_col')
+STRING_FIELDS = ('color', 'text_color', 'keycode', 'primary_label', 'key_id', 'profile')
+KEY_FIELDS = FLOAT_FIELDS + INT_FIELDS + STRING_FIELDS + ('secondary_labels',)
+
+# Sentinel used for a missing (None) matrix coordinate
+MATRIX_NONE = -(2 ** 63)
+
+_FLAG_BITS = {name: 1 << position for position, name in enumerate(FLOAT_FIELDS)}
+_DEFAULTS = {name: getattr(KeyDefinition, name) for name in FLOAT_FIELDS + INT_FIELDS + STRING_FIELDS}
+_KEY_FIELD_SET = frozenset(KEY_FIELDS)
+_NORMALIZED_FIELDS = ('width', 'height', 'rotation_angle')
+
+
+class ColumnarKeys(MutableSequence):
+    """Array-backed sequence of keys that yields KeyView objects."""
+
+    def __init__(self, keys: Optional[List[Any]] = None):
+        self._floats: Dict[str, array] = {name: array('d') for name in FLOAT_FIELDS}
+        self._ints: Dict[str, array] = {name: array('q') for name in INT_FIELDS}
+        self._strings: Dict[str, List[Optional[str]]] = {name: [] for name in STRING_FIELDS}
+        self._int_flags = array('B')
+        self._labels: Dict[int, List[str]] = {}
+
+        # (name, default, flag bit, column) tuples used by the append fast path
+        self._float_specs = tuple((name, _DEFAULTS[name], _FLAG_BITS[name], self._floats[name])
+                                  for name in FLOAT_FIELDS)
+        self._int_specs = tuple((name, self._ints[name]) for name in INT_FIELDS)
+        self._string_specs = tuple((name, _DEFAULTS[name], self._strings[name])
+                                   for name in STRING_FIELDS)
+
+        if keys:
+            self.extend(keys)
+
+    # Sequence protocol
+
+    def __len__(self) -> int:
+        return len(self._int_flags)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [KeyView(self, position) for position in range(*index.indices(len(self)))]
+        return KeyView(self, self._normalize_index(index))
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            raise TypeError("ColumnarKeys does not support slice assignment")
+        position = self._normalize_index(index)
+        fields = _fields_of(value)
+        for name in KEY_FIELDS:
+            self.set_field(position, name, fields[name])
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            for position in sorted(range(*index.indices(len(self))), reverse=True):
+                self._delete(position)
+        else:
+            self._delete(self._normalize_index(index))
+
+    def __iter__(self) -> Iterator['KeyView']:
+        for position in range(len(self)):
+            yield KeyView(self, position)
+
+    def insert(self, index: int, value) -> None:
+        """Insert a key before index."""
+        count = len(self)
+        if index < 0:
+            index = max(0, count + index)
+        index = min(index, count)
+
+        fields = _fields_of(value)
+        for name in FLOAT_FIELDS:
+            self._floats[name].insert(index, float(fields[name]))
+        for name in INT_FIELDS:
+            self._ints[name].insert(index, _encode_matrix(fields[name]))
+        for name in STRING_FIELDS:
+            self._strings[name].insert(index, fields[name])
+        self._int_flags.insert(index, _int_flags_for(fields))
+
+        if index < count and self._labels:
+            self._labels = {(position + 1 if position >= index else position): labels
+                            for position, labels in self._labels.items()}
+        if fields['secondary_labels']:
+            self._labels[index] = list(fields['secondary_labels'])
+
+    def append(self, value) -> 'KeyView':
+        """Append a KeyDefinition (or KeyView) and return the view of the stored key."""
+        return self._append(_fields_of(value))
+
+    def append_fields(self, **fields) -> 'KeyView':
+        """
+        Append a key from keyword arguments without building a KeyDefinition.
+
+        Missing fields take KeyDefinition defaults, and sizes and rotation are
+        normalized the same way KeyDefinition.__post_init__ does.
+        """
+        unknown = fields.keys() - _KEY_FIELD_SET
+        if unknown:
+            raise TypeError(f"Unknown key fields: {', '.join(sorted(unknown))}")
+
+        for name in _NORMALIZED_FIELDS:
+            if name in fields:
+                break
+        else:
+            # Defaults are already normalized
+            return self._append(fields)
+
+        fields['width'] = max(0.1, fields.get('width', 1.0))
+        fields['height'] = max(0.1, fields.get('height', 1.0))
+        fields['rotation_angle'] = fields.get('rotation_angle', 0.0) % 360
+        return self._append(fields)
+
+    # Field access used by KeyView
+
+    def get_field(self, position: int, name: str) -> Any:
+        """Read a single field of the key at position."""
+        column = self._floats.get(name)
+        if column is not None:
+            value = column[position]
+            if self._int_flags[position] & _FLAG_BITS[name]:
+                return int(value)
+            return value
+
+        column = self._ints.get(name)
+        if column is not None:
+            value = column[position]
+            return None if value == MATRIX_NONE else value
+
+        if name == 'secondary_labels':
+            labels = self._labels.get(position)
+            if labels is None:
+                # Handed out lists must stay attached so in-place edits persist
+                labels = self._labels[position] = []
+            return labels
+
+        return self._strings[name][position]
+
+    def set_field(self, position: int, name: str, value: Any) -> None:
+        """Write a single field of the key at position."""
+        column = self._floats.get(name)
+        if column is not None:
+            column[position] = float(value)
+            bit = _FLAG_BITS[name]
+            if _is_int(value):
+                self._int_flags[position] |= bit
+            else:
+                self._int_flags[position] &= ~bit & 0xFF
+            return
+
+        column = self._ints.get(name)
+        if column is not None:
+            column[position] = _encode_matrix(value)
+            return
+
+        if name == 'secondary_labels':
+            if value:
+                self._labels[position] = value
+            else:
+                self._labels.pop(position, None)
+            return
+
+        self._strings[name][position] = value
+
+    def to_key_definitions(self) -> List[KeyDefinition]:
+        """Materialize all keys as independent KeyDefinition objects."""
+        return [view.to_key_definition() for view in self]
+
+    def mark_float(self, names) -> None:
+        """
+        Mark numeric fields as holding floats for every key.
+
+        Call after writing float values straight into the arrays returned by
+        column(), so the fields no longer read back as ints.
+        """
+        mask = 0
+        for name in names:
+            mask |= _FLAG_BITS[name]
+        table = bytes(value & ~mask for value in range(256))
+        self._int_flags[:] = array('B', self._int_flags.tobytes().translate(table))
+
+    def column(self, name: str) -> array:
+        """Return the raw typed array backing a numeric field."""
+        if name in self._floats:
+            return self._floats[name]
+        if name in self._ints:
+            return self._ints[name]
+        raise KeyError(f"'{name}' is not a numeric key field")
+
+    # Internal helpers
+
+    def _normalize_index(self, index: int) -> int:
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("key index out of range")
+        return index
+
+    def _append(self, fields: Dict[str, Any]) -> 'KeyView':
+        """Append a key from a field dict; missing fields take KeyDefinition defaults."""
+        position = len(self)
+        get = fields.get
+
+        flags = 0
+        for name, default, bit, column in self._float_specs:
+            value = get(name, default)
+            column.append(value)
+            if value.__class__ is int:
+                flags |= bit
+        self._int_flags.append(flags)
+        for name, column in self._int_specs:
+            value = get(name)
+            column.append(MATRIX_NONE if value is None else _encode_matrix(value))
+        for name, default, column in self._string_specs:
+            column.append(get(name, default))
+
+        labels = get('secondary_labels')
+        if labels:
+            self._labels[position] = list(labels)
+        return KeyView(self, position)
+
+    def _delete(self, position: int) -> None:
+        for name in FLOAT_FIELDS:
+            del self._floats[name][position]
+        for name in INT_FIELDS:
+            del self._ints[name][position]
+        for name in STRING_FIELDS:
+            del self._strings[name][position]
+        del self._int_flags[position]
+
+        if self._labels:
+            self._labels = {(index - 1 if index > position else index): labels
+                            for index, labels in self._labels.items() if index != position}
+
+    def __repr__(self) -> str:
+        return f"ColumnarKeys({len(self)} keys)"
+
+
+class KeyView:
+    """
+    A single key inside a ColumnarKeys store.
+
+    Exposes the KeyDefinition attributes; reads and writes go straight to the
+    underlying arrays.
+    """
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: ColumnarKeys, index: int):
+        self._store = store
+        self._index = index
+
+    def to_key_definition(self) -> KeyDefinition:
+        """Return an independent KeyDefinition copy of this key."""
+        store = self._store
+        index = self._index
+        fields = {name: store.get_field(index, name) for name in KEY_FIELDS
+                  if name != 'secondary_labels'}
+        fields['secondary_labels'] = list(store._labels.get(index, ()))
+        return KeyDefinition(**fields)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, KeyView):
+            if other._store is self._store and other._index == self._index:
+                return True
+        elif not isinstance(other, KeyDefinition):
+            return NotImplemented
+        return _fields_of(self) == _fields_of(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in KEY_FIELDS)
+        return f"KeyView({fields})"
+
+
+def _make_property(name: str) -> property:
+    def getter(view):
+        return view._store.get_field(view._index, name)
+
+    def setter(view, value):
+        view._store.set_field(view._index, name, value)
+
+    return property(getter, setter)
+
+
+for _name in KEY_FIELDS:
+    setattr(KeyView, _name, _make_property(_name))
+
+
+def _fields_of(key: Any) -> Dict[str, Any]:
+    """Collect the KeyDefinition fields from a KeyDefinition or KeyView."""
+    if isinstance(key, KeyView):
+        store = key._store
+        fields = {name: store.get_field(key._index, name) for name in KEY_FIELDS
+                  if name != 'secondary_labels'}
+        fields['secondary_labels'] = store._labels.get(key._index)
+        return fields
+    return {name: getattr(key, name) for name in KEY_FIELDS}
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _int_flags_for(fields: Dict[str, Any]) -> int:
+    flags = 0
+    for name, bit in _FLAG_BITS.items():
+        if _is_int(fields[name]):
+            flags |= bit
+    return flags
+
+
+def _encode_matrix(value: Optional[int]) -> int:
+    if value is None:
+        return MATRIX_NONE
+    if not _is_int(value):
+        raise TypeError(f"Matrix coordinates must be int or None, got {value!r}")
+    return value
@@ -0,0 +1,155 @@
+"""
+Key Geometry
+
+This module computes the absolute outline of every key: its four corners and
+its center after rotating by rotation_angle degrees about (rotation_x,
+rotation_y), the way KLE draws it. A layout's outlines are computed once and
+cached on the layout; each key's position, size and rotation are recorded
+alongside, and only keys whose recorded values no longer match are
+recomputed on the next lookup, so callers never see stale outlines after
+editing keys.
+
+The module only relies on keys exposing the KeyDefinition geometry
+attributes and has no package-relative imports, so tools outside
+qmk_format_converter can load it directly.
+"""
+
+import math
+from operator import attrgetter
+from typing import List, Sequence, Tuple
+
+
+Point = Tuple[float, float]
+Polygon = List[Point]
+BoundingBox = Tuple[float, float, float, float]
+
+GEOMETRY_FIELDS = ('x', 'y', 'width', 'height', 'rotation_angle', 'rotation_x', 'rotation_y')
+_key_snapshot = attrgetter(*GEOMETRY_FIELDS)
+
+# Attribute holding the cached LayoutGeometry on a layout object
+CACHE_ATTRIBUTE = '_key_geometry'
+
+
+def _rotate(points: Sequence[Point], angle: float, origin_x: float, origin_y: float) -> Polygon:
+    """Rotate points clockwise (KLE y-down coordinates) about an origin."""
+    radians = math.radians(angle)
+    cos_a = math.cos(radians)
+    sin_a = math.sin(radians)
+
+    rotated = []
+    for x, y in points:
+        dx = x - origin_x
+        dy = y - origin_y
+        rotated.append((origin_x + dx * cos_a - dy * sin_a,
+                        origin_y + dx * sin_a + dy * cos_a))
+    return rotated
+
+
+def _outline(snapshot: tuple) -> Tuple[Polygon, Point]:
+    """Return (corners, center) for a GEOMETRY_FIELDS tuple."""
+    x, y, width, height, angle, origin_x, origin_y = snapshot
+    right = x + width
+    bottom = y + height
+    corners = [(x, y), (right, y), (right, bottom), (x, bottom)]
+    center = (x + width / 2, y + height / 2)
+
+    if not angle:
+        return corners, center
+    corners_and_center = _rotate(corners + [center], angle, origin_x, origin_y)
+    return corners_and_center[:4], corners_and_center[4]
+
+
+def key_polygon(key) -> Polygon:
+    """Return the four corners of a key outline, rotated about its rotation origin.
+
+    Corners are ordered top-left, top-right, bottom-right, bottom-left in the
+    key's own (unrotated) frame.
+    """
+    return _outline(_key_snapshot(key))[0]
+
+
+def key_center(key) -> Point:
+    """Return the center of a key after rotation."""
+    return _outline(_key_snapshot(key))[1]
+
+
+def polygon_bounds(polygon: Sequence[Point]) -> BoundingBox:
+    """Return the axis-aligned bounding box (min_x, min_y, max_x, max_y) of a polygon."""
+    xs = [point[0] for point in polygon]
+    ys = [point[1] for point in polygon]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+class LayoutGeometry:
+    """Absolute outlines, centers and bounding boxes of a layout's keys, by key index."""
+
+    def __init__(self, keys: Sequence = ()):
+        self.snapshots: List[tuple] = []
+        self.polygons: List[Polygon] = []
+        self.centers: List[Point] = []
+        self.bounds: List[BoundingBox] = []
+        self.recomputed = 0  # Keys recomputed by the last refresh()
+        self.refresh(keys)
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    def refresh(self, keys: Sequence) -> 'LayoutGeometry':
+        """
+        Bring the outlines in line with keys.
+
+        Keys whose geometry attributes match the recorded values keep their
+        outlines; added or changed keys are recomputed and outlines of
+        removed keys are dropped.
+        """
+        snapshots = [_key_snapshot(key) for key in keys]
+        count = len(snapshots)
+        del self.snapshots[count:], self.polygons[count:], self.centers[count:], self.bounds[count:]
+
+        recomputed = 0
+        known = len(self.snapshots)
+        for index, snapshot in enumerate(snapshots):
+            if index < known and self.snapshots[index] == snapshot:
+                continue
+            polygon, center = _outline(snapshot)
+            box = polygon_bounds(polygon)
+            if index < known:
+                self.snapshots[index] = snapshot
+                self.polygons[index] = polygon
+                self.centers[index] = center
+                self.bounds[index] = box
+            else:
+                self.snapshots.append(snapshot)
+                self.polygons.append(polygon)
+                self.centers.append(center)
+                self.bounds.append(box)
+            recomputed += 1
+
+        self.recomputed = recomputed
+        return self
+
+    def is_rotated(self, index: int) -> bool:
+        """Check whether the key at index is drawn rotated."""
+        return bool(self.snapshots[index][4])
+
+    def layout_bounds(self) -> BoundingBox:
+        """Return the bounding box of all rotated outlines ((0, 0, 0, 0) if empty)."""
+        if not self.bounds:
+            return (0, 0, 0, 0)
+        return (min(box[0] for box in self.bounds), min(box[1] for box in self.bounds),
+                max(box[2] for box in self.bounds), max(box[3] for box in self.bounds))
+
+
+def layout_geometry(layout) -> LayoutGeometry:
+    """
+    Return the cached outlines of layout.keys, refreshed for any key changes.
+
+    Args:
+        layout: Any object with a ``keys`` sequence; the cache is stored on it
+    """
+    geometry = getattr(layout, CACHE_ATTRIBUTE, None)
+    if geometry is None:
+        geometry = LayoutGeometry(layout.keys)
+        setattr(layout, CACHE_ATTRIBUTE, geometry)
+        return geometry
+    return geometry.refresh(layout.keys)
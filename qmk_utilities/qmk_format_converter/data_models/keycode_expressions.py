@@ -0,0 +1,318 @@
+"""
+QMK Keycode Expressions
+
+This module parses QMK keycode expressions, such as KC_A, MO(_LOWER),
+LT(1, KC_SPC), LCTL(LSFT(KC_T)), MT(MOD_LCTL | MOD_LSFT, KC_ESC) or a custom
+keycode like MY_MACRO, into small immutable syntax trees. The grammar is:
+
+    expression := term ('|' term)*
+    term       := NUMBER | NAME | NAME '(' [expression (',' expression)*] ')'
+
+Parsing is memoized with an LRU cache, so validating or labelling a large
+keymap parses each distinct keycode string once. Function-style keycodes are
+classified into families (layer, modifier, mod-tap, one-shot, ...) with
+their expected argument kinds, which is what validate_keycode checks.
+
+Tools outside qmk_format_converter, such as the ASCII keymap generator,
+import it as qmk_format_converter.data_models.keycode_expressions, so a
+process that also runs the converter holds a single copy and parse cache.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+# Expression kinds
+NAME = 'name'
+NUMBER = 'number'
+CALL = 'call'
+UNION = 'union'
+
+# Argument kinds of function-style keycodes
+INDEX = 'index'      # Layer, tap dance or unicode index: a number or an identifier
+KEYCODE = 'keycode'  # Any valid keycode expression
+MODS = 'mods'        # MOD_* bits, optionally combined with '|'
+
+_MODIFIERS = ('LCTL', 'LSFT', 'LALT', 'LGUI', 'LCMD', 'LWIN', 'LOPT',
+              'RCTL', 'RSFT', 'RALT', 'RGUI', 'RCMD', 'RWIN', 'ROPT', 'ALGR',
+              'C', 'S', 'A', 'G', 'HYPR', 'MEH', 'LCAG', 'LSG', 'LAG', 'RSG', 'RAG',
+              'SGUI', 'SCMD', 'SWIN', 'LCA', 'LSA', 'RSA', 'RCS', 'LCS')
+_MOD_TAPS = ('LCTL_T', 'LSFT_T', 'LALT_T', 'LGUI_T', 'LCMD_T', 'LWIN_T', 'LOPT_T',
+             'RCTL_T', 'RSFT_T', 'RALT_T', 'RGUI_T', 'RCMD_T', 'RWIN_T', 'ROPT_T',
+             'CTL_T', 'SFT_T', 'ALT_T', 'GUI_T', 'CMD_T', 'WIN_T', 'OPT_T', 'ALGR_T',
+             'C_S_T', 'MEH_T', 'HYPR_T', 'ALL_T', 'LCAG_T', 'LSG_T', 'SGUI_T', 'SCMD_T',
+             'SWIN_T', 'LAG_T', 'RSG_T', 'RAG_T', 'LCA_T', 'LSA_T', 'RSA_T', 'RCS_T')
+
+# Function name -> (family, argument kinds)
+FUNCTIONS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'MO': ('layer', (INDEX,)),
+    'TG': ('layer', (INDEX,)),
+    'TO': ('layer', (INDEX,)),
+    'TT': ('layer', (INDEX,)),
+    'DF': ('layer', (INDEX,)),
+    'PDF': ('layer', (INDEX,)),
+    'OSL': ('layer', (INDEX,)),
+    'LT': ('layer_tap', (INDEX, KEYCODE)),
+    'LM': ('layer_mod', (INDEX, MODS)),
+    'MT': ('mod_tap', (MODS, KEYCODE)),
+    'OSM': ('one_shot_mod', (MODS,)),
+    'TD': ('tap_dance', (INDEX,)),
+    'UC': ('unicode', (INDEX,)),
+    'UM': ('unicode', (INDEX,)),
+    'UP': ('unicode', (INDEX, INDEX)),
+}
+FUNCTIONS.update((name, ('modifier', (KEYCODE,))) for name in _MODIFIERS)
+FUNCTIONS.update((name, ('mod_tap', (KEYCODE,))) for name in _MOD_TAPS)
+
+# Name prefixes of keycodes defined by QMK itself; other names are custom keycodes
+STANDARD_PREFIXES = ('KC_', 'QK_', 'RGB_', 'RM_', 'UG_', 'AU_', 'MU_', 'MI_', 'DB_', 'AG_',
+                     'BL_', 'BT_', 'CK_', 'DM_', 'DT_', 'EE_', 'HF_', 'JS_', 'LM_', 'MS_',
+                     'OS_', 'PB_', 'PM_', 'SQ_', 'TL_', 'UC_', 'MOD_')
+PLACEHOLDERS = frozenset(('_______', 'XXXXXXX'))
+# Custom keycodes are C constants (enum members or #defines), named in upper case
+_CUSTOM_NAME_PATTERN = re.compile(r'[A-Z][A-Z0-9_]*$')
+
+_TOKEN_PATTERN = re.compile(r'\s*(?:(0[xX][0-9a-fA-F]+|\d+)|([A-Za-z_]\w*)|([(),|]))')
+
+
+class KeycodeSyntaxError(ValueError):
+    """Raised when a keycode expression cannot be parsed."""
+    pass
+
+
+@dataclass(frozen=True)
+class KeycodeExpression:
+    """Parsed QMK keycode expression."""
+    kind: str                                    # NAME, NUMBER, CALL or UNION
+    name: str                                    # Keycode, number or function name ('|' for unions)
+    args: Tuple['KeycodeExpression', ...] = ()   # Call arguments or union terms
+
+    @property
+    def family(self) -> Optional[str]:
+        """Family of a known function-style keycode, e.g. 'layer' or 'mod_tap'."""
+        if self.kind != CALL or self.name not in FUNCTIONS:
+            return None
+        return FUNCTIONS[self.name][0]
+
+    @property
+    def is_custom(self) -> bool:
+        """Whether this is a custom keycode: an upper-case name that is not a QMK keycode."""
+        return (self.kind == NAME and self.name not in PLACEHOLDERS
+                and not self.name.startswith(STANDARD_PREFIXES)
+                and _CUSTOM_NAME_PATTERN.match(self.name) is not None)
+
+    @property
+    def layer(self) -> Optional['KeycodeExpression']:
+        """Layer argument of a layer keycode such as MO(_LOWER) or LT(1, KC_SPC), if it has one."""
+        if self.family in ('layer', 'layer_tap', 'layer_mod') and self.args:
+            return self.args[0]
+        return None
+
+    def __str__(self) -> str:
+        if self.kind == CALL:
+            return f"{self.name}({', '.join(str(arg) for arg in self.args)})"
+        if self.kind == UNION:
+            return ' | '.join(str(term) for term in self.args)
+        return self.name
+
+
+class _Parser:
+    """Recursive descent parser over the tokens of one expression."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: List[Tuple[str, str]] = []
+        position = 0
+        end = len(text.rstrip())
+        while position < end:
+            match = _TOKEN_PATTERN.match(text, position)
+            if match is None:
+                raise KeycodeSyntaxError(f"Unexpected character {text[position:].lstrip()[:1]!r} in {text!r}")
+            number, name, symbol = match.groups()
+            if number is not None:
+                self.tokens.append((NUMBER, number))
+            elif name is not None:
+                self.tokens.append((NAME, name))
+            else:
+                self.tokens.append((symbol, symbol))
+            position = match.end()
+        self.index = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.index][0] if self.index < len(self.tokens) else None
+
+    def _take(self, expected: str) -> str:
+        if self._peek() != expected:
+            found = self.tokens[self.index][1] if self.index < len(self.tokens) else 'end of input'
+            raise KeycodeSyntaxError(f"Expected {expected!r} but found {found!r} in {self.text!r}")
+        value = self.tokens[self.index][1]
+        self.index += 1
+        return value
+
+    def parse(self) -> KeycodeExpression:
+        expression = self._expression()
+        if self.index != len(self.tokens):
+            raise KeycodeSyntaxError(f"Unexpected {self.tokens[self.index][1]!r} in {self.text!r}")
+        return expression
+
+    def _expression(self) -> KeycodeExpression:
+        terms = [self._term()]
+        while self._peek() == '|':
+            self.index += 1
+            terms.append(self._term())
+        if len(terms) == 1:
+            return terms[0]
+        return KeycodeExpression(UNION, '|', tuple(terms))
+
+    def _term(self) -> KeycodeExpression:
+        if self._peek() == NUMBER:
+            return KeycodeExpression(NUMBER, self._take(NUMBER))
+
+        name = self._take(NAME)
+        if self._peek() != '(':
+            return KeycodeExpression(NAME, name)
+
+        self.index += 1
+        args = []
+        if self._peek() != ')':
+            args.append(self._expression())
+            while self._peek() == ',':
+                self.index += 1
+                args.append(self._expression())
+        self._take(')')
+        return KeycodeExpression(CALL, name, tuple(args))
+
+
+@lru_cache(maxsize=4096)
+def _parse_cached(text: str) -> Union[KeycodeExpression, KeycodeSyntaxError]:
+    # Failures are cached too, so they are not re-parsed on every lookup
+    try:
+        return _Parser(text).parse()
+    except KeycodeSyntaxError as e:
+        return e
+
+
+def parse_keycode(text: str) -> KeycodeExpression:
+    """
+    Parse a keycode expression.
+
+    Args:
+        text: Keycode as written in a keymap, e.g. 'LT(1, KC_SPC)'
+
+    Returns:
+        Parsed expression
+
+    Raises:
+        KeycodeSyntaxError: If text is not a keycode expression
+    """
+    result = _parse_cached(text)
+    if isinstance(result, KeycodeSyntaxError):
+        raise KeycodeSyntaxError(str(result))
+    return result
+
+
+def try_parse_keycode(text: str) -> Optional[KeycodeExpression]:
+    """Parse a keycode expression, returning None if it is not one."""
+    result = _parse_cached(text)
+    return None if isinstance(result, KeycodeSyntaxError) else result
+
+
+def split_keycodes(text: str) -> List[str]:
+    """
+    Split a comma separated keycode list at top-level commas only.
+
+    Commas inside function-style keycodes such as LT(1, KC_SPC) do not split.
+    Items are returned unstripped.
+    """
+    items = []
+    depth = 0
+    start = 0
+    for position, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth <= 0:
+            items.append(text[start:position])
+            start = position + 1
+    items.append(text[start:])
+    return items
+
+
+def is_keymap_name(name: str) -> bool:
+    """
+    Whether a plain name can stand for a key in a keymap.
+
+    Accepts the _______ and XXXXXXX placeholders, names with a QMK prefix such
+    as QK_BOOT or RGB_TOG (QMK defines far more of them than the keycode
+    mapping knows) and custom keycodes such as MY_MACRO or SAFE_RANGE.
+    """
+    return (name in PLACEHOLDERS or name.startswith(STANDARD_PREFIXES)
+            or KeycodeExpression(NAME, name).is_custom)
+
+
+def _argument_problem(arg: KeycodeExpression, kind: str,
+                      is_known_keycode: Callable[[str], bool]) -> Optional[str]:
+    if kind == INDEX:
+        if arg.kind in (NUMBER, NAME):
+            return None
+        return f"expected a number or name, got '{arg}'"
+    if kind == MODS:
+        terms = arg.args if arg.kind == UNION else (arg,)
+        for term in terms:
+            if term.kind == NUMBER or (term.kind == NAME and term.name.startswith('MOD_')):
+                continue
+            return f"expected MOD_* modifiers, got '{term}'"
+        return None
+    return keycode_problem(arg, is_known_keycode)
+
+
+def keycode_problem(expression: KeycodeExpression,
+                    is_known_keycode: Callable[[str], bool]) -> Optional[str]:
+    """
+    Describe what is wrong with a parsed keycode, or return None if it is valid.
+
+    Args:
+        expression: Parsed keycode
+        is_known_keycode: Returns whether a plain keycode name is valid
+
+    Returns:
+        Description of the first problem found, or None
+    """
+    if expression.kind == NAME:
+        if is_known_keycode(expression.name):
+            return None
+        return f"unknown keycode '{expression.name}'"
+    if expression.kind != CALL:
+        return f"'{expression}' is not a keycode"
+    if expression.name not in FUNCTIONS:
+        return f"unknown function '{expression.name}'"
+
+    argument_kinds = FUNCTIONS[expression.name][1]
+    if len(expression.args) != len(argument_kinds):
+        return (f"{expression.name}() takes {len(argument_kinds)} argument(s), "
+                f"got {len(expression.args)}")
+    for arg, kind in zip(expression.args, argument_kinds):
+        problem = _argument_problem(arg, kind, is_known_keycode)
+        if problem is not None:
+            return problem
+    return None
+
+
+def validate_keycode(text: str, is_known_keycode: Callable[[str], bool]) -> Optional[str]:
+    """
+    Parse and check a keycode string.
+
+    Args:
+        text: Keycode as written in a keymap
+        is_known_keycode: Returns whether a plain keycode name is valid
+
+    Returns:
+        Description of the first problem found, or None if the keycode is valid
+    """
+    result = _parse_cached(text)
+    if isinstance(result, KeycodeSyntaxError):
+        return str(result)
+    return keycode_problem(result, is_known_keycode)
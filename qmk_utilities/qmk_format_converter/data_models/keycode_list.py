@@ -0,0 +1,252 @@
+"""
+Sparse Layer Keycode Storage
+
+This module provides KeycodeList, the storage behind LayerDefinition.keycodes.
+Keycodes are kept as integer IDs from the global KEYCODE_IDS intern table
+rather than as strings, and only decoded when a generator asks for them.
+
+Most layers of a large keymap are largely transparent, so a layer starts out
+stored as a fill value (KC_TRNS by default) plus a map from key position to
+every keycode ID that differs from it. Growing a layer with fill values only
+bumps its length, so padding every layer when a key is added costs nothing
+per layer. Once more than one position in DENSE_RATIO holds something other
+than the fill value, the layer switches to a dense array of IDs, which takes
+four bytes per key.
+
+KeycodeList behaves like a list of keycode strings. Operations that produce
+new sequences (copy(), slicing and concatenation) return plain lists, which
+is also how generators get a list to serialize: the full list is only built
+when one of those is asked for. ids() returns the encoded array for code that
+can work on IDs directly.
+"""
+
+from array import array
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .keycode_mappings import KEYCODE_IDS
+
+
+DEFAULT_FILL = "KC_TRNS"
+
+# Switch to dense storage once more than 1 in DENSE_RATIO keys is not the fill
+DENSE_RATIO = 16
+
+ID_TYPECODE = 'I'
+
+
+class KeycodeList(MutableSequence):
+    """List of keycodes stored as interned IDs, sparse or dense."""
+
+    __slots__ = ('_fill_id', '_length', '_overrides', '_dense')
+
+    def __init__(self, keycodes: Iterable[str] = (), fill: str = DEFAULT_FILL):
+        """
+        Initialize the list.
+
+        Args:
+            keycodes: Initial keycodes
+            fill: Keycode that is not stored per position while the list is sparse
+        """
+        self._fill_id = KEYCODE_IDS.intern(fill)
+        self._length = 0
+        self._overrides: Optional[Dict[int, int]] = {}
+        self._dense: Optional[array] = None
+        self.extend(keycodes)
+
+    @classmethod
+    def from_ids(cls, keycode_ids: Iterable[int], fill: str = DEFAULT_FILL) -> 'KeycodeList':
+        """Build a list from IDs already interned in KEYCODE_IDS."""
+        keycodes = cls(fill=fill)
+        keycodes._reload_ids(array(ID_TYPECODE, keycode_ids))
+        return keycodes
+
+    @property
+    def fill(self) -> str:
+        return KEYCODE_IDS.keycode(self._fill_id)
+
+    @property
+    def is_dense(self) -> bool:
+        """Whether every position's ID is stored."""
+        return self._dense is not None
+
+    def ids(self) -> array:
+        """Return the keycode IDs as a new array."""
+        if self._dense is not None:
+            return array(ID_TYPECODE, self._dense)
+        ids = array(ID_TYPECODE, [self._fill_id]) * self._length
+        for position, keycode_id in self._overrides.items():
+            ids[position] = keycode_id
+        return ids
+
+    def _position(self, index: int) -> int:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("keycode index out of range")
+        return index
+
+    def _check_density(self) -> None:
+        if self._overrides is not None and len(self._overrides) * DENSE_RATIO > self._length:
+            self._dense = self.ids()
+            self._overrides = None
+
+    # Sequence protocol
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.copy()[index]
+        position = self._position(index)
+        if self._dense is not None:
+            return KEYCODE_IDS.keycode(self._dense[position])
+        return KEYCODE_IDS.keycode(self._overrides.get(position, self._fill_id))
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            values = self.copy()
+            values[index] = value
+            self._reload(values)
+            return
+
+        position = self._position(index)
+        keycode_id = KEYCODE_IDS.intern(value)
+        if self._dense is not None:
+            self._dense[position] = keycode_id
+        elif keycode_id == self._fill_id:
+            self._overrides.pop(position, None)
+        else:
+            self._overrides[position] = keycode_id
+            self._check_density()
+
+    def __delitem__(self, index) -> None:
+        ids = self.ids()
+        del ids[index]
+        self._reload_ids(ids)
+
+    def insert(self, index: int, value: str) -> None:
+        if index >= self._length:
+            self.append(value)
+            return
+        ids = self.ids()
+        ids.insert(index, KEYCODE_IDS.intern(value))
+        self._reload_ids(ids)
+
+    def append(self, value: str) -> None:
+        keycode_id = KEYCODE_IDS.intern(value)
+        if self._dense is not None:
+            self._dense.append(keycode_id)
+        elif keycode_id != self._fill_id:
+            self._overrides[self._length] = keycode_id
+        self._length += 1
+        self._check_density()
+
+    def extend(self, values: Iterable[str]) -> None:
+        if self._dense is not None:
+            self._dense.extend(KEYCODE_IDS.encode(values))
+            self._length = len(self._dense)
+            return
+
+        # Padding with the fill value is the common case, so only intern the rest
+        intern = KEYCODE_IDS.intern
+        fill = self.fill
+        overrides = self._overrides
+        position = self._length
+        for value in values:
+            if value != fill:
+                overrides[position] = intern(value)
+            position += 1
+        self._length = position
+        self._check_density()
+
+    def resize(self, length: int) -> None:
+        """Truncate to length, or pad to it with the fill value."""
+        length = max(0, length)
+        if self._dense is not None:
+            if length < self._length:
+                del self._dense[length:]
+            else:
+                self._dense.extend(array(ID_TYPECODE, [self._fill_id]) * (length - self._length))
+        elif length < self._length:
+            self._overrides = {position: keycode_id for position, keycode_id in self._overrides.items()
+                               if position < length}
+        self._length = length
+
+    def _reload(self, values: List[str]) -> None:
+        self._reload_ids(array(ID_TYPECODE, KEYCODE_IDS.encode(values)))
+
+    def _reload_ids(self, ids: array) -> None:
+        fill_id = self._fill_id
+        self._length = len(ids)
+        self._overrides = {position: keycode_id for position, keycode_id in enumerate(ids)
+                           if keycode_id != fill_id}
+        self._dense = None
+        self._check_density()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.copy())
+
+    def __contains__(self, value: Any) -> bool:
+        keycode_id = KEYCODE_IDS.id_of(value)
+        if keycode_id is None:
+            return False
+        if self._dense is not None:
+            return keycode_id in self._dense
+        if keycode_id == self._fill_id and len(self._overrides) < self._length:
+            return True
+        return keycode_id in self._overrides.values()
+
+    def count(self, value: Any) -> int:
+        keycode_id = KEYCODE_IDS.id_of(value)
+        if keycode_id is None:
+            return 0
+        if self._dense is not None:
+            return self._dense.count(keycode_id)
+        if keycode_id == self._fill_id:
+            return self._length - len(self._overrides)
+        return sum(1 for override in self._overrides.values() if override == keycode_id)
+
+    # List compatibility
+
+    def copy(self) -> List[str]:
+        """Return the keycodes as a new plain list."""
+        keycodes = KEYCODE_IDS.keycodes
+        if self._dense is not None:
+            return [keycodes[keycode_id] for keycode_id in self._dense]
+        values = [keycodes[self._fill_id]] * self._length
+        for position, keycode_id in self._overrides.items():
+            values[position] = keycodes[keycode_id]
+        return values
+
+    def __add__(self, other) -> List[str]:
+        if isinstance(other, (list, KeycodeList)):
+            return self.copy() + list(other)
+        return NotImplemented
+
+    def __radd__(self, other) -> List[str]:
+        if isinstance(other, list):
+            return other + self.copy()
+        return NotImplemented
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, KeycodeList):
+            if self._length != other._length:
+                return False
+            if (self._overrides is not None and other._overrides is not None
+                    and self._fill_id == other._fill_id):
+                return self._overrides == other._overrides
+            return self.ids() == other.ids()
+        if isinstance(other, list):
+            return self._length == len(other) and self.copy() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # IDs are local to this process, so pickle the keycode strings
+        return (self.__class__, (self.copy(), self.fill))
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
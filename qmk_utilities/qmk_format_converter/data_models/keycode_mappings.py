@@ -3,12 +3,28 @@ Keycode Mapping System
 
 This module provides mapping between different keycode formats used by
 KLE, VIA, and QMK keymap.c files.
+
+Lookups by KLE label, by category and by keycode substring are served from
+indexes built once from the mapping table, so per-key label parsing does not
+scan every mapping.
+
+The mapping table itself is built on first use, so importing this module (and
+the parsers and generators that depend on it) stays cheap.
+
+KEYCODE_IDS interns keycode strings as small integers; layer keycodes are
+stored as these IDs and only turned back into strings for output.
 """
 
-from typing import Dict, Optional, Set, List
+import threading
+from typing import Dict, Iterable, Optional, Set, List
 from dataclasses import dataclass
 
 
+# Longest substring stored in the suggestion index; longer queries intersect
+# the index entries of their n-grams and verify the candidates
+SUGGEST_NGRAM_SIZE = 3
+
+
 @dataclass
 class KeycodeMapping:
     """Represents a keycode mapping between different formats."""
@@ -30,8 +46,51 @@ class KeycodeMappingSystem:
     """
     
     def __init__(self):
-        self.mappings: Dict[str, KeycodeMapping] = {}
-        self._initialize_mappings()
+        self._mappings: Optional[Dict[str, KeycodeMapping]] = None
+        self._indexed_count = -1  # Indexes are built on the first lookup
+    
+    @property
+    def mappings(self) -> Dict[str, KeycodeMapping]:
+        """Mapping table keyed by QMK keycode, built on first access."""
+        if self._mappings is None:
+            self._mappings = {}
+            self._initialize_mappings()
+        return self._mappings
+    
+    @mappings.setter
+    def mappings(self, value: Dict[str, KeycodeMapping]) -> None:
+        self._mappings = value
+        self._indexed_count = -1
+    
+    def rebuild_indexes(self) -> None:
+        """
+        Rebuild the lookup indexes from the mapping table.
+        
+        Called automatically when the number of mappings changes; call it
+        explicitly after replacing an existing mapping in place.
+        """
+        label_index: Dict[str, str] = {}
+        category_index: Dict[str, List[KeycodeMapping]] = {}
+        ngram_index: Dict[str, Set[str]] = {}
+        
+        for qmk_code, mapping in self.mappings.items():
+            # First mapping with a label wins, matching the original linear scan
+            label_index.setdefault(mapping.kle_label, mapping.qmk_code)
+            category_index.setdefault(mapping.category, []).append(mapping)
+            
+            for size in range(1, SUGGEST_NGRAM_SIZE + 1):
+                for start in range(len(qmk_code) - size + 1):
+                    ngram_index.setdefault(qmk_code[start:start + size], set()).add(qmk_code)
+        
+        self._label_index = label_index
+        self._category_index = category_index
+        self._ngram_index = ngram_index
+        self._indexed_count = len(self.mappings)
+    
+    def _ensure_indexes(self) -> None:
+        """Rebuild the indexes if mappings were added or removed."""
+        if self._indexed_count != len(self.mappings):
+            self.rebuild_indexes()
     
     def _initialize_mappings(self):
         """Initialize the standard keycode mappings."""
@@ -177,10 +236,8 @@ class KeycodeMappingSystem:
     
     def kle_to_qmk(self, kle_label: str) -> Optional[str]:
         """Convert KLE label to QMK keycode."""
-        for mapping in self.mappings.values():
-            if mapping.kle_label == kle_label:
-                return mapping.qmk_code
-        return None
+        self._ensure_indexes()
+        return self._label_index.get(kle_label)
     
     def qmk_to_via(self, qmk_code: str) -> Optional[str]:
         """Convert QMK keycode to VIA keycode (usually the same)."""
@@ -197,12 +254,13 @@ class KeycodeMappingSystem:
     
     def get_categories(self) -> Set[str]:
         """Get all keycode categories."""
-        return {mapping.category for mapping in self.mappings.values()}
+        self._ensure_indexes()
+        return set(self._category_index)
     
     def get_keycodes_by_category(self, category: str) -> List[KeycodeMapping]:
         """Get all keycodes in a specific category."""
-        return [mapping for mapping in self.mappings.values() 
-                if mapping.category == category]
+        self._ensure_indexes()
+        return list(self._category_index.get(category, ()))
     
     def is_valid_qmk_keycode(self, keycode: str) -> bool:
         """Check if a keycode is a valid QMK keycode."""
@@ -211,13 +269,23 @@ class KeycodeMappingSystem:
     def suggest_keycode(self, partial: str) -> List[str]:
         """Suggest QMK keycodes based on partial input."""
         partial_upper = partial.upper()
-        suggestions = []
+        if not partial_upper:
+            return sorted(self.mappings)
         
-        for qmk_code in self.mappings.keys():
-            if partial_upper in qmk_code:
-                suggestions.append(qmk_code)
+        self._ensure_indexes()
+        if len(partial_upper) <= SUGGEST_NGRAM_SIZE:
+            return sorted(self._ngram_index.get(partial_upper, ()))
         
-        return sorted(suggestions)
+        # Narrow down to keycodes containing every n-gram of the input
+        size = SUGGEST_NGRAM_SIZE
+        candidates = None
+        for start in range(len(partial_upper) - size + 1):
+            codes = self._ngram_index.get(partial_upper[start:start + size])
+            if not codes:
+                return []
+            candidates = set(codes) if candidates is None else candidates & codes
+        
+        return sorted(qmk_code for qmk_code in candidates if partial_upper in qmk_code)
     
     def parse_kle_key_label(self, label: str) -> str:
         """
@@ -262,5 +330,71 @@ class KeycodeMappingSystem:
         return "KC_TRNS"
 
 
+class KeycodeInternTable:
+    """
+    Assigns compact integer IDs to keycode strings.
+    
+    Any keycode can be interned, including parameterized ones such as
+    LT(1,KC_SPC) or MO(_LOWER). Each distinct string gets the next free ID
+    and keeps it for the life of the process, so IDs can be compared and
+    hashed instead of strings and decoded with a list lookup. Strings are not
+    normalized, so decoding always gives back the exact original text.
+    
+    IDs are only meaningful within one process; serialize keycodes, not IDs.
+    """
+    
+    def __init__(self, preload: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        self._keycodes: List[str] = []
+        self._lock = threading.Lock()
+        for keycode in preload:
+            self.intern(keycode)
+    
+    def __len__(self) -> int:
+        return len(self._keycodes)
+    
+    def __contains__(self, keycode: str) -> bool:
+        return keycode in self._ids
+    
+    @property
+    def keycodes(self) -> List[str]:
+        """Keycode strings indexed by ID (do not modify)."""
+        return self._keycodes
+    
+    def intern(self, keycode: str) -> int:
+        """Return the ID of a keycode, assigning one if it is new."""
+        keycode_id = self._ids.get(keycode)
+        if keycode_id is None:
+            with self._lock:
+                keycode_id = self._ids.get(keycode)
+                if keycode_id is None:
+                    keycode_id = len(self._keycodes)
+                    self._keycodes.append(keycode)
+                    self._ids[keycode] = keycode_id
+        return keycode_id
+    
+    def id_of(self, keycode: str) -> Optional[int]:
+        """Return the ID of a keycode, or None if it was never interned."""
+        return self._ids.get(keycode)
+    
+    def keycode(self, keycode_id: int) -> str:
+        """Return the keycode string for an ID."""
+        return self._keycodes[keycode_id]
+    
+    def encode(self, keycodes: Iterable[str]) -> List[int]:
+        """Intern a sequence of keycodes and return their IDs."""
+        ids = self._ids
+        intern = self.intern
+        return [ids[keycode] if keycode in ids else intern(keycode) for keycode in keycodes]
+    
+    def decode(self, keycode_ids: Iterable[int]) -> List[str]:
+        """Return the keycode strings for a sequence of IDs."""
+        keycodes = self._keycodes
+        return [keycodes[keycode_id] for keycode_id in keycode_ids]
+
+
 # Global instance for easy access
 KEYCODE_MAPPER = KeycodeMappingSystem()
+
+# Global keycode intern table shared by every layer
+KEYCODE_IDS = KeycodeInternTable(("KC_TRNS", "KC_NO"))
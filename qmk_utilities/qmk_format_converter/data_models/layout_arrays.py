@@ -0,0 +1,398 @@
+"""
+Vectorized Layout Operations
+
+Bulk versions of the LayoutCalculator and LayoutTransformer operations that
+work on whole coordinate arrays instead of one key at a time. When NumPy is
+installed, the keys of one or many layouts are gathered into flat float64
+arrays and transformed with array arithmetic. Keys held in ColumnarKeys are
+read and written through their typed arrays without building key objects.
+Lists of KeyDefinition objects are only vectorized for read-only operations
+on large layouts, since copying attributes in and out of arrays costs more
+than the per-key loop saves. Without NumPy every operation runs as a plain
+Python loop.
+
+Rotation follows KLE semantics: a key is drawn at (x, y) and then rotated by
+rotation_angle degrees about (rotation_x, rotation_y). Transforms move the
+rotation origin of rotated keys along with their position; the origin of
+unrotated keys has no effect and is left alone.
+"""
+
+import math
+from operator import attrgetter
+from typing import List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; the pure Python implementations are used instead
+    np = None
+
+from .universal_layout import UniversalLayout
+from .columnar_layout import ColumnarKeys
+from .geometry import key_polygon
+
+
+HAS_NUMPY = np is not None
+
+# Below this many KeyDefinition objects, gathering arrays costs more than it saves
+VECTORIZE_MIN_KEYS = 512
+
+BoundingBox = Tuple[float, float, float, float]
+Point = Tuple[float, float]
+
+GEOMETRY_FIELDS = ('x', 'y', 'width', 'height', 'rotation_angle', 'rotation_x', 'rotation_y')
+_get_geometry = attrgetter(*GEOMETRY_FIELDS)
+
+
+def _key_lists(layouts) -> list:
+    """Accept UniversalLayouts or key sequences."""
+    return [layout.keys if isinstance(layout, UniversalLayout) else layout for layout in layouts]
+
+
+def _per_layout(value, count: int, name: str) -> list:
+    """Expand a scalar argument to one value per layout."""
+    if isinstance(value, (int, float)):
+        return [value] * count
+    values = list(value)
+    if len(values) != count:
+        raise ValueError(f"Expected {count} {name} values, got {len(values)}")
+    return values
+
+
+def _split(key_lists, writes: bool) -> Tuple[List[int], List[int]]:
+    """
+    Decide which layouts to vectorize.
+
+    Returns:
+        (indexes handled with NumPy, indexes handled with Python loops)
+    """
+    if not HAS_NUMPY:
+        return [], list(range(len(key_lists)))
+
+    columnar = []
+    objects = []
+    for index, keys in enumerate(key_lists):
+        (columnar if isinstance(keys, ColumnarKeys) else objects).append(index)
+
+    if writes or sum(len(key_lists[index]) for index in objects) < VECTORIZE_MIN_KEYS:
+        return columnar, objects
+    return columnar + objects, []
+
+
+def _pick(key_lists, indexes: List[int]) -> list:
+    return [key_lists[index] for index in indexes]
+
+
+# Public API
+
+def layout_bounds(keys, rotated: bool = False) -> BoundingBox:
+    """
+    Return (min_x, min_y, max_x, max_y) of a key sequence.
+
+    Args:
+        keys: Key sequence or UniversalLayout
+        rotated: Use the rotated key outlines instead of the unrotated boxes
+    """
+    return batch_layout_bounds([keys], rotated)[0]
+
+
+def batch_layout_bounds(layouts, rotated: bool = False) -> List[BoundingBox]:
+    """Return the bounds of every layout; empty layouts give (0, 0, 0, 0)."""
+    key_lists = _key_lists(layouts)
+    vectorized, looped = _split(key_lists, writes=False)
+    results = [None] * len(key_lists)
+    if vectorized:
+        for index, bounds in zip(vectorized, _KeyBlock(_pick(key_lists, vectorized)).bounds(rotated)):
+            results[index] = bounds
+    for index in looped:
+        results[index] = _bounds_python(key_lists[index], rotated)
+    return results
+
+
+def normalize_positions(keys, rotated: bool = False) -> None:
+    """Move a layout so its bounds start at (0, 0)."""
+    batch_normalize_positions([keys], rotated)
+
+
+def batch_normalize_positions(layouts, rotated: bool = False) -> None:
+    """Move every layout so its bounds start at (0, 0)."""
+    key_lists = _key_lists(layouts)
+    vectorized, looped = _split(key_lists, writes=True)
+    if vectorized:
+        _KeyBlock(_pick(key_lists, vectorized)).normalize(rotated)
+    for index in looped:
+        _normalize_python(key_lists[index], rotated)
+
+
+def scale_layout(keys, scale_factor: float) -> None:
+    """Scale positions and sizes of a layout about (0, 0)."""
+    batch_scale_layouts([keys], scale_factor)
+
+
+def batch_scale_layouts(layouts, scale_factors: Union[float, Sequence[float]]) -> None:
+    """
+    Scale every layout about (0, 0).
+
+    Args:
+        layouts: UniversalLayouts or key sequences
+        scale_factors: One factor for all layouts, or one per layout
+    """
+    key_lists = _key_lists(layouts)
+    factors = _per_layout(scale_factors, len(key_lists), "scale factor")
+    vectorized, looped = _split(key_lists, writes=True)
+    if vectorized:
+        _KeyBlock(_pick(key_lists, vectorized)).scale(_pick(factors, vectorized))
+    for index in looped:
+        _scale_python(key_lists[index], factors[index])
+
+
+def rotate_layout(keys, angle: float, origin_x: float = 0.0, origin_y: float = 0.0) -> None:
+    """Rotate a whole layout by angle degrees about (origin_x, origin_y)."""
+    batch_rotate_layouts([keys], angle, [(origin_x, origin_y)])
+
+
+def batch_rotate_layouts(layouts, angles: Union[float, Sequence[float]],
+                         origins: Optional[Sequence[Point]] = None) -> None:
+    """
+    Rotate every layout about its own origin.
+
+    Unrotated keys get the layout rotation directly. For keys that are
+    already rotated, the two rotations are composed: the angles add up, the
+    rotation origin is rotated about the layout origin, and the key position
+    moves with its origin so the key lands where rotating its outline would
+    put it.
+
+    Args:
+        layouts: UniversalLayouts or key sequences
+        angles: One angle in degrees for all layouts, or one per layout
+        origins: (x, y) rotation origin per layout (all (0, 0) if None)
+    """
+    key_lists = _key_lists(layouts)
+    angles = _per_layout(angles, len(key_lists), "angle")
+    if origins is None:
+        origins = [(0.0, 0.0)] * len(key_lists)
+    elif len(origins) != len(key_lists):
+        raise ValueError(f"Expected {len(key_lists)} origins, got {len(origins)}")
+
+    vectorized, looped = _split(key_lists, writes=True)
+    if vectorized:
+        _KeyBlock(_pick(key_lists, vectorized)).rotate(_pick(angles, vectorized),
+                                                        _pick(origins, vectorized))
+    for index in looped:
+        _rotate_python(key_lists[index], angles[index], origins[index])
+
+
+# Pure Python implementations
+
+def _bounds_python(keys, rotated: bool) -> BoundingBox:
+    if not keys:
+        return (0, 0, 0, 0)
+
+    if rotated:
+        xs = []
+        ys = []
+        for key in keys:
+            for x, y in key_polygon(key):
+                xs.append(x)
+                ys.append(y)
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    return (min(key.x for key in keys),
+            min(key.y for key in keys),
+            max(key.x + key.width for key in keys),
+            max(key.y + key.height for key in keys))
+
+
+def _normalize_python(keys, rotated: bool) -> None:
+    if not keys:
+        return
+
+    min_x, min_y, _, _ = _bounds_python(keys, rotated)
+    for key in keys:
+        key.x -= min_x
+        key.y -= min_y
+        if key.rotation_angle:
+            key.rotation_x -= min_x
+            key.rotation_y -= min_y
+
+
+def _scale_python(keys, factor: float) -> None:
+    for key in keys:
+        key.x *= factor
+        key.y *= factor
+        key.width *= factor
+        key.height *= factor
+        if key.rotation_angle:
+            key.rotation_x *= factor
+            key.rotation_y *= factor
+
+
+def _rotate_python(keys, angle: float, origin: Point) -> None:
+    if not angle % 360:
+        return
+
+    origin_x, origin_y = origin
+    radians = math.radians(angle)
+    cos_a = math.cos(radians)
+    sin_a = math.sin(radians)
+
+    for key in keys:
+        if key.rotation_angle:
+            dx = key.rotation_x - origin_x
+            dy = key.rotation_y - origin_y
+            new_x = origin_x + dx * cos_a - dy * sin_a
+            new_y = origin_y + dx * sin_a + dy * cos_a
+            key.x += new_x - key.rotation_x
+            key.y += new_y - key.rotation_y
+            key.rotation_x = new_x
+            key.rotation_y = new_y
+        else:
+            key.rotation_x = origin_x
+            key.rotation_y = origin_y
+        key.rotation_angle = (key.rotation_angle + angle) % 360
+
+
+# NumPy implementation
+
+class _KeyBlock:
+    """Geometry of one or more key sequences gathered into flat float64 arrays."""
+
+    def __init__(self, key_lists: list):
+        self.key_lists = key_lists
+        self.counts = np.array([len(keys) for keys in key_lists], dtype=np.intp)
+        self.ends = np.cumsum(self.counts)
+        self.starts = self.ends - self.counts
+
+        parts = {name: [] for name in GEOMETRY_FIELDS}
+        for keys in key_lists:
+            if not len(keys):
+                continue
+            if isinstance(keys, ColumnarKeys):
+                for name in GEOMETRY_FIELDS:
+                    parts[name].append(np.frombuffer(keys.column(name), dtype=np.float64))
+            else:
+                rows = np.array([_get_geometry(key) for key in keys], dtype=np.float64)
+                for index, name in enumerate(GEOMETRY_FIELDS):
+                    parts[name].append(rows[:, index])
+
+        self.values = {name: np.concatenate(columns) if columns else np.empty(0)
+                       for name, columns in parts.items()}
+
+    def _repeat(self, per_layout) -> 'np.ndarray':
+        """Expand one value per layout to one value per key."""
+        return np.repeat(np.asarray(per_layout, dtype=np.float64), self.counts)
+
+    def _segment_reduce(self, ufunc, values) -> 'np.ndarray':
+        """Reduce values per layout; empty layouts get 0."""
+        result = np.zeros(len(self.counts))
+        filled = self.counts > 0
+        if values.size:
+            result[filled] = ufunc.reduceat(values, self.starts[filled])
+        return result
+
+    def _extents(self, rotated: bool):
+        """Return per-key (min_x, min_y, max_x, max_y) arrays."""
+        v = self.values
+        left = v['x']
+        top = v['y']
+        right = left + v['width']
+        bottom = top + v['height']
+        if not rotated or not v['rotation_angle'].any():
+            return left, top, right, bottom
+
+        radians = np.radians(v['rotation_angle'])
+        cos_a = np.cos(radians)
+        sin_a = np.sin(radians)
+        is_rotated = v['rotation_angle'] != 0
+        origin_x = v['rotation_x']
+        origin_y = v['rotation_y']
+
+        xs = []
+        ys = []
+        for corner_x, corner_y in ((left, top), (right, top), (right, bottom), (left, bottom)):
+            dx = corner_x - origin_x
+            dy = corner_y - origin_y
+            xs.append(np.where(is_rotated, origin_x + dx * cos_a - dy * sin_a, corner_x))
+            ys.append(np.where(is_rotated, origin_y + dx * sin_a + dy * cos_a, corner_y))
+        return (np.minimum.reduce(xs), np.minimum.reduce(ys),
+                np.maximum.reduce(xs), np.maximum.reduce(ys))
+
+    def bounds(self, rotated: bool) -> List[BoundingBox]:
+        min_x, min_y, max_x, max_y = self._extents(rotated)
+        columns = (self._segment_reduce(np.minimum, min_x), self._segment_reduce(np.minimum, min_y),
+                   self._segment_reduce(np.maximum, max_x), self._segment_reduce(np.maximum, max_y))
+        return [tuple(row) for row in np.column_stack(columns).tolist()]
+
+    def normalize(self, rotated: bool) -> None:
+        min_x, min_y, _, _ = self._extents(rotated)
+        shift_x = self._repeat(self._segment_reduce(np.minimum, min_x))
+        shift_y = self._repeat(self._segment_reduce(np.minimum, min_y))
+
+        v = self.values
+        v['x'] = v['x'] - shift_x
+        v['y'] = v['y'] - shift_y
+        changed = ['x', 'y']
+
+        is_rotated = v['rotation_angle'] != 0
+        if is_rotated.any():
+            v['rotation_x'] = np.where(is_rotated, v['rotation_x'] - shift_x, v['rotation_x'])
+            v['rotation_y'] = np.where(is_rotated, v['rotation_y'] - shift_y, v['rotation_y'])
+            changed += ['rotation_x', 'rotation_y']
+        self._write(changed)
+
+    def scale(self, factors) -> None:
+        factor = self._repeat(factors)
+        v = self.values
+        for name in ('x', 'y', 'width', 'height'):
+            v[name] = v[name] * factor
+        changed = ['x', 'y', 'width', 'height']
+
+        is_rotated = v['rotation_angle'] != 0
+        if is_rotated.any():
+            v['rotation_x'] = np.where(is_rotated, v['rotation_x'] * factor, v['rotation_x'])
+            v['rotation_y'] = np.where(is_rotated, v['rotation_y'] * factor, v['rotation_y'])
+            changed += ['rotation_x', 'rotation_y']
+        self._write(changed)
+
+    def rotate(self, angles, origins) -> None:
+        angle = self._repeat(angles)
+        origin_x = self._repeat([origin[0] for origin in origins])
+        origin_y = self._repeat([origin[1] for origin in origins])
+        applies = np.mod(angle, 360) != 0
+        if not applies.any():
+            return
+
+        v = self.values
+        radians = np.radians(angle)
+        cos_a = np.cos(radians)
+        sin_a = np.sin(radians)
+        is_rotated = v['rotation_angle'] != 0
+
+        dx = v['rotation_x'] - origin_x
+        dy = v['rotation_y'] - origin_y
+        new_x = np.where(is_rotated, origin_x + dx * cos_a - dy * sin_a, origin_x)
+        new_y = np.where(is_rotated, origin_y + dx * sin_a + dy * cos_a, origin_y)
+
+        moves = applies & is_rotated
+        v['x'] = np.where(moves, v['x'] + (new_x - v['rotation_x']), v['x'])
+        v['y'] = np.where(moves, v['y'] + (new_y - v['rotation_y']), v['y'])
+        v['rotation_x'] = np.where(applies, new_x, v['rotation_x'])
+        v['rotation_y'] = np.where(applies, new_y, v['rotation_y'])
+        v['rotation_angle'] = np.where(applies, np.mod(v['rotation_angle'] + angle, 360),
+                                       v['rotation_angle'])
+        self._write(['x', 'y', 'rotation_x', 'rotation_y', 'rotation_angle'])
+
+    def _write(self, names: List[str]) -> None:
+        """Store the updated arrays back into the keys."""
+        for keys, start, end in zip(self.key_lists, self.starts.tolist(), self.ends.tolist()):
+            if start == end:
+                continue
+            if isinstance(keys, ColumnarKeys):
+                for name in names:
+                    np.frombuffer(keys.column(name), dtype=np.float64)[:] = self.values[name][start:end]
+                keys.mark_float(names)
+            else:
+                columns = [self.values[name][start:end].tolist() for name in names]
+                for key, row in zip(keys, zip(*columns)):
+                    for name, value in zip(names, row):
+                        setattr(key, name, value)
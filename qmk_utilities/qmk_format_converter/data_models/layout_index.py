@@ -0,0 +1,106 @@
+"""
+Layout Indexes
+
+This module provides the lookup structures behind UniversalLayout's matrix
+position and layer lookups, and the row grouping shared by the generators.
+
+An AttributeIndex maps a value computed from each item of a list (such as a
+key's (matrix_row, matrix_col) or a layer's name) to the position of the
+first item with that value. Layouts are often built by appending straight to
+``layout.keys`` or by replacing the list, so the index checks on every
+lookup that it still describes the same list at the same length and
+rebuilds itself otherwise. Each hit is also checked against the item it
+points to. If an item is edited in place so that a lookup would now miss,
+call ``invalidate()``.
+"""
+
+from operator import attrgetter
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+
+class AttributeIndex:
+    """Maps a per-item value to the first position holding it in a list."""
+
+    def __init__(self, value_of: Callable[[Any], Hashable]):
+        """
+        Initialize the index.
+
+        Args:
+            value_of: Function returning the indexed value of an item
+        """
+        self.value_of = value_of
+        self.positions: Dict[Hashable, int] = {}
+        self._source: Optional[Sequence] = None
+        self._length = -1
+
+    def invalidate(self) -> None:
+        """Force a rebuild on the next lookup."""
+        self._source = None
+        self._length = -1
+
+    def rebuild(self, items: Sequence) -> None:
+        """Index every item of items."""
+        positions = {}
+        for position, item in enumerate(items):
+            positions.setdefault(self.value_of(item), position)
+        self.positions = positions
+        self._source = items
+        self._length = len(items)
+
+    def appended(self, items: Sequence) -> None:
+        """Record that one item was appended to items."""
+        if self._source is items and self._length == len(items) - 1:
+            self.positions.setdefault(self.value_of(items[-1]), self._length)
+            self._length += 1
+        else:
+            self.invalidate()
+
+    def find(self, items: Sequence, value: Hashable) -> Optional[int]:
+        """Return the position of the first item with value, or None."""
+        if self._source is not items or self._length != len(items):
+            self.rebuild(items)
+
+        position = self.positions.get(value)
+        if position is None or self.value_of(items[position]) == value:
+            return position
+
+        # The item was edited in place since the index was built
+        self.rebuild(items)
+        return self.positions.get(value)
+
+
+matrix_position = attrgetter('matrix_row', 'matrix_col')
+
+
+def group_keys_by_row(keys: Sequence, row_of: Callable[[Any], Any] = attrgetter('y')) -> List[List[int]]:
+    """
+    Group key positions into rows.
+
+    Rows are ordered by their row value and keys within a row by X; keys
+    with equal values keep their layout order. Grouping is a single pass,
+    and the sorts are linear for keys already in reading order.
+
+    Args:
+        keys: Keys to group
+        row_of: Function returning a key's sortable row value (default: its Y)
+
+    Returns:
+        List of rows, each a list of positions in keys
+    """
+    rows: Dict[Any, List[int]] = {}
+    xs = []
+    for position, key in enumerate(keys):
+        xs.append(key.x)
+        row_value = row_of(key)
+        row = rows.get(row_value)
+        if row is None:
+            rows[row_value] = [position]
+        else:
+            row.append(position)
+
+    grouped = []
+    for row_value in sorted(rows):
+        row = rows[row_value]
+        row.sort(key=xs.__getitem__)
+        grouped.append(row)
+    return grouped
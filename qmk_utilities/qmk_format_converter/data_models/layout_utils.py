@@ -6,7 +6,12 @@ This module provides utility functions for working with the universal layout dat
 
 from typing import List, Dict, Tuple, Optional
 from .universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
-from .keycode_mappings import KEYCODE_MAPPER
+from .keycode_mappings import KEYCODE_MAPPER, KEYCODE_IDS
+from .keycode_list import KeycodeList
+from .keycode_expressions import is_keymap_name, validate_keycode
+from .geometry import LayoutGeometry, key_center, key_polygon
+from .spatial_index import KeySpatialIndex, polygons_overlap
+from . import layout_arrays
 
 
 class LayoutValidator:
@@ -21,7 +26,7 @@ class LayoutValidator:
         errors.extend(layout.validate())
         
         # Additional validations
-        errors.extend(LayoutValidator._validate_key_positions(layout.keys))
+        errors.extend(LayoutValidator._validate_key_positions(layout.keys, layout.key_geometry()))
         errors.extend(LayoutValidator._validate_layer_consistency(layout.layers, len(layout.keys)))
         errors.extend(LayoutValidator._validate_matrix_mapping(layout.keys, layout.matrix_rows, layout.matrix_cols))
         errors.extend(LayoutValidator._validate_keycodes(layout.layers))
@@ -29,20 +34,25 @@ class LayoutValidator:
         return errors
     
     @staticmethod
-    def _validate_key_positions(keys: List[KeyDefinition]) -> List[str]:
+    def _validate_key_positions(keys: List[KeyDefinition],
+                                geometry: Optional[LayoutGeometry] = None) -> List[str]:
         """Validate key physical positions for overlaps."""
         errors = []
         
-        for i, key1 in enumerate(keys):
-            for j, key2 in enumerate(keys[i+1:], i+1):
-                if LayoutValidator._keys_overlap(key1, key2):
-                    errors.append(f"Keys {i} and {j} overlap in physical position")
+        # Only keys sharing a grid cell are compared, instead of every pair
+        index = KeySpatialIndex(keys, geometry=geometry)
+        for i, j in index.overlapping_pairs():
+            errors.append(f"Keys {i} and {j} overlap in physical position")
         
         return errors
     
     @staticmethod
     def _keys_overlap(key1: KeyDefinition, key2: KeyDefinition) -> bool:
         """Check if two keys overlap physically."""
+        if key1.rotation_angle or key2.rotation_angle:
+            # Rotated keys are compared by their actual outlines
+            return polygons_overlap(key_polygon(key1), key_polygon(key2))
+        
         # Simple bounding box overlap check
         key1_right = key1.x + key1.width
         key1_bottom = key1.y + key1.height
@@ -82,16 +92,44 @@ class LayoutValidator:
     def _validate_keycodes(layers: List[LayerDefinition]) -> List[str]:
         """Validate keycode format."""
         errors = []
+        problems: Dict[int, Optional[str]] = {}
         
         for layer in layers:
-            for i, keycode in enumerate(layer.keycodes):
-                if not keycode:
-                    errors.append(f"Layer '{layer.name}', position {i}: empty keycode")
-                elif not KEYCODE_MAPPER.is_valid_qmk_keycode(keycode) and not keycode.startswith(('MO(', 'LT(', 'TG(')):
-                    # Allow layer switching functions even if not in basic mapping
-                    errors.append(f"Layer '{layer.name}', position {i}: invalid keycode '{keycode}'")
+            if isinstance(layer.keycodes, KeycodeList):
+                keycode_ids = layer.keycodes.ids()
+            else:
+                keycode_ids = KEYCODE_IDS.encode(layer.keycodes)
+            
+            # Check each distinct keycode once, then report the positions holding bad ones
+            bad_ids = set()
+            for keycode_id in set(keycode_ids):
+                if keycode_id not in problems:
+                    problems[keycode_id] = LayoutValidator._keycode_problem(KEYCODE_IDS.keycode(keycode_id))
+                if problems[keycode_id] is not None:
+                    bad_ids.add(keycode_id)
+            
+            if bad_ids:
+                for i, keycode_id in enumerate(keycode_ids):
+                    if keycode_id in bad_ids:
+                        errors.append(f"Layer '{layer.name}', position {i}: {problems[keycode_id]}")
         
         return errors
+    
+    @staticmethod
+    def _keycode_problem(keycode: str) -> Optional[str]:
+        """Describe what is wrong with a keycode, or return None if it is valid."""
+        if not keycode:
+            return "empty keycode"
+        # Function-style keycodes are checked against their grammar; plain ones may be
+        # mapped, placeholders, QMK keycodes the mapping lacks or custom keycodes
+        if validate_keycode(keycode, LayoutValidator._is_known_keycode) is not None:
+            return f"invalid keycode '{keycode}'"
+        return None
+    
+    @staticmethod
+    def _is_known_keycode(name: str) -> bool:
+        """Whether a plain keycode name is valid in a keymap."""
+        return KEYCODE_MAPPER.is_valid_qmk_keycode(name) or is_keymap_name(name)
 
 
 class LayoutCalculator:
@@ -100,15 +138,12 @@ class LayoutCalculator:
     @staticmethod
     def calculate_layout_bounds(keys: List[KeyDefinition]) -> Tuple[float, float, float, float]:
         """Calculate the bounding box of all keys."""
-        if not keys:
-            return (0, 0, 0, 0)
-        
-        min_x = min(key.x for key in keys)
-        min_y = min(key.y for key in keys)
-        max_x = max(key.x + key.width for key in keys)
-        max_y = max(key.y + key.height for key in keys)
-        
-        return (min_x, min_y, max_x, max_y)
+        return layout_arrays.layout_bounds(keys)
+    
+    @staticmethod
+    def calculate_rotated_bounds(keys: List[KeyDefinition]) -> Tuple[float, float, float, float]:
+        """Calculate the bounding box of all keys after applying their rotation."""
+        return layout_arrays.layout_bounds(keys, rotated=True)
     
     @staticmethod
     def calculate_layout_size(keys: List[KeyDefinition]) -> Tuple[float, float]:
@@ -118,8 +153,13 @@ class LayoutCalculator:
     
     @staticmethod
     def calculate_key_center(key: KeyDefinition) -> Tuple[float, float]:
-        """Calculate the center point of a key."""
-        return (key.x + key.width / 2, key.y + key.height / 2)
+        """Calculate the center point of a key, after applying its rotation."""
+        return key_center(key)
+    
+    @staticmethod
+    def calculate_key_centers(layout: UniversalLayout) -> List[Tuple[float, float]]:
+        """Calculate the center points of all keys, after applying their rotation."""
+        return layout.key_geometry().centers
     
     @staticmethod
     def find_optimal_matrix_size(keys: List[KeyDefinition]) -> Tuple[int, int]:
@@ -154,23 +194,33 @@ class LayoutTransformer:
     @staticmethod
     def normalize_positions(keys: List[KeyDefinition]) -> None:
         """Normalize key positions to start from (0, 0)."""
-        if not keys:
-            return
-        
-        min_x, min_y, _, _ = LayoutCalculator.calculate_layout_bounds(keys)
-        
-        for key in keys:
-            key.x -= min_x
-            key.y -= min_y
+        layout_arrays.normalize_positions(keys)
     
     @staticmethod
     def scale_layout(keys: List[KeyDefinition], scale_factor: float) -> None:
         """Scale the entire layout by a factor."""
-        for key in keys:
-            key.x *= scale_factor
-            key.y *= scale_factor
-            key.width *= scale_factor
-            key.height *= scale_factor
+        layout_arrays.scale_layout(keys, scale_factor)
+    
+    @staticmethod
+    def rotate_layout(keys: List[KeyDefinition], angle: float,
+                      origin_x: float = 0.0, origin_y: float = 0.0) -> None:
+        """Rotate the entire layout by angle degrees about (origin_x, origin_y)."""
+        layout_arrays.rotate_layout(keys, angle, origin_x, origin_y)
+    
+    @staticmethod
+    def transform_layouts(layouts: List[UniversalLayout], scale_factor: Optional[float] = None,
+                          angle: Optional[float] = None, normalize: bool = False) -> None:
+        """
+        Apply the same transforms to many layouts in one pass per transform.
+        
+        Scaling is applied first, then rotation about (0, 0), then normalization.
+        """
+        if scale_factor is not None:
+            layout_arrays.batch_scale_layouts(layouts, scale_factor)
+        if angle is not None:
+            layout_arrays.batch_rotate_layouts(layouts, angle)
+        if normalize:
+            layout_arrays.batch_normalize_positions(layouts, rotated=angle is not None)
     
     @staticmethod
     def auto_assign_matrix_positions(keys: List[KeyDefinition]) -> None:
@@ -0,0 +1,126 @@
+"""
+Spatial Index
+
+This module provides a uniform-grid spatial index over key outlines so that
+overlap checks only compare keys that share a grid cell instead of every pair
+of keys in the layout. Key outlines honour rotation about (rotation_x,
+rotation_y), so rotated thumb clusters are tested against their real shape
+rather than their unrotated bounding box.
+"""
+
+import math
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .universal_layout import KeyDefinition
+from .geometry import BoundingBox, LayoutGeometry, Point, Polygon
+
+
+# Tolerance used when comparing projections of rotated outlines. Keys that
+# merely touch along an edge are not considered overlapping.
+OVERLAP_EPSILON = 1e-9
+
+
+def _project(polygon: Sequence[Point], axis_x: float, axis_y: float) -> Tuple[float, float]:
+    """Project a polygon onto an axis and return the covered interval."""
+    values = [x * axis_x + y * axis_y for x, y in polygon]
+    return min(values), max(values)
+
+
+def polygons_overlap(polygon1: Sequence[Point], polygon2: Sequence[Point],
+                     epsilon: float = OVERLAP_EPSILON) -> bool:
+    """Check whether two convex polygons overlap using the separating axis theorem.
+
+    Polygons that only touch along an edge or at a corner do not overlap.
+    """
+    for polygon in (polygon1, polygon2):
+        count = len(polygon)
+        for index in range(count):
+            x1, y1 = polygon[index]
+            x2, y2 = polygon[(index + 1) % count]
+            # Edge normal; its length does not matter for a separation test
+            axis_x = y1 - y2
+            axis_y = x2 - x1
+            if axis_x == 0 and axis_y == 0:
+                continue
+
+            min1, max1 = _project(polygon1, axis_x, axis_y)
+            min2, max2 = _project(polygon2, axis_x, axis_y)
+            scale = epsilon * math.hypot(axis_x, axis_y)
+            if max1 <= min2 + scale or max2 <= min1 + scale:
+                return False
+
+    return True
+
+
+class KeySpatialIndex:
+    """Uniform grid over key bounding boxes used to find overlap candidates."""
+
+    def __init__(self, keys: Sequence[KeyDefinition], cell_size: float = 0.0,
+                 geometry: Optional[LayoutGeometry] = None):
+        """
+        Build the index.
+
+        Args:
+            keys: Keys to index, in layout order
+            cell_size: Grid cell size in key units (defaults to the mean key extent)
+            geometry: Precomputed outlines of keys (computed here if None)
+        """
+        self.keys = keys
+        if geometry is None:
+            geometry = LayoutGeometry(keys)
+        self.geometry = geometry
+        self.polygons: List[Polygon] = geometry.polygons
+        self.bounds: List[BoundingBox] = geometry.bounds
+        self.cell_size = cell_size if cell_size > 0 else self._default_cell_size()
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+        for index, box in enumerate(self.bounds):
+            for cell in self._cells_for_box(box):
+                self.cells.setdefault(cell, []).append(index)
+
+    def _default_cell_size(self) -> float:
+        """Pick a cell size close to the typical key footprint."""
+        if not self.bounds:
+            return 1.0
+
+        total = 0.0
+        for min_x, min_y, max_x, max_y in self.bounds:
+            total += max(max_x - min_x, max_y - min_y)
+        return max(total / len(self.bounds), 0.25)
+
+    def _cells_for_box(self, box: BoundingBox) -> Iterator[Tuple[int, int]]:
+        """Yield every grid cell touched by a bounding box."""
+        min_x, min_y, max_x, max_y = box
+        size = self.cell_size
+        for cell_x in range(math.floor(min_x / size), math.floor(max_x / size) + 1):
+            for cell_y in range(math.floor(min_y / size), math.floor(max_y / size) + 1):
+                yield (cell_x, cell_y)
+
+    def candidate_pairs(self) -> List[Tuple[int, int]]:
+        """Return index pairs (i < j) whose bounding boxes share a cell, sorted."""
+        pairs = set()
+        for members in self.cells.values():
+            if len(members) < 2:
+                continue
+            for position, first in enumerate(members):
+                for second in members[position + 1:]:
+                    pairs.add((first, second) if first < second else (second, first))
+        return sorted(pairs)
+
+    def overlapping_pairs(self) -> List[Tuple[int, int]]:
+        """Return index pairs (i < j) of keys whose outlines overlap, in layout order."""
+        return [pair for pair in self.candidate_pairs() if self.keys_overlap(*pair)]
+
+    def keys_overlap(self, first: int, second: int) -> bool:
+        """Check whether two indexed keys overlap."""
+        box1 = self.bounds[first]
+        box2 = self.bounds[second]
+        # Separated or merely touching bounding boxes never overlap
+        if (box1[0] >= box2[2] or box2[0] >= box1[2] or
+                box1[1] >= box2[3] or box2[1] >= box1[3]):
+            return False
+
+        # For axis-aligned keys the bounding box test is exact
+        if not self.geometry.is_rotated(first) and not self.geometry.is_rotated(second):
+            return True
+        return polygons_overlap(self.polygons[first], self.polygons[second])
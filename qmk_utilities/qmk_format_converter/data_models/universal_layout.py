@@ -13,6 +13,10 @@ The design philosophy is to create a comprehensive data model that can represent
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Union, Any
 from enum import Enum
+from operator import attrgetter
+
+from .layout_index import AttributeIndex, matrix_position
+from .keycode_list import KeycodeList
 
 
 class KeySize(Enum):
@@ -87,7 +91,7 @@ class LayerDefinition:
     """
     name: str                           # Layer name (e.g., "QWERTY", "LOWER")
     index: int                          # Layer index (0-based)
-    keycodes: List[str] = field(default_factory=list)  # Keycode for each key position
+    keycodes: List[str] = field(default_factory=list)  # Keycode for each key position (stored as KeycodeList)
     description: str = ""               # Layer description
     is_default: bool = False            # Is this the default layer?
     
@@ -99,6 +103,12 @@ class LayerDefinition:
         """Validate layer data after initialization."""
         if not self.name:
             self.name = f"Layer_{self.index}"
+    
+    def __setattr__(self, name, value):
+        # Keycodes are always held in sparse storage, however they are assigned
+        if name == 'keycodes' and not isinstance(value, KeycodeList):
+            value = KeycodeList(value if value is not None else ())
+        super().__setattr__(name, value)
 
 
 @dataclass
@@ -140,6 +150,17 @@ class UniversalLayout:
     qmk_metadata: Dict[str, Any] = field(default_factory=dict)    # QMK-specific data
     qmk_configurator_metadata: Dict[str, Any] = field(default_factory=dict)  # QMK Configurator-specific data
     
+    # Cached key outlines (see geometry.layout_geometry)
+    _key_geometry: Any = field(default=None, init=False, repr=False, compare=False)
+    
+    # Lookup indexes over keys and layers (see layout_index.AttributeIndex)
+    _matrix_index: AttributeIndex = field(default_factory=lambda: AttributeIndex(matrix_position),
+                                          init=False, repr=False, compare=False)
+    _layer_name_index: AttributeIndex = field(default_factory=lambda: AttributeIndex(attrgetter('name')),
+                                              init=False, repr=False, compare=False)
+    _layer_number_index: AttributeIndex = field(default_factory=lambda: AttributeIndex(attrgetter('index')),
+                                                init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         """Validate and set up the layout after initialization."""
         # Ensure we have at least empty collections
@@ -179,9 +200,34 @@ class UniversalLayout:
         self.matrix_rows = max_row + 1 if max_row > 0 else len(self.keys) // 10 + 1
         self.matrix_cols = max_col + 1 if max_col > 0 else 10
     
+    def use_columnar_keys(self) -> None:
+        """
+        Switch key storage to compact typed arrays.
+
+        Existing keys are copied into a ColumnarKeys store. Keys are then
+        accessed through views that expose the KeyDefinition attributes, so
+        callers must re-read keys from ``layout.keys`` after adding them.
+        """
+        from .columnar_layout import ColumnarKeys
+
+        if not isinstance(self.keys, ColumnarKeys):
+            self.keys = ColumnarKeys(self.keys)
+
+    def key_geometry(self):
+        """
+        Return the absolute outlines and centers of all keys.
+
+        The result is cached on the layout and refreshed for keys that were
+        added, removed or moved since the last call.
+        """
+        from .geometry import layout_geometry
+
+        return layout_geometry(self)
+
     def add_key(self, key: KeyDefinition) -> None:
         """Add a key to the layout."""
         self.keys.append(key)
+        self._matrix_index.appended(self.keys)
         
         # Update layer keycodes to match new key count
         for layer in self.layers:
@@ -197,6 +243,8 @@ class UniversalLayout:
             layer.keycodes = layer.keycodes[:len(self.keys)]
             
         self.layers.append(layer)
+        self._layer_name_index.appended(self.layers)
+        self._layer_number_index.appended(self.layers)
     
     def get_key_count(self) -> int:
         """Get the total number of keys in the layout."""
@@ -208,17 +256,34 @@ class UniversalLayout:
     
     def get_layer_by_name(self, name: str) -> Optional[LayerDefinition]:
         """Get a layer by its name."""
-        for layer in self.layers:
-            if layer.name == name:
-                return layer
-        return None
+        position = self._layer_name_index.find(self.layers, name)
+        return self.layers[position] if position is not None else None
     
     def get_layer_by_index(self, index: int) -> Optional[LayerDefinition]:
         """Get a layer by its index."""
-        for layer in self.layers:
-            if layer.index == index:
-                return layer
-        return None
+        position = self._layer_number_index.find(self.layers, index)
+        return self.layers[position] if position is not None else None
+    
+    def get_key_position_at(self, matrix_row: int, matrix_col: int) -> Optional[int]:
+        """Get the position in keys of the key wired at a matrix position."""
+        return self._matrix_index.find(self.keys, (matrix_row, matrix_col))
+    
+    def get_key_at(self, matrix_row: int, matrix_col: int) -> Optional[KeyDefinition]:
+        """Get the key wired at a matrix position."""
+        position = self._matrix_index.find(self.keys, (matrix_row, matrix_col))
+        return self.keys[position] if position is not None else None
+    
+    def invalidate_indexes(self) -> None:
+        """
+        Drop the matrix and layer lookup indexes.
+        
+        Adding, removing or replacing keys and layers is picked up
+        automatically; call this after changing the matrix position, name or
+        index of an existing key or layer in place.
+        """
+        self._matrix_index.invalidate()
+        self._layer_name_index.invalidate()
+        self._layer_number_index.invalidate()
     
     def validate(self) -> List[str]:
         """
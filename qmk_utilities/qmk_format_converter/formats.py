@@ -0,0 +1,79 @@
+"""
+Supported Formats
+
+The formats the converter reads and writes, the names they are given on the
+command line and in server requests, and the descriptions shown by the CLI.
+Kept free of converter imports so `--list-formats` and `--info` answer
+without loading the converter.
+"""
+
+from enum import Enum
+
+
+class SupportedFormat(Enum):
+    """Supported keyboard layout formats."""
+    KLE = "kle"
+    VIA = "via"
+    KEYMAP = "keymap"
+    QMK_CONFIGURATOR = "qmk_configurator"
+
+
+# Format name -> one-line description
+FORMAT_DESCRIPTIONS = {
+    "kle": "Keyboard Layout Editor JSON format (keyboard-layout-editor.com)",
+    "via": "VIA keymap JSON specification format (caniusevia.com)",
+    "keymap": "QMK keymap.c source file format",
+    "qmk_configurator": "QMK Configurator JSON format (config.qmk.fm)"
+}
+
+FORMAT_INFO = {
+    SupportedFormat.KLE: {
+        "name": "Keyboard Layout Editor",
+        "extension": ".json",
+        "description": "Visual keyboard layout format from keyboard-layout-editor.com",
+        "features": ["Physical layout", "Key positioning", "Visual styling", "Key labels"],
+        "url": "https://keyboard-layout-editor.com"
+    },
+    SupportedFormat.VIA: {
+        "name": "VIA Keymap Format",
+        "extension": ".json",
+        "description": "VIA/VIAL keymap specification format",
+        "features": ["Keymap layers", "Keyboard metadata", "Matrix definitions", "Feature flags"],
+        "url": "https://caniusevia.com/docs/specification"
+    },
+    SupportedFormat.KEYMAP: {
+        "name": "QMK Keymap Source",
+        "extension": ".c",
+        "description": "QMK firmware keymap source code",
+        "features": ["Layer definitions", "Custom functions", "Compile-ready code", "QMK macros"],
+        "url": "https://docs.qmk.fm"
+    },
+    SupportedFormat.QMK_CONFIGURATOR: {
+        "name": "QMK Configurator",
+        "extension": ".json",
+        "description": "QMK Configurator JSON format from config.qmk.fm",
+        "features": ["Flat layer arrays", "Keyboard metadata", "Direct QMK compatibility", "Web editor export"],
+        "url": "https://config.qmk.fm"
+    }
+}
+
+# Accepted format names (case-insensitive) -> format
+FORMAT_NAMES = {
+    'kle': SupportedFormat.KLE,
+    'via': SupportedFormat.VIA,
+    'keymap': SupportedFormat.KEYMAP,
+    'keymap.c': SupportedFormat.KEYMAP,
+    'c': SupportedFormat.KEYMAP,
+    'qmk_configurator': SupportedFormat.QMK_CONFIGURATOR,
+    'qmk-configurator': SupportedFormat.QMK_CONFIGURATOR,
+    'configurator': SupportedFormat.QMK_CONFIGURATOR
+}
+
+
+def format_from_string(format_str: str) -> SupportedFormat:
+    """Convert string to SupportedFormat enum."""
+    format_str = format_str.lower()
+    if format_str not in FORMAT_NAMES:
+        raise ValueError(f"Unsupported format: {format_str}")
+    
+    return FORMAT_NAMES[format_str]
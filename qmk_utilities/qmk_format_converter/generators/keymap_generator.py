@@ -5,13 +5,26 @@ This module implements generation of QMK keymap.c files
 from the universal layout data model.
 """
 
+import hashlib
+import os
 import re
 import sys
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Union, Optional, Tuple
-from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
-from data_models.keycode_mappings import KEYCODE_MAPPER
+
+# Handle both standalone and module execution
+try:
+    from ..data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from ..data_models.keycode_mappings import KEYCODE_MAPPER
+    from ..data_models.layout_index import group_keys_by_row
+except ImportError:
+    # Running as standalone script
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from data_models.keycode_mappings import KEYCODE_MAPPER
+    from data_models.layout_index import group_keys_by_row
 
 # Import the existing ASCII keymap generator
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "ascii_keymap_gen"))
@@ -28,6 +41,80 @@ class KeymapGenerateError(Exception):
     pass
 
 
+@dataclass
+class KeymapPlacement:
+    """Per-layout formatting plan shared by every layer of a keymap."""
+    layout_macro: str                        # LAYOUT macro name
+    key_count: int                           # Keycodes per layer
+    rows: List[List[int]]                    # Key positions on each keycode line
+    fallback_comment: str                    # 'split', 'standard' or 'title'
+    ascii_layout: Any = None                 # Lily58 LayoutConfig of the ASCII generator, if available
+    ascii_cells: Dict[str, str] = field(default_factory=dict)  # Formatted ASCII cell per keycode
+
+
+# ASCII generator per working directory, with the layout and template files it was loaded from
+_ascii_parsers: Dict[str, Tuple[Tuple, Any]] = {}
+
+
+def _ascii_sources(working_dir: str) -> Tuple:
+    """(directory, name, mtime, size) of every layout and template file the ASCII generator reads."""
+    sources = []
+    for directory in ('layouts', 'templates'):
+        try:
+            with os.scandir(os.path.join(working_dir, directory)) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        sources.append((directory, entry.name, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            continue
+    return tuple(sorted(sources))
+
+
+def _load_ascii_parser(working_dir: str):
+    """
+    Load the ASCII generator's layouts, which are relative to the working directory.
+    
+    The loaded generator is reused until a layout or template file is added,
+    removed or modified, so long-running --serve and --watch processes pick
+    up edits on the next conversion.
+    """
+    sources = _ascii_sources(working_dir)
+    cached = _ascii_parsers.get(working_dir)
+    if cached is not None and cached[0] == sources:
+        return cached[1]
+    parser = ModularKeymapParser()
+    _ascii_parsers[working_dir] = (sources, parser)
+    return parser
+
+
+def keymap_cache_context() -> str:
+    """
+    Hash the keymap.c inputs that are not part of the layout.
+    
+    The header carries the current year, and Lily58 keymaps are drawn with the
+    ASCII layouts and templates of the working directory, so cached keymap.c
+    output is only valid for the same year and the same ASCII files.
+    """
+    digest = hashlib.sha256(str(datetime.now().year).encode('utf-8'))
+    if ModularKeymapParser is not None:
+        working_dir = os.getcwd()
+        for directory, name, _, _ in _ascii_sources(working_dir):
+            try:
+                with open(os.path.join(working_dir, directory, name), 'rb') as f:
+                    content = f.read()
+            except OSError:
+                continue
+            digest.update(f"\0{directory}\0{name}\0".encode('utf-8'))
+            digest.update(content)
+    return digest.hexdigest()
+
+
+def clear_ascii_parser_cache() -> None:
+    """Forget every loaded ASCII generator, so the next keymap reloads its layouts."""
+    _ascii_parsers.clear()
+
+
 class KeymapGenerator:
     """
     Generator for QMK keymap.c files.
@@ -133,72 +220,100 @@ class KeymapGenerator:
         """Generate the main keymaps array."""
         layout_macro = layout.layout_name or "LAYOUT"
         
-        # Start the keymaps array
-        content = f"const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {{\n"
+        # Row placement and comment style depend only on the keys, so work them out once
+        placement = self._plan_placement(layout.keys, layout_macro, layout.layers)
         
-        # Generate each layer
-        for i, layer in enumerate(layout.layers):
-            content += self._generate_layer(layer, layout_macro, layout.keys)
-            if i < len(layout.layers) - 1:
-                content += ",\n\n"
-            else:
-                content += "\n"
+        return ("const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {\n"
+                + ",\n\n".join(self._render_layer(placement, layer) for layer in layout.layers)
+                + "\n};")
+    
+    def _plan_placement(self, keys: List[KeyDefinition], layout_macro: str,
+                        layers: List[LayerDefinition]) -> KeymapPlacement:
+        """Work out the formatting shared by every layer of a layout."""
+        if self._is_split_keyboard(keys):
+            fallback_comment = 'split'
+        elif len(keys) <= 70:  # Assume 60% or smaller
+            fallback_comment = 'standard'
+        else:
+            fallback_comment = 'title'
+        
+        placement = KeymapPlacement(layout_macro=layout_macro, key_count=len(keys),
+                                    rows=self._key_rows(keys), fallback_comment=fallback_comment)
         
-        content += "};"
-        return content
+        # Try to use the existing ASCII keymap generator if available
+        if ModularKeymapParser and len(keys) == 58:  # Lily58
+            try:
+                ascii_parser = _load_ascii_parser(os.getcwd())
+                
+                # Get the Lily58 layout configuration
+                lily58_config = ascii_parser.layouts.get('lily58')
+                if lily58_config:
+                    # Label each distinct keycode once for all layers
+                    keycodes = set()
+                    for layer in layers:
+                        keycodes.update(layer.keycodes)
+                    placement.ascii_cells = {
+                        keycode: ascii_parser.format_key_for_ascii(ascii_parser.keycode_to_label(keycode))
+                        for keycode in keycodes
+                    }
+                    placement.ascii_layout = lily58_config
+            except Exception:
+                # Fall back to built-in generation if ASCII generator fails
+                placement.ascii_layout = None
+        
+        return placement
     
-    def _generate_layer(self, layer: LayerDefinition, layout_macro: str, keys: List[KeyDefinition]) -> str:
-        """Generate a single layer definition."""
+    def _key_rows(self, keys: List[KeyDefinition]) -> List[List[int]]:
+        """Key positions on each keycode line of a layer."""
+        # For split keyboards like Lily58, preserve the original key order from KLE file
+        # since it matches the expected QMK LAYOUT macro parameter order
+        if len(keys) == 58:  # Lily58 specific formatting
+            # Top four rows of 12 keys, then the thumb cluster of 10
+            return [list(range(start, start + count))
+                    for start, count in ((0, 12), (12, 12), (24, 12), (36, 12), (48, 10))]
+        
+        # For other keyboards, rows by Y coordinate, keys within rows by X coordinate
+        return group_keys_by_row(keys)
+    
+    def _render_layer(self, placement: KeymapPlacement, layer: LayerDefinition) -> str:
+        """Render a single layer definition."""
+        index, name, keycodes = layer.index, layer.name, layer.keycodes
+        
         # Add layer comment
-        layer_comment = self._generate_layer_comment(layer, keys)
-        content = layer_comment + "\n" if layer_comment else ""
+        layer_comment = self._generate_layer_comment(placement, index, name, keycodes)
+        parts = [layer_comment, "\n"] if layer_comment else []
         
         # Start layer definition
-        content += f"    [{layer.index}] = {layout_macro}(\n"
+        parts.append(f"    [{index}] = {placement.layout_macro}(\n")
         
         # Generate keycode layout
-        keycode_layout = self._generate_keycode_layout(layer.keycodes, keys)
-        content += keycode_layout
+        parts.append(self._generate_keycode_layout(placement, keycodes))
         
-        content += "    )"
-        return content
+        parts.append("    )")
+        return "".join(parts)
     
-    def _generate_layer_comment(self, layer: LayerDefinition, keys: List[KeyDefinition]) -> str:
+    def _generate_layer_comment(self, placement: KeymapPlacement, index: int, name: str,
+                                keycodes: List[str]) -> str:
         """Generate ASCII art comment for a layer using existing ASCII generator."""
-        layer_name = layer.name
-        if layer.index == 0:
+        layer_name = name
+        if index == 0:
             layer_name = "Base Layer"
-        elif layer.index == 1:
+        elif index == 1:
             layer_name = "Function Layer"
         
-        # Try to use the existing ASCII keymap generator if available
-        if ModularKeymapParser and len(keys) == 58:  # Lily58
+        if placement.ascii_layout is not None:
             try:
-                # Create a parser instance to access layout detection
-                ascii_parser = ModularKeymapParser()
-                
-                # Get the Lily58 layout configuration
-                lily58_config = ascii_parser.layouts.get('lily58')
-                if lily58_config:
-                    # Convert our keycodes to the format expected by ASCII generator
-                    keycode_labels = []
-                    for keycode in layer.keycodes:
-                        label = ascii_parser.keycode_to_label(keycode)
-                        keycode_labels.append(label)
-                    
-                    # Generate ASCII using the proper template
-                    return lily58_config.template.format(
-                        layer_name=layer_name,
-                        **{f'k{i}': ascii_parser.format_key_for_ascii(kc) for i, kc in enumerate(keycode_labels)}
-                    )
+                # Generate ASCII using the proper template
+                cells = placement.ascii_cells
+                return placement.ascii_layout.render(layer_name, [cells[keycode] for keycode in keycodes])
             except Exception:
-                # Fall back to built-in generation if ASCII generator fails
+                # Fall back to built-in generation if the template does not fit
                 pass
         
         # Fallback to built-in ASCII generation
-        if self._is_split_keyboard(keys):
-            return self._generate_split_keyboard_comment(layer_name, keys)
-        elif len(keys) <= 70:  # Assume 60% or smaller
+        if placement.fallback_comment == 'split':
+            return self._generate_split_keyboard_comment(layer_name, placement.key_count)
+        elif placement.fallback_comment == 'standard':
             return self._generate_standard_keyboard_comment(layer_name)
         else:
             return f"    /* {layer_name} */"
@@ -225,9 +340,9 @@ class KeymapGenerator:
         # If there's a significant gap (>2 units), likely a split keyboard
         return max_gap > 2.0
     
-    def _generate_split_keyboard_comment(self, layer_name: str, keys: List[KeyDefinition]) -> str:
+    def _generate_split_keyboard_comment(self, layer_name: str, key_count: int) -> str:
         """Generate ASCII art for split keyboards."""
-        if len(keys) == 58:  # Lily58
+        if key_count == 58:  # Lily58
             return f"""    /* {layer_name}
      * ,-----------------------------------------.                    ,-----------------------------------------.
      * |      |      |      |      |      |      |                    |      |      |      |      |      |      |
@@ -268,92 +383,17 @@ class KeymapGenerator:
      * └────┴────┴────┴────────────────────────┴────┴────┴────┴────┘
      */"""
     
-    def _generate_keycode_layout(self, keycodes: List[str], keys: List[KeyDefinition]) -> str:
+    def _generate_keycode_layout(self, placement: KeymapPlacement, keycodes: List[str]) -> str:
         """Generate formatted keycode layout."""
-        if len(keycodes) != len(keys):
+        if len(keycodes) != placement.key_count:
             # Pad or truncate to match key count
-            if len(keycodes) < len(keys):
-                keycodes = keycodes + ['KC_TRNS'] * (len(keys) - len(keycodes))
-            else:
-                keycodes = keycodes[:len(keys)]
-        
-        # For split keyboards like Lily58, preserve the original key order from KLE file
-        # since it matches the expected QMK LAYOUT macro parameter order
-        if len(keys) == 58:  # Lily58 specific formatting
-            return self._format_lily58_keycodes(keycodes)
-        
-        # For other keyboards, use row-based organization
-        rows = self._organize_keys_into_rows(keys, keycodes)
-        
-        content = ""
-        for i, row in enumerate(rows):
-            content += "        "  # Indent
-            content += ", ".join(f"{kc:<8}" for kc in row)
-            if i < len(rows) - 1:
-                content += ",\n"
+            if len(keycodes) < placement.key_count:
+                keycodes = keycodes + ['KC_TRNS'] * (placement.key_count - len(keycodes))
             else:
-                content += "\n"
+                keycodes = keycodes[:placement.key_count]
         
-        return content
-    
-    def _format_lily58_keycodes(self, keycodes: List[str]) -> str:
-        """Format keycodes specifically for Lily58 layout."""
-        # Lily58 has 58 keys, format them in logical groups
-        # Based on the QMK Lily58 keymap structure
-        content = ""
-        
-        # Format in groups of keys for readability
-        keys_per_line = [
-            # Top row (12 keys)
-            12,
-            # Second row (12 keys) 
-            12,
-            # Third row (12 keys)
-            12,
-            # Fourth row (12 keys)
-            12,
-            # Thumb cluster (10 keys)
-            10
-        ]
-        
-        idx = 0
-        for i, line_count in enumerate(keys_per_line):
-            content += "        "  # Indent
-            line_keys = []
-            for j in range(line_count):
-                if idx < len(keycodes):
-                    line_keys.append(f"{keycodes[idx]:<8}")
-                    idx += 1
-                else:
-                    line_keys.append(f"{'KC_TRNS':<8}")
-            
-            content += ", ".join(line_keys)
-            if i < len(keys_per_line) - 1:
-                content += ",\n"
-            else:
-                content += "\n"
-        
-        return content
-    
-    def _organize_keys_into_rows(self, keys: List[KeyDefinition], keycodes: List[str]) -> List[List[str]]:
-        """Organize keys and keycodes into rows for formatting."""
-        # Group keys by Y coordinate (row)
-        rows_dict = {}
-        for i, key in enumerate(keys):
-            row_y = key.y
-            if row_y not in rows_dict:
-                rows_dict[row_y] = []
-            keycode = keycodes[i] if i < len(keycodes) else 'KC_TRNS'
-            rows_dict[row_y].append((key.x, keycode))
-        
-        # Sort rows and keys within rows
-        rows = []
-        for y in sorted(rows_dict.keys()):
-            row_data = sorted(rows_dict[y], key=lambda item: item[0])  # Sort by X
-            row_keycodes = [item[1] for item in row_data]
-            rows.append(row_keycodes)
-        
-        return rows
+        lines = ["        " + ", ".join(f"{keycodes[i]:<8}" for i in row) for row in placement.rows]
+        return ",\n".join(lines) + "\n" if lines else ""
     
     def _generate_optional_functions(self) -> str:
         """Generate optional function templates."""
@@ -7,8 +7,22 @@ from the universal layout data model.
 
 import json
 from typing import Dict, List, Any, Union, Optional, Tuple
-from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
-from data_models.keycode_mappings import KEYCODE_MAPPER
+
+# Handle both standalone and module execution
+try:
+    from ..data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from ..data_models.keycode_mappings import KEYCODE_MAPPER
+    from ..data_models.layout_index import group_keys_by_row
+    from ..data_models.geometry import LayoutGeometry
+except ImportError:
+    # Running as standalone script
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from data_models.keycode_mappings import KEYCODE_MAPPER
+    from data_models.layout_index import group_keys_by_row
+    from data_models.geometry import LayoutGeometry
 
 
 class KLEGenerateError(Exception):
@@ -80,7 +94,7 @@ class KLEGenerator:
             kle_data.append(metadata)
         
         # Generate layout rows
-        rows = self._generate_layout_rows(layout.keys)
+        rows = self._generate_layout_rows(layout.keys, layout.key_geometry())
         kle_data.extend(rows)
         
         return kle_data
@@ -123,24 +137,44 @@ class KLEGenerator:
         
         return metadata if metadata else None
     
-    def _generate_layout_rows(self, keys: List[KeyDefinition]) -> List[List[Union[str, Dict[str, Any]]]]:
-        """Generate layout rows from keys."""
+    def _generate_layout_rows(self, keys: List[KeyDefinition],
+                              geometry: Optional[LayoutGeometry] = None) -> List[List[Union[str, Dict[str, Any]]]]:
+        """
+        Generate layout rows from keys.
+        
+        Keys are grouped into rows per rotation cluster (same angle and
+        origin) instead of sharing rows with unrotated keys at the same Y.
+        Clusters follow the unrotated rows, ordered left to right by where
+        their keys are drawn. Positions are written the way KLE reads them:
+        a row starts one unit below the previous one at the rotation origin's
+        X, a new rotation origin moves the position to that origin, and x/y
+        offsets cover any remaining difference.
+        """
         if not keys:
             return []
+        if geometry is None:
+            geometry = LayoutGeometry(keys)
+        
+        def cluster_of(key):
+            return (key.rotation_angle or 0.0, key.rotation_x or 0.0, key.rotation_y or 0.0)
+        
+        # Order rotation clusters by the mean drawn center of their keys
+        cluster_centers = {}
+        for index, key in enumerate(keys):
+            cluster = cluster_of(key)
+            if cluster != (0.0, 0.0, 0.0):
+                cluster_centers.setdefault(cluster, []).append(geometry.centers[index])
         
-        # Group keys by Y coordinate (row)
-        rows_dict = {}
-        for key in keys:
-            row_y = key.y
-            if row_y not in rows_dict:
-                rows_dict[row_y] = []
-            rows_dict[row_y].append(key)
+        cluster_order = {(0.0, 0.0, 0.0): (0,)}
+        for cluster, centers in cluster_centers.items():
+            cluster_order[cluster] = (1, sum(center[0] for center in centers) / len(centers),
+                                      sum(center[1] for center in centers) / len(centers)) + cluster
         
-        # Sort rows by Y coordinate and keys within rows by X coordinate
-        sorted_rows = []
-        for y in sorted(rows_dict.keys()):
-            row_keys = sorted(rows_dict[y], key=lambda k: k.x)
-            sorted_rows.append(row_keys)
+        def row_of(key):
+            return (cluster_order[cluster_of(key)], key.y)
+        
+        # Group keys by rotation cluster and Y coordinate (row), sorted by X coordinate within rows
+        sorted_rows = [[keys[i] for i in row] for row in group_keys_by_row(keys, row_of)]
         
         # Generate KLE format for each row
         kle_rows = []
@@ -148,6 +182,9 @@ class KLEGenerator:
             kle_row = self._generate_kle_row(row_keys)
             if kle_row:  # Only add non-empty rows
                 kle_rows.append(kle_row)
+            # The next row starts one unit down, at the rotation origin's X
+            self.current_x = self.current_props['rx']
+            self.current_y += 1.0
         
         return kle_rows
     
@@ -157,11 +194,9 @@ class KLEGenerator:
             return []
         
         kle_row = []
-        expected_x = row_keys[0].x
-        
-        for key in row_keys:
+        for index, key in enumerate(row_keys):
             # Add positioning and formatting properties if needed
-            props = self._get_key_properties(key, expected_x)
+            props = self._get_key_properties(key, first_in_row=index == 0)
             if props:
                 kle_row.append(props)
             
@@ -169,19 +204,43 @@ class KLEGenerator:
             label = self._get_key_label(key)
             kle_row.append(label)
             
-            # Update expected X position
-            expected_x = key.x + key.width
+            # The next key follows this one, at the width as written
+            self.current_x += props['w'] if props and 'w' in props else 1.0
         
         return kle_row
     
-    def _get_key_properties(self, key: KeyDefinition, expected_x: float) -> Optional[Dict[str, Any]]:
-        """Get key properties that differ from defaults."""
+    def _get_key_properties(self, key: KeyDefinition, first_in_row: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get key properties that differ from the current state.
+        
+        Args:
+            key: Key to write
+            first_in_row: Whether the key starts a row; KLE only reads
+                rotation changes there
+        """
         props = {}
         
-        # X offset (only if different from expected position)
-        x_offset = key.x - expected_x
-        if abs(x_offset) > 0.001:  # Floating point tolerance
-            props['x'] = round(x_offset, 3)
+        # Rotation properties; a new origin moves the position to it
+        if first_in_row:
+            angle = round(key.rotation_angle or 0.0, 3)
+            origin = (round(key.rotation_x or 0.0, 3), round(key.rotation_y or 0.0, 3))
+            if angle != self.current_props['r']:
+                props['r'] = angle
+                self.current_props['r'] = angle
+            if origin != (self.current_props['rx'], self.current_props['ry']):
+                props['rx'], props['ry'] = origin
+                self.current_props['rx'], self.current_props['ry'] = origin
+                self.current_x, self.current_y = origin
+        
+        # Position offsets, tracked as written so rounding does not accumulate
+        y_offset = round(key.y - self.current_y, 3)
+        if abs(y_offset) > 0.001:  # Floating point tolerance
+            props['y'] = y_offset
+            self.current_y += y_offset
+        x_offset = round(key.x - self.current_x, 3)
+        if abs(x_offset) > 0.001:
+            props['x'] = x_offset
+            self.current_x += x_offset
         
         # Width (only if not 1.0)
         if abs(key.width - 1.0) > 0.001:
@@ -191,14 +250,6 @@ class KLEGenerator:
         if abs(key.height - 1.0) > 0.001:
             props['h'] = round(key.height, 3)
         
-        # Rotation properties
-        if abs(key.rotation_angle) > 0.001:
-            props['r'] = round(key.rotation_angle, 1)
-        if abs(key.rotation_x) > 0.001:
-            props['rx'] = round(key.rotation_x, 3)
-        if abs(key.rotation_y) > 0.001:
-            props['ry'] = round(key.rotation_y, 3)
-        
         # Color properties
         if key.color and key.color != '#cccccc':
             props['c'] = key.color
@@ -7,7 +7,16 @@ QMK Configurator format is used by config.qmk.fm and contains layers as flat arr
 
 import json
 from typing import Dict, List, Any, Optional
-from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+
+# Handle both standalone and module execution
+try:
+    from ..data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+except ImportError:
+    # Running as standalone script
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
 
 
 class QMKConfiguratorGenerateError(Exception):
@@ -12,6 +12,7 @@ from typing import Dict, List, Any, Union, Optional, Tuple
 try:
     from ..data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
     from ..data_models.keycode_mappings import KEYCODE_MAPPER
+    from ..data_models.layout_index import group_keys_by_row
 except ImportError:
     # Running as standalone script
     import sys
@@ -19,6 +20,7 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
     from data_models.keycode_mappings import KEYCODE_MAPPER
+    from data_models.layout_index import group_keys_by_row
 
 
 class VIAGenerateError(Exception):
@@ -128,19 +130,11 @@ class VIAGenerator:
     
     def _generate_layout(self, via_data: Dict[str, Any], layout: UniversalLayout):
         """Generate physical layout structure."""
-        # Group keys by Y coordinate (row)
-        rows_dict = {}
-        for key in layout.keys:
-            row_y = key.y
-            if row_y not in rows_dict:
-                rows_dict[row_y] = []
-            rows_dict[row_y].append(key)
-        
-        # Sort rows by Y coordinate and keys within rows by X coordinate
+        # Group keys into rows by Y coordinate, sorted by X coordinate within rows
+        keys = layout.keys
         keymap_layout = []
-        for y in sorted(rows_dict.keys()):
-            row_keys = sorted(rows_dict[y], key=lambda k: k.x)
-            via_row = self._generate_via_row(row_keys)
+        for row in group_keys_by_row(keys):
+            via_row = self._generate_via_row([keys[i] for i in row])
             keymap_layout.append(via_row)
         
         via_data['layouts'] = {
@@ -0,0 +1,134 @@
+"""
+C Tokenizer
+
+This module implements a small, linear tokenizer for the subset of C found in
+QMK keymap.c files. A single master regular expression splits the source into
+comments, string and character literals, preprocessor lines, identifiers,
+numbers and punctuation, so parsers can walk the token stream once instead of
+running several regex passes over the whole file.
+"""
+
+import re
+import string
+from typing import List, NamedTuple, Optional, Tuple
+
+
+# Token kinds
+PREPROCESSOR = 'preprocessor'
+BLOCK_COMMENT = 'block_comment'
+LINE_COMMENT = 'line_comment'
+STRING = 'string'
+CHAR = 'char'
+NUMBER = 'number'
+IDENTIFIER = 'identifier'
+PUNCT = 'punct'
+
+COMMENT_KINDS = frozenset((BLOCK_COMMENT, LINE_COMMENT))
+
+# Every match is one token with the whitespace in front of it. A '#' outside
+# comments and literals can only start a directive in valid C (the '#' and '##'
+# operators live inside #define lines), so directives need no line anchoring.
+# The most frequent tokens are tried first.
+_TOKEN_PATTERN = re.compile(r'''
+    (\s*)
+    (
+      [A-Za-z_]\w*                                  # identifier
+    | [,()\[\]{};]                                  # single-character punctuation
+    | \.?[0-9](?:[eEpP][+-]|[\w.])*                 # number
+    | /\*.*?(?:\*/|\Z)                              # block comment
+    | //(?:\\\r?\n|[^\n])*                          # line comment
+    | "(?:\\.|[^"\\\n])*"?                          # string
+    | '(?:\\.|[^'\\\n])*'?                          # character
+    | \#(?:\\\r?\n|[^\n])*                          # preprocessor
+    | ->|\+\+|--|<<=?|>>=?|&&|\|\||[<>=!&|^+\-*/%]=|\.\.\.|\S  # other punctuation
+    )
+''', re.VERBOSE | re.DOTALL)
+
+# Token kind by first character; None marks characters that need a second look
+_KIND_BY_FIRST_CHAR = dict.fromkeys(string.ascii_letters + '_', IDENTIFIER)
+_KIND_BY_FIRST_CHAR.update(dict.fromkeys(string.digits, NUMBER))
+_KIND_BY_FIRST_CHAR.update({'"': STRING, "'": CHAR, '#': PREPROCESSOR, '/': None, '.': None})
+
+_DEFINE_PATTERN = re.compile(r'[ \t]*#[ \t]*define[ \t]+([A-Za-z_]\w*)(?![\w(])[ \t]*(.*)', re.DOTALL)
+_INCLUDE_PATTERN = re.compile(r'[ \t]*#[ \t]*include[ \t]*(.*)', re.DOTALL)
+
+
+class Token(NamedTuple):
+    """A single source token."""
+    kind: str       # One of the token kind constants
+    text: str       # Source text of the token
+    space: str      # Whitespace that preceded the token in the source
+
+
+def tokenize(content: str) -> List[Token]:
+    """
+    Split C source into tokens.
+
+    Unterminated comments and literals extend to the end of the line (or file
+    for block comments) rather than raising, so malformed input still yields a
+    complete token stream.
+    """
+    new_token = tuple.__new__
+    kind_of = _KIND_BY_FIRST_CHAR.get
+    return [new_token(Token, (kind_of(text[0], PUNCT) or _second_look(text), text, space))
+            for space, text in _TOKEN_PATTERN.findall(content)]
+
+
+def _second_look(text: str) -> str:
+    """Classify tokens starting with '/' or '.'."""
+    if text.startswith('/*'):
+        return BLOCK_COMMENT
+    if text.startswith('//'):
+        return LINE_COMMENT
+    if text[0] == '.' and len(text) > 1 and text[1].isdigit():
+        return NUMBER
+    return PUNCT
+
+
+def parse_define(token: Token) -> Optional[Tuple[str, str]]:
+    """
+    Return (name, value) for an object-like ``#define`` line, else None.
+
+    Line continuations are joined and comments removed from the value.
+    """
+    match = _DEFINE_PATTERN.match(token.text)
+    if not match:
+        return None
+    value = match.group(2).replace('\\\r\n', ' ').replace('\\\n', ' ')
+    tokens = [part for part in tokenize(value) if part.kind not in COMMENT_KINDS]
+    return match.group(1), join_tokens(tokens)
+
+
+def parse_include(token: Token) -> Optional[str]:
+    """Return the target of an ``#include`` line (with quotes or brackets), else None."""
+    match = _INCLUDE_PATTERN.match(token.text)
+    return match.group(1).strip() if match else None
+
+
+def parse_int(text: str) -> Optional[int]:
+    """Parse a C integer literal (decimal, hex, octal or binary, any suffix)."""
+    literal = text.rstrip('uUlL')
+    try:
+        if len(literal) > 1 and literal[0] == '0' and literal[1].isdigit():
+            return int(literal, 8)
+        return int(literal, 0)
+    except ValueError:
+        return None
+
+
+def join_tokens(tokens: List[Token]) -> str:
+    """
+    Rebuild source text from tokens.
+
+    Tokens that were separated by whitespace in the source are joined with a
+    single space; adjacent tokens stay adjacent.
+    """
+    if len(tokens) == 1:
+        return tokens[0].text
+
+    parts = []
+    for token in tokens:
+        if token.space and parts:
+            parts.append(' ')
+        parts.append(token.text)
+    return ''.join(parts)
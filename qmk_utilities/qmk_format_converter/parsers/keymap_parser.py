@@ -2,6 +2,10 @@
 Keymap.c Parser
 
 This module implements parsing of QMK keymap.c files to the universal layout data model.
+
+The source is tokenized once by the C tokenizer; enums, #define constants,
+custom keycodes and the keymaps array are then read in a single walk over the
+tokens, with comments and strings already separated from the code.
 """
 
 import re
@@ -11,6 +15,9 @@ from typing import Dict, List, Any, Union, Optional, Tuple, Set
 try:
     from ..data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
     from ..data_models.keycode_mappings import KEYCODE_MAPPER
+    from .c_tokenizer import (Token, tokenize, parse_define, parse_include, parse_int,
+                              join_tokens, COMMENT_KINDS, BLOCK_COMMENT, IDENTIFIER,
+                              PREPROCESSOR, PUNCT)
 except ImportError:
     # Running as standalone script
     import sys
@@ -18,6 +25,62 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
     from data_models.keycode_mappings import KEYCODE_MAPPER
+    sys.path.insert(0, str(Path(__file__).parent))
+    from c_tokenizer import (Token, tokenize, parse_define, parse_include, parse_int,
+                             join_tokens, COMMENT_KINDS, BLOCK_COMMENT, IDENTIFIER,
+                             PREPROCESSOR, PUNCT)
+
+
+_OPENERS = frozenset('([{')
+_CLOSERS = frozenset(')]}')
+_NON_CODE_KINDS = COMMENT_KINDS | {PREPROCESSOR}
+
+
+def _split_group(tokens: List[Token], open_index: int) -> Tuple[List[List[Token]], int]:
+    """
+    Split the contents of a bracketed group at its top-level commas.
+    
+    Args:
+        tokens: Code tokens
+        open_index: Index of the opening '(', '[' or '{'
+    
+    Returns:
+        Tuple of (non-empty items, index of the closing bracket)
+    """
+    items = []
+    current: List[Token] = []
+    depth = 0
+    i = open_index + 1
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == PUNCT:
+            text = token.text
+            if text in _OPENERS:
+                depth += 1
+            elif text in _CLOSERS:
+                if depth == 0:
+                    break
+                depth -= 1
+            elif text == ',' and depth == 0:
+                if current:
+                    items.append(current)
+                current = []
+                i += 1
+                continue
+        current.append(token)
+        i += 1
+    
+    if current:
+        items.append(current)
+    return items, i
+
+
+def _append_argument(args: List[str], tokens: List[Token]) -> None:
+    """Append the source text of a macro argument, skipping empty ones."""
+    if len(tokens) == 1:
+        args.append(tokens[0].text)
+    elif tokens:
+        args.append(join_tokens(tokens))
 
 
 class KeymapParseError(Exception):
@@ -36,38 +99,54 @@ class KeymapParser:
     - ASCII art comments for visual layout
     """
     
-    def __init__(self):
+    def __init__(self, columnar: bool = False):
+        self.columnar = columnar  # Store keys in compact typed arrays
         self.custom_keycodes: Dict[str, str] = {}
+        self.symbol_values: Dict[str, int] = {}  # Integer values of enum entries
         self.layout_macro = ""
         
-    def parse_file(self, file_path: str) -> UniversalLayout:
-        """Parse a keymap.c file."""
+    def parse_file(self, file_path: str, source: Optional[Any] = None) -> UniversalLayout:
+        """Parse a keymap.c file, reusing already decoded text from source if given."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if source is not None:
+                content = source.text()
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
             return self.parse_content(content)
         except IOError as e:
             raise KeymapParseError(f"Failed to read keymap file: {e}")
     
     def parse_content(self, content: str) -> UniversalLayout:
         """Parse keymap.c content."""
-        # Clean content - remove comments but preserve ASCII art
-        cleaned_content = self._clean_content(content)
-        
-        # Extract custom keycodes
-        self.custom_keycodes = self._extract_custom_keycodes(content)
-        
-        # Extract layout macro name
-        self.layout_macro = self._extract_layout_macro(cleaned_content)
+        # Tokenize once; comments and preprocessor lines are set aside for
+        # metadata and symbol values, the remaining tokens hold the C code
+        tokens = tokenize(content)
+        code = [token for token in tokens if token.kind not in _NON_CODE_KINDS]
+        comments = [token for token in tokens if token.kind in COMMENT_KINDS]
+        
+        defines: Dict[str, str] = {}
+        includes: List[str] = []
+        for token in tokens:
+            if token.kind == PREPROCESSOR:
+                define = parse_define(token)
+                if define:
+                    defines[define[0]] = define[1]
+                else:
+                    include = parse_include(token)
+                    if include:
+                        includes.append(include)
         
-        # Extract keymap layers
-        layers_data = self._extract_keymap_layers(cleaned_content)
+        # Extract enums, custom keycodes and the keymap layers in one walk
+        layers_data = self._extract_keymap_layers(code, defines)
         
         if not layers_data:
             raise KeymapParseError("No keymap layers found")
         
         # Create layout object
         layout = UniversalLayout()
+        if self.columnar:
+            layout.use_columnar_keys()
         layout.name = f"Keymap ({self.layout_macro})"
         layout.layout_name = self.layout_macro or "LAYOUT"
         
@@ -87,153 +166,56 @@ class KeymapParser:
             layer = LayerDefinition(
                 name=layer_data['name'],
                 index=layer_data['index'],
-                keycodes=layer_data['keycodes'].copy(),
+                keycodes=layer_data['keycodes'],
                 is_default=(layer_data['index'] == 0)
             )
             layout.add_layer(layer)
         
         # Extract metadata from comments
-        self._extract_metadata_from_comments(layout, content)
+        self._extract_metadata_from_comments(layout, comments, includes)
         
         return layout
     
-    def _clean_content(self, content: str) -> str:
-        """Clean C code content, removing single-line comments but preserving multi-line comments."""
-        # Remove single-line comments (// ...)
-        content = re.sub(r'//.*$', '', content, flags=re.MULTILINE)
-        return content
-    
-    def _extract_custom_keycodes(self, content: str) -> Dict[str, str]:
-        """Extract custom keycode definitions from enum."""
-        custom_keycodes = {}
-        
-        # Find enum blocks
-        enum_pattern = r'enum\s+\w*\s*\{([^}]+)\}'
-        matches = re.findall(enum_pattern, content, re.DOTALL)
-        
-        for enum_content in matches:
-            # Parse enum entries
-            entries = re.findall(r'(\w+)(?:\s*=\s*([^,\s]+))?', enum_content)
-            for name, value in entries:
-                if name and name != 'SAFE_RANGE':
-                    custom_keycodes[name] = value or name
-        
-        return custom_keycodes
-    
-    def _extract_layer_enum_mapping(self, content: str) -> Dict[str, int]:
-        """Extract layer enum to index mapping from enum definitions."""
-        layer_enum_map = {}
-        
-        # Find enum blocks that contain layer definitions
-        enum_pattern = r'enum\s+\w*\s*\{([^}]+)\}'
-        matches = re.findall(enum_pattern, content, re.DOTALL)
-        
-        for enum_content in matches:
-            # Look for layer-like enum entries (starting with _ and containing LAYER or common layer names)
-            lines = enum_content.split(',')
-            current_index = 0
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Parse enum entry
-                if '=' in line:
-                    # Explicit value assignment
-                    name_part, value_part = line.split('=', 1)
-                    name = name_part.strip()
-                    try:
-                        value = int(value_part.strip())
-                        current_index = value
-                    except ValueError:
-                        # Value might be a reference to another enum
-                        current_index += 1
-                else:
-                    # Implicit value
-                    name = line.strip()
-                
-                # Check if this looks like a layer name
-                if name.startswith('_') and (
-                    'QWERTY' in name.upper() or 
-                    'LOWER' in name.upper() or 
-                    'RAISE' in name.upper() or 
-                    'ADJUST' in name.upper() or
-                    'BASE' in name.upper() or
-                    'FN' in name.upper() or
-                    'LAYER' in name.upper()
-                ):
-                    layer_enum_map[name] = current_index
-                    current_index += 1
-        
-        return layer_enum_map
-    
-    def _extract_layout_macro(self, content: str) -> str:
-        """Extract the layout macro name (e.g., LAYOUT_60_ansi)."""
-        # Look for keymaps array definition
-        keymap_pattern = r'keymaps\[\]\[MATRIX_ROWS\]\[MATRIX_COLS\]\s*=\s*\{.*?\[0\]\s*=\s*(\w+)\s*\('
-        match = re.search(keymap_pattern, content, re.DOTALL)
-        
-        if match:
-            return match.group(1)
-        
-        # Fallback: look for any LAYOUT macro
-        layout_pattern = r'\[0\]\s*=\s*(LAYOUT\w*)\s*\('
-        match = re.search(layout_pattern, content)
-        if match:
-            return match.group(1)
-        
-        return "LAYOUT"
-    
-    def _extract_keymap_layers(self, content: str) -> List[Dict[str, Any]]:
-        """Extract all keymap layers from the keymaps array."""
-        layers = []
-        
-        # Find the keymaps array
-        keymaps_pattern = r'keymaps\[\]\[MATRIX_ROWS\]\[MATRIX_COLS\]\s*=\s*\{(.*?)\};'
-        match = re.search(keymaps_pattern, content, re.DOTALL)
+    def _extract_keymap_layers(self, code: List[Token], defines: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Walk the code tokens once, collecting enum values, custom keycodes
+        and the layers of the keymaps array.
+        """
+        self.custom_keycodes = {}
+        self.layout_macro = ""
+        self.symbol_values = {}
+        entries = None
+        
+        i = 0
+        while i < len(code):
+            text = code[i].text
+            if text == 'enum':
+                i = self._parse_enum(code, i + 1, defines)
+            elif text == 'keymaps' and entries is None and i + 1 < len(code) and code[i + 1].text == '[':
+                entries, i = self._parse_keymaps_array(code, i + 1)
+            else:
+                i += 1
         
-        if not match:
+        if entries is None:
             raise KeymapParseError("Could not find keymaps array")
         
-        keymaps_content = match.group(1)
-        
-        # Extract enum definitions for layer mapping
-        layer_enum_map = self._extract_layer_enum_mapping(content)
-        
-        # Extract individual layers - support both numeric [0] and enum [_QWERTY] patterns
-        # Use a more comprehensive regex that handles multi-line content and balances parentheses
-        layer_pattern = r'\[([_A-Z0-9]+)\]\s*=\s*' + re.escape(self.layout_macro) + r'\s*\('
-        
-        # Find the starting positions of each layer
-        layer_starts = [(m.group(1), m.start()) for m in re.finditer(layer_pattern, keymaps_content)]
+        # Resolve layer identifiers; positional entries follow the previous layer
+        raw_layers = []
+        next_index = 0
+        for designator, macro, keycodes in entries:
+            if not self.layout_macro:
+                self.layout_macro = macro
+            layer_identifier = str(next_index) if designator is None else designator
+            raw_layers.append((layer_identifier, keycodes))
+            
+            layer_index = self._evaluate(layer_identifier, defines)
+            next_index = (layer_index if layer_index is not None else len(raw_layers) - 1) + 1
         
-        layer_matches = []
-        if layer_starts:
-            # For each layer start, find its corresponding end by balancing parentheses
-            for i, (layer_name, start_pos) in enumerate(layer_starts):
-                # Find where the opening parenthesis is
-                open_paren_pos = keymaps_content.find('(', start_pos)
-                if open_paren_pos == -1:
-                    continue
-                
-                # Find the matching closing parenthesis
-                paren_depth = 1
-                end_pos = open_paren_pos + 1
-                
-                while paren_depth > 0 and end_pos < len(keymaps_content):
-                    if keymaps_content[end_pos] == '(':
-                        paren_depth += 1
-                    elif keymaps_content[end_pos] == ')':
-                        paren_depth -= 1
-                    end_pos += 1
-                
-                if paren_depth == 0:  # Found the matching closing parenthesis
-                    # Extract the content inside the parentheses
-                    layer_content = keymaps_content[open_paren_pos+1:end_pos-1].strip()
-                    layer_matches.append((layer_name, layer_content))
+        if not self.layout_macro:
+            self.layout_macro = "LAYOUT"
         
-        for layer_identifier, layer_content in layer_matches:
+        layers = []
+        for layer_identifier, keycodes in raw_layers:
             # Determine layer index and name
             if layer_identifier.isdigit():
                 # Numeric layer index
@@ -244,12 +226,12 @@ class KeymapParser:
                 elif layer_index == 1:
                     layer_name = "Function"
             else:
-                # Enum-based layer name
-                layer_index = layer_enum_map.get(layer_identifier, len(layers))
+                # Enum or #define based layer name
+                layer_index = self._evaluate(layer_identifier, defines)
+                if layer_index is None:
+                    layer_index = len(layers)
                 layer_name = layer_identifier.lstrip('_').title()  # Convert _QWERTY to Qwerty
             
-            keycodes = self._parse_layer_keycodes(layer_content)
-            
             # Expand keycodes to full matrix if needed
             keycodes = self._expand_keycodes_to_matrix(keycodes)
             
@@ -264,37 +246,119 @@ class KeymapParser:
         
         return layers
     
-    def _parse_layer_keycodes(self, layer_content: str) -> List[str]:
-        """Parse keycodes from a layer definition."""
-        # Remove comments and whitespace
-        cleaned = re.sub(r'/\*.*?\*/', '', layer_content, flags=re.DOTALL)
-        cleaned = re.sub(r'//.*$', '', cleaned, flags=re.MULTILINE)
-        
-        # Split on commas, handling multiline content
-        parts = re.split(r',\s*', cleaned)
-        
-        keycodes = []
-        for part in parts:
-            part = part.strip()
-            if not part:
+    def _parse_enum(self, code: List[Token], i: int, defines: Dict[str, str]) -> int:
+        """Record the entries of an enum starting after the 'enum' keyword; returns the next index."""
+        if i < len(code) and code[i].kind == IDENTIFIER:
+            i += 1  # Enum tag
+        if i >= len(code) or code[i].text != '{':
+            return i
+        
+        entries, close = _split_group(code, i)
+        next_value: Optional[int] = 0
+        for entry in entries:
+            if entry[0].kind != IDENTIFIER:
                 continue
+            name = entry[0].text
+            
+            value_text = None
+            if len(entry) > 2 and entry[1].text == '=':
+                value_text = join_tokens(entry[2:])
+                value = self._evaluate(value_text, defines)
+            else:
+                value = next_value
             
-            # First try to match complete function calls with parameters
-            # Function calls like MO(_LOWER), LT(1, KC_TAB), etc.
-            func_match = re.search(r'([A-Z_][A-Z0-9_]*\([^()]*(?:\([^()]*\)[^()]*)*\))', part)
-            if func_match:
-                keycodes.append(func_match.group(1))
+            if name != 'SAFE_RANGE':
+                self.custom_keycodes[name] = value_text or name
+            if value is not None:
+                self.symbol_values[name] = value
+            next_value = value + 1 if value is not None else None
+        
+        return close + 1
+    
+    def _parse_keymaps_array(self, code: List[Token],
+                             i: int) -> Tuple[Optional[List[Tuple[Optional[str], str, List[str]]]], int]:
+        """
+        Parse ``keymaps[][MATRIX_ROWS][MATRIX_COLS] = { ... }`` starting at the first '['.
+        
+        Entries are split at top-level commas and the arguments of each layer
+        macro call at the call's own top-level commas, in a single walk, so
+        nested calls such as LT(1, KC_TAB) stay one keycode.
+        
+        Returns:
+            Tuple of (layer entries as (designator, macro name, keycodes), or
+            None if this is not the array definition, and the next token index)
+        """
+        while i < len(code) and code[i].text == '[':
+            _, close = _split_group(code, i)
+            i = close + 1
+        
+        if i + 1 >= len(code) or code[i].text != '=' or code[i + 1].text != '{':
+            return None, i
+        
+        entries = []
+        entry_start = i + 2             # First token of the current entry
+        macro_index = None              # Position of the entry's layer macro name
+        args: List[str] = []            # Keycodes of the layer macro call
+        arg_start = None                # First token of the keycode being read, inside the call
+        depth = 0
+        
+        i += 2
+        end = len(code)
+        while i < end:
+            token = code[i]
+            i += 1
+            if token.kind != PUNCT:
                 continue
             
-            # If no function call, try to match simple keycodes
-            keycode_match = re.search(r'([A-Z_][A-Z0-9_]*)', part)
-            if keycode_match:
-                keycode = keycode_match.group(1)
-                # Skip layout macro name if it appears
-                if keycode != self.layout_macro and keycode not in ['MATRIX_ROWS', 'MATRIX_COLS']:
-                    keycodes.append(keycode)
-        
-        return keycodes
+            text = token.text
+            if text in _OPENERS:
+                depth += 1
+                if (depth == 1 and text == '(' and macro_index is None and i - 2 >= entry_start
+                        and code[i - 2].kind == IDENTIFIER):
+                    macro_index = i - 2
+                    arg_start = i
+            elif text in _CLOSERS:
+                depth -= 1
+                if depth < 0:
+                    # End of the keymaps array
+                    break
+                if depth == 0 and arg_start is not None:
+                    _append_argument(args, code[arg_start:i - 1])
+                    arg_start = None
+            elif text == ',':
+                if depth == 0:
+                    if macro_index is not None:
+                        self._add_keymap_entry(entries, code[entry_start:macro_index],
+                                               code[macro_index].text, args)
+                    entry_start, macro_index, args = i, None, []
+                elif depth == 1 and arg_start is not None:
+                    _append_argument(args, code[arg_start:i - 1])
+                    arg_start = i
+        
+        if macro_index is not None:
+            self._add_keymap_entry(entries, code[entry_start:macro_index], code[macro_index].text, args)
+        return entries, i
+    
+    def _add_keymap_entry(self, entries: List[Tuple[Optional[str], str, List[str]]],
+                          head: List[Token], macro: str, args: List[str]):
+        """Record a keymaps array entry given the tokens in front of its layer macro call."""
+        if not head:
+            # Positional entry
+            entries.append((None, macro, args))
+        elif len(head) >= 4 and head[0].text == '[' and head[-2].text == ']' and head[-1].text == '=':
+            # Designated entry: [index] = MACRO(...)
+            entries.append((join_tokens(head[1:-2]), macro, args))
+    
+    def _evaluate(self, text: str, defines: Dict[str, str], depth: int = 0) -> Optional[int]:
+        """Resolve an integer literal, enum value or #define constant."""
+        value = parse_int(text)
+        if value is not None:
+            return value
+        if text in self.symbol_values:
+            return self.symbol_values[text]
+        if text in defines and depth < 16:
+            return self._evaluate(defines[text], defines, depth + 1)
+        return None
     
     def _expand_keycodes_to_matrix(self, keycodes: List[str]) -> List[str]:
         """Expand keycodes to full matrix size by adding KC_NO for unused positions."""
@@ -397,27 +461,29 @@ class KeymapParser:
             
             layout.add_key(key)
     
-    def _extract_metadata_from_comments(self, layout: UniversalLayout, content: str):
-        """Extract metadata from file comments."""
+    def _extract_metadata_from_comments(self, layout: UniversalLayout, comments: List[Token],
+                                        includes: List[str]):
+        """Extract metadata from file comments and includes."""
+        block_comments = [token.text for token in comments if token.kind == BLOCK_COMMENT]
+        
         # Extract copyright information
-        copyright_match = re.search(r'/\*\s*Copyright\s+(\d+)\s+([^*]+)', content)
-        if copyright_match:
-            year = copyright_match.group(1)
-            author = copyright_match.group(2).strip()
-            layout.author = author
-            layout.description = f"QMK Keymap (Copyright {year})"
+        for block in block_comments:
+            copyright_match = re.match(r'/\*\s*Copyright\s+(\d+)\s+([^*]+)', block)
+            if copyright_match:
+                year = copyright_match.group(1)
+                author = copyright_match.group(2).strip()
+                layout.author = author
+                layout.description = f"QMK Keymap (Copyright {year})"
+                break
         
         # Look for keyboard name in includes
-        keyboard_match = re.search(r'#include\s+"([^"]+)/keymap\.c"', content)
-        if not keyboard_match:
-            keyboard_match = re.search(r'#include\s+QMK_KEYBOARD_H', content)
-        
-        if keyboard_match:
-            layout.name = f"QMK Keymap"
+        for include in includes:
+            if include == 'QMK_KEYBOARD_H' or re.match(r'"[^"]+/keymap\.c"', include):
+                layout.name = f"QMK Keymap"
+                break
         
         # Extract ASCII art layouts if present
-        ascii_art_blocks = re.findall(r'/\*[^*]*\*(?:[^/][^*]*\*+)*/', content, re.DOTALL)
-        for block in ascii_art_blocks:
+        for block in block_comments:
             if '┌' in block or '┬' in block or '│' in block:
                 # This looks like ASCII art layout - store in description
                 if not layout.description:
@@ -449,15 +515,16 @@ class KeymapParser:
         return errors
 
 
-def parse_keymap_file(file_path: str) -> UniversalLayout:
+def parse_keymap_file(file_path: str, columnar: bool = False,
+                      source: Optional[Any] = None) -> UniversalLayout:
     """Convenience function to parse a keymap.c file."""
-    parser = KeymapParser()
-    return parser.parse_file(file_path)
+    parser = KeymapParser(columnar=columnar)
+    return parser.parse_file(file_path, source)
 
 
-def parse_keymap_content(content: str) -> UniversalLayout:
+def parse_keymap_content(content: str, columnar: bool = False) -> UniversalLayout:
     """Convenience function to parse keymap.c content."""
-    parser = KeymapParser()
+    parser = KeymapParser(columnar=columnar)
     return parser.parse_content(content)
 
 
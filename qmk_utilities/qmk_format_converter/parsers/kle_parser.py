@@ -3,12 +3,28 @@ KLE Parser
 
 This module implements parsing of KLE (Keyboard Layout Editor) JSON format
 to the universal layout data model.
+
+Besides parsing a fully loaded document, KLEParser can read a KLE file as a
+stream: rows are decoded one at a time from the top-level array, so keys can
+be produced with bounded memory and files holding several concatenated KLE
+documents can be converted layout by layout.
 """
 
+import codecs
 import json
-from typing import Dict, List, Any, Union, Optional, Tuple
-from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
-from data_models.keycode_mappings import KEYCODE_MAPPER
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Any, Union, Optional, Tuple
+
+# Handle both standalone and module execution
+try:
+    from ..data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from ..data_models.keycode_mappings import KEYCODE_MAPPER
+except ImportError:
+    # Running as standalone script
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from data_models.keycode_mappings import KEYCODE_MAPPER
 
 
 class KLEParseError(Exception):
@@ -16,6 +32,117 @@ class KLEParseError(Exception):
     pass
 
 
+class _JSONArrayReader:
+    """
+    Incremental reader for top-level JSON arrays in a file object.
+    
+    Each array element is decoded on its own with JSONDecoder.raw_decode, so
+    only the element being decoded (plus one read chunk) is held in memory.
+    Several arrays may follow each other in the same stream.
+    """
+    
+    def __init__(self, stream, chunk_size: int = 64 * 1024):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = None
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+    
+    def _fill(self, size: Optional[int] = None) -> bool:
+        """Read more input into the buffer; returns False at end of stream."""
+        if self._eof:
+            return False
+        
+        chunk = self.stream.read(size or self.chunk_size)
+        if isinstance(chunk, bytes):
+            if self._text_decoder is None:
+                self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+            try:
+                text = self._text_decoder.decode(chunk, final=not chunk)
+            except UnicodeDecodeError as e:
+                raise KLEParseError(f"Failed to read KLE file: {e}")
+        else:
+            text = chunk
+        
+        if not chunk:
+            self._eof = True
+        
+        # Drop consumed input so memory stays bounded by the current element
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return bool(chunk)
+    
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of stream)."""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in ' \t\n\r':
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ''
+    
+    def at_end(self) -> bool:
+        """Return True if only whitespace remains in the stream."""
+        return self._peek() == ''
+    
+    def next_array(self) -> Optional[Iterator[Any]]:
+        """
+        Start reading the next top-level array.
+        
+        Returns:
+            Iterator over the array's elements, or None at end of stream
+        """
+        char = self._peek()
+        if not char:
+            return None
+        if char != '[':
+            # Decode the value first so malformed JSON is reported as such
+            self._decode_value()
+            raise KLEParseError("KLE data must be a non-empty array")
+        self._pos += 1
+        return self._elements()
+    
+    def _elements(self) -> Iterator[Any]:
+        first = True
+        while True:
+            char = self._peek()
+            if char == ']':
+                self._pos += 1
+                return
+            if not first:
+                if char != ',':
+                    raise KLEParseError(f"Invalid JSON: expected ',' or ']' but found {char!r}")
+                self._pos += 1
+                self._peek()
+            first = False
+            yield self._decode_value()
+    
+    def _decode_value(self) -> Any:
+        """Decode the JSON value at the current position, reading more input as needed."""
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # The value may continue in input not read yet; grow reads
+                # geometrically so long values are re-scanned only a few times
+                if self._fill(max(self.chunk_size, len(self._buffer) - self._pos)):
+                    continue
+                raise KLEParseError(f"Invalid JSON: {e}")
+            
+            if end == len(self._buffer) and not self._eof:
+                # A number may be cut off at the end of the buffer
+                if self._fill():
+                    continue
+            self._pos = end
+            return value
+
+
 class KLEParser:
     """
     Parser for KLE (Keyboard Layout Editor) JSON format.
@@ -26,11 +153,16 @@ class KLEParser:
     - Each row contains keys (strings) and formatting objects
     """
     
-    def __init__(self):
+    def __init__(self, columnar: bool = False):
+        self.columnar = columnar  # Store keys in compact typed arrays
+        self._key_store = None
         self.current_row = 0
         self.current_col = 0
         self.current_x = 0.0
         self.current_y = 0.0
+        # Position that rx/ry reset to, kept across rotation changes as in KLE
+        self.cluster_x = 0.0
+        self.cluster_y = 0.0
         
         # Current formatting state
         self.current_props = {
@@ -48,11 +180,14 @@ class KLEParser:
             'p': 'OEM'     # profile
         }
     
-    def parse_file(self, file_path: str) -> UniversalLayout:
-        """Parse a KLE JSON file."""
+    def parse_file(self, file_path: str, source: Optional[Any] = None) -> UniversalLayout:
+        """Parse a KLE JSON file, reusing already decoded JSON from source if given."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if source is not None:
+                data = source.json()
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             return self.parse_data(data)
         except (IOError, json.JSONDecodeError) as e:
             raise KLEParseError(f"Failed to read KLE file: {e}")
@@ -70,32 +205,87 @@ class KLEParser:
         if not isinstance(data, list) or len(data) == 0:
             raise KLEParseError("KLE data must be a non-empty array")
         
+        return self._build_layout(data)
+    
+    def parse_stream(self, source: Union[str, Path, Any]) -> UniversalLayout:
+        """
+        Parse a KLE document incrementally from a file path or file object.
+        
+        Rows are decoded one at a time instead of loading the whole document,
+        and the resulting layout is identical to parse_data on the loaded JSON.
+        
+        Args:
+            source: Path to a KLE file, or a binary or text file object
+        """
+        with _open_source(source) as stream:
+            reader = _JSONArrayReader(stream)
+            elements = reader.next_array()
+            if elements is None:
+                raise KLEParseError("Invalid JSON: no KLE document found")
+            
+            layout = self._build_layout(elements)
+            if not reader.at_end():
+                raise KLEParseError("Invalid JSON: extra data after the KLE document")
+            return layout
+    
+    def iter_layouts(self, source: Union[str, Path, Any]) -> Iterator[UniversalLayout]:
+        """
+        Parse a stream of concatenated KLE documents, yielding one layout each.
+        
+        Only the layout being built is kept in memory, so multi-layout dumps
+        of any size can be converted document by document.
+        
+        Args:
+            source: Path to a file, or a binary or text file object
+        """
+        with _open_source(source) as stream:
+            reader = _JSONArrayReader(stream)
+            elements = reader.next_array()
+            while elements is not None:
+                yield self._build_layout(elements)
+                elements = reader.next_array()
+    
+    def iter_keys(self, source: Union[str, Path, Any]) -> Iterator[KeyDefinition]:
+        """
+        Yield the keys of a KLE document as each row is decoded.
+        
+        Keys are the same KeyDefinitions parse_stream would produce, but
+        nothing is accumulated, so memory use does not grow with the file.
+        
+        Args:
+            source: Path to a KLE file, or a binary or text file object
+        """
+        with _open_source(source) as stream:
+            elements = _JSONArrayReader(stream).next_array()
+            if elements is None:
+                raise KLEParseError("Invalid JSON: no KLE document found")
+            
+            self._reset_state()
+            for key in self._iter_document_keys(UniversalLayout(), elements):
+                yield key
+    
+    def _build_layout(self, elements: Iterable[Any]) -> UniversalLayout:
+        """Build a layout from the top-level elements of one KLE document."""
         # Reset parser state
         self._reset_state()
         
         # Create layout object
         layout = UniversalLayout()
+        if self.columnar:
+            # Keys are written straight into the layout's arrays while parsing
+            layout.use_columnar_keys()
+            self._key_store = layout.keys
         
-        # Parse metadata if present (first element is object)
-        start_index = 0
-        if isinstance(data[0], dict) and not self._is_key_property(data[0]):
-            metadata = data[0]
-            self._apply_metadata(layout, metadata)
-            start_index = 1
-        
-        # Parse keyboard rows
-        keys = []
-        for i in range(start_index, len(data)):
-            row_data = data[i]
-            if isinstance(row_data, list):
-                row_keys = self._parse_row(row_data)
-                keys.extend(row_keys)
-            else:
-                raise KLEParseError(f"Row {i - start_index} must be an array")
+        # Parse metadata and keyboard rows
+        try:
+            keys = list(self._iter_document_keys(layout, elements))
+        finally:
+            self._key_store = None
         
-        # Add keys to layout
-        for key in keys:
-            layout.add_key(key)
+        # Add keys to layout (columnar keys are already stored)
+        if not self.columnar:
+            for key in keys:
+                layout.add_key(key)
         
         # Create default layer with parsed keycodes
         default_keycodes = [key.keycode or "KC_TRNS" for key in keys]
@@ -120,12 +310,37 @@ class KLEParser:
         
         return layout
     
+    def _iter_document_keys(self, layout: UniversalLayout,
+                            elements: Iterable[Any]) -> Iterator[KeyDefinition]:
+        """Apply document metadata to layout and yield keys row by row."""
+        row_index = 0
+        first = True
+        
+        for element in elements:
+            # Parse metadata if present (first element is object)
+            if first:
+                first = False
+                if isinstance(element, dict) and not self._is_key_property(element):
+                    self._apply_metadata(layout, element)
+                    continue
+            
+            if not isinstance(element, list):
+                raise KLEParseError(f"Row {row_index} must be an array")
+            for key in self._parse_row(element):
+                yield key
+            row_index += 1
+        
+        if first:
+            raise KLEParseError("KLE data must be a non-empty array")
+    
     def _reset_state(self):
         """Reset parser state for new parsing."""
         self.current_row = 0
         self.current_col = 0
         self.current_x = 0.0
         self.current_y = 0.0
+        self.cluster_x = 0.0
+        self.cluster_y = 0.0
         self.current_props = {
             'w': 1.0, 'h': 1.0, 'x': 0.0, 'y': 0.0,
             'r': 0.0, 'rx': 0.0, 'ry': 0.0,
@@ -174,6 +389,15 @@ class KLEParser:
     
     def _update_properties(self, props: Dict[str, Any]):
         """Update current formatting properties."""
+        # A rotation origin moves the position to it, as in KLE; x and y are
+        # then offsets from the origin in the rotated cluster's frame
+        if 'rx' in props:
+            self.cluster_x = float(props['rx'])
+            self.current_x, self.current_y = self.cluster_x, self.cluster_y
+        if 'ry' in props:
+            self.cluster_y = float(props['ry'])
+            self.current_x, self.current_y = self.cluster_x, self.cluster_y
+        
         # Handle position offsets
         if 'x' in props:
             self.current_x += float(props['x'])
@@ -191,7 +415,8 @@ class KLEParser:
         keycode = KEYCODE_MAPPER.parse_kle_key_label(label)
         
         # Create key definition
-        key = KeyDefinition(
+        create = self._key_store.append_fields if self._key_store is not None else KeyDefinition
+        key = create(
             # Physical properties
             x=self.current_x,
             y=self.current_y,
@@ -262,7 +487,7 @@ class KLEParser:
         """Move to the next keyboard row."""
         self.current_row += 1
         self.current_col = 0
-        self.current_x = 0.0
+        self.current_x = float(self.current_props['rx'])  # Rows start at the rotation origin
         self.current_y += 1.0  # Standard row spacing
     
     def validate_kle_data(self, data: List[Any]) -> List[str]:
@@ -300,18 +525,53 @@ class KLEParser:
         return errors
 
 
-def parse_kle_file(file_path: str) -> UniversalLayout:
+class _open_source:
+    """Context manager yielding a file object for a path, or the given file object."""
+    
+    def __init__(self, source: Union[str, Path, Any]):
+        self.source = source
+        self.file = None
+    
+    def __enter__(self):
+        if isinstance(self.source, (str, Path)):
+            try:
+                self.file = open(self.source, 'rb')
+            except IOError as e:
+                raise KLEParseError(f"Failed to read KLE file: {e}")
+            return self.file
+        return self.source
+    
+    def __exit__(self, *exc_info):
+        if self.file is not None:
+            self.file.close()
+        return False
+
+
+def parse_kle_file(file_path: str, columnar: bool = False,
+                   source: Optional[Any] = None) -> UniversalLayout:
     """Convenience function to parse a KLE file."""
-    parser = KLEParser()
-    return parser.parse_file(file_path)
+    parser = KLEParser(columnar=columnar)
+    return parser.parse_file(file_path, source)
 
 
-def parse_kle_json(json_str: str) -> UniversalLayout:
+def parse_kle_json(json_str: str, columnar: bool = False) -> UniversalLayout:
     """Convenience function to parse KLE JSON string."""
-    parser = KLEParser()
+    parser = KLEParser(columnar=columnar)
     return parser.parse_json(json_str)
 
 
+def parse_kle_stream(source: Union[str, Path, Any], columnar: bool = False) -> UniversalLayout:
+    """Convenience function to parse a KLE file or file object incrementally."""
+    parser = KLEParser(columnar=columnar)
+    return parser.parse_stream(source)
+
+
+def iter_kle_layouts(source: Union[str, Path, Any], columnar: bool = False) -> Iterator[UniversalLayout]:
+    """Convenience function to parse concatenated KLE documents one layout at a time."""
+    parser = KLEParser(columnar=columnar)
+    return parser.iter_layouts(source)
+
+
 def validate_kle_file(file_path: str) -> List[str]:
     """Validate a KLE file and return any errors."""
     try:
@@ -7,8 +7,18 @@ QMK Configurator format is exported from config.qmk.fm and contains layers as fl
 
 import json
 from typing import Dict, List, Any, Optional
-from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
-from data_models.keycode_mappings import KEYCODE_MAPPER
+
+# Handle both standalone and module execution
+try:
+    from ..data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from ..data_models.keycode_mappings import KEYCODE_MAPPER
+except ImportError:
+    # Running as standalone script
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from data_models.keycode_mappings import KEYCODE_MAPPER
 
 
 class QMKConfiguratorParseError(Exception):
@@ -56,14 +66,17 @@ class QMKConfiguratorParser:
         }
     }
     
-    def __init__(self):
-        pass
+    def __init__(self, columnar: bool = False):
+        self.columnar = columnar  # Store keys in compact typed arrays
     
-    def parse_file(self, file_path: str) -> UniversalLayout:
-        """Parse a QMK Configurator JSON file."""
+    def parse_file(self, file_path: str, source: Optional[Any] = None) -> UniversalLayout:
+        """Parse a QMK Configurator JSON file, reusing already decoded JSON from source if given."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if source is not None:
+                data = source.json()
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             return self.parse_data(data)
         except (IOError, json.JSONDecodeError) as e:
             raise QMKConfiguratorParseError(f"Failed to read QMK Configurator file: {e}")
@@ -88,6 +101,8 @@ class QMKConfiguratorParser:
         
         # Create layout object
         layout = UniversalLayout()
+        if self.columnar:
+            layout.use_columnar_keys()
         
         # Parse metadata
         self._parse_metadata(layout, data)
@@ -123,7 +138,7 @@ class QMKConfiguratorParser:
             
             # Update key keycodes from first layer
             if layer_index == 0 and len(layer.keycodes) == len(keys):
-                for i, key in enumerate(keys):
+                for i, key in enumerate(layout.keys):
                     if i < len(layer.keycodes):
                         key.keycode = layer.keycodes[i]
                         # Update label based on keycode
@@ -228,7 +243,7 @@ class QMKConfiguratorParser:
         layer = LayerDefinition(
             name=layer_name,
             index=layer_index,
-            keycodes=layer_keycodes.copy(),
+            keycodes=layer_keycodes,
             is_default=(layer_index == 0)
         )
         
@@ -302,15 +317,16 @@ class QMKConfiguratorParser:
         return has_required and has_layers_array and (has_version or has_layout)
 
 
-def parse_qmk_configurator_file(file_path: str) -> UniversalLayout:
+def parse_qmk_configurator_file(file_path: str, columnar: bool = False,
+                                source: Optional[Any] = None) -> UniversalLayout:
     """Convenience function to parse a QMK Configurator file."""
-    parser = QMKConfiguratorParser()
-    return parser.parse_file(file_path)
+    parser = QMKConfiguratorParser(columnar=columnar)
+    return parser.parse_file(file_path, source)
 
 
-def parse_qmk_configurator_json(json_str: str) -> UniversalLayout:
+def parse_qmk_configurator_json(json_str: str, columnar: bool = False) -> UniversalLayout:
     """Convenience function to parse QMK Configurator JSON string."""
-    parser = QMKConfiguratorParser()
+    parser = QMKConfiguratorParser(columnar=columnar)
     return parser.parse_json(json_str)
 
 
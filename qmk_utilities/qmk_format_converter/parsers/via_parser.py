@@ -6,8 +6,18 @@ This module implements parsing of VIA JSON format to the universal layout data m
 
 import json
 from typing import Dict, List, Any, Union, Optional, Tuple
-from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
-from data_models.keycode_mappings import KEYCODE_MAPPER
+
+# Handle both standalone and module execution
+try:
+    from ..data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from ..data_models.keycode_mappings import KEYCODE_MAPPER
+except ImportError:
+    # Running as standalone script
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from data_models.universal_layout import UniversalLayout, KeyDefinition, LayerDefinition
+    from data_models.keycode_mappings import KEYCODE_MAPPER
 
 
 class VIAParseError(Exception):
@@ -26,7 +36,8 @@ class VIAParser:
     - Keymaps: logical keymaps with QMK keycodes
     """
     
-    def __init__(self):
+    def __init__(self, columnar: bool = False):
+        self.columnar = columnar  # Store keys in compact typed arrays
         self.current_x = 0.0
         self.current_y = 0.0
         self.current_props = {
@@ -39,11 +50,14 @@ class VIAParser:
             'ry': 0.0,     # rotation y
         }
     
-    def parse_file(self, file_path: str) -> UniversalLayout:
-        """Parse a VIA JSON file."""
+    def parse_file(self, file_path: str, source: Optional[Any] = None) -> UniversalLayout:
+        """Parse a VIA JSON file, reusing already decoded JSON from source if given."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if source is not None:
+                data = source.json()
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             return self.parse_data(data)
         except (IOError, json.JSONDecodeError) as e:
             raise VIAParseError(f"Failed to read VIA file: {e}")
@@ -63,6 +77,8 @@ class VIAParser:
         
         # Create layout object
         layout = UniversalLayout()
+        if self.columnar:
+            layout.use_columnar_keys()
         
         # Parse metadata
         self._parse_metadata(layout, data)
@@ -131,14 +147,14 @@ class VIAParser:
                 layer = LayerDefinition(
                     name=layer_name,
                     index=layer_index,
-                    keycodes=layer_keycodes.copy(),
+                    keycodes=layer_keycodes,
                     is_default=is_default
                 )
                 layout.add_layer(layer)
                 
                 # Update key keycodes from first layer
                 if layer_index == 0:
-                    for i, key in enumerate(keys):
+                    for i, key in enumerate(layout.keys):
                         if i < len(layer_keycodes):
                                 key.keycode = layer_keycodes[i]
                                 # Update label based on keycode if not None
@@ -157,7 +173,7 @@ class VIAParser:
                         
                     # Update key keycodes from first layer
                     if layers and len(layers[0].keycodes) == len(keys):
-                        for i, key in enumerate(keys):
+                        for i, key in enumerate(layout.keys):
                             if i < len(layers[0].keycodes):
                                 key.keycode = layers[0].keycodes[i]
                                 # Update label based on keycode if not None
@@ -323,7 +339,7 @@ class VIAParser:
             layer = LayerDefinition(
                 name=layer_name,
                 index=layer_index,
-                keycodes=layer_keycodes.copy(),
+                keycodes=layer_keycodes,
                 is_default=(layer_index == 0)
             )
             
@@ -464,15 +480,16 @@ class VIAParser:
         return errors
 
 
-def parse_via_file(file_path: str) -> UniversalLayout:
+def parse_via_file(file_path: str, columnar: bool = False,
+                   source: Optional[Any] = None) -> UniversalLayout:
     """Convenience function to parse a VIA file."""
-    parser = VIAParser()
-    return parser.parse_file(file_path)
+    parser = VIAParser(columnar=columnar)
+    return parser.parse_file(file_path, source)
 
 
-def parse_via_json(json_str: str) -> UniversalLayout:
+def parse_via_json(json_str: str, columnar: bool = False) -> UniversalLayout:
     """Convenience function to parse VIA JSON string."""
-    parser = VIAParser()
+    parser = VIAParser(columnar=columnar)
     return parser.parse_json(json_str)
 
 
@@ -3,47 +3,161 @@ QMK Format Converter
 
 Main converter class that orchestrates format conversion between
 KLE, VIA, and keymap.c formats using the universal data model.
+
+Parser and generator modules are imported the first time a format is used,
+so commands that never convert anything start quickly.
 """
 
+import importlib
 import json
 import os
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Union, Optional, Dict, Any
-from enum import Enum
+from typing import Union, Optional, Dict, Any, Callable, Iterator, Tuple
 
 # Handle both standalone and module execution
 try:
     from .data_models.universal_layout import UniversalLayout
-    from .parsers.kle_parser import parse_kle_file
-    from .parsers.via_parser import parse_via_file
-    from .parsers.keymap_parser import parse_keymap_file
-    from .parsers.qmk_configurator_parser import parse_qmk_configurator_file
-    from .generators.kle_generator import generate_kle_file
-    from .generators.via_generator import generate_via_file
-    from .generators.keymap_generator import generate_keymap_file
-    from .generators.qmk_configurator_generator import generate_qmk_configurator_file
+    from .conversion_cache import ConversionCache, LayoutCache
+    from .formats import FORMAT_DESCRIPTIONS, FORMAT_INFO, SupportedFormat
 except ImportError:
     # Running as standalone script
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent))
     from data_models.universal_layout import UniversalLayout
-    from parsers.kle_parser import parse_kle_file
-    from parsers.via_parser import parse_via_file
-    from parsers.keymap_parser import parse_keymap_file
-    from parsers.qmk_configurator_parser import parse_qmk_configurator_file
-    from generators.kle_generator import generate_kle_file
-    from generators.via_generator import generate_via_file
-    from generators.keymap_generator import generate_keymap_file
-    from generators.qmk_configurator_generator import generate_qmk_configurator_file
+    from conversion_cache import ConversionCache, LayoutCache
+    from formats import FORMAT_DESCRIPTIONS, FORMAT_INFO, SupportedFormat
+
+
+# (module, function) implementing each format, imported on first use
+PARSER_FUNCTIONS = {
+    SupportedFormat.KLE: ('parsers.kle_parser', 'parse_kle_file'),
+    SupportedFormat.VIA: ('parsers.via_parser', 'parse_via_file'),
+    SupportedFormat.KEYMAP: ('parsers.keymap_parser', 'parse_keymap_file'),
+    SupportedFormat.QMK_CONFIGURATOR: ('parsers.qmk_configurator_parser', 'parse_qmk_configurator_file'),
+}
+
+GENERATOR_FUNCTIONS = {
+    SupportedFormat.KLE: ('generators.kle_generator', 'generate_kle_file'),
+    SupportedFormat.VIA: ('generators.via_generator', 'generate_via_file'),
+    SupportedFormat.KEYMAP: ('generators.keymap_generator', 'generate_keymap_file'),
+    SupportedFormat.QMK_CONFIGURATOR: ('generators.qmk_configurator_generator',
+                                       'generate_qmk_configurator_file'),
+}
+
+# Digest of the inputs an output format reads besides the layout, for the conversion cache key
+CACHE_CONTEXT_FUNCTIONS = {
+    SupportedFormat.KEYMAP: ('generators.keymap_generator', 'keymap_cache_context'),
+}
+
+
+class LazyFunctionMap(Mapping):
+    """Read-only format -> function mapping that imports each module on first lookup."""
+    
+    def __init__(self, specs: Dict[SupportedFormat, Tuple[str, str]]):
+        self._specs = specs
+        self._loaded: Dict[SupportedFormat, Callable] = {}
+    
+    def __getitem__(self, format_type: SupportedFormat) -> Callable:
+        function = self._loaded.get(format_type)
+        if function is None:
+            module_name, function_name = self._specs[format_type]
+            if __package__:
+                module = importlib.import_module(f".{module_name}", __package__)
+            else:
+                module = importlib.import_module(module_name)
+            function = self._loaded[format_type] = getattr(module, function_name)
+        return function
+    
+    def __iter__(self) -> Iterator[SupportedFormat]:
+        return iter(self._specs)
+    
+    def __len__(self) -> int:
+        return len(self._specs)
+
 
+@dataclass
+class ConversionStats:
+    """I/O counters for a single load or conversion."""
+    bytes_read: int = 0         # Bytes read from disk
+    file_reads: int = 0         # Number of times the input file was opened and read
+    text_decodes: int = 0       # UTF-8 decodes of the raw bytes
+    json_decodes: int = 0       # JSON parses of the decoded text
+    cache_hit: Optional[bool] = None  # Conversion cache outcome (None if no cache used)
+    layout_cache_hit: Optional[bool] = None  # Parsed layout cache outcome (None if not used)
+    
+    def summary(self) -> str:
+        """Generate a one-line summary of the counters."""
+        summary = (f"{self.bytes_read} bytes read in {self.file_reads} read(s), "
+                   f"{self.text_decodes} text decode(s), {self.json_decodes} JSON decode(s)")
+        if self.cache_hit is not None:
+            summary += f", cache {'hit' if self.cache_hit else 'miss'}"
+        if self.layout_cache_hit is not None:
+            summary += f", layout cache {'hit' if self.layout_cache_hit else 'miss'}"
+        return summary
 
-class SupportedFormat(Enum):
-    """Supported keyboard layout formats."""
-    KLE = "kle"
-    VIA = "via"
-    KEYMAP = "keymap"
-    QMK_CONFIGURATOR = "qmk_configurator"
+
+class InputSource:
+    """
+    An input file that is read from disk and decoded at most once.
+    
+    The raw bytes, the decoded text and the parsed JSON are each produced on
+    first use and cached, so format detection and parsing share the same work.
+    Decoding failures are cached too and re-raised on every access.
+    """
+    
+    def __init__(self, file_path: Union[str, Path], stats: Optional[ConversionStats] = None):
+        self.path = Path(file_path)
+        self.stats = stats if stats is not None else ConversionStats()
+        self._raw: Optional[bytes] = None
+        self._text: Optional[str] = None
+        self._text_error: Optional[Exception] = None
+        self._json: Any = None
+        self._json_error: Optional[Exception] = None
+        self._json_loaded = False
+    
+    @property
+    def raw(self) -> bytes:
+        """Raw file contents."""
+        if self._raw is None:
+            with open(self.path, 'rb') as f:
+                self._raw = f.read()
+            self.stats.file_reads += 1
+            self.stats.bytes_read += len(self._raw)
+        return self._raw
+    
+    def text(self) -> str:
+        """File contents decoded as UTF-8 with universal newlines, like open(..., 'r')."""
+        if self._text is None and self._text_error is None:
+            raw = self.raw
+            self.stats.text_decodes += 1
+            try:
+                text = raw.decode('utf-8')
+            except UnicodeDecodeError as e:
+                self._text_error = e
+            else:
+                if '\r' in text:
+                    text = text.replace('\r\n', '\n').replace('\r', '\n')
+                self._text = text
+        if self._text_error is not None:
+            raise self._text_error
+        return self._text
+    
+    def json(self) -> Any:
+        """File contents parsed as JSON."""
+        if not self._json_loaded:
+            text = self.text()
+            self.stats.json_decodes += 1
+            try:
+                self._json = json.loads(text)
+            except json.JSONDecodeError as e:
+                self._json_error = e
+            self._json_loaded = True
+        if self._json_error is not None:
+            raise self._json_error
+        return self._json
 
 
 class QMKFormatConverter:
@@ -65,22 +179,25 @@ class QMKFormatConverter:
                              "output.c", SupportedFormat.KEYMAP)
     """
     
-    def __init__(self):
-        """Initialize the converter with parsers and generators."""
-        # Map formats to parser and generator functions
-        self.parsers = {
-            SupportedFormat.KLE: parse_kle_file,
-            SupportedFormat.VIA: parse_via_file,
-            SupportedFormat.KEYMAP: parse_keymap_file,
-            SupportedFormat.QMK_CONFIGURATOR: parse_qmk_configurator_file
-        }
-        
-        self.generators = {
-            SupportedFormat.KLE: generate_kle_file,
-            SupportedFormat.VIA: generate_via_file,
-            SupportedFormat.KEYMAP: generate_keymap_file,
-            SupportedFormat.QMK_CONFIGURATOR: generate_qmk_configurator_file
-        }
+    def __init__(self, cache: Optional[ConversionCache] = None,
+                 layout_cache: Optional[LayoutCache] = None):
+        """
+        Initialize the converter with parsers and generators.
+        
+        Args:
+            cache: Conversion cache used by convert_file (no caching if None)
+            layout_cache: In-memory cache of parsed layouts used by convert_file
+        """
+        self.cache = cache
+        self.layout_cache = layout_cache
+        
+        # Map formats to parser and generator functions (imported on first use)
+        self.parsers = LazyFunctionMap(PARSER_FUNCTIONS)
+        self.generators = LazyFunctionMap(GENERATOR_FUNCTIONS)
+        self.cache_contexts = LazyFunctionMap(CACHE_CONTEXT_FUNCTIONS)
+        
+        # I/O counters of the most recent load_file/convert_file call
+        self.last_stats: Optional[ConversionStats] = None
     
     def detect_format(self, file_path: Union[str, Path]) -> Optional[SupportedFormat]:
         """
@@ -97,21 +214,22 @@ class QMKFormatConverter:
         if not file_path.exists():
             return None
         
+        return self._detect_source_format(InputSource(file_path))
+    
+    def _detect_source_format(self, source: InputSource) -> Optional[SupportedFormat]:
+        """Detect the format of an input source, decoding its content at most once."""
         # Check file extension first
-        extension = file_path.suffix.lower()
+        extension = source.path.suffix.lower()
         if extension == '.c':
             return SupportedFormat.KEYMAP
         elif extension in ['.json', '.kle']:
             # Need to examine content to distinguish KLE vs VIA
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                
-                if not content:
+                if not source.text().strip():
                     return None
                 
                 # Try to parse as JSON
-                data = json.loads(content)
+                data = source.json()
                 
                 # Detect QMK Configurator format characteristics (check first as it's most specific)
                 if isinstance(data, dict):
@@ -137,8 +255,7 @@ class QMKFormatConverter:
         
         # Check content patterns for keymap.c files without .c extension
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = source.text()
             
             # Look for QMK keymap patterns
             qmk_patterns = ['LAYOUT(', 'const uint16_t PROGMEM', '#include QMK_KEYBOARD_H']
@@ -151,13 +268,21 @@ class QMKFormatConverter:
         return None
     
     def load_file(self, file_path: Union[str, Path], 
-                  format_type: Optional[SupportedFormat] = None) -> UniversalLayout:
+                  format_type: Optional[SupportedFormat] = None,
+                  columnar: bool = False,
+                  source: Optional[InputSource] = None) -> UniversalLayout:
         """
         Load a keyboard layout file and convert it to universal format.
         
+        The file is read and decoded at most once: the bytes, text and JSON
+        used for format detection are handed to the parser. I/O counters are
+        available in ``last_stats`` afterwards.
+        
         Args:
             file_path: Path to the input file
             format_type: Format of the input file (auto-detected if None)
+            columnar: Store keys in compact typed arrays (see ColumnarKeys)
+            source: Already opened input for file_path (created if None)
             
         Returns:
             UniversalLayout object representing the keyboard layout
@@ -171,15 +296,19 @@ class QMKFormatConverter:
         if not file_path.exists():
             raise FileNotFoundError(f"Input file not found: {file_path}")
         
+        if source is None:
+            source = InputSource(file_path)
+        self.last_stats = source.stats
+        
         # Auto-detect format if not provided
         if format_type is None:
-            format_type = self.detect_format(file_path)
+            format_type = self._detect_source_format(source)
             if format_type is None:
                 raise ValueError(f"Unable to detect format for file: {file_path}")
         
         # Load using appropriate parser function
         parser_func = self.parsers[format_type]
-        return parser_func(str(file_path))
+        return parser_func(str(file_path), columnar=columnar, source=source)
     
     def save_file(self, layout: UniversalLayout, 
                   file_path: Union[str, Path], 
@@ -215,18 +344,61 @@ class QMKFormatConverter:
         """
         Convert a file from one format to another.
         
+        The input is read and decoded once; see ``last_stats`` for the counters.
+        When a cache is configured, unchanged inputs skip parsing and
+        generation and the cached output is written directly. With a layout
+        cache, unchanged inputs skip parsing only.
+        
         Args:
             input_path: Path to the input file
             input_format: Format of the input file (auto-detected if None)
             output_path: Path where to save the converted file
             output_format: Format to convert to
         """
-        # Load the input file
-        layout = self.load_file(input_path, input_format)
+        source = InputSource(input_path)
+        cache_key = None
+        
+        if self.cache is not None and source.path.exists():
+            context_func = self.cache_contexts.get(output_format)
+            cache_key = self.cache.make_key(
+                source.raw, input_format.value if input_format else None,
+                output_format.value, source.path.suffix,
+                context_func() if context_func else ""
+            )
+            cached_output = self.cache.get(cache_key)
+            source.stats.cache_hit = cached_output is not None
+            if cached_output is not None:
+                self.last_stats = source.stats
+                with open(output_path, 'wb') as f:
+                    f.write(cached_output)
+                print(f"Successfully converted {input_path} ({input_format or 'auto'}) "
+                      f"to {output_path} ({output_format.value}) [cached]")
+                return
+        
+        # Load the input file, reusing a previously parsed layout if possible
+        layout = None
+        layout_key = None
+        if self.layout_cache is not None and source.path.exists():
+            layout_key = self.layout_cache.make_key(
+                source.raw, input_format.value if input_format else None, source.path.suffix
+            )
+            layout = self.layout_cache.get(layout_key)
+            source.stats.layout_cache_hit = layout is not None
+        
+        if layout is None:
+            layout = self.load_file(input_path, input_format, source=source)
+            if layout_key is not None:
+                self.layout_cache.put(layout_key, layout)
+        else:
+            self.last_stats = source.stats
         
         # Save in the target format
         self.save_file(layout, output_path, output_format)
         
+        if cache_key is not None:
+            with open(output_path, 'rb') as f:
+                self.cache.put(cache_key, f.read())
+        
         print(f"Successfully converted {input_path} ({input_format or 'auto'}) "
               f"to {output_path} ({output_format.value})")
     
@@ -291,12 +463,7 @@ class QMKFormatConverter:
         Returns:
             Dictionary mapping format names to descriptions
         """
-        return {
-            "kle": "Keyboard Layout Editor JSON format (keyboard-layout-editor.com)",
-            "via": "VIA keymap JSON specification format (caniusevia.com)",
-            "keymap": "QMK keymap.c source file format",
-            "qmk_configurator": "QMK Configurator JSON format (config.qmk.fm)"
-        }
+        return dict(FORMAT_DESCRIPTIONS)
     
     def get_format_info(self, format_type: SupportedFormat) -> Dict[str, Any]:
         """
@@ -308,35 +475,4 @@ class QMKFormatConverter:
         Returns:
             Dictionary containing format information
         """
-        format_info = {
-            SupportedFormat.KLE: {
-                "name": "Keyboard Layout Editor",
-                "extension": ".json",
-                "description": "Visual keyboard layout format from keyboard-layout-editor.com",
-                "features": ["Physical layout", "Key positioning", "Visual styling", "Key labels"],
-                "url": "https://keyboard-layout-editor.com"
-            },
-            SupportedFormat.VIA: {
-                "name": "VIA Keymap Format", 
-                "extension": ".json",
-                "description": "VIA/VIAL keymap specification format",
-                "features": ["Keymap layers", "Keyboard metadata", "Matrix definitions", "Feature flags"],
-                "url": "https://caniusevia.com/docs/specification"
-            },
-            SupportedFormat.KEYMAP: {
-                "name": "QMK Keymap Source",
-                "extension": ".c", 
-                "description": "QMK firmware keymap source code",
-                "features": ["Layer definitions", "Custom functions", "Compile-ready code", "QMK macros"],
-                "url": "https://docs.qmk.fm"
-            },
-            SupportedFormat.QMK_CONFIGURATOR: {
-                "name": "QMK Configurator",
-                "extension": ".json",
-                "description": "QMK Configurator JSON format from config.qmk.fm",
-                "features": ["Flat layer arrays", "Keyboard metadata", "Direct QMK compatibility", "Web editor export"],
-                "url": "https://config.qmk.fm"
-            }
-        }
-        
-        return format_info.get(format_type, {})
+        return FORMAT_INFO.get(format_type, {})
@@ -0,0 +1,44 @@
+"""
+Keycode validation tests: placeholders, QMK keycodes the mapping lacks and
+custom keycodes are valid, malformed expressions are not.
+
+Usage: python -m pytest qmk_format_converter/tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the qmk_utilities directory to the Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from qmk_format_converter.data_models.keycode_expressions import is_keymap_name, parse_keycode
+from qmk_format_converter.data_models.layout_utils import LayoutValidator
+
+
+@pytest.mark.parametrize('keycode', [
+    '_______', 'XXXXXXX',
+    'QK_BOOT', 'RGB_TOG', 'UG_TOGG', 'CW_TOGG', 'KC_LPRN', 'MS_UP', 'EE_CLR',
+    'SAFE_RANGE', 'MY_MACRO',
+    'KC_A', 'MO(_LOWER)', 'LT(1, KC_SPC)', 'LCTL(LSFT(KC_T))', 'MT(MOD_LCTL | MOD_LSFT, KC_ESC)',
+    'LT(2, MY_MACRO)', 'LCTL(QK_BOOT)',
+])
+def test_valid_keycodes(keycode):
+    assert LayoutValidator._keycode_problem(keycode) is None
+
+
+@pytest.mark.parametrize('keycode', [
+    '', 'my_macro', 'MO()', 'LT(1)', 'LT(1, KC_SPC', 'MT(KC_A, KC_ESC)', 'FOO(KC_A)', 'KC_A KC_B',
+])
+def test_invalid_keycodes(keycode):
+    assert LayoutValidator._keycode_problem(keycode) is not None
+
+
+def test_custom_keycodes():
+    assert parse_keycode('MY_MACRO').is_custom
+    assert parse_keycode('SAFE_RANGE').is_custom
+    assert not parse_keycode('KC_A').is_custom
+    assert not parse_keycode('_______').is_custom
+    assert not parse_keycode('MO(1)').is_custom
+    assert not is_keymap_name('my_macro')